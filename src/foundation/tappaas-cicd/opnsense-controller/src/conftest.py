@@ -0,0 +1,5 @@
+import os
+
+# Never let a test run read or write the user's config-store snapshot
+# (~/.cache/tappaas/config-store.pickle), whichever module is collected first.
+os.environ["TAPPAAS_CONFIG_CACHE"] = ""
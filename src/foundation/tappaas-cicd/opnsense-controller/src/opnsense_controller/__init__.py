@@ -19,6 +19,7 @@ from .caddy_manager import (
 from .config import Config
 from .dhcp_manager import DhcpHost, DhcpManager, DhcpRange
 from .firewall_manager import (
+    AliasInfo,
     FirewallManager,
     FirewallRule,
     FirewallRuleInfo,
@@ -26,6 +27,7 @@ from .firewall_manager import (
     Protocol,
     RuleAction,
     RuleDirection,
+    RuleIndex,
 )
 from .vlan_manager import Vlan, VlanManager
 from .zone_manager import Zone, ZoneManager
@@ -37,6 +39,7 @@ __all__ = [
     "AcmeCertInfo",
     "AcmeManager",
     "AcmeValidation",
+    "AliasInfo",
     "CaddyDomain",
     "CaddyDomainInfo",
     "CaddyHandler",
@@ -54,6 +57,7 @@ __all__ = [
     "Protocol",
     "RuleAction",
     "RuleDirection",
+    "RuleIndex",
     "Vlan",
     "VlanManager",
     "Zone",
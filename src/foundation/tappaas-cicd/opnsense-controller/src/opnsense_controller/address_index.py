@@ -0,0 +1,189 @@
+"""One-snapshot index of DHCP pools, static reservations and leases.
+
+``DhcpManager.ip_in_any_range`` used to re-list every range and re-parse the
+start/end strings for each query. :class:`AddressIndex` parses one snapshot
+once: ranges are sorted by start address with a running maximum of their end
+addresses, so "which pool holds this IP?" is a bisect plus a short walk back
+over overlapping pools; reserved and leased IPs are plain dict lookups.
+
+:meth:`AddressIndex.audit` uses it to report, in one pass, every static
+reservation that sits inside a dynamic pool (issue #251), every IP reserved
+by more than one host, and every reserved IP currently leased to a different
+MAC.
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import re
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+
+_SPLIT = re.compile(r"[,;\s]+")
+
+AddrKey = tuple[int, int]  # (IP version, integer value): v4 and v6 never mix
+
+
+def split_values(raw) -> list[str]:
+    """Normalise an API field that may be a list, a joined string or empty."""
+    if not raw:
+        return []
+    if isinstance(raw, (list, tuple)):
+        items = [str(v) for v in raw]
+    else:
+        items = _SPLIT.split(str(raw))
+    return [v.strip() for v in items if v and v.strip()]
+
+
+def _addr(value) -> AddrKey | None:
+    try:
+        ip = ipaddress.ip_address(str(value).strip())
+    except ValueError:
+        return None
+    return (ip.version, int(ip))
+
+
+def _normal(value) -> str | None:
+    """Canonical text of an IP (so IPv6 spellings compare equal), or None."""
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError:
+        return None
+
+
+@dataclass
+class AddressFinding:
+    """One problem reported by :meth:`AddressIndex.audit`."""
+
+    kind: str      # "in-pool" | "duplicate" | "leased-elsewhere"
+    ip: str
+    host: str      # description (or host.domain) of the reservation
+    detail: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class AddressIndex:
+    """DHCP ranges, static host IPs and leases from one snapshot.
+
+    Any of the three inputs may be omitted; lookups against a missing one
+    simply find nothing. Ranges with unparseable or inverted bounds, and
+    hosts/leases with invalid IPs, are ignored.
+    """
+
+    __slots__ = ("ranges", "hosts", "leases", "_starts", "_ends", "_max_end", "_order",
+                 "_sorted", "_by_host_ip", "_by_lease_ip")
+
+    def __init__(
+        self,
+        ranges: Iterable[dict] = (),
+        hosts: Iterable[dict] = (),
+        leases: Iterable[dict] = (),
+    ):
+        self.ranges = list(ranges)
+        self.hosts = list(hosts)
+        self.leases = list(leases)
+
+        spans = []
+        for order, dhcp_range in enumerate(self.ranges):
+            start = _addr(dhcp_range.get("start_addr") or "")
+            end = _addr(dhcp_range.get("end_addr") or "")
+            if start is None or end is None or start[0] != end[0] or start > end:
+                continue
+            spans.append((start, end, order))
+        spans.sort()
+        self._starts = [s for s, _, _ in spans]
+        self._ends = [e for _, e, _ in spans]
+        self._order = [o for _, _, o in spans]
+        self._sorted = [self.ranges[o] for o in self._order]
+        self._max_end: list[AddrKey] = []
+        for end in self._ends:
+            self._max_end.append(max(end, self._max_end[-1]) if self._max_end else end)
+
+        self._by_host_ip: dict[str, list[dict]] = {}
+        for host in self.hosts:
+            for raw in split_values(host.get("ip")):
+                ip = _normal(raw)
+                if ip is not None:
+                    self._by_host_ip.setdefault(ip, []).append(host)
+
+        self._by_lease_ip: dict[str, dict] = {}
+        for lease in self.leases:
+            ip = _normal(lease.get("ip") or "")
+            if ip is not None:
+                self._by_lease_ip.setdefault(ip, lease)
+
+    @classmethod
+    def from_manager(cls, manager, hosts: bool = True, leases: bool = True) -> "AddressIndex":
+        """Snapshot a connected DhcpManager (one list call per source)."""
+        return cls(
+            manager.list_ranges(),
+            manager.list_hosts() if hosts else (),
+            manager.list_leases() if leases else (),
+        )
+
+    def range_for(self, ip_address: str) -> dict | None:
+        """The pool containing ``ip_address`` (bounds inclusive), else None.
+
+        When pools overlap, the one listed first by OPNsense wins, matching
+        the old linear scan. An invalid IP is never inside a pool.
+        """
+        key = _addr(ip_address)
+        if key is None:
+            return None
+        best = None
+        i = bisect_right(self._starts, key) - 1
+        while i >= 0 and self._max_end[i] >= key:
+            if self._ends[i] >= key and (best is None or self._order[i] < self._order[best]):
+                best = i
+            i -= 1
+        return self._sorted[best] if best is not None else None
+
+    def reservations_for(self, ip_address: str) -> list[dict]:
+        """Static host entries that reserve ``ip_address``."""
+        ip = _normal(ip_address)
+        return list(self._by_host_ip.get(ip, ())) if ip else []
+
+    def lease_for(self, ip_address: str) -> dict | None:
+        """The active lease for ``ip_address``, if any."""
+        ip = _normal(ip_address)
+        return self._by_lease_ip.get(ip) if ip else None
+
+    def audit(self) -> list[AddressFinding]:
+        """Every reservation problem in the snapshot, sorted by IP."""
+        findings: list[AddressFinding] = []
+        for ip, hosts in self._by_host_ip.items():
+            names = [_host_label(h) for h in hosts]
+            pool = self.range_for(ip)
+            if pool is not None:
+                desc = pool.get("description") or pool.get("interface") or "?"
+                for name in names:
+                    findings.append(AddressFinding(
+                        "in-pool", ip, name,
+                        f"inside DHCP pool '{desc}' ({pool.get('start_addr')}-{pool.get('end_addr')})",
+                    ))
+            if len(hosts) > 1:
+                for name in names:
+                    others = ", ".join(n for n in names if n != name) or name
+                    findings.append(AddressFinding("duplicate", ip, name, f"also reserved by {others}"))
+            lease = self._by_lease_ip.get(ip)
+            if lease is not None:
+                lease_mac = (lease.get("mac") or "").lower()
+                for host, name in zip(hosts, names):
+                    macs = [m.lower() for m in split_values(host.get("hardware_addr"))]
+                    if macs and lease_mac and lease_mac not in macs:
+                        who = lease.get("hostname") or "?"
+                        findings.append(AddressFinding(
+                            "leased-elsewhere", ip, name, f"leased to {lease_mac} ({who})",
+                        ))
+        findings.sort(key=lambda f: (_addr(f.ip), f.kind, f.host))
+        return findings
+
+
+def _host_label(host: dict) -> str:
+    if host.get("description"):
+        return host["description"]
+    name, domain = host.get("host") or "?", host.get("domain")
+    return f"{name}.{domain}" if domain else name
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from oxl_opnsense_client import Client
 
 from .config import Config
+from .session import get_client
 
 
 @dataclass
@@ -166,31 +167,9 @@ class CaddyManager:
         self.config = config
         self._client: Client | None = None
 
-    def _get_client_kwargs(self) -> dict:
-        """Build client connection kwargs from config."""
-        kwargs = {
-            "firewall": self.config.firewall,
-            "port": self.config.resolve_port(),
-            "ssl_verify": self.config.ssl_verify,
-            "debug": self.config.debug,
-            "api_timeout": self.config.api_timeout,
-            "api_retries": self.config.api_retries,
-        }
-
-        if self.config.credential_file:
-            kwargs["credential_file"] = self.config.credential_file
-        elif self.config.token and self.config.secret:
-            kwargs["token"] = self.config.token
-            kwargs["secret"] = self.config.secret
-
-        if self.config.ssl_ca_file:
-            kwargs["ssl_ca_file"] = self.config.ssl_ca_file
-
-        return kwargs
-
     def connect(self) -> "CaddyManager":
         """Establish connection to OPNsense."""
-        self._client = Client(**self._get_client_kwargs())
+        self._client = get_client(self.config)
         return self
 
     def disconnect(self):
@@ -1,9 +1,12 @@
 """Configuration management for OPNsense connection."""
 
+import json
 import os
 import socket
 import ssl
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -11,6 +14,72 @@ DEFAULT_CREDENTIAL_FILE = Path.home() / ".opnsense-credentials.txt"
 DEFAULT_PORTS = [443, 8443]
 PROBE_TIMEOUT = 5  # seconds
 
+# On-disk cache of discovered ports, so each CLI process does not re-probe.
+# OPNSENSE_PORT_CACHE overrides the path; an empty value disables the cache.
+PORT_CACHE_FILE = os.environ.get(
+    "OPNSENSE_PORT_CACHE",
+    str(Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "tappaas" / "opnsense-ports.json"),
+)
+PORT_CACHE_TTL = 24 * 3600  # seconds
+
+# Probed ports per (firewall, ssl_verify, ssl_ca_file), shared by every Config
+# in the process so several managers / configs against one firewall probe once.
+# Values are (port, source) with source "cache" or "probe".
+_probed_ports: dict[tuple[str, bool, str | None], tuple[int, str]] = {}
+
+
+def _read_port_cache() -> dict:
+    if not PORT_CACHE_FILE:
+        return {}
+    try:
+        data = json.loads(Path(PORT_CACHE_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_port_cache(data: dict) -> None:
+    if not PORT_CACHE_FILE:
+        return
+    path = Path(PORT_CACHE_FILE)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+        tmp.replace(path)
+    except OSError:
+        pass  # the cache is an optimisation only
+
+
+def cached_port(firewall: str) -> int | None:
+    """Return the cached port for a firewall host, or None if absent/expired."""
+    entry = _read_port_cache().get(firewall)
+    if not isinstance(entry, dict):
+        return None
+    try:
+        port, stamp = int(entry["port"]), float(entry["time"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if time.time() - stamp > PORT_CACHE_TTL:
+        return None
+    return port
+
+
+def store_port(firewall: str, port: int) -> None:
+    """Record a discovered port for a firewall host in the on-disk cache."""
+    data = _read_port_cache()
+    data[firewall] = {"port": port, "time": time.time()}
+    _write_port_cache(data)
+
+
+def forget_port(firewall: str) -> None:
+    """Drop a firewall host from both the process and on-disk port caches."""
+    for key in [k for k in _probed_ports if k[0] == firewall]:
+        del _probed_ports[key]
+    data = _read_port_cache()
+    if data.pop(firewall, None) is not None:
+        _write_port_cache(data)
+
 
 def _default_credential_file() -> str | None:
     """Return the default credential file path if it exists."""
@@ -28,8 +97,9 @@ def probe_opnsense_port(
 ) -> int:
     """Probe OPNsense to determine which HTTPS port it is listening on.
 
-    Tries each port in order and returns the first one that accepts
-    an HTTPS connection.
+    Probes all ports concurrently and returns the first one, in the given
+    order of preference, that accepts an HTTPS connection. The worst case is
+    therefore one timeout, not one per port.
 
     Args:
         firewall: Firewall hostname or IP address
@@ -54,14 +124,26 @@ def probe_opnsense_port(
     elif ssl_ca_file:
         ctx.load_verify_locations(ssl_ca_file)
 
-    errors = []
-    for port in ports:
+    def attempt(port: int) -> Exception | None:
         try:
             with socket.create_connection((firewall, port), timeout=timeout) as sock:
                 with ctx.wrap_socket(sock, server_hostname=firewall):
-                    return port
+                    return None
         except (OSError, ssl.SSLError) as e:
-            errors.append((port, e))
+            return e
+
+    errors = []
+    pool = ThreadPoolExecutor(max_workers=len(ports) or 1)
+    try:
+        futures = [pool.submit(attempt, port) for port in ports]
+        for port, future in zip(ports, futures):
+            err = future.result()
+            if err is None:
+                return port
+            errors.append((port, err))
+    finally:
+        # Don't wait for lower-preference probes still in flight
+        pool.shutdown(wait=False, cancel_futures=True)
 
     tried = ", ".join(str(p) for p in ports)
     details = "; ".join(f"port {p}: {e}" for p, e in errors)
@@ -84,6 +166,8 @@ class Config:
     debug: bool = False
     api_timeout: float = 30.0  # Default 30 seconds (upstream default is 2.0)
     api_retries: int = 3  # Retry failed requests (upstream default is 0)
+    # Where an auto-detected port came from: "cache" (on disk) or "probe"
+    port_source: str | None = field(default=None, init=False, repr=False)
 
     def __post_init__(self):
         """Validate that credentials are available from at least one source."""
@@ -105,8 +189,10 @@ class Config:
     def resolve_port(self) -> int:
         """Resolve the API port, probing if not explicitly set.
 
-        When port is None, probes the firewall on ports 443 and 8443
-        (in that order) and caches the result.
+        When port is None, uses the on-disk port cache (PORT_CACHE_FILE,
+        valid for PORT_CACHE_TTL) or probes the firewall on ports 443 and
+        8443, and caches the result on this config, for the rest of the
+        process and on disk.
 
         Returns:
             The resolved port number
@@ -114,6 +200,18 @@ class Config:
         if self.port is not None:
             return self.port
 
+        key = (self.firewall, self.ssl_verify, self.ssl_ca_file)
+        if key in _probed_ports:
+            self.port, self.port_source = _probed_ports[key]
+            return self.port
+
+        port = cached_port(self.firewall)
+        if port is not None:
+            if self.debug:
+                print(f"Using cached OPNsense port {port} for {self.firewall}", file=sys.stderr)
+            self.port, self.port_source = _probed_ports[key] = (port, "cache")
+            return self.port
+
         if self.debug:
             print(f"Auto-detecting OPNsense port on {self.firewall}...", file=sys.stderr)
 
@@ -122,12 +220,29 @@ class Config:
             ssl_verify=self.ssl_verify,
             ssl_ca_file=self.ssl_ca_file,
         )
+        self.port_source = "probe"
+        _probed_ports[key] = (self.port, self.port_source)
+        store_port(self.firewall, self.port)
 
         if self.debug:
             print(f"Detected OPNsense on port {self.port}", file=sys.stderr)
 
         return self.port
 
+    def forget_port(self) -> bool:
+        """Drop an auto-detected port after a connection failure.
+
+        Returns True if the port came from the cache, i.e. a fresh probe
+        might find a different one; explicit ports are never forgotten.
+        """
+        if self.port_source is None:
+            return False
+        from_cache = self.port_source == "cache"
+        forget_port(self.firewall)
+        self.port = None
+        self.port_source = None
+        return from_cache
+
     @classmethod
     def from_env(cls) -> "Config":
         """Create config from environment variables.
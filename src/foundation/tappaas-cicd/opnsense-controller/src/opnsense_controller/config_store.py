@@ -0,0 +1,164 @@
+"""Parse-once cache for the JSON files in the TAPPaaS config directory.
+
+zones.json, firewall/aliases.json and the module JSON files are read by
+zone-manager, rules-manager and the policy tools, often several times in one
+process and again in every CLI process a shell script starts. ``load_json()``
+keeps the parsed value keyed by absolute path and validated by the file's
+``(mtime_ns, size)``. When the stamp changes but the content hash does not (a
+``git checkout`` or ``cp -p`` touching the file) the parsed value is reused as
+well, so only real edits cost a parse.
+
+The cache is also kept in a pickle snapshot (:func:`cache_file`) that is
+read on first use and rewritten at exit when it changed, so the next process
+starts warm. The snapshot is only trusted when owned by the current user, and
+entries for files that no longer exist are dropped rather than carried over.
+
+Values are shared between callers: treat them as read-only.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Any
+
+# Snapshot path; None means "resolve from the environment when used".
+CONFIG_CACHE_FILE: str | None = None
+_SNAPSHOT_VERSION = 1
+
+Stamp = tuple[int, int]
+
+
+class _Entry:
+    __slots__ = ("stamp", "digest", "data")
+
+    def __init__(self, stamp: Stamp, digest: bytes, data: Any):
+        self.stamp = stamp
+        self.digest = digest
+        self.data = data
+
+    def __getstate__(self):
+        return (self.stamp, self.digest, self.data)
+
+    def __setstate__(self, state):
+        self.stamp, self.digest, self.data = state
+
+
+_lock = threading.Lock()
+_entries: dict[str, _Entry] = {}
+_snapshot_loaded = False
+_dirty = False
+
+
+def cache_file() -> str:
+    """The snapshot path, or "" when the snapshot is disabled.
+
+    TAPPAAS_CONFIG_CACHE overrides the default location; an empty value
+    disables the snapshot. Read at each use, not at import.
+    """
+    if CONFIG_CACHE_FILE is not None:
+        return CONFIG_CACHE_FILE
+    return os.environ.get(
+        "TAPPAAS_CONFIG_CACHE",
+        str(Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "tappaas" / "config-store.pickle"),
+    )
+
+
+def _digest(raw: bytes) -> bytes:
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _load_snapshot() -> None:
+    global _snapshot_loaded, _dirty
+    if _snapshot_loaded:
+        return
+    _snapshot_loaded = True
+    path = cache_file()
+    if not path:
+        return
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_uid != os.getuid():
+                return
+            version, entries = pickle.load(f)
+    except Exception:
+        return  # missing, foreign or corrupt: start cold
+    if version == _SNAPSHOT_VERSION and isinstance(entries, dict):
+        for key, entry in entries.items():
+            if os.path.exists(key):
+                _entries.setdefault(key, entry)
+            else:
+                _dirty = True  # rewrite without the files that are gone
+
+
+def save_snapshot() -> None:
+    """Write the cache to :func:`cache_file` if anything changed.
+
+    Entries whose file has been deleted since it was read are left out, so
+    the snapshot only holds files that still exist.
+    """
+    global _dirty
+    target = cache_file()
+    with _lock:
+        if not target or not _dirty:
+            return
+        entries = dict(_entries)
+        _dirty = False
+    payload = (_SNAPSHOT_VERSION, {k: e for k, e in entries.items() if os.path.exists(k)})
+    path = Path(target)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+    except OSError:
+        pass  # the snapshot is an optimisation only
+
+
+def clear() -> None:
+    """Forget every cached file (the snapshot on disk is left alone)."""
+    global _snapshot_loaded, _dirty
+    with _lock:
+        _entries.clear()
+        _snapshot_loaded = False
+        _dirty = False
+
+
+def load_json(path: str | Path) -> Any:
+    """Return the parsed contents of a JSON file, parsing only when it changed.
+
+    Raises ``FileNotFoundError`` / ``OSError`` and ``json.JSONDecodeError``
+    exactly like ``json.load(open(path))``. The returned value is shared with
+    other callers and must not be mutated.
+    """
+    global _dirty
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        _load_snapshot()
+        entry = _entries.get(key)
+        if entry is not None and entry.stamp == stamp:
+            return entry.data
+
+    with open(key, "rb") as f:
+        raw = f.read()
+    digest = _digest(raw)
+    if entry is not None and entry.digest == digest:
+        data = entry.data
+    else:
+        data = json.loads(raw)
+    with _lock:
+        _entries[key] = _Entry(stamp, digest, data)
+        _dirty = True
+    return data
+
+
+atexit.register(save_snapshot)
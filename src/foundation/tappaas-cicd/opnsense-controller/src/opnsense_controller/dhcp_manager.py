@@ -1,9 +1,17 @@
 """DHCP management operations for OPNsense Dnsmasq service."""
 
+import ipaddress
+import re
 from dataclasses import dataclass, field
 from oxl_opnsense_client import Client
 
+from .address_index import AddressIndex, split_values
 from .config import Config
+from .log import error
+from .session import get_client
+
+# A lower-case colon-separated MAC address, as dnsmasq host entries store it.
+MAC_PATTERN = re.compile(r"^[0-9a-f]{2}(:[0-9a-f]{2}){5}$")
 
 
 def _convert_bools_to_int(params):
@@ -59,6 +67,247 @@ class DhcpHost:
     ignore: bool = False  # Ignore DHCP packets from this host
 
 
+def _range_payload(dhcp_range: DhcpRange) -> dict:
+    """Body of a raw addRange call (strings only, no bool conversion needed)."""
+    payload = {
+        "description": dhcp_range.description,
+        "start_addr": dhcp_range.start_addr,
+        "end_addr": dhcp_range.end_addr,
+        "lease_time": str(dhcp_range.lease_time),
+    }
+    if dhcp_range.interface:
+        payload["interface"] = dhcp_range.interface
+    if dhcp_range.subnet_mask:
+        payload["subnet_mask"] = dhcp_range.subnet_mask
+    if dhcp_range.domain:
+        payload["domain"] = dhcp_range.domain
+    if dhcp_range.set_tag:
+        payload["set_tag"] = dhcp_range.set_tag
+    return payload
+
+
+def _host_payload(host: DhcpHost, complete: bool = False) -> dict:
+    """Body of a raw addHost/setHost call.
+
+    Uses the OPNsense model field names: the description is ``descr`` and
+    the MAC list is ``hwaddr`` (the oxl ``dnsmasq_host`` module translates
+    these, the raw API does not). With ``complete`` the optional fields are
+    sent even when unset, so a setHost also clears values the host lacks
+    (used to restore an entry exactly).
+    """
+    payload = {
+        "descr": host.description,
+        "host": host.host,
+        "ip": ",".join(host.ip),
+        "hwaddr": ",".join(host.hardware_addr),
+        "domain": host.domain or "",
+    }
+    if host.lease_time:
+        payload["lease_time"] = str(host.lease_time)
+    if host.set_tag:
+        payload["set_tag"] = host.set_tag
+    if host.ignore:
+        payload["ignore"] = "1"
+    if complete:
+        payload.setdefault("lease_time", "")
+        payload.setdefault("set_tag", "")
+        payload.setdefault("ignore", "0")
+    return payload
+
+
+def _int_or(value, default: int | None) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _range_from_row(row: dict) -> DhcpRange:
+    """DhcpRange equivalent of a list_ranges() row (used to undo a replace)."""
+    return DhcpRange(
+        description=row.get("description") or "",
+        start_addr=row.get("start_addr") or "",
+        end_addr=row.get("end_addr") or "",
+        interface=row.get("interface") or None,
+        subnet_mask=row.get("subnet_mask") or None,
+        lease_time=_int_or(row.get("lease_time") or 86400, 86400),
+        domain=row.get("domain") or None,
+        set_tag=row.get("set_tag") or None,
+    )
+
+
+def _host_from_row(row: dict) -> DhcpHost:
+    """DhcpHost equivalent of a list_hosts() row (used to undo an overwrite)."""
+    return DhcpHost(
+        description=row.get("description") or "",
+        host=row.get("host") or "",
+        ip=split_values(row.get("ip")),
+        hardware_addr=split_values(row.get("hardware_addr")),
+        domain=row.get("domain") or None,
+        lease_time=_int_or(row.get("lease_time"), None),
+        set_tag=row.get("set_tag") or None,
+        ignore=str(row.get("ignore") or "0") in ("1", "True", "true"),
+    )
+
+
+class BatchError(RuntimeError):
+    """A batched dnsmasq write failed; the writes staged before it were undone.
+
+    ``rolled_back`` lists the descriptions whose writes were reverted, in
+    the order they were undone. dnsmasq was not reconfigured.
+    """
+
+    def __init__(self, message: str, rolled_back: list[str]):
+        super().__init__(message)
+        self.rolled_back = rolled_back
+
+
+class DhcpBatch:
+    """Stage many range and host writes, then apply them with one reconfigure.
+
+    Use :meth:`DhcpManager.batch`. Items are validated together before the
+    first write; existing entries are looked up from one list call per kind
+    instead of one per item. Every write records how to undo it, and if a
+    write fails the earlier ones are undone in reverse and :class:`BatchError`
+    is raised, leaving the firewall's staged config as it was.
+
+    Ranges are matched by description and replaced (delete then add, as
+    create_range does); hosts are matched by description and overwritten in
+    place.
+    """
+
+    def __init__(self, manager: "DhcpManager"):
+        self.manager = manager
+        self.ranges: list[DhcpRange] = []
+        self.hosts: list[DhcpHost] = []
+
+    def add_range(self, dhcp_range: DhcpRange) -> "DhcpBatch":
+        self.ranges.append(dhcp_range)
+        return self
+
+    def add_host(self, host: DhcpHost) -> "DhcpBatch":
+        self.hosts.append(host)
+        return self
+
+    def __enter__(self) -> "DhcpBatch":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.commit()
+
+    def validate(self) -> list[str]:
+        """Problems that would make the batch fail; empty when it is valid."""
+        problems: list[str] = []
+        seen: set[tuple[str, str]] = set()
+        for kind, items in (("range", self.ranges), ("host", self.hosts)):
+            for item in items:
+                label = f"{kind} '{item.description}'"
+                if not item.description:
+                    problems.append(f"{kind} without a description")
+                elif (kind, item.description) in seen:
+                    problems.append(f"{label}: duplicate description in batch")
+                seen.add((kind, item.description))
+                problems += [f"{label}: {p}" for p in _item_problems(item)]
+        return problems
+
+    def commit(self, check_mode: bool = False) -> list[dict]:
+        """Write every staged item, then reconfigure dnsmasq once.
+
+        Returns one result dict per item (ranges first, then hosts).
+        Raises ValueError if validation fails (nothing is written) and
+        BatchError if a write fails (earlier writes are undone).
+        """
+        problems = self.validate()
+        if problems:
+            raise ValueError("Invalid DHCP batch: " + "; ".join(problems))
+        if check_mode:
+            return (
+                [{"changed": True, "check_mode": True, "description": r.description,
+                  "interface": r.interface} for r in self.ranges]
+                + [{"changed": True, "check_mode": True, "description": h.description}
+                   for h in self.hosts]
+            )
+        if not self.ranges and not self.hosts:
+            return []
+
+        manager = self.manager
+        ranges_by_desc = {r["description"]: r for r in manager.list_ranges()} if self.ranges else {}
+        hosts_by_desc = {h["description"]: h for h in manager.list_hosts()} if self.hosts else {}
+        undo: list[tuple[str, object]] = []
+        results: list[dict] = []
+        current = ""
+        try:
+            for dhcp_range in self.ranges:
+                current = dhcp_range.description
+                existing = ranges_by_desc.get(current)
+                if existing and existing.get("uuid"):
+                    manager._settings_call("delRange", existing["uuid"], expect="deleted")
+                    old = _range_from_row(existing)
+                    undo.append((current, lambda old=old: manager._settings_call(
+                        "addRange", data={"range": _range_payload(old)})))
+                response = manager._settings_call("addRange", data={"range": _range_payload(dhcp_range)})
+                uuid = response.get("uuid")
+                undo.append((current, lambda uuid=uuid: manager._settings_call(
+                    "delRange", uuid, expect="deleted")))
+                results.append({"changed": True, "uuid": uuid, "interface": dhcp_range.interface})
+
+            for host in self.hosts:
+                current = host.description
+                existing = hosts_by_desc.get(current)
+                if existing and existing.get("uuid"):
+                    uuid = existing["uuid"]
+                    manager._settings_call("setHost", uuid, data={"host": _host_payload(host)})
+                    old = _host_from_row(existing)
+                    undo.append((current, lambda uuid=uuid, old=old: manager._settings_call(
+                        "setHost", uuid, data={"host": _host_payload(old, complete=True)})))
+                else:
+                    uuid = manager._settings_call("addHost", data={"host": _host_payload(host)}).get("uuid")
+                    undo.append((current, lambda uuid=uuid: manager._settings_call(
+                        "delHost", uuid, expect="deleted")))
+                results.append({"changed": True, "uuid": uuid})
+        except Exception as e:
+            rolled_back = []
+            for description, revert in reversed(undo):
+                try:
+                    revert()
+                except Exception as undo_error:
+                    error(f"DHCP batch rollback of '{description}' failed: {undo_error}")
+                    continue
+                if description not in rolled_back:
+                    rolled_back.append(description)
+            raise BatchError(f"DHCP batch write failed at '{current}': {e}", rolled_back) from e
+
+        manager.reconfigure()
+        return results
+
+
+def _item_problems(item: DhcpRange | DhcpHost) -> list[str]:
+    problems = []
+    if isinstance(item, DhcpRange):
+        try:
+            start = ipaddress.ip_address(item.start_addr)
+            end = ipaddress.ip_address(item.end_addr)
+        except ValueError as e:
+            return [str(e)]
+        if start.version != end.version or start > end:
+            problems.append(f"invalid range {item.start_addr}-{item.end_addr}")
+        if not isinstance(item.lease_time, int) or item.lease_time <= 0:
+            problems.append(f"invalid lease_time {item.lease_time!r}")
+        return problems
+    if not item.host:
+        problems.append("host is required")
+    for ip in item.ip:
+        try:
+            ipaddress.ip_address(ip)
+        except ValueError as e:
+            problems.append(str(e))
+    for mac in item.hardware_addr:
+        if not MAC_PATTERN.match(mac.lower()):
+            problems.append(f"invalid MAC address '{mac}'")
+    return problems
+
+
 class DhcpManager:
     """Manage DHCP settings on OPNsense Dnsmasq service."""
 
@@ -66,31 +315,9 @@ class DhcpManager:
         self.config = config
         self._client: Client | None = None
 
-    def _get_client_kwargs(self) -> dict:
-        """Build client connection kwargs from config."""
-        kwargs = {
-            "firewall": self.config.firewall,
-            "port": self.config.resolve_port(),
-            "ssl_verify": self.config.ssl_verify,
-            "debug": self.config.debug,
-            "api_timeout": self.config.api_timeout,
-            "api_retries": self.config.api_retries,
-        }
-
-        if self.config.credential_file:
-            kwargs["credential_file"] = self.config.credential_file
-        elif self.config.token and self.config.secret:
-            kwargs["token"] = self.config.token
-            kwargs["secret"] = self.config.secret
-
-        if self.config.ssl_ca_file:
-            kwargs["ssl_ca_file"] = self.config.ssl_ca_file
-
-        return kwargs
-
     def connect(self) -> "DhcpManager":
         """Establish connection to OPNsense."""
-        self._client = Client(**self._get_client_kwargs())
+        self._client = get_client(self.config)
         return self
 
     def disconnect(self):
@@ -159,7 +386,8 @@ class DhcpManager:
     def list_ranges(self) -> list[dict]:
         """List all configured DHCP ranges.
 
-        Returns list of dicts with uuid, description, start_addr, end_addr, interface, domain, etc.
+        Returns list of dicts with uuid, description, start_addr, end_addr,
+        interface, subnet_mask, domain, lease_time and set_tag.
         """
         result = self.client.run_module(
             "raw",
@@ -179,6 +407,7 @@ class DhcpManager:
                 "start_addr": row.get("start_addr"),
                 "end_addr": row.get("end_addr"),
                 "interface": row.get("interface"),
+                "subnet_mask": row.get("subnet_mask"),
                 "domain": row.get("domain"),
                 "lease_time": row.get("lease_time"),
                 "set_tag": row.get("set_tag"),
@@ -214,35 +443,19 @@ class DhcpManager:
         Returns:
             The first matching range dict (with start_addr/end_addr/
             description/interface) if the IP is within a pool, else None.
-            A range whose start/end cannot be parsed is skipped.
+            A range whose start/end cannot be parsed is skipped, and an
+            invalid IP is never inside a pool. To test many addresses, build
+            one AddressIndex.from_manager() snapshot instead.
         """
-        import ipaddress
-
-        try:
-            candidate = ipaddress.ip_address(ip_address)
-        except ValueError:
-            # Not a valid IP — caller decides how to treat this; we cannot
-            # claim it is inside a range, so report "not in range".
-            return None
-
-        for dhcp_range in self.list_ranges():
-            start_raw = dhcp_range.get("start_addr")
-            end_raw = dhcp_range.get("end_addr")
-            if not start_raw or not end_raw:
-                continue
-            try:
-                start = ipaddress.ip_address(start_raw)
-                end = ipaddress.ip_address(end_raw)
-            except ValueError:
-                continue
-            if start <= candidate <= end:
-                return dhcp_range
-        return None
+        return AddressIndex(ranges=self.list_ranges()).range_for(ip_address)
 
     def list_hosts(self) -> list[dict]:
         """List all configured DHCP host reservations.
 
-        Returns list of dicts with uuid, description, host, ip, hardware_addr, domain, etc.
+        Returns list of dicts with uuid, description, host, ip, hardware_addr,
+        domain, lease_time, set_tag and ignore.
+        searchHost rows use the model names ``descr`` and ``hwaddr``; they are
+        mapped to the DhcpHost field names here.
         """
         result = self.client.run_module(
             "raw",
@@ -261,8 +474,11 @@ class DhcpManager:
                 "description": row.get("descr"),  # API field is 'descr' not 'description'
                 "host": row.get("host"),
                 "ip": row.get("ip"),
-                "hardware_addr": row.get("hardware_addr"),
+                "hardware_addr": row.get("hwaddr"),  # API field is 'hwaddr'
                 "domain": row.get("domain"),
+                "lease_time": row.get("lease_time"),
+                "set_tag": row.get("set_tag"),
+                "ignore": row.get("ignore"),
             })
         return hosts
 
@@ -281,14 +497,11 @@ class DhcpManager:
                 return host
         return None
 
-    def list_leases(self) -> list[dict]:
-        """List active DHCP leases handed out by dnsmasq (issue #235).
+    def iter_leases(self):
+        """Yield active dnsmasq leases in API order, without sorting.
 
-        TAPPaaS runs dnsmasq for DHCP/DNS, so leases come from the dnsmasq
-        ``leases/search`` controller (not the ISC ``dhcpv4`` plugin). Returns a
-        list of dicts with ip, hostname, mac, zone (the OPNsense interface
-        description, which is the TAPPaaS zone label), interface, and the raw
-        ``expire`` unix timestamp (0/None for a static/never-expiring lease).
+        Same dicts as list_leases(). Used by the lease watcher, which keys
+        leases by (mac, ip) and has no use for display ordering.
         """
         result = self.client.run_module(
             "raw",
@@ -300,9 +513,8 @@ class DhcpManager:
             },
         )
         rows = result.get("result", {}).get("response", {}).get("rows", [])
-        leases = []
         for row in rows:
-            leases.append({
+            yield {
                 "ip": row.get("address"),
                 "hostname": row.get("hostname") or "",
                 "mac": row.get("hwaddr"),
@@ -311,7 +523,18 @@ class DhcpManager:
                 "zone": row.get("if_descr") or row.get("if_name") or "",
                 "interface": row.get("if_name") or "",
                 "expire": row.get("expire"),
-            })
+            }
+
+    def list_leases(self) -> list[dict]:
+        """List active DHCP leases handed out by dnsmasq (issue #235).
+
+        TAPPaaS runs dnsmasq for DHCP/DNS, so leases come from the dnsmasq
+        ``leases/search`` controller (not the ISC ``dhcpv4`` plugin). Returns a
+        list of dicts with ip, hostname, mac, zone (the OPNsense interface
+        description, which is the TAPPaaS zone label), interface, and the raw
+        ``expire`` unix timestamp (0/None for a static/never-expiring lease).
+        """
+        leases = list(self.iter_leases())
         # Stable, human-friendly ordering: by zone, then numeric IP.
         def _ip_key(ip: str) -> tuple:
             try:
@@ -343,6 +566,40 @@ class DhcpManager:
             },
         )
 
+    def batch(self) -> DhcpBatch:
+        """Start a DhcpBatch: validated, rollback-safe writes with one reconfigure.
+
+        Example:
+            with manager.batch() as batch:
+                batch.add_range(dhcp_range)
+                batch.add_host(host)
+        """
+        return DhcpBatch(self)
+
+    def _settings_call(
+        self,
+        command: str,
+        uuid: str | None = None,
+        data: dict | None = None,
+        expect: str = "saved",
+    ) -> dict:
+        """One raw dnsmasq settings POST; returns the response or raises RuntimeError."""
+        params = {
+            "module": "dnsmasq",
+            "controller": "settings",
+            "command": command,
+            "action": "post",
+        }
+        if uuid:
+            params["params"] = [uuid]
+        if data is not None:
+            params["data"] = data
+        result = self.client.run_module("raw", params=params)
+        response = result.get("result", {}).get("response", {})
+        if response.get("result") != expect:
+            raise RuntimeError(f"{command} failed: {response}")
+        return response
+
     def create_range(
         self,
         dhcp_range: DhcpRange,
@@ -376,20 +633,7 @@ class DhcpManager:
                 "interface": dhcp_range.interface,
             }
 
-        range_payload = {
-            "description": dhcp_range.description,
-            "start_addr": dhcp_range.start_addr,
-            "end_addr": dhcp_range.end_addr,
-            "lease_time": str(dhcp_range.lease_time),
-        }
-        if dhcp_range.interface:
-            range_payload["interface"] = dhcp_range.interface
-        if dhcp_range.subnet_mask:
-            range_payload["subnet_mask"] = dhcp_range.subnet_mask
-        if dhcp_range.domain:
-            range_payload["domain"] = dhcp_range.domain
-        if dhcp_range.set_tag:
-            range_payload["set_tag"] = dhcp_range.set_tag
+        range_payload = _range_payload(dhcp_range)
 
         # Idempotency: drop any existing range with this description first.
         self.delete_range(dhcp_range.description, reconfigure=False)
@@ -483,25 +727,23 @@ class DhcpManager:
         ranges: list[DhcpRange],
         check_mode: bool = False,
     ) -> list[dict]:
-        """Create multiple DHCP ranges, applying once at the end.
+        """Create multiple DHCP ranges as one DhcpBatch, applying once at the end.
 
         Args:
             ranges: List of DHCP range configurations
             check_mode: If True, perform dry-run without making changes
 
         Returns:
-            List of result dictionaries from the API
+            List of result dictionaries, one per range
+
+        Raises:
+            ValueError: if any range is invalid (nothing is written)
+            BatchError: if a write fails (earlier writes are undone)
         """
-        results = []
+        batch = self.batch()
         for dhcp_range in ranges:
-            # Stage each change; reconfigure once after the batch.
-            result = self.create_range(
-                dhcp_range, check_mode=check_mode, reconfigure=False
-            )
-            results.append(result)
-        if not check_mode and results:
-            self.reconfigure()
-        return results
+            batch.add_range(dhcp_range)
+        return batch.commit(check_mode=check_mode)
 
     # =========================================================================
     # DHCP Host (Static Reservation) Operations
@@ -585,12 +827,68 @@ class DhcpManager:
             params=params,
         )
 
-    def delete_host_by_uuid(self, uuid: str, check_mode: bool = False) -> dict:
+    def save_host(
+        self,
+        host: DhcpHost,
+        uuid: str | None = None,
+        check_mode: bool = False,
+        reconfigure: bool = True,
+    ) -> dict:
+        """Add (uuid=None) or overwrite (uuid given) a host via the raw API.
+
+        Unlike create_host, which goes through the ``dnsmasq_host`` module and
+        re-lists every host to find a match, this writes the entry directly
+        with ``addHost`` / ``setHost``. Bulk callers that already hold a
+        list_hosts() snapshot use it to stage many writes and apply once.
+
+        Args:
+            host: DHCP host configuration
+            uuid: UUID of the entry to overwrite; None to add a new one
+            check_mode: If True, perform dry-run without making changes
+            reconfigure: If True, reconfigure dnsmasq to apply immediately.
+                Pass False when staging several changes for a single apply.
+
+        Returns:
+            Result dictionary with changed/uuid keys.
+        """
+        if check_mode:
+            return {"changed": True, "uuid": uuid, "check_mode": True}
+
+        host_payload = _host_payload(host)
+
+        command = "setHost" if uuid else "addHost"
+        result = self.client.run_module(
+            "raw",
+            params={
+                "module": "dnsmasq",
+                "controller": "settings",
+                "command": command,
+                "params": [uuid] if uuid else [],
+                "action": "post",
+                "data": {"host": host_payload},
+            },
+        )
+        response = result.get("result", {}).get("response", {})
+        if response.get("result") != "saved":
+            raise RuntimeError(f"{command} failed for '{host.description}': {response}")
+
+        if reconfigure:
+            self.reconfigure()
+
+        return {"changed": True, "uuid": uuid or response.get("uuid")}
+
+    def delete_host_by_uuid(
+        self,
+        uuid: str,
+        check_mode: bool = False,
+        reconfigure: bool = True,
+    ) -> dict:
         """Delete a DHCP host reservation by UUID using the raw API.
 
         Args:
             uuid: UUID of the DHCP host to delete
             check_mode: If True, perform dry-run without making changes
+            reconfigure: If True, reconfigure dnsmasq to apply immediately.
 
         Returns:
             Result dictionary from the API
@@ -612,15 +910,8 @@ class DhcpManager:
 
         # Apply configuration after deletion
         if result.get("result", {}).get("response", {}).get("result") == "deleted":
-            self.client.run_module(
-                "raw",
-                params={
-                    "module": "dnsmasq",
-                    "controller": "service",
-                    "command": "reconfigure",
-                    "action": "post",
-                },
-            )
+            if reconfigure:
+                self.reconfigure()
             return {"changed": True, "uuid": uuid}
 
         return {"changed": False, "error": result}
@@ -630,20 +921,23 @@ class DhcpManager:
         hosts: list[DhcpHost],
         check_mode: bool = False,
     ) -> list[dict]:
-        """Create multiple static DHCP host reservations.
+        """Create or update multiple static DHCP host reservations as one DhcpBatch.
 
         Args:
             hosts: List of DHCP host configurations
             check_mode: If True, perform dry-run without making changes
 
         Returns:
-            List of result dictionaries from the API
+            List of result dictionaries, one per host
+
+        Raises:
+            ValueError: if any host is invalid (nothing is written)
+            BatchError: if a write fails (earlier writes are undone)
         """
-        results = []
+        batch = self.batch()
         for host in hosts:
-            result = self.create_host(host, check_mode=check_mode)
-            results.append(result)
-        return results
+            batch.add_host(host)
+        return batch.commit(check_mode=check_mode)
 
     # =========================================================================
     # Dnsmasq Service Configuration
@@ -684,6 +978,32 @@ class DhcpManager:
             params=params,
         )
 
+    def get_dnsmasq_interfaces(self) -> list[str]:
+        """Get the interface IDs dnsmasq currently listens on.
+
+        Returns:
+            Selected interface IDs (e.g. ['lan', 'opt1']); empty means all
+        """
+        result = self.client.run_module(
+            "raw",
+            params={
+                "module": "dnsmasq",
+                "controller": "settings",
+                "command": "get",
+                "action": "get",
+            },
+        )
+        field = (
+            result.get("result", {}).get("response", {})
+            .get("dnsmasq", {}).get("interface", {})
+        )
+        if isinstance(field, str):
+            return [v for v in field.split(",") if v]
+        return [
+            key for key, option in field.items()
+            if isinstance(option, dict) and option.get("selected") == 1
+        ]
+
     def set_dnsmasq_interfaces(
         self,
         interfaces: list[str],
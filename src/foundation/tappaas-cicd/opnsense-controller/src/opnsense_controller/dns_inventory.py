@@ -0,0 +1,349 @@
+"""Bulk import/export of dnsmasq host entries for dns-manager.
+
+``dns-manager add`` looks each entry up with ``get_host_by_description`` (one
+full ``searchHost`` per call) and writes it through the ``dnsmasq_host``
+module, which lists every host again and reconfigures dnsmasq. Provisioning a
+few hundred hosts that way is quadratic in list traffic.
+
+Here the firewall is listed once into a :class:`HostIndex` (by description,
+host.domain, IP and MAC), an inventory file is diffed against it into a
+:class:`HostPlan`, and only the creates, updates and deletes the plan needs
+are staged through the raw API, followed by a single ``reconfigure``.
+
+Inventory files are JSON (a list of objects, or ``{"hosts": [...]}``) or CSV
+with the columns ``host,domain,ip,mac,description``. ``ip`` and ``mac`` may
+hold several values separated by commas, semicolons or spaces. ``export``
+writes the same formats, so an export can be edited and imported again.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import ipaddress
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .address_index import split_values
+from .dhcp_manager import MAC_PATTERN, DhcpHost, DhcpManager
+
+INVENTORY_FIELDS = ("host", "domain", "ip", "mac", "description")
+
+
+def _key(host: str, domain: str | None) -> str:
+    return f"{host}.{domain}".lower() if domain else host.lower()
+
+
+@dataclass(frozen=True)
+class HostEntry:
+    """One host entry, normalised so that equal entries compare equal."""
+
+    host: str
+    domain: str = ""
+    ip: tuple[str, ...] = ()
+    mac: tuple[str, ...] = ()
+    description: str = ""
+    uuid: str | None = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "HostEntry":
+        """Build from a DhcpManager.list_hosts() row."""
+        return cls(
+            host=row.get("host") or "",
+            domain=row.get("domain") or "",
+            ip=tuple(split_values(row.get("ip"))),
+            mac=tuple(m.lower() for m in split_values(row.get("hardware_addr"))),
+            description=row.get("description") or "",
+            uuid=row.get("uuid"),
+        )
+
+    @property
+    def fqdn(self) -> str:
+        return f"{self.host}.{self.domain}" if self.domain else self.host
+
+    def same_as(self, other: "HostEntry") -> bool:
+        """True when nothing the inventory controls differs (uuid ignored)."""
+        return (
+            self.host == other.host
+            and self.domain == other.domain
+            and sorted(self.ip) == sorted(other.ip)
+            and sorted(self.mac) == sorted(other.mac)
+            and self.description == other.description
+        )
+
+    def to_dhcp_host(self) -> DhcpHost:
+        return DhcpHost(
+            description=self.description,
+            host=self.host,
+            ip=list(self.ip),
+            hardware_addr=list(self.mac),
+            domain=self.domain or None,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "host": self.host,
+            "domain": self.domain,
+            "ip": list(self.ip),
+            "mac": list(self.mac),
+            "description": self.description,
+        }
+
+
+class HostIndex:
+    """A single list_hosts() snapshot indexed for matching and conflict checks."""
+
+    __slots__ = ("entries", "by_description", "by_fqdn", "by_ip", "by_mac")
+
+    def __init__(self, rows: list[dict]):
+        self.entries: list[HostEntry] = [HostEntry.from_row(r) for r in rows]
+        self.by_description: dict[str, HostEntry] = {}
+        self.by_fqdn: dict[str, list[HostEntry]] = {}
+        self.by_ip: dict[str, list[HostEntry]] = {}
+        self.by_mac: dict[str, list[HostEntry]] = {}
+        for entry in self.entries:
+            if entry.description:
+                self.by_description.setdefault(entry.description, entry)
+            self.by_fqdn.setdefault(_key(entry.host, entry.domain), []).append(entry)
+            for ip in entry.ip:
+                self.by_ip.setdefault(ip, []).append(entry)
+            for mac in entry.mac:
+                self.by_mac.setdefault(mac, []).append(entry)
+
+    @classmethod
+    def from_manager(cls, manager: DhcpManager) -> "HostIndex":
+        return cls(manager.list_hosts())
+
+    def match(self, wanted: HostEntry, taken: set[str]) -> HostEntry | None:
+        """Existing entry ``wanted`` should replace, skipping uuids in ``taken``.
+
+        Description is the primary key (as in ``add``); an entry renamed in
+        the inventory is still found by host.domain, then by MAC.
+        """
+        candidates = [self.by_description.get(wanted.description)]
+        candidates += self.by_fqdn.get(_key(wanted.host, wanted.domain), [])
+        for mac in wanted.mac:
+            candidates += self.by_mac.get(mac, [])
+        for entry in candidates:
+            if entry is not None and entry.uuid not in taken:
+                return entry
+        return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Inventory files
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _entry_from_record(record: dict, where: str) -> HostEntry:
+    if not isinstance(record, dict):
+        raise ValueError(f"{where}: expected an object, got {type(record).__name__}")
+    host = str(record.get("host") or "").strip()
+    if not host:
+        raise ValueError(f"{where}: 'host' is required")
+    domain = str(record.get("domain") or "").strip()
+    ips = split_values(record.get("ip"))
+    if not ips:
+        raise ValueError(f"{where}: 'ip' is required for {host}")
+    for ip in ips:
+        try:
+            ipaddress.ip_address(ip)
+        except ValueError:
+            raise ValueError(f"{where}: invalid IP address '{ip}' for {host}") from None
+    macs = [m.lower().replace("-", ":") for m in split_values(record.get("mac", record.get("hardware_addr")))]
+    for mac in macs:
+        if not MAC_PATTERN.match(mac):
+            raise ValueError(f"{where}: invalid MAC address '{mac}' for {host}")
+    description = str(record.get("description") or "").strip() or (
+        f"{host}.{domain}" if domain else host
+    )
+    return HostEntry(host, domain, tuple(ips), tuple(macs), description)
+
+
+def parse_inventory(text: str, fmt: str) -> list[HostEntry]:
+    """Parse inventory text (``fmt`` is "json" or "csv") into host entries.
+
+    Raises ValueError on malformed records or duplicate descriptions.
+    """
+    if fmt == "json":
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get("hosts")
+        if not isinstance(data, list):
+            raise ValueError("JSON inventory must be a list of hosts or {\"hosts\": [...]}")
+        records = [(f"entry {i}", r) for i, r in enumerate(data)]
+    elif fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        records = [(f"line {reader.line_num}", r) for r in reader]
+    else:
+        raise ValueError(f"Unknown inventory format: {fmt}")
+
+    entries: list[HostEntry] = []
+    seen: dict[str, str] = {}
+    for where, record in records:
+        entry = _entry_from_record(record, where)
+        if entry.description in seen:
+            raise ValueError(
+                f"{where}: duplicate description '{entry.description}' "
+                f"(first at {seen[entry.description]})"
+            )
+        seen[entry.description] = where
+        entries.append(entry)
+    return entries
+
+
+def inventory_format(path: str | Path, fmt: str | None = None) -> str:
+    """Explicit ``fmt`` or the one implied by the file extension (default json)."""
+    if fmt:
+        return fmt
+    return "csv" if Path(path).suffix.lower() == ".csv" else "json"
+
+
+def load_inventory(path: str | Path, fmt: str | None = None) -> list[HostEntry]:
+    return parse_inventory(Path(path).read_text(), inventory_format(path, fmt))
+
+
+def dump_inventory(entries: list[HostEntry], fmt: str) -> str:
+    """Render entries in an importable format, sorted by FQDN."""
+    entries = sorted(entries, key=lambda e: (e.fqdn.lower(), e.description))
+    if fmt == "json":
+        return json.dumps([e.to_dict() for e in entries], indent=2) + "\n"
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=INVENTORY_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for e in entries:
+        writer.writerow({**e.to_dict(), "ip": " ".join(e.ip), "mac": " ".join(e.mac)})
+    return out.getvalue()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Diff and apply
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class HostPlan:
+    """Changes needed to make the firewall match an inventory."""
+
+    creates: list[HostEntry] = field(default_factory=list)
+    updates: list[tuple[HostEntry, HostEntry]] = field(default_factory=list)  # (current, wanted)
+    deletes: list[HostEntry] = field(default_factory=list)
+    unchanged: list[HostEntry] = field(default_factory=list)
+    conflicts: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.creates or self.updates or self.deletes)
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "create": len(self.creates),
+            "update": len(self.updates),
+            "delete": len(self.deletes),
+            "unchanged": len(self.unchanged),
+            "conflict": len(self.conflicts),
+        }
+
+    def diff_lines(self) -> list[str]:
+        lines = [f"+ {e.fqdn} -> {', '.join(e.ip)}  ({e.description})" for e in self.creates]
+        for current, wanted in self.updates:
+            changes = [
+                f"{name}: {old or '-'} => {new or '-'}"
+                for name, old, new in (
+                    ("host", current.fqdn, wanted.fqdn),
+                    ("ip", ", ".join(sorted(current.ip)), ", ".join(sorted(wanted.ip))),
+                    ("mac", ", ".join(sorted(current.mac)), ", ".join(sorted(wanted.mac))),
+                    ("description", current.description, wanted.description),
+                )
+                if old != new
+            ]
+            lines.append(f"~ {wanted.fqdn}  " + "; ".join(changes))
+        lines += [f"- {e.fqdn} -> {', '.join(e.ip)}  ({e.description})" for e in self.deletes]
+        lines += [f"! {c}" for c in self.conflicts]
+        return lines
+
+
+def plan_import(index: HostIndex, wanted: list[HostEntry], prune: bool = False) -> HostPlan:
+    """Diff an inventory against a firewall snapshot.
+
+    Each inventory entry is matched to at most one existing entry (see
+    :meth:`HostIndex.match`). With ``prune`` every unmatched existing entry
+    is deleted. An entry whose IP or MAC would still be held by a different
+    entry after the import is reported as a conflict and left out of the
+    plan rather than creating a duplicate reservation.
+    """
+    plan = HostPlan()
+    taken: set[str] = set()
+    matches: list[tuple[HostEntry, HostEntry | None]] = []
+    for entry in wanted:
+        current = index.match(entry, taken)
+        if current is not None:
+            taken.add(current.uuid)
+        matches.append((entry, current))
+
+    if prune:
+        plan.deletes = [e for e in index.entries if e.uuid not in taken]
+
+    # Who holds each IP/MAC once the import is done: inventory entries hold
+    # their own, unmatched existing entries keep theirs unless pruned.
+    holders: dict[str, list[tuple[int | str, str]]] = {}
+    for i, (entry, _) in enumerate(matches):
+        for value in entry.ip + entry.mac:
+            holders.setdefault(value, []).append((i, entry.description))
+    if not prune:
+        for existing in index.entries:
+            if existing.uuid not in taken:
+                for value in existing.ip + existing.mac:
+                    holders.setdefault(value, []).append(
+                        (existing.uuid or "", existing.description or existing.fqdn))
+
+    for i, (entry, current) in enumerate(matches):
+        clashes = sorted({
+            label for value in entry.ip + entry.mac
+            for holder, label in holders[value] if holder != i
+        })
+        if clashes:
+            plan.conflicts.append(
+                f"{entry.fqdn} ({entry.description}): IP/MAC also used by {', '.join(clashes)}"
+            )
+        elif current is None:
+            plan.creates.append(entry)
+        elif current.same_as(entry):
+            plan.unchanged.append(current)
+        else:
+            plan.updates.append((current, entry))
+    return plan
+
+
+def apply_plan(manager: DhcpManager, plan: HostPlan) -> list[str]:
+    """Stage every change in ``plan`` and reconfigure dnsmasq once.
+
+    Deletes run first so freed IPs/descriptions can be reused, then updates,
+    then creates. A failed write is recorded and the rest still go ahead;
+    returns the error messages (empty on full success).
+    """
+    errors: list[str] = []
+    staged = 0
+
+    def run(entry: HostEntry, write, *args, **kwargs) -> None:
+        nonlocal staged
+        try:
+            result = write(*args, reconfigure=False, **kwargs)
+        except Exception as e:
+            errors.append(f"{entry.fqdn} ({entry.description}): {e}")
+            return
+        if result.get("changed"):
+            staged += 1
+        else:
+            errors.append(f"{entry.fqdn} ({entry.description}): {result.get('error', result)}")
+
+    for entry in plan.deletes:
+        run(entry, manager.delete_host_by_uuid, entry.uuid)
+    for current, entry in plan.updates:
+        run(entry, manager.save_host, entry.to_dhcp_host(), uuid=current.uuid)
+    for entry in plan.creates:
+        run(entry, manager.save_host, entry.to_dhcp_host())
+    if staged:
+        manager.reconfigure()
+    return errors
@@ -6,10 +6,21 @@ in OPNsense's Dnsmasq service.
 """
 
 import argparse
+import json
 import sys
 
+from .address_index import AddressIndex
 from .config import Config
 from .dhcp_manager import DhcpHost, DhcpManager
+from .dns_inventory import (
+    HostIndex,
+    apply_plan,
+    dump_inventory,
+    inventory_format,
+    load_inventory,
+    plan_import,
+)
+from .lease_watch import LeaseWatcher
 
 
 def format_ip(ip_raw) -> str:
@@ -213,7 +224,11 @@ def list_dns_hosts(manager: DhcpManager) -> bool:
         return False
 
 
-def check_dns_range(manager: DhcpManager, ip_address: str) -> bool:
+def check_dns_range(
+    manager: DhcpManager,
+    ip_address: str,
+    index: AddressIndex | None = None,
+) -> bool:
     """Check whether an IP falls inside a configured DHCP pool (issue #251).
 
     Prints the matching range if the IP is inside a DHCP pool and returns
@@ -225,12 +240,16 @@ def check_dns_range(manager: DhcpManager, ip_address: str) -> bool:
     Args:
         manager: DhcpManager instance
         ip_address: IPv4 address to test
+        index: Prebuilt AddressIndex to query instead of listing the ranges
 
     Returns:
         True if the IP is NOT inside any DHCP pool, False if it is inside one.
     """
     try:
-        match = manager.ip_in_any_range(ip_address)
+        if index is not None:
+            match = index.range_for(ip_address)
+        else:
+            match = manager.ip_in_any_range(ip_address)
     except Exception as e:
         print(f"ERROR: Failed to query DHCP ranges: {e}", file=sys.stderr)
         # Unknown — do not block the caller; report "clear".
@@ -248,6 +267,176 @@ def check_dns_range(manager: DhcpManager, ip_address: str) -> bool:
     return True
 
 
+def check_dns_ranges(manager: DhcpManager, ip_addresses: list[str]) -> bool:
+    """check_dns_range for several IPs against one snapshot of the ranges.
+
+    Returns True only if every IP is clear of every DHCP pool.
+    """
+    if len(ip_addresses) == 1:
+        return check_dns_range(manager, ip_addresses[0])
+    try:
+        index = AddressIndex.from_manager(manager, hosts=False, leases=False)
+    except Exception as e:
+        print(f"ERROR: Failed to query DHCP ranges: {e}", file=sys.stderr)
+        return True
+    results = [check_dns_range(manager, ip, index) for ip in ip_addresses]
+    return all(results)
+
+
+def audit_dns_hosts(manager: DhcpManager, as_json: bool = False) -> bool:
+    """Report reservation problems across all static DNS/DHCP host entries.
+
+    Lists ranges, hosts and leases once and flags every static reservation
+    inside a dynamic pool, every IP reserved by more than one entry, and
+    every reserved IP that is leased to a different MAC.
+
+    Args:
+        manager: DhcpManager instance
+        as_json: Print the findings as a JSON list
+
+    Returns:
+        True if nothing was flagged, False otherwise
+    """
+    try:
+        index = AddressIndex.from_manager(manager)
+    except Exception as e:
+        print(f"ERROR: Failed to read DHCP state: {e}", file=sys.stderr)
+        return False
+
+    findings = index.audit()
+    if as_json:
+        print(json.dumps([f.to_dict() for f in findings], indent=2))
+        return not findings
+
+    if not findings:
+        print(
+            f"No problems found ({len(index.hosts)} host entries, "
+            f"{len(index.ranges)} DHCP ranges, {len(index.leases)} leases)"
+        )
+        return True
+    print(f"Found {len(findings)} problems:")
+    print()
+    for f in findings:
+        print(f"  {f.kind:16} {f.ip:15}  {f.host}: {f.detail}")
+    return False
+
+
+def watch_leases(
+    manager: DhcpManager,
+    interval: float = 30.0,
+    initial: bool = True,
+    count: int | None = None,
+) -> bool:
+    """Print DHCP lease add/expire/change events as JSON lines until interrupted.
+
+    Args:
+        manager: DhcpManager instance
+        interval: Seconds between lease polls
+        initial: Report the leases present at start as "add" events
+        count: Stop after this many polls (default: run until interrupted)
+
+    Returns:
+        True when the watch ends normally
+    """
+    watcher = LeaseWatcher(manager, interval=interval, initial=initial)
+    try:
+        for event in watcher.events(max_polls=count):
+            print(json.dumps(event.to_dict()), flush=True)
+    except KeyboardInterrupt:
+        pass
+    return True
+
+
+def import_dns_hosts(
+    manager: DhcpManager,
+    path: str,
+    fmt: str | None = None,
+    prune: bool = False,
+    check_mode: bool = False,
+) -> bool:
+    """Make the dnsmasq host entries match an inventory file.
+
+    Lists the firewall once, prints the diff, and (unless check_mode)
+    stages only the needed creates/updates/deletes with a single reconfigure.
+    Entries whose IP or MAC clash with another entry are skipped and make
+    the command fail.
+
+    Args:
+        manager: DhcpManager instance
+        path: JSON or CSV inventory file
+        fmt: "json" or "csv" (default: from the file extension)
+        prune: Also delete firewall entries that are not in the inventory
+        check_mode: If True, only print the diff
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        wanted = load_inventory(path, fmt)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Cannot read inventory {path}: {e}", file=sys.stderr)
+        return False
+
+    try:
+        plan = plan_import(HostIndex.from_manager(manager), wanted, prune=prune)
+    except Exception as e:
+        print(f"ERROR: Failed to list DNS entries: {e}", file=sys.stderr)
+        return False
+
+    for line in plan.diff_lines():
+        print(line)
+    counts = plan.summary()
+    print(
+        f"{counts['create']} to create, {counts['update']} to update, "
+        f"{counts['delete']} to delete, {counts['unchanged']} unchanged, "
+        f"{counts['conflict']} conflicting"
+    )
+
+    if check_mode:
+        print("Dry-run mode: no changes made")
+        return not plan.conflicts
+    if not plan.changed:
+        return not plan.conflicts
+
+    errors = apply_plan(manager, plan)
+    for err in errors:
+        print(f"ERROR: {err}", file=sys.stderr)
+    if not errors:
+        print("✓ DNS entries imported successfully")
+    return not errors and not plan.conflicts
+
+
+def export_dns_hosts(manager: DhcpManager, path: str | None = None, fmt: str | None = None) -> bool:
+    """Write all DNS host entries in an importable JSON/CSV format.
+
+    Args:
+        manager: DhcpManager instance
+        path: Output file (default: stdout)
+        fmt: "json" or "csv" (default: from the file extension, else json)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        index = HostIndex.from_manager(manager)
+    except Exception as e:
+        print(f"ERROR: Failed to list DNS entries: {e}", file=sys.stderr)
+        return False
+
+    text = dump_inventory(index.entries, inventory_format(path or "", fmt))
+    if not path:
+        sys.stdout.write(text)
+        return True
+    try:
+        with open(path, "w") as f:
+            f.write(text)
+    except OSError as e:
+        print(f"ERROR: Cannot write {path}: {e}", file=sys.stderr)
+        return False
+    print(f"Exported {len(index.entries)} DNS host entries to {path}")
+    return True
+
+
 def main():
     """Main entry point for DNS manager CLI."""
     parser = argparse.ArgumentParser(
@@ -270,6 +459,17 @@ Examples:
   # Check whether an IP is inside a DHCP pool (non-zero exit if it is)
   dns-manager check-range 10.2.20.25
 
+  # Flag every static reservation inside a pool, reserved twice, or leased elsewhere
+  dns-manager audit
+
+  # Stream lease add/expire/change events as JSON lines
+  dns-manager watch-leases --interval 10
+
+  # Export all entries, edit, and import them back (one list, one reconfigure)
+  dns-manager export -o hosts.csv
+  dns-manager import hosts.csv --check
+  dns-manager import hosts.csv --prune
+
   # Dry-run mode (don't make changes)
   dns-manager add backup mgmt.internal 10.0.0.12 --check-mode
   dns-manager delete backup mgmt.internal --check-mode
@@ -338,9 +538,51 @@ Examples:
     # Check-range command (issue #251)
     check_range_parser = subparsers.add_parser(
         "check-range",
-        help="Check whether an IP is inside a DHCP pool (exit 1 if it is)",
+        help="Check whether IPs are inside a DHCP pool (exit 1 if any is)",
+    )
+    check_range_parser.add_argument("ip", nargs="+", help="IP address(es) to check")
+
+    # Audit command
+    audit_parser = subparsers.add_parser(
+        "audit",
+        help="Flag static reservations inside DHCP pools, duplicated or leased elsewhere (exit 1 if any)",
+    )
+    audit_parser.add_argument("--json", action="store_true", help="Print findings as JSON")
+
+    # Watch-leases command
+    watch_parser = subparsers.add_parser(
+        "watch-leases",
+        help="Poll DHCP leases and print add/expire/change events as JSON lines",
     )
-    check_range_parser.add_argument("ip", help="IP address to check")
+    watch_parser.add_argument("--interval", type=float, default=30.0, help="Seconds between polls (default: 30)")
+    watch_parser.add_argument(
+        "--no-initial",
+        action="store_true",
+        help="Do not report the leases present at start, only later changes",
+    )
+    watch_parser.add_argument("--count", type=int, help="Stop after this many polls")
+
+    # Import / export commands
+    import_parser = subparsers.add_parser(
+        "import",
+        help="Create/update/delete entries so they match a JSON or CSV inventory",
+    )
+    import_parser.add_argument("file", help="Inventory file (columns: host, domain, ip, mac, description)")
+    import_parser.add_argument("--format", choices=["json", "csv"], help="Inventory format (default: from extension)")
+    import_parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Also delete entries on the firewall that are not in the inventory",
+    )
+    import_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only print the diff (same as --check-mode)",
+    )
+
+    export_parser = subparsers.add_parser("export", help="Write all entries as JSON or CSV")
+    export_parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    export_parser.add_argument("--format", choices=["json", "csv"], help="Output format (default: from extension, else json)")
 
     args = parser.parse_args()
 
@@ -398,7 +640,26 @@ Examples:
             elif args.command == "list":
                 success = list_dns_hosts(manager)
             elif args.command == "check-range":
-                success = check_dns_range(manager, args.ip)
+                success = check_dns_ranges(manager, args.ip)
+            elif args.command == "audit":
+                success = audit_dns_hosts(manager, args.json)
+            elif args.command == "watch-leases":
+                success = watch_leases(
+                    manager,
+                    interval=args.interval,
+                    initial=not args.no_initial,
+                    count=args.count,
+                )
+            elif args.command == "import":
+                success = import_dns_hosts(
+                    manager,
+                    args.file,
+                    args.format,
+                    prune=args.prune,
+                    check_mode=args.check_mode or args.check,
+                )
+            elif args.command == "export":
+                success = export_dns_hosts(manager, args.output, args.format)
 
             sys.exit(0 if success else 1)
 
@@ -1,10 +1,12 @@
 """Firewall rule management operations for OPNsense."""
 
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from enum import Enum
 from oxl_opnsense_client import Client
 
 from .config import Config
+from .session import get_client
 
 
 class RuleAction(str, Enum):
@@ -118,6 +120,129 @@ class FirewallRuleInfo:
             sequence=int(data["sequence"]) if data.get("sequence") else None,
         )
 
+    def matches(self, rule: FirewallRule) -> bool:
+        """Return True if this live rule already carries ``rule``'s settings.
+
+        Compares the fields the filter ``get`` endpoint reports back; a match
+        means writing ``rule`` again would be a no-op. Enum values and protocol
+        names are compared case-insensitively, empty ports count as "any".
+        """
+        def value(v) -> str:
+            return str(v.value if isinstance(v, Enum) else v).lower()
+
+        interface = ",".join(rule.interface) if isinstance(rule.interface, list) else rule.interface
+        return (
+            self.description == rule.description
+            and self.enabled == rule.enabled
+            and value(self.action) == value(rule.action)
+            and self.interface == interface
+            and value(self.direction) == value(rule.direction)
+            and value(self.protocol) == value(rule.protocol)
+            and self.source_net == rule.source_net
+            and (self.source_port or None) == (rule.source_port or None)
+            and self.destination_net == rule.destination_net
+            and (self.destination_port or None) == (rule.destination_port or None)
+            and self.log == rule.log
+            and self.sequence == rule.sequence
+        )
+
+
+@dataclass
+class AliasInfo:
+    """Information about an existing firewall alias."""
+
+    uuid: str
+    name: str
+    type: str
+    content: list[str] = field(default_factory=list)
+    description: str = ""
+    enabled: bool = True
+
+    def matches(self, alias_type: str, content: list[str], description: str) -> bool:
+        """Return True if this alias already has the given type, content and description.
+
+        Content is compared as a set; OPNsense does not preserve entry order.
+        """
+        return (
+            self.type == alias_type
+            and sorted(self.content) == sorted(str(c) for c in content)
+            and self.description == description
+        )
+
+
+class RuleIndex:
+    """Point-in-time snapshot of the filter ruleset, indexed for lookups.
+
+    Built from a single ``/api/firewall/filter/get`` download so callers that
+    need many lookups (rules-manager reconcile, zone-manager rule sync) pay for
+    one fetch and one parse instead of one per query. Lookups by uuid,
+    description, canonical description and sequence are O(1); prefix scans on
+    the canonical description use a sorted key list (O(log n + k)).
+
+    The canonical description is the part before the first ``|`` — TAPPaaS
+    records rules as ``"<canonical> | <freetext>"`` (see
+    ``rules_manager._canonical_part``); rules without a suffix are their own
+    canonical form.
+
+    The index is a snapshot: it does not see changes made after it was built.
+    FirewallManager drops its cached index on every mutation it performs.
+    """
+
+    def __init__(self, rules: list[FirewallRuleInfo]):
+        self.rules = list(rules)
+        self.by_uuid: dict[str, FirewallRuleInfo] = {}
+        self.by_description: dict[str, FirewallRuleInfo] = {}
+        self.by_canonical: dict[str, list[FirewallRuleInfo]] = {}
+        self.by_sequence: dict[int, list[FirewallRuleInfo]] = {}
+        for rule in self.rules:
+            self.by_uuid[rule.uuid] = rule
+            # First occurrence wins, matching the old linear-scan lookup.
+            self.by_description.setdefault(rule.description, rule)
+            self.by_canonical.setdefault(self.canonical(rule.description), []).append(rule)
+            if rule.sequence is not None:
+                self.by_sequence.setdefault(rule.sequence, []).append(rule)
+        self._sorted_keys = sorted(self.by_canonical)
+
+    @staticmethod
+    def canonical(description: str) -> str:
+        """Return the canonical (pre-``|``) part of a rule description."""
+        return description.split("|", 1)[0].strip()
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def get(self, uuid: str) -> FirewallRuleInfo | None:
+        """Return the rule with this UUID, or None."""
+        return self.by_uuid.get(uuid)
+
+    def get_by_description(self, description: str) -> FirewallRuleInfo | None:
+        """Return the first rule whose full description matches exactly."""
+        return self.by_description.get(description)
+
+    def get_by_canonical(self, canonical: str) -> list[FirewallRuleInfo]:
+        """Return every rule whose canonical description matches exactly."""
+        return list(self.by_canonical.get(canonical, []))
+
+    def get_by_sequence(self, sequence: int) -> list[FirewallRuleInfo]:
+        """Return every rule at this sequence number."""
+        return list(self.by_sequence.get(sequence, []))
+
+    def with_prefix(self, prefix: str) -> list[FirewallRuleInfo]:
+        """Return rules whose canonical description starts with ``prefix``."""
+        rules: list[FirewallRuleInfo] = []
+        i = bisect_left(self._sorted_keys, prefix)
+        while i < len(self._sorted_keys) and self._sorted_keys[i].startswith(prefix):
+            rules.extend(self.by_canonical[self._sorted_keys[i]])
+            i += 1
+        return rules
+
+    def search(self, pattern: str = "") -> list[FirewallRuleInfo]:
+        """Case-insensitive substring match on the description (list_rules semantics)."""
+        if not pattern:
+            return list(self.rules)
+        needle = pattern.lower()
+        return [r for r in self.rules if needle in r.description.lower()]
+
 
 class FirewallManager:
     """Manage firewall rules on OPNsense."""
@@ -125,37 +250,17 @@ class FirewallManager:
     def __init__(self, config: Config):
         self.config = config
         self._client: Client | None = None
-
-    def _get_client_kwargs(self) -> dict:
-        """Build client connection kwargs from config."""
-        kwargs = {
-            "firewall": self.config.firewall,
-            "port": self.config.resolve_port(),
-            "ssl_verify": self.config.ssl_verify,
-            "debug": self.config.debug,
-            "api_timeout": self.config.api_timeout,
-            "api_retries": self.config.api_retries,
-        }
-
-        if self.config.credential_file:
-            kwargs["credential_file"] = self.config.credential_file
-        elif self.config.token and self.config.secret:
-            kwargs["token"] = self.config.token
-            kwargs["secret"] = self.config.secret
-
-        if self.config.ssl_ca_file:
-            kwargs["ssl_ca_file"] = self.config.ssl_ca_file
-
-        return kwargs
+        self._rule_index: RuleIndex | None = None
 
     def connect(self) -> "FirewallManager":
         """Establish connection to OPNsense."""
-        self._client = Client(**self._get_client_kwargs())
+        self._client = get_client(self.config)
         return self
 
     def disconnect(self):
         """Close connection to OPNsense."""
         self._client = None
+        self._rule_index = None
 
     def __enter__(self) -> "FirewallManager":
         return self.connect()
@@ -185,12 +290,37 @@ class FirewallManager:
     def list_rules(self, search_pattern: str = "") -> list[FirewallRuleInfo]:
         """List all firewall rules.
 
+        Served from the cached RuleIndex snapshot, so repeated calls within a
+        run cost one download. The snapshot is refreshed after any mutation
+        made through this manager (see invalidate_rule_index).
+
         Args:
             search_pattern: Search pattern to filter rules (default: all)
 
         Returns:
             List of FirewallRuleInfo objects
         """
+        return self.rule_index().search(search_pattern)
+
+    def rule_index(self, refresh: bool = False) -> RuleIndex:
+        """Return the indexed ruleset snapshot, fetching it on first use.
+
+        Args:
+            refresh: Force a new download even if a snapshot is cached
+
+        Returns:
+            RuleIndex over every rule in the filter configuration
+        """
+        if self._rule_index is None or refresh:
+            self._rule_index = RuleIndex(self._fetch_rules())
+        return self._rule_index
+
+    def invalidate_rule_index(self) -> None:
+        """Drop the cached ruleset snapshot; the next lookup re-fetches."""
+        self._rule_index = None
+
+    def _fetch_rules(self) -> list[FirewallRuleInfo]:
+        """Download and parse the full filter ruleset."""
         # Use the /api/firewall/filter/get endpoint which shows the full config
         result = self.client.run_module(
             "raw",
@@ -215,9 +345,7 @@ class FirewallManager:
             # Extract selected values from the OPNsense API format
             rule_info = self._parse_rule_from_get(rule_uuid, rule_data)
             if rule_info:
-                # Apply search filter if provided
-                if not search_pattern or search_pattern.lower() in rule_info.description.lower():
-                    rules.append(rule_info)
+                rules.append(rule_info)
 
         return rules
 
@@ -290,11 +418,7 @@ class FirewallManager:
         Returns:
             FirewallRuleInfo if found, None otherwise
         """
-        rules = self.list_rules(description)
-        for rule in rules:
-            if rule.description == description:
-                return rule
-        return None
+        return self.rule_index().get_by_description(description)
 
     def create_rule(self, rule: FirewallRule, apply: bool = True) -> dict:
         """Create a new firewall rule.
@@ -355,6 +479,7 @@ class FirewallManager:
             "rule",
             params=params,
         )
+        self.invalidate_rule_index()
 
         # Apply changes if requested
         if apply:
@@ -394,6 +519,7 @@ class FirewallManager:
                 "reload": False,
             },
         )
+        self.invalidate_rule_index()
 
         if apply:
             self.apply_changes()
@@ -419,6 +545,7 @@ class FirewallManager:
                 "action": "post",
             },
         )
+        self.invalidate_rule_index()
 
         if apply:
             self.apply_changes()
@@ -446,6 +573,7 @@ class FirewallManager:
                 "action": "post",
             },
         )
+        self.invalidate_rule_index()
 
         if apply:
             self.apply_changes()
@@ -506,12 +634,75 @@ class FirewallManager:
                 "action": "post",
             },
         )
+        self.invalidate_rule_index()
         return result
 
     # =========================================================================
     # Convenience Methods
     # =========================================================================
 
+    def list_aliases(self) -> list[AliasInfo]:
+        """List all firewall aliases.
+
+        Uses /api/firewall/alias/get (one download of the whole alias table).
+
+        Returns:
+            List of AliasInfo objects
+        """
+        result = self.client.run_module(
+            "raw",
+            params={
+                "module": "firewall",
+                "controller": "alias",
+                "command": "get",
+                "action": "get",
+            },
+        )
+        response = result.get("result", {}).get("response", {})
+        aliases_config = response.get("alias", {}).get("aliases", {}).get("alias", {})
+
+        # API may return an empty list instead of dict when no aliases exist
+        if isinstance(aliases_config, list):
+            return []
+
+        def selected(field_data: dict | str) -> list[str]:
+            """Selected keys of an OPNsense option field, or split plain text."""
+            if isinstance(field_data, str):
+                return [v.strip() for v in field_data.replace(",", "\n").splitlines() if v.strip()]
+            return [
+                key for key, info in field_data.items()
+                if isinstance(info, dict) and info.get("selected") == 1
+            ]
+
+        aliases = []
+        for alias_uuid, data in aliases_config.items():
+            alias_type = selected(data.get("type", {}))
+            aliases.append(AliasInfo(
+                uuid=alias_uuid,
+                name=data.get("name", ""),
+                type=alias_type[0] if alias_type else "",
+                content=selected(data.get("content", "")),
+                description=data.get("description", ""),
+                enabled=data.get("enabled", "1") == "1",
+            ))
+        return aliases
+
+    def reconfigure_aliases(self) -> dict:
+        """Reload aliases so pending alias changes take effect.
+
+        Returns:
+            Result dictionary from the API
+        """
+        return self.client.run_module(
+            "raw",
+            params={
+                "module": "firewall",
+                "controller": "alias",
+                "command": "reconfigure",
+                "action": "post",
+            },
+        )
+
     def create_allow_rule(
         self,
         description: str,
@@ -0,0 +1,159 @@
+"""Concurrent control-plane health probes with latency metrics.
+
+zone-manager gates ``--execute`` on Unbound DNS, egress and the OPNsense API
+(#307). The probes are independent, so :func:`run_health_probes` runs them
+in parallel and a gate costs the slowest probe rather than the sum of their
+timeouts. Every result carries its latency and can be appended to a JSON-lines
+metrics file.
+
+:class:`HealthWatcher` repeats the same probes on a background thread while a
+run mutates the firewall, and reports the moment DNS or egress degrades.
+
+A probe is a zero-argument callable that returns True when healthy. It logs its
+own detail and should not raise; an exception counts as a failure.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from .log import debug, info, warn
+
+Probe = Callable[[], bool]
+
+
+@dataclass
+class HealthResult:
+    """Outcome of one probe run."""
+
+    probe: str
+    ok: bool
+    latency_ms: float
+    label: str = ""
+    timestamp: float = 0.0
+    detail: str = ""
+
+
+def _timed(name: str, probe: Probe, label: str) -> HealthResult:
+    start = time.monotonic()
+    detail = ""
+    try:
+        ok = bool(probe())
+    except Exception as e:
+        ok, detail = False, str(e) or type(e).__name__
+    latency = round((time.monotonic() - start) * 1000, 1)
+    return HealthResult(name, ok, latency, label=label, timestamp=time.time(), detail=detail)
+
+
+def write_metrics(results: list[HealthResult], metrics_file: str | Path | None) -> None:
+    """Append results as JSON lines (one object per probe run)."""
+    if not metrics_file or not results:
+        return
+    try:
+        with open(metrics_file, "a") as f:
+            for r in results:
+                f.write(json.dumps({"metric": "health_probe", **asdict(r)}) + "\n")
+    except OSError as e:
+        warn(f"Cannot write health metrics to {metrics_file}: {e}")
+
+
+def run_health_probes(
+    probes: dict[str, Probe],
+    label: str = "",
+    metrics_file: str | Path | None = None,
+) -> dict[str, HealthResult]:
+    """Run all probes concurrently; returns results keyed by probe name."""
+    if not probes:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(probes)) as pool:
+        futures = {name: pool.submit(_timed, name, fn, label) for name, fn in probes.items()}
+        results = {name: f.result() for name, f in futures.items()}
+    debug(f"[HEALTH {label}] " + ", ".join(
+        f"{r.probe} {'ok' if r.ok else 'FAILED'} {r.latency_ms}ms" for r in results.values()
+    ))
+    write_metrics(list(results.values()), metrics_file)
+    return results
+
+
+class HealthWatcher:
+    """Re-run health probes every ``interval`` seconds on a background thread.
+
+    Use as a context manager around the mutating part of a run. Failures and
+    recoveries are logged as they happen; the collected samples and
+    :meth:`summary` are available afterwards.
+    """
+
+    def __init__(
+        self,
+        probes: dict[str, Probe],
+        interval: float = 5.0,
+        label: str = "WATCH",
+        metrics_file: str | Path | None = None,
+    ):
+        self.probes = probes
+        self.interval = interval
+        self.label = label
+        self.metrics_file = metrics_file
+        self.samples: list[HealthResult] = []
+        self._healthy: dict[str, bool] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "HealthWatcher":
+        self._thread = threading.Thread(target=self._run, name="health-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "HealthWatcher":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        # Always sample at least once, even if stopped right after start()
+        while True:
+            results = run_health_probes(self.probes, self.label, self.metrics_file)
+            self.samples.extend(results.values())
+            for name, r in results.items():
+                was = self._healthy.get(name, True)
+                if was and not r.ok:
+                    warn(f"[HEALTH {self.label}] {name} FAILED during apply")
+                elif not was and r.ok:
+                    info(f"[HEALTH {self.label}] {name} recovered ({r.latency_ms}ms)")
+                self._healthy[name] = r.ok
+            if self._stop.wait(self.interval):
+                return
+
+    @property
+    def degraded(self) -> list[str]:
+        """Probes that failed at least once while watching."""
+        return sorted({r.probe for r in self.samples if not r.ok})
+
+    def summary(self) -> dict[str, dict]:
+        """Per probe: runs, failures and max/avg latency in ms."""
+        out: dict[str, dict] = {}
+        for name in self.probes:
+            runs = [r for r in self.samples if r.probe == name]
+            if not runs:
+                continue
+            latencies = [r.latency_ms for r in runs]
+            out[name] = {
+                "runs": len(runs),
+                "failures": sum(1 for r in runs if not r.ok),
+                "max_ms": max(latencies),
+                "avg_ms": round(sum(latencies) / len(latencies), 1),
+            }
+        return out
@@ -0,0 +1,136 @@
+"""Incremental feed of dnsmasq lease changes.
+
+Tools that react to leases (DNS registration, inventory) used to call
+``list_leases()`` repeatedly and diff the whole sorted table themselves.
+:class:`LeaseWatcher` polls ``leases/search`` on an interval, keeps a compact
+table keyed by ``(mac, ip)`` and yields only what changed:
+
+- ``add``: a (mac, ip) pair that was not leased at the previous poll
+- ``expire``: a pair that is no longer leased
+- ``change``: same pair, different hostname, zone or interface
+
+Lease renewals only move the ``expire`` timestamp and are not reported.
+``dns-manager watch-leases`` prints the events as JSON lines.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+
+from .log import error
+
+LeaseKey = tuple[str, str]            # (mac, ip)
+LeaseValue = tuple[str, str, str]     # (hostname, zone, interface)
+
+_VALUE_FIELDS = ("hostname", "zone", "interface")
+
+
+@dataclass
+class LeaseEvent:
+    """One change in the lease table."""
+
+    event: str              # "add" | "expire" | "change"
+    mac: str
+    ip: str
+    hostname: str = ""
+    zone: str = ""
+    interface: str = ""
+    expire: int | str | None = None
+    changed: dict[str, list[str]] = field(default_factory=dict)  # field -> [old, new]
+    timestamp: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class LeaseTable:
+    """The last seen leases, keyed by (mac, ip)."""
+
+    __slots__ = ("values", "expires")
+
+    def __init__(self):
+        self.values: dict[LeaseKey, LeaseValue] = {}
+        self.expires: dict[LeaseKey, int | str | None] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def update(self, leases: Iterable[dict], now: float | None = None) -> list[LeaseEvent]:
+        """Replace the table with ``leases``; return the events in between."""
+        now = time.time() if now is None else now
+        values: dict[LeaseKey, LeaseValue] = {}
+        expires: dict[LeaseKey, int | str | None] = {}
+        for lease in leases:
+            key = ((lease.get("mac") or "").lower(), lease.get("ip") or "")
+            values[key] = (lease.get("hostname") or "", lease.get("zone") or "", lease.get("interface") or "")
+            expires[key] = lease.get("expire")
+
+        events: list[LeaseEvent] = []
+        for key, value in values.items():
+            old = self.values.get(key)
+            if old == value:
+                continue
+            event = LeaseEvent("add" if old is None else "change", *key, *value,
+                               expire=expires[key], timestamp=now)
+            if old is not None:
+                event.changed = {
+                    name: [before, after]
+                    for name, before, after in zip(_VALUE_FIELDS, old, value)
+                    if before != after
+                }
+            events.append(event)
+        for key, old in self.values.items():
+            if key not in values:
+                events.append(LeaseEvent("expire", *key, *old, expire=self.expires.get(key), timestamp=now))
+
+        self.values, self.expires = values, expires
+        return events
+
+
+class LeaseWatcher:
+    """Poll a DhcpManager's leases every ``interval`` seconds and yield changes.
+
+    With ``initial=True`` the first poll reports every current lease as
+    ``add``; otherwise it only primes the table. A failed poll is logged to
+    stderr and retried at the next interval without touching the table.
+    """
+
+    def __init__(self, manager, interval: float = 30.0, initial: bool = True):
+        self.manager = manager
+        self.interval = interval
+        self.initial = initial
+        self.table = LeaseTable()
+        self.polls = 0
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Make events() return after the current poll."""
+        self._stop.set()
+
+    def poll(self) -> list[LeaseEvent]:
+        """Fetch the leases once and return the events since the last poll."""
+        events = self.table.update(self.manager.iter_leases())
+        self.polls += 1
+        if self.polls == 1 and not self.initial:
+            return []
+        return events
+
+    def events(self, max_polls: int | None = None) -> Iterator[LeaseEvent]:
+        """Yield events until stop() is called or ``max_polls`` polls have run."""
+        polls = 0
+        while not self._stop.is_set():
+            try:
+                events = self.poll()
+            except Exception as e:
+                # stderr, so a JSON-lines consumer on stdout is not disturbed
+                error(f"Lease poll failed: {e}")
+            else:
+                yield from events
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,266 @@
+"""Indexed, parse-once loader for the module.json corpus.
+
+The pinhole-allowed-from validator (issue #163) used to ``json.loads`` every
+module file, re-read peer modules for every ingress entry that named them,
+re-read ``pinhole.json`` for every dependsOn entry, and then re-scan the raw
+text line by line to find a line number for each finding. ``ModuleCorpus``
+instead reads the directory once, in parallel, with a small position-tracking
+JSON parser that records the line of every key and array element. Peer lookups
+and pinhole files are served from the same cache.
+
+Line numbers come from :func:`loads_with_lines`: ``lines[("ingress", 2,
+"from")]`` is the line of the ``"from"`` key inside the third ingress entry,
+``lines[("ingress", 2)]`` the line of that entry's opening brace.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from json.decoder import JSONDecodeError, scanstring
+from pathlib import Path
+from typing import Any
+
+# Modules whose JSON files exist in the config directory but are NOT consumer
+# modules — never apply per-module firewall validation to these.
+_NON_MODULE_STEMS: frozenset[str] = frozenset(
+    {"configuration", "firewall", "zones", "aliases",
+     "sequence-map", "module-fields"}
+)
+
+DEFAULT_LOAD_WORKERS = 8
+
+JsonPath = tuple[str | int, ...]
+
+
+def discover_module_files(modules_dir: Path) -> list[Path]:
+    """Return module.json file paths from `modules_dir`, sorted by name.
+
+    Skips well-known non-module JSON files (configuration.json, zones.json,
+    firewall.json, etc.) and `.orig` backup files.
+    """
+    if not modules_dir.is_dir():
+        return []
+    return sorted(
+        p for p in modules_dir.glob("*.json")
+        if p.stem not in _NON_MODULE_STEMS and not p.name.endswith(".orig")
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Position-tracking JSON parser
+# ─────────────────────────────────────────────────────────────────────────────
+
+_WS = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+_LITERALS = (("true", True), ("false", False), ("null", None))
+
+
+class _LineParser:
+    def __init__(self, text: str):
+        self.text = text
+        self.newlines = [m.start() for m in re.finditer("\n", text)]
+        self.lines: dict[JsonPath, int] = {}
+
+    def line_of(self, pos: int) -> int:
+        return bisect_left(self.newlines, pos) + 1
+
+    def skip(self, pos: int) -> int:
+        return _WS.match(self.text, pos).end()
+
+    def value(self, pos: int, path: JsonPath) -> tuple[Any, int]:
+        text = self.text
+        pos = self.skip(pos)
+        char = text[pos:pos + 1]
+        if char == "{":
+            return self.object(pos + 1, path)
+        if char == "[":
+            return self.array(pos + 1, path)
+        if char == '"':
+            return scanstring(text, pos + 1)
+        match = _NUMBER.match(text, pos)
+        if match:
+            literal = match.group()
+            number = float(literal) if match.group(1) or match.group(2) else int(literal)
+            return number, match.end()
+        for word, result in _LITERALS:
+            if text.startswith(word, pos):
+                return result, pos + len(word)
+        raise JSONDecodeError("Expecting value", text, pos)
+
+    def object(self, pos: int, path: JsonPath) -> tuple[dict, int]:
+        text = self.text
+        result: dict = {}
+        pos = self.skip(pos)
+        if text[pos:pos + 1] == "}":
+            return result, pos + 1
+        while True:
+            if text[pos:pos + 1] != '"':
+                raise JSONDecodeError(
+                    "Expecting property name enclosed in double quotes", text, pos)
+            key_line = self.line_of(pos)
+            key, pos = scanstring(text, pos + 1)
+            pos = self.skip(pos)
+            if text[pos:pos + 1] != ":":
+                raise JSONDecodeError("Expecting ':' delimiter", text, pos)
+            self.lines[path + (key,)] = key_line
+            result[key], pos = self.value(pos + 1, path + (key,))
+            pos = self.skip(pos)
+            char = text[pos:pos + 1]
+            if char == "}":
+                return result, pos + 1
+            if char != ",":
+                raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+            pos = self.skip(pos + 1)
+
+    def array(self, pos: int, path: JsonPath) -> tuple[list, int]:
+        text = self.text
+        result: list = []
+        pos = self.skip(pos)
+        if text[pos:pos + 1] == "]":
+            return result, pos + 1
+        while True:
+            pos = self.skip(pos)
+            index = len(result)
+            self.lines[path + (index,)] = self.line_of(pos)
+            item, pos = self.value(pos, path + (index,))
+            result.append(item)
+            pos = self.skip(pos)
+            char = text[pos:pos + 1]
+            if char == "]":
+                return result, pos + 1
+            if char != ",":
+                raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+            pos += 1
+
+
+def loads_with_lines(text: str) -> tuple[Any, dict[JsonPath, int]]:
+    """Parse JSON text; also return the 1-based line of every key/element.
+
+    Raises ``json.JSONDecodeError`` (with lineno) on malformed input.
+    """
+    parser = _LineParser(text)
+    parser.lines[()] = parser.line_of(parser.skip(0))
+    value, end = parser.value(0, ())
+    end = parser.skip(end)
+    if end != len(text):
+        raise JSONDecodeError("Extra data", text, end)
+    return value, parser.lines
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Corpus
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class ModuleDoc:
+    """One parsed module file, or the reason it could not be parsed."""
+
+    path: Path
+    data: Any = None
+    lines: dict[JsonPath, int] = field(default_factory=dict)
+    error: str | None = None     # "invalid JSON: ..." | "cannot read: ..."
+    error_line: int = 1
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+    def line(self, *path: str | int) -> int:
+        """Line of ``path``, or of its nearest recorded ancestor (1 if none)."""
+        while path:
+            if path in self.lines:
+                return self.lines[path]
+            path = path[:-1]
+        return 1
+
+    @classmethod
+    def load(cls, path: Path) -> "ModuleDoc":
+        try:
+            text = path.read_text()
+        except OSError as e:
+            return cls(path, error=f"cannot read: {e}")
+        try:
+            data, lines = loads_with_lines(text)
+        except JSONDecodeError as e:
+            return cls(path, error=f"invalid JSON: {e.msg}", error_line=e.lineno or 1)
+        except RecursionError:
+            return cls(path, error="invalid JSON: nesting too deep")
+        return cls(path, data, lines)
+
+
+def _read_pinhole_ports(provider_location: str, service: str) -> list[dict] | None:
+    """Mirror of rules_manager.load_pinhole_ports that never raises.
+
+    Returns the ports list, or None when the provider has no pinhole.json for
+    that service (which is the normal case for most services).
+    """
+    if not provider_location:
+        return None
+    path = Path(provider_location) / "services" / service / "pinhole.json"
+    if not path.is_file():
+        return None
+    try:
+        data = json.loads(path.read_text())
+    except Exception:
+        return None
+    if not isinstance(data, dict):
+        return None
+    ports = data.get("ports", []) or []
+    return ports if isinstance(ports, list) else None
+
+
+class ModuleCorpus:
+    """Every module file in a directory, parsed once and indexed by stem.
+
+    Files are read on a thread pool. Peer lookups for names that are not
+    discovered modules, and provider pinhole.json files, are loaded on first
+    use and cached.
+    """
+
+    def __init__(self, modules_dir: Path, workers: int = DEFAULT_LOAD_WORKERS):
+        self.modules_dir = Path(modules_dir)
+        files = discover_module_files(self.modules_dir)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            docs = list(pool.map(ModuleDoc.load, files))
+        self.docs: dict[str, ModuleDoc] = {doc.stem: doc for doc in docs}
+        self._extra: dict[str, ModuleDoc | None] = {}
+        self._pinholes: dict[tuple[str, str], list[dict] | None] = {}
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self.docs.values())
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def peer(self, name: str) -> ModuleDoc | None:
+        """The module file ``<name>.json``, or None if it does not exist."""
+        doc = self.docs.get(name)
+        if doc is not None:
+            return doc
+        with self._lock:
+            if name not in self._extra:
+                path = self.modules_dir / f"{name}.json"
+                self._extra[name] = ModuleDoc.load(path) if path.is_file() else None
+            return self._extra[name]
+
+    def peer_data(self, name: str) -> dict | None:
+        """Parsed object of a peer module; None if missing, invalid or not an object."""
+        doc = self.peer(name)
+        if doc is None or not isinstance(doc.data, dict):
+            return None
+        return doc.data
+
+    def pinhole_ports(self, provider_location: str, service: str) -> list[dict] | None:
+        """Cached :func:`_read_pinhole_ports` per (provider location, service)."""
+        key = (provider_location, service)
+        with self._lock:
+            if key not in self._pinholes:
+                self._pinholes[key] = _read_pinhole_ports(provider_location, service)
+            return self._pinholes[key]
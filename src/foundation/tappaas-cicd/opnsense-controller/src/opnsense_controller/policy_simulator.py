@@ -0,0 +1,565 @@
+"""Offline what-if evaluation of the compiled TAPPaaS firewall policy.
+
+Answers "would a packet from A to B on port P pass?" without an OPNsense
+connection. The rule set is the one the controllers would install:
+
+    * zone rules        ZoneManager.desired_firewall_rules()  (bands 1 and 5)
+    * module rules      RulesManager._compile() per module     (bands 3 and 4)
+
+Rules are evaluated the way pf evaluates the automation rules — first match
+wins (every rule is ``quick``), in sequence order, only against rules bound to
+the interface the packet enters on — and anything left unmatched hits the
+OPNsense default deny. Each verdict names the sequence and rule that decided it.
+
+Offline approximations:
+    * VLAN zones are bound to a symbolic interface named after the zone and
+      untagged zones to their bridge ("lan"), in both the zone and module rules.
+    * A zone or a host-alias module is represented by one address inside its
+      subnet (``network + 2``, clear of the gateway); host aliases (FQDNs) also
+      match by name, since DHCP addresses are not known offline.
+    * Traffic within one zone never reaches the firewall and is reported as
+      ``same-zone``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import ipaddress
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from .firewall_manager import FirewallRule, RuleAction
+from .log import error, info
+from .rules_manager import (
+    DEFAULT_MODULES_DIR,
+    ModuleSpec,
+    RulesManager,
+    ZoneSpec,
+    _find_aliases_file,
+    _find_zones_file,
+    _module_alias_name,
+    discover_modules,
+    load_global_aliases,
+    load_module,
+    load_zones,
+)
+from .zone_manager import ZoneManager
+
+# Stand-in for "somewhere on the internet" (TEST-NET-3: public, never RFC1918).
+INTERNET_SAMPLE_IP = ipaddress.IPv4Address("203.0.113.10")
+INTERNET_INTERFACE = "wan"
+_ALIAS_DEPTH_LIMIT = 8
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One side of a simulated packet."""
+
+    label: str
+    ip: ipaddress.IPv4Address
+    zone: str | None = None
+    names: frozenset[str] = frozenset()   # alias names / FQDNs it answers to
+
+
+@dataclass
+class Verdict:
+    """Outcome of a single query."""
+
+    action: str                      # pass | block
+    reason: str                      # rule | default-deny | same-zone
+    sequence: int | None = None
+    description: str = ""
+    interface: str = ""
+    evaluated: int = 0               # candidate rules inspected
+
+    @property
+    def allowed(self) -> bool:
+        return self.action == "pass"
+
+    def explain(self) -> str:
+        if self.reason == "same-zone":
+            return "pass (same zone — traffic does not cross the firewall)"
+        if self.reason == "default-deny":
+            return f"block (default deny on {self.interface}; no rule matched)"
+        return f"{self.action} by seq {self.sequence} on {self.interface}: {self.description}"
+
+
+@dataclass
+class Query:
+    """A what-if question, optionally with the verdict CI expects."""
+
+    source: str
+    destination: str
+    port: int | None = None
+    protocol: str = "TCP"
+    expect: str | None = None        # pass | block
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Query":
+        port = data.get("port")
+        return cls(
+            source=data["from"],
+            destination=data["to"],
+            port=int(port) if port is not None else None,
+            protocol=data.get("protocol", "TCP"),
+            expect=data.get("expect"),
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Compiled rules
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class _AddressMatch:
+    """A source/destination_net value resolved to networks and names."""
+
+    any: bool = False
+    networks: tuple[ipaddress.IPv4Network, ...] = ()
+    names: frozenset[str] = frozenset()
+
+    def matches(self, endpoint: Endpoint) -> bool:
+        if self.any:
+            return True
+        if any(endpoint.ip in net for net in self.networks):
+            return True
+        return bool(self.names & endpoint.names)
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    sequence: int
+    order: int                       # tie-break: input order within a sequence
+    action: str
+    interfaces: tuple[str, ...]      # a multi-interface rule applies on each
+    protocols: frozenset[str] | None  # None = any
+    source: _AddressMatch
+    destination: _AddressMatch
+    ports: tuple[tuple[int, int], ...] | None  # None = any port
+    description: str
+
+    def matches(self, src: Endpoint, dst: Endpoint, port: int | None, protocol: str) -> bool:
+        if self.protocols is not None and protocol not in self.protocols:
+            return False
+        if self.ports is not None:
+            if port is None or not any(lo <= port <= hi for lo, hi in self.ports):
+                return False
+        return self.source.matches(src) and self.destination.matches(dst)
+
+
+def _sort_key(rule: _CompiledRule) -> tuple[int, int]:
+    return rule.sequence, rule.order
+
+
+class PolicySimulator:
+    """Indexed first-match evaluator over a list of FirewallRule.
+
+    Rules are bucketed by interface and then by destination port — exact ports
+    in a dict, ranges and port-less rules in their own lists — so a query only
+    walks the rules that could possibly match, merged back into sequence order.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[FirewallRule],
+        zones: dict[str, ZoneSpec],
+        interfaces: dict[str, str],
+        modules: dict[str, ModuleSpec] | None = None,
+        aliases: dict[str, dict] | None = None,
+    ):
+        """Compile and index the rule set.
+
+        Args:
+            rules: Rules as the controllers would install them
+            zones: zones.json view (name → ZoneSpec)
+            interfaces: Zone name → interface identifier used by ``rules``
+            modules: Known modules (name → ModuleSpec), for module endpoints
+            aliases: Alias definitions (name → {"type", "addresses"})
+        """
+        self.zones = zones
+        self.interfaces = interfaces
+        self.modules = modules or {}
+        self.aliases = aliases or {}
+        self.skipped: list[str] = []
+        self._zone_networks = sorted(
+            (
+                (ipaddress.IPv4Network(z.ip_network, strict=False), name)
+                for name, z in zones.items() if z.ip_network
+            ),
+            key=lambda item: -item[0].prefixlen,   # most specific subnet first
+        )
+        self._portless: dict[str, list[_CompiledRule]] = {}
+        self._ranged: dict[str, list[_CompiledRule]] = {}
+        self._by_port: dict[tuple[str, int], list[_CompiledRule]] = {}
+        self._endpoints: dict[str, Endpoint] = {}
+        self.rule_count = 0
+
+        for order, rule in enumerate(rules):
+            compiled = self._compile_rule(rule, order)
+            if compiled is None:
+                continue
+            self.rule_count += 1
+            for interface in compiled.interfaces:
+                if compiled.ports is None:
+                    self._portless.setdefault(interface, []).append(compiled)
+                elif all(lo == hi for lo, hi in compiled.ports):
+                    for lo, _ in compiled.ports:
+                        self._by_port.setdefault((interface, lo), []).append(compiled)
+                else:
+                    self._ranged.setdefault(interface, []).append(compiled)
+        for bucket in (self._portless, self._ranged, self._by_port):
+            for entries in bucket.values():
+                entries.sort(key=_sort_key)
+
+    # ── Queries ──────────────────────────────────────────────────────────
+
+    def evaluate(
+        self, source: str, destination: str, port: int | None = None, protocol: str = "TCP"
+    ) -> Verdict:
+        """Decide a packet from ``source`` to ``destination``.
+
+        ``source``/``destination`` may be a zone name, a module name, an IPv4
+        address, or ``internet``.
+        """
+        src = self.endpoint(source)
+        dst = self.endpoint(destination)
+        if src.zone is not None and src.zone == dst.zone:
+            return Verdict(action="pass", reason="same-zone")
+
+        interface = self._interface_of(src)
+        protocol = protocol.upper()
+        candidates = heapq.merge(
+            self._portless.get(interface, ()),
+            self._by_port.get((interface, port), ()) if port is not None else (),
+            self._ranged.get(interface, ()) if port is not None else (),
+            key=_sort_key,
+        )
+        evaluated = 0
+        for rule in candidates:
+            evaluated += 1
+            if rule.matches(src, dst, port, protocol):
+                return Verdict(
+                    action=rule.action,
+                    reason="rule",
+                    sequence=rule.sequence,
+                    description=rule.description,
+                    interface=interface,
+                    evaluated=evaluated,
+                )
+        return Verdict(action="block", reason="default-deny", interface=interface,
+                       evaluated=evaluated)
+
+    def run(self, query: Query) -> Verdict:
+        return self.evaluate(query.source, query.destination, query.port, query.protocol)
+
+    def endpoint(self, name: str) -> Endpoint:
+        """Resolve a query operand to an Endpoint (cached)."""
+        cached = self._endpoints.get(name)
+        if cached is None:
+            cached = self._endpoints[name] = self._resolve_endpoint(name)
+        return cached
+
+    # ── Endpoint resolution ──────────────────────────────────────────────
+
+    def _resolve_endpoint(self, name: str) -> Endpoint:
+        if name == "internet":
+            return Endpoint(label=name, ip=INTERNET_SAMPLE_IP)
+        if name in self.zones:
+            return Endpoint(label=name, ip=self._representative_ip(name), zone=name)
+        if name in self.modules:
+            module = self.modules[name]
+            names = {_module_alias_name(module.vmname)}
+            if module.zone0:
+                names.add(f"{module.vmname}.{module.zone0.replace('_', '-')}.internal")
+            if module.zone0 not in self.zones:
+                raise ValueError(f"module '{name}' has unknown zone0 '{module.zone0}'")
+            return Endpoint(
+                label=name,
+                ip=self._representative_ip(module.zone0),
+                zone=module.zone0,
+                names=frozenset(names),
+            )
+        try:
+            ip = ipaddress.IPv4Address(name)
+        except ValueError:
+            raise ValueError(
+                f"'{name}' is not a zone, module, IPv4 address or 'internet'"
+            ) from None
+        return Endpoint(label=name, ip=ip, zone=self._zone_of(ip))
+
+    def _representative_ip(self, zone_name: str) -> ipaddress.IPv4Address:
+        network = ipaddress.IPv4Network(self.zones[zone_name].ip_network, strict=False)
+        if network.num_addresses > 4:
+            return network.network_address + 2
+        return network.network_address
+
+    def _zone_of(self, ip: ipaddress.IPv4Address) -> str | None:
+        for network, name in self._zone_networks:
+            if ip in network:
+                return name
+        return None
+
+    def _interface_of(self, endpoint: Endpoint) -> str:
+        if endpoint.zone is None:
+            return INTERNET_INTERFACE
+        return self.interfaces.get(endpoint.zone, INTERNET_INTERFACE)
+
+    # ── Rule compilation ─────────────────────────────────────────────────
+
+    def _compile_rule(self, rule: FirewallRule, order: int) -> _CompiledRule | None:
+        if not rule.enabled or rule.sequence is None:
+            self.skipped.append(rule.description)
+            return None
+        if rule.source_invert or rule.destination_invert:
+            self.skipped.append(rule.description)
+            return None
+        raw = rule.interface.split(",") if isinstance(rule.interface, str) else rule.interface
+        interfaces = tuple(dict.fromkeys(i.strip() for i in raw if i and i.strip()))
+        action = rule.action.value if isinstance(rule.action, RuleAction) else str(rule.action)
+        protocol = getattr(rule.protocol, "value", rule.protocol)
+        if protocol == "any":
+            protocols = None
+        elif protocol == "TCP/UDP":
+            protocols = frozenset({"TCP", "UDP"})
+        else:
+            protocols = frozenset({str(protocol).upper()})
+        return _CompiledRule(
+            sequence=int(rule.sequence),
+            order=order,
+            action="pass" if action == "pass" else "block",
+            interfaces=interfaces,
+            protocols=protocols,
+            source=self._address_match(rule.source_net),
+            destination=self._address_match(rule.destination_net),
+            ports=self._port_ranges(rule.destination_port),
+            description=rule.description,
+        )
+
+    def _address_match(self, value: str, depth: int = 0) -> _AddressMatch:
+        if not value or value == "any":
+            return _AddressMatch(any=True)
+        try:
+            return _AddressMatch(networks=(ipaddress.IPv4Network(value, strict=False),))
+        except ValueError:
+            pass
+        alias = self.aliases.get(value)
+        if alias is None or depth >= _ALIAS_DEPTH_LIMIT:
+            # Unknown alias (or FQDN): match endpoints that answer to the name.
+            return _AddressMatch(names=frozenset({value}))
+        networks: list[ipaddress.IPv4Network] = []
+        names = {value}
+        for entry in alias.get("addresses", []):
+            nested = self._address_match(str(entry), depth + 1)
+            if nested.any:
+                return nested
+            networks.extend(nested.networks)
+            names |= nested.names
+        return _AddressMatch(networks=tuple(networks), names=frozenset(names))
+
+    def _port_ranges(
+        self, value: str | None, depth: int = 0
+    ) -> tuple[tuple[int, int], ...] | None:
+        if value is None or value == "" or value == "any":
+            return None
+        ranges: list[tuple[int, int]] = []
+        for part in str(value).split(","):
+            part = part.strip()
+            lo, sep, hi = part.replace(":", "-").partition("-")
+            if lo.isdigit() and (not sep or hi.isdigit()):
+                ranges.append((int(lo), int(hi) if sep else int(lo)))
+                continue
+            alias = self.aliases.get(part)
+            if alias is not None and depth < _ALIAS_DEPTH_LIMIT:
+                for entry in alias.get("addresses", []):
+                    ranges.extend(self._port_ranges(str(entry), depth + 1) or ())
+        # An unresolvable port spec matches nothing rather than everything.
+        return tuple(ranges)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Building the policy from disk
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class PolicyBuild:
+    """A simulator plus the modules that could not be compiled into it."""
+
+    simulator: PolicySimulator
+    errors: dict[str, list[str]] = field(default_factory=dict)
+
+
+def offline_interfaces(zones: dict[str, ZoneSpec]) -> dict[str, str]:
+    """Symbolic interface per zone: the zone name for VLAN zones, else the bridge."""
+    return {
+        name: name if zone.vlan_tag > 0 else (zone.bridge or "lan").lower()
+        for name, zone in zones.items()
+    }
+
+
+def build_policy(
+    zones_file: Path,
+    modules_dir: Path = DEFAULT_MODULES_DIR,
+    global_aliases: dict[str, dict] | None = None,
+    module_names: list[str] | None = None,
+) -> PolicyBuild:
+    """Compile zone and module rules from disk into a PolicySimulator.
+
+    Never connects to OPNsense: the VLAN→interface map the live controllers
+    read from the firewall is replaced by :func:`offline_interfaces`.
+    """
+    zones = load_zones(zones_file)
+    interfaces = offline_interfaces(zones)
+    global_aliases = global_aliases or {}
+
+    # Neither manager is connected, so neither needs a Config.
+    zone_mgr = ZoneManager(None, zones_file)
+    zone_mgr.load_zones()
+    rules: list[FirewallRule] = zone_mgr.desired_firewall_rules(
+        interface_for=lambda zone: interfaces.get(zone.name)
+    )
+    rules_mgr = RulesManager(
+        config=None,
+        zones=zones,
+        modules_dir=modules_dir,
+        global_aliases=global_aliases,
+        sequence_map_file=None,
+        compile_cache_file=None,
+        interface_map={z.vlan_tag: interfaces[n] for n, z in zones.items() if z.vlan_tag > 0},
+    )
+
+    aliases: dict[str, dict] = dict(global_aliases)
+    modules: dict[str, ModuleSpec] = {}
+    errors: dict[str, list[str]] = {}
+    for name in module_names if module_names is not None else discover_modules(modules_dir):
+        try:
+            module = load_module(modules_dir, name)
+        except (FileNotFoundError, ValueError) as exc:
+            errors[name] = [str(exc)]
+            continue
+        modules[module.vmname] = module
+        compiled, compile_errors = rules_mgr._compile(module)
+        if compile_errors:
+            errors[name] = [str(e) for e in compile_errors]
+            continue
+        rules.extend(rules_mgr._to_firewall_rule(r) for r in compiled)
+        aliases.update(module.aliases)
+        for alias_name, target in rules_mgr._module_aliases_to_provision(module).items():
+            aliases[alias_name] = {"type": target.alias_type, "addresses": target.content}
+
+    simulator = PolicySimulator(rules, zones, interfaces, modules=modules, aliases=aliases)
+    return PolicyBuild(simulator=simulator, errors=errors)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _load_queries(path: Path) -> list[Query]:
+    """Read queries from a JSON array or a JSON-lines file."""
+    text = path.read_text()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [Query.from_dict(entry) for entry in entries]
+
+
+def _verdict_payload(query: Query, verdict: Verdict) -> dict:
+    payload = {"from": query.source, "to": query.destination, "port": query.port,
+               "protocol": query.protocol, **asdict(verdict)}
+    if query.expect is not None:
+        payload["expect"] = query.expect
+        payload["ok"] = verdict.action == query.expect
+    return payload
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="policy-sim",
+        description="Offline what-if queries against the compiled TAPPaaS firewall policy",
+    )
+    parser.add_argument("--zones-file", help="Path to zones.json")
+    parser.add_argument("--aliases-file", help="Path to firewall/aliases.json")
+    parser.add_argument("--modules-dir", default=str(DEFAULT_MODULES_DIR),
+                        help="Directory containing <module>.json files")
+    parser.add_argument("--output", choices=["text", "json"], default="text",
+                        help="Output format (default: text)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p_q = subparsers.add_parser("query", help="Evaluate a single packet")
+    p_q.add_argument("source", help="Zone, module, IPv4 address or 'internet'")
+    p_q.add_argument("destination", help="Zone, module, IPv4 address or 'internet'")
+    p_q.add_argument("--port", type=int, help="Destination port")
+    p_q.add_argument("--protocol", default="TCP", help="L4 protocol (default: TCP)")
+
+    p_c = subparsers.add_parser(
+        "check", help="Evaluate a file of queries; exit 1 if any 'expect' is not met"
+    )
+    p_c.add_argument("queries", help="JSON array or JSON-lines file of "
+                                     "{from, to, port, protocol, expect}")
+
+    args = parser.parse_args()
+    if args.output == "json":
+        os.environ["TAPPAAS_SILENT"] = "1"
+
+    try:
+        build = build_policy(
+            _find_zones_file(args.zones_file),
+            Path(args.modules_dir),
+            load_global_aliases(_find_aliases_file(args.aliases_file)),
+        )
+    except (OSError, ValueError) as exc:
+        error(f"Cannot build policy: {exc}")
+        return 2
+    for name, messages in build.errors.items():
+        for message in messages:
+            error(f"{name}: not simulated: {message}")
+    sim = build.simulator
+
+    if args.command == "query":
+        queries = [Query(args.source, args.destination, args.port, args.protocol)]
+    else:
+        try:
+            queries = _load_queries(Path(args.queries))
+        except (OSError, ValueError, KeyError) as exc:
+            error(f"Cannot read queries: {exc}")
+            return 2
+
+    results = []
+    failed = 0
+    for query in queries:
+        try:
+            verdict = sim.run(query)
+        except ValueError as exc:
+            error(str(exc))
+            return 2
+        payload = _verdict_payload(query, verdict)
+        if payload.get("ok") is False:
+            failed += 1
+        results.append(payload)
+        if args.output == "text":
+            port = f":{query.port}" if query.port is not None else ""
+            mark = "" if query.expect is None else (" ok" if payload["ok"] else " MISMATCH")
+            print(f"{query.source} -> {query.destination}{port}/{query.protocol}: "
+                  f"{verdict.explain()}{mark}")
+
+    if args.output == "json":
+        json.dump({"rules": sim.rule_count, "results": results, "failed": failed},
+                  sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif args.command == "check":
+        info(f"{len(queries) - failed}/{len(queries)} queries met expectations")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
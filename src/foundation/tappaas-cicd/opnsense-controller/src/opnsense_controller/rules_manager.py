@@ -30,17 +30,23 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import ipaddress
 import json
 import os
 import sys
-from dataclasses import dataclass, field
+import threading
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Iterable, Literal
 
 from oxl_opnsense_client import Client
 
 from .config import Config
+from .config_store import load_json
 from .firewall_manager import (
+    AliasInfo,
     FirewallManager,
     FirewallRule,
     FirewallRuleInfo,
@@ -50,6 +56,13 @@ from .firewall_manager import (
     RuleDirection,
 )
 from .log import debug, error, info, warn
+from .probe import (
+    DEFAULT_PROBE_CONCURRENCY,
+    DEFAULT_PROBE_TIMEOUT,
+    ProbeResult,
+    ProbeTarget,
+    probe_all,
+)
 from .vlan_manager import VlanManager
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -74,6 +87,7 @@ BAND_INGRESS_BASE = 10000
 BAND_EGRESS_BASE = 20000
 SLOT_SIZE = 100        # rules per module per direction
 SLOT_COUNT = 100       # number of distinct slots within a band
+DEFAULT_COMPILE_WORKERS = 8  # reconcile --all: modules compiled concurrently
 
 DEFAULT_MODULES_DIR = Path("/home/tappaas/config")
 DEFAULT_ZONES_FILE = Path("/home/tappaas/TAPPaaS/src/foundation/firewall/zones.json")
@@ -81,6 +95,9 @@ DEFAULT_GLOBAL_ALIASES_FILE = Path(
     "/home/tappaas/TAPPaaS/src/foundation/firewall/aliases.json"
 )
 DEFAULT_SEQUENCE_MAP_FILE = Path("/home/tappaas/config/firewall/sequence-map.json")
+DEFAULT_COMPILE_CACHE_FILE = Path("/home/tappaas/config/firewall/compiled-rules.json")
+# Bump when _compile's output for the same inputs changes, to drop stale entries.
+COMPILE_CACHE_VERSION = 1
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -121,6 +138,8 @@ class ModuleSpec:
     # <provider.location>/services/<service>/pinhole.json for each dependency.
     depends_on: list[str] = field(default_factory=list)
     location: str = ""
+    # Stem of the <name>.json load_module read; vmname may differ from it.
+    config_name: str = ""
 
 
 @dataclass
@@ -171,12 +190,31 @@ class ApplyResult:
     """Outcome of add_rules / reconcile."""
 
     module: str
-    applied: int = 0
+    applied: int = 0          # desired rules ensured (created + updated + unchanged)
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
     deleted: int = 0
     aliases_created: int = 0
     errors: list[ValidationError] = field(default_factory=list)
 
 
+@dataclass
+class RulePlan:
+    """Write set that brings one module's live rules to the compiled state.
+
+    ``delete`` holds superseded copies of desired rules (a stale freetext suffix
+    or a duplicate); ``orphans`` holds live rules no longer desired at all, which
+    only reconcile prunes.
+    """
+
+    create: list[FirewallRule] = field(default_factory=list)
+    update: list[FirewallRule] = field(default_factory=list)
+    delete: list[FirewallRuleInfo] = field(default_factory=list)
+    orphans: list[FirewallRuleInfo] = field(default_factory=list)
+    unchanged: int = 0
+
+
 @dataclass
 class RemoveResult:
     """Outcome of remove_rules."""
@@ -195,10 +233,60 @@ class VerifyResult:
     present: int = 0
     missing: list[str] = field(default_factory=list)
     extra: list[str] = field(default_factory=list)
+    probes: list[ProbeResult] = field(default_factory=list)   # --deep only
+    unprobed: list[str] = field(default_factory=list)         # --deep: no probeable target
+    # Probes run from the controller (mgmt), not from the rule's source zone,
+    # so by default they are informational; --probe-gate makes them count.
+    probe_gate: bool = False
+
+    @property
+    def probes_ok(self) -> bool:
+        return not any(p.status in ("fail", "error") for p in self.probes)
 
     @property
     def ok(self) -> bool:
-        return not self.missing and not self.extra
+        return (
+            not self.missing
+            and not self.extra
+            and (self.probes_ok or not self.probe_gate)
+        )
+
+
+@dataclass
+class OwnershipScan:
+    """Module ownership of the live ruleset, built in one pass over a snapshot.
+
+    ``rules`` maps a module vmname to every rule it owns (manual + auto-pinhole);
+    ``alias_refs`` maps an alias name to the modules whose rules reference it as
+    source or destination. Replaces per-prefix ``list_rules`` scans, each of which
+    was a full ruleset download.
+    """
+
+    rules: dict[str, list[FirewallRuleInfo]] = field(default_factory=dict)
+    alias_refs: dict[str, set[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[FirewallRuleInfo]) -> "OwnershipScan":
+        scan = cls()
+        for r in rules:
+            module = _extract_module(r.description)
+            scan.rules.setdefault(module, []).append(r)
+            for net in (r.source_net, r.destination_net):
+                for token in (net or "").split(","):
+                    token = token.strip()
+                    if token:
+                        scan.alias_refs.setdefault(token, set()).add(module)
+        return scan
+
+    def owned(self, module_name: str) -> list[FirewallRuleInfo]:
+        return list(self.rules.get(module_name, []))
+
+    def all_rules(self) -> list[FirewallRuleInfo]:
+        return [r for rules in self.rules.values() for r in rules]
+
+    def alias_is_orphan(self, alias_name: str, exclude_module: str) -> bool:
+        """True if no module other than ``exclude_module`` references the alias."""
+        return not (self.alias_refs.get(alias_name, set()) - {exclude_module})
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -314,8 +402,7 @@ def _module_alias_name(peer_vmname: str) -> str:
 
 def load_zones(path: Path) -> dict[str, ZoneSpec]:
     """Load zones.json into a name→ZoneSpec map."""
-    with open(path) as f:
-        data = json.load(f)
+    data = load_json(path)
     result: dict[str, ZoneSpec] = {}
     for name, entry in data.items():
         # Keys beginning with '_' (e.g. _README) are documentation, not zones.
@@ -337,8 +424,7 @@ def load_module(modules_dir: Path, name: str) -> ModuleSpec:
     path = modules_dir / f"{name}.json"
     if not path.is_file():
         raise FileNotFoundError(f"module config not found: {path}")
-    with open(path) as f:
-        data = json.load(f)
+    data = load_json(path)
     # Pattern A (#207) nests firewall:rules fields under config."firewall:rules".
     # Fall back to nested form when the top-level key is absent or empty.
     fr = data.get("config", {}).get("firewall:rules", {})
@@ -354,6 +440,7 @@ def load_module(modules_dir: Path, name: str) -> ModuleSpec:
         alias_type=data.get("aliasType", "host") or "host",
         depends_on=data.get("dependsOn", []) or [],
         location=data.get("location", "") or "",
+        config_name=name,
     )
 
 
@@ -361,8 +448,7 @@ def load_global_aliases(path: Path | None) -> dict[str, dict]:
     """Load firewall/aliases.json; returns {} if file missing."""
     if path is None or not path.is_file():
         return {}
-    with open(path) as f:
-        data = json.load(f)
+    data = load_json(path)
     return {k: v for k, v in data.items() if isinstance(v, dict) and "type" in v}
 
 
@@ -374,6 +460,120 @@ def discover_modules(modules_dir: Path) -> list[str]:
     )
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Sequence index
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def slot_range(direction: str, slot: int) -> tuple[int, int]:
+    """Inclusive sequence range of ``slot`` in the ingress or egress band."""
+    base = BAND_INGRESS_BASE if direction == "ingress" else BAND_EGRESS_BASE
+    start = base + slot * SLOT_SIZE
+    return start, start + SLOT_SIZE - 1
+
+
+def sequence_slot(sequence: int) -> tuple[str, int] | None:
+    """Return ``(direction, slot)`` for a module-band sequence, else None."""
+    for direction, base in (("ingress", BAND_INGRESS_BASE), ("egress", BAND_EGRESS_BASE)):
+        if base <= sequence < base + SLOT_COUNT * SLOT_SIZE:
+            return direction, (sequence - base) // SLOT_SIZE
+    return None
+
+
+class SequenceIndex:
+    """Which module owns which slot and sequence in the module bands.
+
+    Slots are claimed either directly (hash slot of a module on disk, or the
+    ``slot`` recorded in sequence-map.json) or through a live rule's sequence
+    number. A slot claimed by more than one module is a collision: both
+    modules' rules interleave in one 100-sequence range, so rule order between
+    them is no longer determined by the module. Allocated sequences are kept
+    sorted, so range queries are O(log n + k).
+    """
+
+    def __init__(self):
+        self._slot_owners: dict[int, set[str]] = {}
+        self._sequences: list[int] = []
+        self._sequence_owners: dict[int, set[str]] = {}
+
+    def claim(self, module: str, slot: int) -> None:
+        self._slot_owners.setdefault(slot, set()).add(module)
+
+    def add(self, module: str, sequence: int) -> None:
+        """Record a live/recorded rule sequence owned by ``module``."""
+        located = sequence_slot(sequence)
+        if located is None:
+            return
+        self.claim(module, located[1])
+        if sequence not in self._sequence_owners:
+            insort(self._sequences, sequence)
+        self._sequence_owners.setdefault(sequence, set()).add(module)
+
+    def owners(self, slot: int) -> set[str]:
+        return set(self._slot_owners.get(slot, set()))
+
+    def sequences_in(self, start: int, end: int) -> list[int]:
+        """Allocated sequences within ``[start, end]``."""
+        return self._sequences[bisect_left(self._sequences, start):bisect_right(self._sequences, end)]
+
+    def collisions(self) -> dict[int, list[str]]:
+        """Slots claimed by more than one module."""
+        return {
+            slot: sorted(owners)
+            for slot, owners in sorted(self._slot_owners.items())
+            if len(owners) > 1
+        }
+
+    def suggest_slot(self, module: str, reserved: Iterable[int] = ()) -> int | None:
+        """First slot at or after ``module``'s hash slot (wrapping) it would own alone.
+
+        ``reserved`` slots are treated as taken (e.g. already suggested to
+        another module in the same report).
+        """
+        reserved = set(reserved)
+        start = stable_hash_index(module)
+        for step in range(SLOT_COUNT):
+            slot = (start + step) % SLOT_COUNT
+            if slot not in reserved and not (self._slot_owners.get(slot, set()) - {module}):
+                return slot
+        return None
+
+    def report(self) -> dict:
+        """Slot occupancy and collisions, JSON-serialisable."""
+        slots = []
+        for slot, owners in sorted(self._slot_owners.items()):
+            slots.append({
+                "slot": slot,
+                "modules": sorted(owners),
+                "ingress_used": len(self.sequences_in(*slot_range("ingress", slot))),
+                "egress_used": len(self.sequences_in(*slot_range("egress", slot))),
+            })
+        collisions = []
+        reserved: set[int] = set()
+        for slot, owners in self.collisions().items():
+            # Keep the first module in place; suggest free slots for the rest.
+            suggested: dict[str, int | None] = {}
+            for module in owners[1:]:
+                suggested[module] = self.suggest_slot(module, reserved)
+                if suggested[module] is not None:
+                    reserved.add(suggested[module])
+            collisions.append({
+                "slot": slot,
+                "modules": owners,
+                "ingress_range": list(slot_range("ingress", slot)),
+                "egress_range": list(slot_range("egress", slot)),
+                "suggested_slots": suggested,
+            })
+        return {
+            "slot_count": SLOT_COUNT,
+            "slot_size": SLOT_SIZE,
+            "used_slots": len(self._slot_owners),
+            "free_slots": SLOT_COUNT - len(self._slot_owners),
+            "collisions": collisions,
+            "slots": slots,
+        }
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # RulesManager
 # ─────────────────────────────────────────────────────────────────────────────
@@ -391,20 +591,39 @@ class RulesManager:
         sequence_map_file: Path | None = DEFAULT_SEQUENCE_MAP_FILE,
         check_mode: bool = False,
         firewall_type: str = "opnsense",
+        compile_cache_file: Path | None = DEFAULT_COMPILE_CACHE_FILE,
+        interface_map: dict[int, str] | None = None,
     ):
         self.config = config
         self.zones = zones
         self.modules_dir = modules_dir
         self.global_aliases = global_aliases or {}
         self.sequence_map_file = sequence_map_file
+        self.compile_cache_file = compile_cache_file
         self.check_mode = check_mode
         self.firewall_type = firewall_type.upper() if firewall_type else "OPNSENSE"
         self._fw: FirewallManager | None = None
         self._client: Client | None = None
         # Cache: peer-module spec lookup for alias targets (avoids re-reading JSON)
         self._peer_module_cache: dict[str, ModuleSpec | None] = {}
-        # Cache: VLAN-tag → OPNsense interface identifier (lazy-loaded at first use)
-        self._vlan_iface_cache: dict[int, str] | None = None
+        # Cache: VLAN-tag → OPNsense interface identifier (lazy-loaded at first
+        # use unless the caller supplies it, e.g. the offline policy simulator)
+        self._vlan_iface_cache: dict[int, str] | None = (
+            dict(interface_map) if interface_map is not None else None
+        )
+        # Cache: ownership scan, valid for as long as fw.rule_index() returns the
+        # same snapshot (FirewallManager drops it on every mutation)
+        self._ownership: OwnershipScan | None = None
+        self._ownership_source: object | None = None
+        # Cache: compiled rules keyed by input hash (lazy-loaded from
+        # compile_cache_file; reconcile --all fills it from worker threads)
+        self._compile_cache: dict[str, dict] | None = None
+        self._compile_cache_dirty = False
+        self._compile_cache_lock = threading.Lock()
+        # Cache: live alias table (name → AliasInfo), read once per connection;
+        # _aliases_dirty marks pending alias writes that still need a reload
+        self._alias_table: dict[str, AliasInfo] | None = None
+        self._aliases_dirty = False
 
     @property
     def is_none_mode(self) -> bool:
@@ -425,6 +644,10 @@ class RulesManager:
             self._fw.disconnect()
         self._fw = None
         self._client = None
+        self._ownership = None
+        self._ownership_source = None
+        self._alias_table = None
+        self._aliases_dirty = False
 
     def __enter__(self) -> "RulesManager":
         return self.connect()
@@ -458,7 +681,10 @@ class RulesManager:
             return result
 
         # Pick up both manual rules (tappaas-module:...) and auto-pinholes
-        # (tappaas-svcdep:...) owned by this module.
+        # (tappaas-svcdep:...) owned by this module. The scan is taken before
+        # deleting; the alias refcounts below exclude this module anyway, so the
+        # same snapshot answers every orphan check without another download.
+        scan = self._ownership_scan()
         existing = self._list_owned_rules(module.vmname)
         if self.check_mode:
             info(f"[check] would delete {len(existing)} rule(s) for {module.vmname}")
@@ -486,16 +712,17 @@ class RulesManager:
         # Remove the FQDN alias for this module if no other module's rules still
         # reference it (refcount via description-prefix scan).
         own_alias = _module_alias_name(module.vmname)
-        if self._alias_is_orphan(own_alias, exclude_module=module.vmname):
+        if self._alias_is_orphan(own_alias, exclude_module=module.vmname, scan=scan):
             if self._delete_alias(own_alias):
                 result.aliases_removed += 1
 
         # Also drop any peer-module aliases this module's rules created if no
         # remaining module references them.
         for peer_alias in self._peer_module_aliases_for(module):
-            if self._alias_is_orphan(peer_alias, exclude_module=module.vmname):
+            if self._alias_is_orphan(peer_alias, exclude_module=module.vmname, scan=scan):
                 if self._delete_alias(peer_alias):
                     result.aliases_removed += 1
+        self._reload_aliases()
 
         return result
 
@@ -509,44 +736,113 @@ class RulesManager:
         """
         if module_name:
             return self._list_owned_rules(module_name)
-        rules: list[FirewallRuleInfo] = []
-        seen: set[str] = set()
-        for prefix in MODULE_RULE_PREFIXES:
-            for r in self.fw.list_rules(search_pattern=f"{prefix}:"):
-                key = getattr(r, "uuid", None) or r.description
-                if key in seen:
-                    continue
-                seen.add(key)
-                rules.append(r)
+        scan = self._ownership_scan()
         if not orphans:
-            return rules
+            return scan.all_rules()
         known = set(discover_modules(self.modules_dir))
-        return [r for r in rules if _extract_module(r.description) not in known]
+        return [
+            r for module, rules in scan.rules.items() if module not in known
+            for r in rules
+        ]
 
     def _list_owned_rules(self, module_name: str) -> list[FirewallRuleInfo]:
         """Return every rule (manual + auto-pinhole) owned by ``module_name``."""
-        rules: list[FirewallRuleInfo] = []
-        seen: set[str] = set()
-        for prefix in MODULE_RULE_PREFIXES:
-            for r in self.fw.list_rules(
-                search_pattern=f"{prefix}:{module_name}:"
-            ):
-                key = getattr(r, "uuid", None) or r.description
-                if key in seen:
-                    continue
-                seen.add(key)
-                rules.append(r)
-        return rules
+        return self._ownership_scan().owned(module_name)
+
+    def _ownership_scan(self) -> OwnershipScan:
+        """Module → rules and alias → modules maps over the current rule snapshot.
+
+        One ruleset download serves every prefix, module and alias lookup; the
+        scan is rebuilt only when FirewallManager hands out a new snapshot.
+        """
+        index = self.fw.rule_index()
+        if self._ownership is None or self._ownership_source is not index:
+            self._ownership = OwnershipScan.from_rules(
+                r for prefix in MODULE_RULE_PREFIXES
+                for r in index.with_prefix(f"{prefix}:")
+            )
+            self._ownership_source = index
+        return self._ownership
+
+    def sequence_index(self, include_live: bool = True) -> SequenceIndex:
+        """Slot/sequence allocation across the fleet.
+
+        Merges the hash slot of every module on disk, the sequence-map.json
+        artifact, and (unless ``include_live`` is False or firewallType is NONE)
+        the sequences of every module-owned rule in the live ruleset.
+        """
+        index = self._disk_slot_index()
+        if self.sequence_map_file and self.sequence_map_file.exists():
+            try:
+                with open(self.sequence_map_file) as f:
+                    recorded = json.load(f).get("modules", {})
+                for vmname, entry in recorded.items():
+                    if "slot" in entry:
+                        index.claim(vmname, int(entry["slot"]))
+                    for seq in (*entry.get("ingress_used", []), *entry.get("egress_used", [])):
+                        index.add(vmname, int(seq))
+            except Exception as exc:
+                warn(f"Could not read sequence-map artifact: {exc}")
+        if include_live and not self.is_none_mode:
+            for vmname, rules in self._ownership_scan().rules.items():
+                for r in rules:
+                    if r.sequence is not None:
+                        index.add(vmname, r.sequence)
+        return index
+
+    def _disk_slot_index(self) -> SequenceIndex:
+        """Hash slots of the modules on disk, claimed by vmname.
+
+        The cheap check for a single-module apply: manifests come from the
+        parse-once config store and the live ruleset is not scanned, so it
+        finds hash collisions but not slots taken over by live or recorded
+        sequences (``sequence-report`` and ``--all`` use the full
+        :meth:`sequence_index`, which starts from this one).
+        """
+        index = SequenceIndex()
+        for name in discover_modules(self.modules_dir):
+            try:
+                spec = self._load_peer_cached(name)
+            except ValueError:
+                spec = None  # unparseable manifest: claim by file name
+            vmname = spec.vmname if spec else name
+            index.claim(vmname, stable_hash_index(vmname))
+        return index
+
+    def _warn_slot_collision(self, index: SequenceIndex, vmname: str) -> None:
+        slot = stable_hash_index(vmname)
+        others = index.owners(slot) - {vmname}
+        if others:
+            start, end = slot_range("ingress", slot)
+            warn(
+                f"{vmname}: sequence slot {slot} ({start}-{end}) is shared with "
+                f"{', '.join(sorted(others))}; rule order between them is not "
+                f"guaranteed. First free slot: {index.suggest_slot(vmname)} "
+                f"(see rules-manager sequence-report)"
+            )
 
-    def verify_rules(self, module_name: str, deep: bool = False) -> VerifyResult:
-        """Verify that desired rules exist in OPNsense."""
+    def verify_rules(
+        self,
+        module_name: str,
+        deep: bool = False,
+        probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+        probe_concurrency: int = DEFAULT_PROBE_CONCURRENCY,
+        probe_gate: bool = False,
+    ) -> VerifyResult:
+        """Verify that desired rules exist in OPNsense.
+
+        With ``deep``, also probe each compiled rule's destination port (TCP
+        connect, or a UDP datagram) concurrently; see ``_probe_targets``.
+        Probe failures only affect ``VerifyResult.ok`` with ``probe_gate``.
+        """
         module = load_module(self.modules_dir, module_name)
-        result = VerifyResult(module=module.vmname)
+        result = VerifyResult(module=module.vmname, probe_gate=probe_gate)
         if self.is_none_mode:
             info(f"firewallType=NONE for {module.vmname}: skipping verify")
             return result
 
-        desired, errors = self._compile(module)
+        desired, errors = self._compile_cached(module, use_cache=True)
+        self._flush_compile_cache()
         if errors:
             for e in errors:
                 error(str(e))
@@ -564,18 +860,72 @@ class RulesManager:
         result.extra = sorted(existing_descs - desired_descs)
 
         if deep:
-            debug("--deep connectivity probing is not yet implemented")
+            targets, result.unprobed = self._probe_targets(module, desired)
+            info(f"{module.vmname}: probing {len(targets)} rule target(s) "
+                 f"({len(result.unprobed)} not probeable)")
+            result.probes = probe_all(
+                targets, concurrency=probe_concurrency, timeout=probe_timeout
+            )
         return result
 
+    def _probe_targets(
+        self, module: ModuleSpec, rules: list[ModuleFirewallRule]
+    ) -> tuple[list[ProbeTarget], list[str]]:
+        """Turn compiled rules into probe targets.
+
+        The vantage point is the host running rules-manager (tappaas-cicd, in
+        mgmt): a pass shows the destination service is up and reachable from
+        there. Rules whose destination is not a single host — ``any``, a CIDR, a
+        network alias, a port alias — or whose protocol has no port (ICMP) are
+        returned as unprobed descriptions instead. TCP/UDP rules are probed
+        over TCP; port ranges probe their first port.
+        """
+        alias_targets = self._module_aliases_to_provision(module)
+        targets: list[ProbeTarget] = []
+        unprobed: list[str] = []
+        for r in rules:
+            host = self._probe_host(module, r.destination_net, alias_targets)
+            port_str = _port_to_str(r.port).split("-", 1)[0]
+            protocol = "UDP" if r.protocol == "UDP" else "TCP"
+            if host is None or not port_str.isdigit() or r.protocol not in ("TCP", "UDP", "TCP/UDP"):
+                unprobed.append(r.description)
+                continue
+            targets.append(ProbeTarget(r.description, host, int(port_str), protocol))
+        return targets, unprobed
+
+    def _probe_host(
+        self, module: ModuleSpec, net: str, alias_targets: dict[str, AliasTarget]
+    ) -> str | None:
+        """Single probeable host behind a destination_net value, or None."""
+        if not net or net == "any" or "/" in net:
+            return None
+        if net in alias_targets:
+            target = alias_targets[net]
+            return target.content[0] if target.alias_type == "host" and target.content else None
+        alias_def = module.aliases.get(net) or self.global_aliases.get(net)
+        if alias_def is not None:
+            if alias_def.get("type", "host") != "host":
+                return None
+            hosts = [a for a in alias_def.get("addresses", []) if "/" not in str(a)]
+            return str(hosts[0]) if hosts else None
+        try:
+            return str(ipaddress.ip_address(net))
+        except ValueError:
+            return None
+
     def create_alias(
         self, name: str, alias_type: str, addresses: list[str], description: str = ""
-    ) -> None:
-        """Create or update an OPNsense alias."""
-        self._upsert_alias(name, alias_type, addresses, description)
+    ) -> bool:
+        """Create or update an OPNsense alias; returns False if it was already current."""
+        changed = self._upsert_alias(name, alias_type, addresses, description)
+        self._reload_aliases()
+        return changed
 
     def remove_alias(self, name: str) -> bool:
         """Delete an OPNsense alias by name."""
-        return self._delete_alias(name)
+        ok = self._delete_alias(name)
+        self._reload_aliases()
+        return ok
 
     # ── Apply pipeline ───────────────────────────────────────────────────
 
@@ -587,80 +937,429 @@ class RulesManager:
             self._emit_manual_instructions(module)
             return result
 
-        rules, errors = self._compile(module)
+        # Read-only check runs may reuse a cached compile; a real apply always
+        # compiles fresh (the VLAN→interface map is live state) and refreshes it.
+        rules, errors = self._compile_cached(module, use_cache=self.check_mode)
+        self._flush_compile_cache()
         if errors:
             for e in errors:
                 error(str(e))
             result.errors = errors
             return result
 
+        # One snapshot read; the plan below decides which rules need writing.
+        plan = self._plan_rules(rules, self._list_owned_rules(module.vmname))
+        stale = plan.delete + (plan.orphans if prune else [])
+        self._warn_slot_collision(self._disk_slot_index(), module.vmname)
+
         if self.check_mode:
-            for r in rules:
-                info(f"[check] +rule seq={r.sequence} desc='{r.description}'")
-            if prune:
-                live = self._list_owned_rules(module.vmname)
-                desired_descs = {r.description for r in rules}
-                for live_rule in live:
-                    if _canonical_part(live_rule.description) not in desired_descs:
-                        info(f"[check] -rule desc='{live_rule.description}'")
+            self._report_plan(plan, stale)
             return result
 
-        # 1. Ensure aliases exist in OPNsense before any rule references them:
-        #    a) module-local aliases declared in module.aliases
-        #    b) peer-module FQDN aliases (tm_<peer>)
-        #    c) global aliases from firewall/aliases.json that are referenced
-        #       via "alias:<name>" in this module's ingress/egress
+        # 1. Ensure aliases exist in OPNsense before any rule references them;
+        #    only changed aliases are written, followed by a single reload.
+        self._provision_aliases(module, result)
+        self._reload_aliases()
+
+        # 2. Apply only the changed rules atomically with a savepoint. An
+        #    unchanged module makes no rule writes and skips apply_changes.
+        result.applied = len(rules)
+        result.unchanged = plan.unchanged
+        if plan.create or plan.update or stale:
+            revision = self.fw.create_savepoint()
+            try:
+                self._write_plan(plan, stale, result)
+                self.fw.apply_changes()
+            except Exception:
+                self._revert(revision)
+                raise
+        else:
+            debug(f"{module.vmname}: {len(rules)} rule(s) unchanged, nothing to write")
+
+        self._write_sequence_map(module, rules)
+        return result
+
+    def reconcile_all(
+        self,
+        module_names: list[str] | None = None,
+        prune: bool = True,
+        workers: int = DEFAULT_COMPILE_WORKERS,
+    ) -> list[ApplyResult]:
+        """Reconcile every module against one snapshot, in one transaction.
+
+        Zones, global aliases and every module spec are loaded once; modules are
+        compiled in parallel, diffed against a single ruleset download, and all
+        writes land inside one savepoint followed by one ``apply_changes()``.
+        A module that fails to load or validate is reported in its own
+        ``ApplyResult`` and skipped; any write failure reverts the whole batch.
+        """
+        names = module_names if module_names is not None else discover_modules(self.modules_dir)
+        results: dict[str, ApplyResult] = {}
+        modules: dict[str, ModuleSpec] = {}
+        for name in names:
+            try:
+                module = load_module(self.modules_dir, name)
+            except (FileNotFoundError, ValueError) as exc:
+                error(f"{name}: cannot load module: {exc}")
+                results[name] = ApplyResult(
+                    module=name, errors=[ValidationError(name, "", str(exc))]
+                )
+                continue
+            # Seed the peer cache so compile never re-reads a manifest.
+            self._peer_module_cache[name] = module
+            modules[name] = module
+            results[name] = ApplyResult(module=module.vmname)
+
+        if self.is_none_mode:
+            for module in modules.values():
+                self._emit_manual_instructions(module)
+            return [results[n] for n in names]
+
+        # Warm the VLAN→interface map once, before worker threads share it.
+        self._vlan_interface_for_tag(0)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            compiled = dict(zip(modules, pool.map(
+                lambda m: self._compile_cached(m, use_cache=self.check_mode),
+                modules.values(),
+            )))
+        self._flush_compile_cache()
+
+        scan = self._ownership_scan()
+        index = self.sequence_index()
+        for module in modules.values():
+            self._warn_slot_collision(index, module.vmname)
+        plans: dict[str, tuple[ModuleSpec, list[ModuleFirewallRule], RulePlan, list[FirewallRuleInfo]]] = {}
+        for name, module in modules.items():
+            rules, errors = compiled[name]
+            if errors:
+                for e in errors:
+                    error(str(e))
+                results[name].errors = errors
+                continue
+            plan = self._plan_rules(rules, scan.owned(module.vmname))
+            plans[name] = (module, rules, plan, plan.delete + (plan.orphans if prune else []))
+
+        if self.check_mode:
+            for name, (module, _, plan, stale) in plans.items():
+                info(f"[check] {module.vmname}:")
+                self._report_plan(plan, stale)
+            return [results[n] for n in names]
+
+        provisioned: set[str] = set()
+        for name, (module, _, _, _) in plans.items():
+            self._provision_aliases(module, results[name], provisioned)
+        self._reload_aliases()
+
+        pending = [
+            (name, plan, stale) for name, (_, _, plan, stale) in plans.items()
+            if plan.create or plan.update or stale
+        ]
+        for name, (_, rules, plan, _) in plans.items():
+            results[name].applied = len(rules)
+            results[name].unchanged = plan.unchanged
+        if pending:
+            revision = self.fw.create_savepoint()
+            try:
+                for name, plan, stale in pending:
+                    self._write_plan(plan, stale, results[name])
+                self.fw.apply_changes()
+            except Exception:
+                self._revert(revision)
+                raise
+        else:
+            debug(f"{len(plans)} module(s) unchanged, nothing to write")
+
+        for module, rules, _, _ in plans.values():
+            self._write_sequence_map(module, rules)
+        return [results[n] for n in names]
+
+    def reconcile_changed(
+        self,
+        changed_files: list[str | Path],
+        prune: bool = True,
+        workers: int = DEFAULT_COMPILE_WORKERS,
+    ) -> list[ApplyResult]:
+        """Reconcile only the modules whose compiled rules a file change can affect."""
+        names = self.affected_modules(changed_files)
+        if not names:
+            info("No module is affected by the changed files")
+            return []
+        info(f"Reconciling {len(names)} affected module(s): {', '.join(names)}")
+        return self.reconcile_all(module_names=names, prune=prune, workers=workers)
+
+    def affected_modules(self, changed_files: list[str | Path]) -> list[str]:
+        """Map changed files to the modules that must be recompiled.
+
+        Builds a reverse-dependency graph over every module in ``modules_dir``
+        (who names whom as an ingress/egress peer or dependsOn provider) and
+        returns, sorted:
+
+          - ``<modules_dir>/<name>.json``: the module itself plus every module
+            that references it;
+          - ``<provider.location>/services/<svc>/pinhole.json``: every module
+            that dependsOn ``<provider>:<svc>``;
+          - ``zones.json`` / ``aliases.json``: every module.
+
+        One level of reverse edges is enough: a module's compile reads its
+        peers' manifests, never their compiled output.
+        """
+        names = discover_modules(self.modules_dir)
+        specs: dict[str, ModuleSpec] = {}
+        for name in names:
+            try:
+                spec = self._load_peer_cached(name)
+            except ValueError as exc:
+                warn(f"{name}: cannot parse module config: {exc}")
+                continue
+            if spec is not None:
+                specs[name] = spec
+
+        referenced_by: dict[str, set[str]] = {}
+        pinhole_consumers: dict[Path, set[str]] = {}
+        for name, spec in specs.items():
+            peers, dependencies = self._referenced_modules(spec)
+            for peer in peers:
+                referenced_by.setdefault(peer, set()).add(name)
+            for provider_name, service in dependencies:
+                provider = specs.get(provider_name)
+                if provider is not None and provider.location:
+                    path = Path(provider.location) / "services" / service / "pinhole.json"
+                    pinhole_consumers.setdefault(path.resolve(), set()).add(name)
+
+        modules_dir = self.modules_dir.resolve()
+        affected: set[str] = set()
+        for changed in changed_files:
+            path = Path(changed).resolve()
+            if path.name in ("zones.json", "aliases.json"):
+                return sorted(specs)
+            if path in pinhole_consumers:
+                affected |= pinhole_consumers[path]
+            elif path.parent == modules_dir and path.suffix == ".json":
+                if path.stem in specs:
+                    affected.add(path.stem)
+                else:
+                    warn(f"{path.stem}: module config not found; use list-rules --orphans "
+                         f"to find its remaining rules")
+                affected |= referenced_by.get(path.stem, set())
+            else:
+                debug(f"{changed}: not a rules-manager input, ignored")
+        return sorted(affected)
+
+    def _report_plan(self, plan: RulePlan, stale: list[FirewallRuleInfo]) -> None:
+        for fw_rule in plan.create:
+            info(f"[check] +rule seq={fw_rule.sequence} desc='{fw_rule.description}'")
+        for fw_rule in plan.update:
+            info(f"[check] ~rule seq={fw_rule.sequence} desc='{fw_rule.description}'")
+        for live_rule in stale:
+            info(f"[check] -rule desc='{live_rule.description}'")
+
+    def _provision_aliases(
+        self, module: ModuleSpec, result: ApplyResult, done: set[str] | None = None
+    ) -> None:
+        """Upsert every alias ``module``'s rules reference.
+
+        a) module-local aliases declared in module.aliases
+        b) peer-module FQDN aliases (tm_<peer>)
+        c) global aliases from firewall/aliases.json that are referenced
+           via "alias:<name>" in this module's ingress/egress
+
+        ``done`` carries names already upserted in this run so a fleet-wide
+        reconcile writes a shared alias once.
+        """
+        wanted: list[tuple[str, str, list[str], str]] = []
         for alias_name, alias_def in module.aliases.items():
-            self._upsert_alias(
+            wanted.append((
                 alias_name,
                 alias_def.get("type", "host"),
                 alias_def.get("addresses", []),
                 alias_def.get("description", ""),
-            )
-            result.aliases_created += 1
+            ))
         for alias_name, target in self._module_aliases_to_provision(module).items():
-            self._upsert_alias(
-                alias_name,
-                target.alias_type,
-                target.content,
-                target.description,
-            )
-            result.aliases_created += 1
+            wanted.append((alias_name, target.alias_type, target.content, target.description))
         for global_name in self._referenced_global_aliases(module):
             alias_def = self.global_aliases[global_name]
-            self._upsert_alias(
+            wanted.append((
                 global_name,
                 alias_def.get("type", "host"),
                 alias_def.get("addresses", []),
                 alias_def.get("description", ""),
+            ))
+
+        for name, alias_type, content, description in wanted:
+            if done is not None:
+                if name in done:
+                    continue
+                done.add(name)
+            if self._upsert_alias(name, alias_type, content, description):
+                result.aliases_created += 1
+
+    def _write_plan(
+        self, plan: RulePlan, stale: list[FirewallRuleInfo], result: ApplyResult
+    ) -> None:
+        """Send a plan's writes; the caller owns the savepoint and apply_changes."""
+        for live_rule in stale:
+            self.fw.delete_rule_by_uuid(live_rule.uuid, apply=False)
+            result.deleted += 1
+        for fw_rule in plan.create:
+            self.fw.create_rule(fw_rule, apply=False)
+            result.created += 1
+        for fw_rule in plan.update:
+            # update_rule finds the live rule by its full description (the oxl
+            # rule module's match field); _plan_rules only puts exact matches here.
+            self.fw.update_rule(fw_rule, apply=False)
+            result.updated += 1
+
+    def _plan_rules(
+        self, rules: list[ModuleFirewallRule], existing: list[FirewallRuleInfo]
+    ) -> RulePlan:
+        """Diff compiled rules against the module's live rules.
+
+        Live rules are keyed on canonical identity — the live description carries
+        a " | <freetext>" suffix the compiled description doesn't (#246). A live
+        rule whose full description matches is updated in place only if a field
+        differs; copies with a different suffix (or duplicates) are superseded.
+        """
+        plan = RulePlan()
+        live_by_canonical: dict[str, list[FirewallRuleInfo]] = {}
+        for live_rule in existing:
+            live_by_canonical.setdefault(
+                _canonical_part(live_rule.description), []
+            ).append(live_rule)
+
+        for r in rules:
+            fw_rule = self._to_firewall_rule(r)
+            candidates = live_by_canonical.pop(r.description, [])
+            keep = next(
+                (c for c in candidates if c.description == fw_rule.description), None
             )
-            result.aliases_created += 1
+            plan.delete.extend(c for c in candidates if c is not keep)
+            if keep is None:
+                plan.create.append(fw_rule)
+            elif keep.matches(fw_rule):
+                plan.unchanged += 1
+            else:
+                plan.update.append(fw_rule)
+
+        plan.orphans = [r for rest in live_by_canonical.values() for r in rest]
+        return plan
+
+    # ── Compile cache ────────────────────────────────────────────────────
+
+    def _compile_cached(
+        self, module: ModuleSpec, use_cache: bool
+    ) -> tuple[list[ModuleFirewallRule], list[ValidationError]]:
+        """``_compile`` backed by the on-disk cache in ``compile_cache_file``.
+
+        With ``use_cache`` a hit skips compilation entirely; otherwise the
+        module is compiled and the entry refreshed. Only clean compiles are
+        cached, so validation errors are always reported fresh.
+        """
+        if not self.compile_cache_file:
+            return self._compile(module)
+        key = self._compile_inputs_key(module)
+        cache = self._load_compile_cache()
+        entry = cache.get(module.vmname)
+        if use_cache and entry and entry.get("key") == key:
+            debug(f"{module.vmname}: compile cache hit")
+            return [ModuleFirewallRule(**r) for r in entry["rules"]], []
 
-        # 2. Apply rules atomically with a savepoint
-        revision = self.fw.create_savepoint()
-        try:
-            existing = self._list_owned_rules(module.vmname) if prune else []
-            desired_descs = {r.description for r in rules}
+        rules, errors = self._compile(module)
+        if not errors:
+            with self._compile_cache_lock:
+                cache[module.vmname] = {
+                    "key": key,
+                    "rules": [asdict(r) for r in rules],
+                }
+                self._compile_cache_dirty = True
+        return rules, errors
 
-            for r in rules:
-                self.fw.create_rule(self._to_firewall_rule(r), apply=False)
-                result.applied += 1
+    def _compile_inputs_key(self, module: ModuleSpec) -> str:
+        """Hash of every file and setting ``_compile`` reads for ``module``.
 
-            if prune:
-                for live_rule in existing:
-                    # Compare on canonical identity — the live description carries
-                    # a " | <freetext>" suffix the desired set doesn't (#246).
-                    if _canonical_part(live_rule.description) not in desired_descs:
-                        self.fw.delete_rule_by_uuid(live_rule.uuid, apply=False)
-                        result.deleted += 1
+        Covers the module's own JSON, zones, global aliases, each peer module
+        it names (ingress ``from`` / egress ``to`` / dependsOn provider) and the
+        providers' pinhole.json files. The live VLAN→interface map is not part
+        of the key, which is why only read-only paths consult the cache.
+        """
+        h = hashlib.sha256()
 
-            self.fw.apply_changes()
-        except Exception:
-            self._revert(revision)
-            raise
+        def add(label: str, data: bytes) -> None:
+            h.update(label.encode())
+            h.update(b"\0")
+            h.update(hashlib.sha256(data).digest())
 
-        self._write_sequence_map(module, rules)
-        return result
+        def add_file(label: str, path: Path) -> None:
+            try:
+                add(label, path.read_bytes())
+            except OSError:
+                add(label, b"<missing>")
+
+        add("version", str(COMPILE_CACHE_VERSION).encode())
+        config_name = module.config_name or module.vmname
+        add_file(f"module:{config_name}", self.modules_dir / f"{config_name}.json")
+        add("zones", json.dumps(
+            {n: asdict(z) for n, z in self.zones.items()}, sort_keys=True
+        ).encode())
+        add("aliases", json.dumps(self.global_aliases, sort_keys=True).encode())
+
+        peers, dependencies = self._referenced_modules(module)
+        for peer in sorted(peers):
+            add_file(f"peer:{peer}", self.modules_dir / f"{peer}.json")
+        for provider_name, service in sorted(dependencies):
+            provider = self._load_peer_cached(provider_name)
+            if provider is not None and provider.location:
+                add_file(
+                    f"pinhole:{provider_name}:{service}",
+                    Path(provider.location) / "services" / service / "pinhole.json",
+                )
+        return h.hexdigest()
+
+    def _referenced_modules(
+        self, module: ModuleSpec
+    ) -> tuple[set[str], list[tuple[str, str]]]:
+        """Other modules whose manifests ``_compile`` reads for ``module``.
+
+        Returns the peer module names (ingress ``from`` / egress ``to`` entries
+        that are not zones, 'internet' or 'alias:<n>', plus dependsOn providers)
+        and the parsed ``(provider, service)`` dependsOn pairs.
+        """
+        peers: set[str] = set()
+        for entry in (*module.ingress, *module.egress):
+            peer = entry.get("from") or entry.get("to")
+            if peer and peer != "internet" and not peer.startswith("alias:") and peer not in self.zones:
+                peers.add(peer)
+        dependencies = [p for p in map(_parse_dependency, module.depends_on) if p]
+        peers.update(provider for provider, _ in dependencies)
+        return peers, dependencies
+
+    def _load_compile_cache(self) -> dict[str, dict]:
+        with self._compile_cache_lock:
+            if self._compile_cache is None:
+                self._compile_cache = {}
+                try:
+                    with open(self.compile_cache_file) as f:
+                        doc = json.load(f)
+                    if doc.get("version") == COMPILE_CACHE_VERSION:
+                        self._compile_cache = doc.get("modules", {})
+                except FileNotFoundError:
+                    pass
+                except Exception as exc:
+                    warn(f"Ignoring unreadable compile cache: {exc}")
+            return self._compile_cache
+
+    def _flush_compile_cache(self) -> None:
+        if not self._compile_cache_dirty or not self.compile_cache_file:
+            return
+        try:
+            self.compile_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.compile_cache_file.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump({"version": COMPILE_CACHE_VERSION,
+                           "modules": self._compile_cache}, f, indent=2)
+            os.replace(tmp, self.compile_cache_file)
+            self._compile_cache_dirty = False
+        except Exception as exc:
+            warn(f"Could not update compile cache: {exc}")
 
     # ── Compilation ──────────────────────────────────────────────────────
 
@@ -798,9 +1497,8 @@ class RulesManager:
 
             # Load the provider's manifest. If it's missing, install-module.sh
             # has already failed validation upstream — skip silently here.
-            try:
-                provider = load_module(self.modules_dir, provider_name)
-            except FileNotFoundError:
+            provider = self._load_peer_cached(provider_name)
+            if provider is None:
                 continue
 
             # Most services don't expose network ports (e.g. cluster:vm).
@@ -1124,9 +1822,8 @@ class RulesManager:
             if not parsed:
                 continue
             provider_name, service = parsed
-            try:
-                provider = load_module(self.modules_dir, provider_name)
-            except FileNotFoundError:
+            provider = self._load_peer_cached(provider_name)
+            if provider is None:
                 continue
             if not load_pinhole_ports(provider.location, service):
                 continue
@@ -1208,9 +1905,8 @@ class RulesManager:
         if peer in self.zones:
             return self._zone_to_interface(self.zones[peer])
         # Module-named peer — resolve to that module's zone interface.
-        try:
-            peer_module = load_module(self.modules_dir, peer)
-        except FileNotFoundError:
+        peer_module = self._load_peer_cached(peer)
+        if peer_module is None:
             return "lan"
         peer_zone = self.zones.get(peer_module.zone0)
         return self._zone_to_interface(peer_zone) if peer_zone else "lan"
@@ -1251,6 +1947,7 @@ class RulesManager:
             self._vlan_iface_cache = {}
             if not self.is_none_mode:
                 try:
+                    # Shares the firewall manager's client (session.get_client)
                     with VlanManager(self.config) as vlan_mgr:
                         for v in vlan_mgr.get_assigned_vlans():
                             tag_str = str(v.get("vlan_tag", ""))
@@ -1297,13 +1994,28 @@ class RulesManager:
             sequence=r.sequence,
         )
 
+    def _live_aliases(self) -> dict[str, AliasInfo]:
+        """Live alias table by name, downloaded once and kept in step with our writes."""
+        if self._alias_table is None:
+            self._alias_table = {a.name: a for a in self.fw.list_aliases()}
+        return self._alias_table
+
     def _upsert_alias(
         self, name: str, alias_type: str, addresses: list[str], description: str
-    ) -> None:
-        """Create or update an OPNsense alias (idempotent — matched by name)."""
+    ) -> bool:
+        """Create or update an OPNsense alias (idempotent — matched by name).
+
+        Diffs against the live alias table and writes only when the type,
+        content or description differ. Returns True if a write was sent; the
+        caller triggers one alias reload via ``_reload_aliases``.
+        """
+        live = self._live_aliases().get(name)
+        if live and live.matches(alias_type, addresses, description):
+            debug(f"alias {name} unchanged")
+            return False
         if self.check_mode:
-            info(f"[check] +alias {name} ({alias_type}) → {addresses}")
-            return
+            info(f"[check] {'~' if live else '+'}alias {name} ({alias_type}) → {addresses}")
+            return True
         params = {
             "name": name,
             "type": alias_type,
@@ -1313,8 +2025,17 @@ class RulesManager:
             "reload": False,
         }
         self.fw.client.run_module("alias", params=params)
+        self._alias_table[name] = AliasInfo(
+            uuid=live.uuid if live else "", name=name, type=alias_type,
+            content=[str(a) for a in addresses], description=description,
+        )
+        self._aliases_dirty = True
+        return True
 
     def _delete_alias(self, name: str) -> bool:
+        if name not in self._live_aliases():
+            debug(f"alias {name} already absent")
+            return True
         if self.check_mode:
             info(f"[check] -alias {name}")
             return True
@@ -1323,32 +2044,33 @@ class RulesManager:
                 "alias",
                 params={"name": name, "state": "absent", "reload": False},
             )
-            return True
         except Exception as exc:
             warn(f"Failed to remove alias '{name}': {exc}")
             return False
+        del self._alias_table[name]
+        self._aliases_dirty = True
+        return True
+
+    def _reload_aliases(self) -> None:
+        """Send one alias reload for every alias write made since the last one."""
+        if not self._aliases_dirty or self.check_mode:
+            return
+        try:
+            self.fw.reconfigure_aliases()
+        except Exception as exc:
+            warn(f"Alias reload failed: {exc}")
+        self._aliases_dirty = False
 
-    def _alias_is_orphan(self, alias_name: str, exclude_module: str) -> bool:
+    def _alias_is_orphan(
+        self, alias_name: str, exclude_module: str, scan: OwnershipScan | None = None
+    ) -> bool:
         """Return True if no rule outside `exclude_module` references `alias_name`.
 
-        Scans both manual rules (``tappaas-module:``) and auto-pinholes
-        (``tappaas-svcdep:``).
+        Covers both manual rules (``tappaas-module:``) and auto-pinholes
+        (``tappaas-svcdep:``) via the ownership scan's alias refcounts.
         """
-        exclude_prefixes = tuple(
-            f"{p}:{exclude_module}:" for p in MODULE_RULE_PREFIXES
-        )
-        seen: set[str] = set()
-        for prefix in MODULE_RULE_PREFIXES:
-            for r in self.fw.list_rules(search_pattern=f"{prefix}:"):
-                key = getattr(r, "uuid", None) or r.description
-                if key in seen:
-                    continue
-                seen.add(key)
-                if r.description.startswith(exclude_prefixes):
-                    continue
-                if alias_name in (r.source_net or "") or alias_name in (r.destination_net or ""):
-                    return False
-        return True
+        scan = scan or self._ownership_scan()
+        return scan.alias_is_orphan(alias_name, exclude_module)
 
     def _revert(self, revision) -> None:
         # create_savepoint() returns {"result": {"response": {"revision": "..."}}}
@@ -1414,9 +2136,8 @@ class RulesManager:
             if not parsed:
                 continue
             provider_name, service = parsed
-            try:
-                provider = load_module(self.modules_dir, provider_name)
-            except FileNotFoundError:
+            provider = self._load_peer_cached(provider_name)
+            if provider is None:
                 continue
             port_specs = load_pinhole_ports(provider.location, service)
             if not port_specs:
@@ -1578,6 +2299,7 @@ def _build_manager(args: argparse.Namespace) -> RulesManager:
         global_aliases=global_aliases,
         check_mode=args.check_mode,
         firewall_type=args.firewall_type,
+        compile_cache_file=None if args.no_compile_cache else DEFAULT_COMPILE_CACHE_FILE,
     )
 
 
@@ -1605,6 +2327,8 @@ def main() -> int:
     global_parser.add_argument("--firewall-type", default="opnsense",
                                 choices=["opnsense", "NONE"],
                                 help="Firewall type (opnsense applies; NONE prints manual instructions)")
+    global_parser.add_argument("--no-compile-cache", action="store_true",
+                                help="Always compile from module.json; ignore the compiled-rules cache")
     global_parser.add_argument("--debug", action="store_true", help="Enable debug output")
 
     parser = argparse.ArgumentParser(
@@ -1621,7 +2345,13 @@ def main() -> int:
 
     p_rec = subparsers.add_parser("reconcile", parents=[global_parser],
                                     help="Diff live state against module.json; apply and prune")
-    p_rec.add_argument("module", help="Module name")
+    p_rec.add_argument("module", nargs="?", help="Module name (omit with --all)")
+    p_rec.add_argument("--all", action="store_true",
+                        help="Reconcile every module in --modules-dir in one transaction")
+    p_rec.add_argument("--changed", nargs="+", metavar="FILE",
+                        help="Reconcile only modules affected by these changed files")
+    p_rec.add_argument("--workers", type=int, default=DEFAULT_COMPILE_WORKERS,
+                        help=f"Parallel compile workers for --all/--changed (default: {DEFAULT_COMPILE_WORKERS})")
 
     p_rm = subparsers.add_parser("remove-rules", parents=[global_parser],
                                    help="Remove all rules and aliases owned by a module")
@@ -1632,6 +2362,12 @@ def main() -> int:
     p_ver.add_argument("module", help="Module name")
     p_ver.add_argument("--deep", action="store_true",
                         help="Run connectivity probes in addition to rule presence")
+    p_ver.add_argument("--probe-timeout", type=float, default=DEFAULT_PROBE_TIMEOUT,
+                        help=f"Per-probe timeout in seconds for --deep (default: {DEFAULT_PROBE_TIMEOUT})")
+    p_ver.add_argument("--probe-concurrency", type=int, default=DEFAULT_PROBE_CONCURRENCY,
+                        help=f"Probes in flight for --deep (default: {DEFAULT_PROBE_CONCURRENCY})")
+    p_ver.add_argument("--probe-gate", action="store_true",
+                        help="With --deep, exit non-zero on a failed probe (default: informational)")
 
     p_ls = subparsers.add_parser("list-rules", parents=[global_parser],
                                    help="List rules currently in OPNsense")
@@ -1639,6 +2375,11 @@ def main() -> int:
     p_ls.add_argument("--orphans", action="store_true",
                        help="Only rules whose module no longer exists on disk")
 
+    p_sq = subparsers.add_parser("sequence-report", parents=[global_parser],
+                                   help="Report sequence slot occupancy and collisions")
+    p_sq.add_argument("--offline", action="store_true",
+                       help="Use module files and sequence-map.json only (no OPNsense read)")
+
     p_ca = subparsers.add_parser("create-alias", parents=[global_parser],
                                    help="Create or update an OPNsense alias")
     p_ca.add_argument("name", help="Alias name")
@@ -1694,24 +2435,60 @@ def _dispatch(args: argparse.Namespace, manager: RulesManager) -> int:
         if result.errors:
             return 1
         info(
-            f"{result.module}: applied={result.applied} "
+            f"{result.module}: applied={result.applied} created={result.created} "
+            f"updated={result.updated} unchanged={result.unchanged} "
             f"aliases={result.aliases_created}"
         )
         _output({"module": result.module, "applied": result.applied,
+                  "created": result.created, "updated": result.updated,
+                  "unchanged": result.unchanged, "deleted": result.deleted,
                   "aliases_created": result.aliases_created,
                   "errors": [str(e) for e in result.errors]}, args)
         return 0
 
+    if cmd == "reconcile" and (args.all or args.changed):
+        if sum(map(bool, (args.module, args.all, args.changed))) > 1:
+            error("reconcile: give only one of a module name, --all or --changed")
+            return 2
+        if args.changed:
+            results = manager.reconcile_changed(args.changed, workers=args.workers)
+        else:
+            results = manager.reconcile_all(workers=args.workers)
+        for result in results:
+            if result.errors:
+                continue
+            info(
+                f"{result.module}: applied={result.applied} created={result.created} "
+                f"updated={result.updated} unchanged={result.unchanged} "
+                f"deleted={result.deleted} aliases={result.aliases_created}"
+            )
+        failed = [r.module for r in results if r.errors]
+        if failed:
+            warn(f"{len(failed)} module(s) skipped with errors: {', '.join(failed)}")
+        _output({"modules": [
+            {"module": r.module, "applied": r.applied, "created": r.created,
+             "updated": r.updated, "unchanged": r.unchanged, "deleted": r.deleted,
+             "aliases_created": r.aliases_created,
+             "errors": [str(e) for e in r.errors]}
+            for r in results
+        ], "failed": failed}, args)
+        return 1 if failed else 0
+
     if cmd == "reconcile":
+        if not args.module:
+            error("reconcile: a module name, --all or --changed is required")
+            return 2
         result = manager.reconcile(args.module)
         if result.errors:
             return 1
         info(
-            f"{result.module}: applied={result.applied} deleted={result.deleted} "
-            f"aliases={result.aliases_created}"
+            f"{result.module}: applied={result.applied} created={result.created} "
+            f"updated={result.updated} unchanged={result.unchanged} "
+            f"deleted={result.deleted} aliases={result.aliases_created}"
         )
         _output({"module": result.module, "applied": result.applied,
-                  "deleted": result.deleted,
+                  "created": result.created, "updated": result.updated,
+                  "unchanged": result.unchanged, "deleted": result.deleted,
                   "aliases_created": result.aliases_created,
                   "errors": [str(e) for e in result.errors]}, args)
         return 0
@@ -1727,16 +2504,34 @@ def _dispatch(args: argparse.Namespace, manager: RulesManager) -> int:
         return 0
 
     if cmd == "verify-rules":
-        result = manager.verify_rules(args.module, deep=args.deep)
+        result = manager.verify_rules(
+            args.module, deep=args.deep,
+            probe_timeout=args.probe_timeout, probe_concurrency=args.probe_concurrency,
+            probe_gate=args.probe_gate,
+        )
         info(f"{result.module}: desired={result.desired} present={result.present} "
              f"missing={len(result.missing)} extra={len(result.extra)}")
         for d in result.missing:
             warn(f"  missing: {d}")
         for d in result.extra:
             warn(f"  extra:   {d}")
-        _output({"module": result.module, "desired": result.desired,
-                  "present": result.present, "missing": result.missing,
-                  "extra": result.extra, "ok": result.ok}, args)
+        for p in result.probes:
+            line = (f"  {p.status:<7} {p.target.protocol} {p.target.host}:{p.target.port} "
+                    f"{p.target.label}" + (f" ({p.detail})" if p.detail else ""))
+            (info if p.status in ("pass", "unknown") else warn)(line)
+        payload = {"module": result.module, "desired": result.desired,
+                   "present": result.present, "missing": result.missing,
+                   "extra": result.extra, "ok": result.ok}
+        if args.deep:
+            payload["probes"] = [
+                {"rule": p.target.label, "host": p.target.host, "port": p.target.port,
+                 "protocol": p.target.protocol, "status": p.status,
+                 "latency_ms": p.latency_ms, "detail": p.detail}
+                for p in result.probes
+            ]
+            payload["unprobed"] = result.unprobed
+            payload["probes_ok"] = result.probes_ok
+        _output(payload, args)
         return 0 if result.ok else 1
 
     if cmd == "list-rules":
@@ -1749,10 +2544,23 @@ def _dispatch(args: argparse.Namespace, manager: RulesManager) -> int:
                              for r in rules]}, args)
         return 0
 
+    if cmd == "sequence-report":
+        report = manager.sequence_index(include_live=not args.offline).report()
+        info(f"slots used={report['used_slots']} free={report['free_slots']} "
+             f"collisions={len(report['collisions'])}")
+        for c in report["collisions"]:
+            moves = ", ".join(f"{m}→{s}" for m, s in c["suggested_slots"].items())
+            warn(f"  slot {c['slot']} {c['ingress_range']}: {', '.join(c['modules'])}"
+                 f" (suggest {moves})")
+        _output(report, args)
+        return 1 if report["collisions"] else 0
+
     if cmd == "create-alias":
         addresses = [s.strip() for s in args.addresses.split(",") if s.strip()]
-        manager.create_alias(args.name, args.type, addresses, args.description)
-        info(f"alias '{args.name}' upserted ({args.type}: {addresses})")
+        if manager.create_alias(args.name, args.type, addresses, args.description):
+            info(f"alias '{args.name}' upserted ({args.type}: {addresses})")
+        else:
+            info(f"alias '{args.name}' already up to date")
         return 0
 
     if cmd == "remove-alias":
@@ -0,0 +1,89 @@
+"""Shared OPNsense API clients for the *Manager classes.
+
+Every manager used to build its own ``oxl_opnsense_client.Client`` on
+``connect()``. Each construction repeats the reachability check and the TLS
+login-page probe, and a short CLI run (zone-manager, rules-manager) opens
+three or four managers against the same firewall. ``get_client()`` builds one
+client per connection target and hands the same instance to every manager in
+the process; ``Config.resolve_port()`` likewise probes 443/8443 once per
+firewall.
+
+Managers only drop their reference on ``disconnect()``; the shared clients are
+closed by ``close_all()`` (registered with :mod:`atexit`).
+"""
+
+import atexit
+import threading
+
+from oxl_opnsense_client import Client
+
+from .config import Config
+
+_lock = threading.Lock()
+_clients: dict[tuple, Client] = {}
+
+
+def client_kwargs(config: Config) -> dict:
+    """Build oxl ``Client`` kwargs from config (resolves the port if needed)."""
+    kwargs = {
+        "firewall": config.firewall,
+        "port": config.resolve_port(),
+        "ssl_verify": config.ssl_verify,
+        "debug": config.debug,
+        "api_timeout": config.api_timeout,
+        "api_retries": config.api_retries,
+    }
+
+    if config.credential_file:
+        kwargs["credential_file"] = config.credential_file
+    elif config.token and config.secret:
+        kwargs["token"] = config.token
+        kwargs["secret"] = config.secret
+
+    if config.ssl_ca_file:
+        kwargs["ssl_ca_file"] = config.ssl_ca_file
+
+    return kwargs
+
+
+def get_client(config: Config) -> Client:
+    """Return the process-wide client for this config's connection target.
+
+    Configs that resolve to the same kwargs (host, port, credentials, TLS and
+    timeout settings) share one client. Construction happens under a lock so
+    concurrent connects to a new target build it only once. If a port taken
+    from the on-disk cache turns out to be unreachable, the cache entry is
+    dropped and the port is probed again once.
+    """
+    try:
+        return _get_or_create(config)
+    except Exception:
+        if not config.forget_port():
+            raise
+        return _get_or_create(config)
+
+
+def _get_or_create(config: Config) -> Client:
+    kwargs = client_kwargs(config)
+    key = tuple(sorted(kwargs.items()))
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = Client(**kwargs)
+            _clients[key] = client
+    return client
+
+
+def close_all() -> None:
+    """Close and forget every shared client (the next connect builds anew)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.session.close()
+        except Exception:
+            pass
+
+
+atexit.register(close_all)
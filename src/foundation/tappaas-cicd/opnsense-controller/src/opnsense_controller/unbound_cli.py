@@ -11,19 +11,28 @@ Commands:
   unbound-manager add <hostname> <domain> <ip> [--description ...]
   unbound-manager delete <hostname> <domain>
   unbound-manager list
+  unbound-manager apply <file> [--prune] [--check]
 
 `*` is a valid hostname (wildcard). Changes reload Unbound automatically.
+`apply` lists the overrides once, writes only the differences from the desired
+set in <file> and reloads Unbound once at the end.
 """
 
 import argparse
+import ipaddress
+import json
 import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from oxl_opnsense_client import Client
 
 from .config import Config
-from .dhcp_manager import DhcpManager  # reused only as a connected-Client provider
+from .session import get_client
 
 
-def _client(args):
-    """Build a connected oxl Client from CLI args (same shape as dns-manager)."""
+def _client(args) -> Client:
+    """The shared oxl Client for the CLI args (same shape as dns-manager)."""
     config_kwargs = {
         "firewall": args.firewall,
         "ssl_verify": not args.no_ssl_verify,
@@ -33,24 +42,38 @@ def _client(args):
         config_kwargs["port"] = args.port
     if args.credential_file:
         config_kwargs["credential_file"] = args.credential_file
-    return DhcpManager(Config(**config_kwargs))
+    return get_client(Config(**config_kwargs))
+
+
+def _raw(client: Client, controller: str, command: str, action: str = "post",
+         uuid: str | None = None, data: dict | None = None) -> dict:
+    """One raw Unbound API call; returns the response body."""
+    params = {"module": "unbound", "controller": controller, "command": command, "action": action}
+    if uuid:
+        params["params"] = [uuid]
+    if data is not None:
+        params["data"] = data
+    return client.run_module("raw", params=params).get("result", {}).get("response", {})
+
+
+def _search_overrides(client: Client) -> list[dict]:
+    return _raw(client, "settings", "searchHostOverride", action="get").get("rows", [])
 
 
 def add_override(args) -> bool:
     desc = args.description or f"{args.hostname}.{args.domain}"
-    with _client(args) as mgr:
-        result = mgr.client.run_module(
-            "unbound_host",
-            check_mode=args.check_mode,
-            params={
-                "hostname": args.hostname,
-                "domain": args.domain,
-                "record_type": "A",
-                "value": args.ip,
-                "description": desc,
-                "state": "present",
-            },
-        )
+    result = _client(args).run_module(
+        "unbound_host",
+        check_mode=args.check_mode,
+        params={
+            "hostname": args.hostname,
+            "domain": args.domain,
+            "record_type": "A",
+            "value": args.ip,
+            "description": desc,
+            "state": "present",
+        },
+    )
     if result.get("error"):
         print(f"ERROR: {result['error']}", file=sys.stderr)
         return False
@@ -61,20 +84,19 @@ def add_override(args) -> bool:
 
 
 def delete_override(args) -> bool:
-    with _client(args) as mgr:
-        result = mgr.client.run_module(
-            "unbound_host",
-            check_mode=args.check_mode,
-            params={
-                "hostname": args.hostname,
-                "domain": args.domain,
-                "record_type": "A",
-                "state": "absent",
-                # Match without `value` (we don't know the IP at delete time);
-                # the default match_fields includes value, which would never match.
-                "match_fields": ["hostname", "domain", "record_type"],
-            },
-        )
+    result = _client(args).run_module(
+        "unbound_host",
+        check_mode=args.check_mode,
+        params={
+            "hostname": args.hostname,
+            "domain": args.domain,
+            "record_type": "A",
+            "state": "absent",
+            # Match without `value` (we don't know the IP at delete time);
+            # the default match_fields includes value, which would never match.
+            "match_fields": ["hostname", "domain", "record_type"],
+        },
+    )
     if result.get("error"):
         print(f"ERROR: {result['error']}", file=sys.stderr)
         return False
@@ -84,17 +106,7 @@ def delete_override(args) -> bool:
 
 
 def list_overrides(args) -> bool:
-    with _client(args) as mgr:
-        result = mgr.client.run_module(
-            "raw",
-            params={
-                "module": "unbound",
-                "controller": "settings",
-                "command": "searchHostOverride",
-                "action": "get",
-            },
-        )
-    rows = result.get("result", {}).get("response", {}).get("rows", [])
+    rows = _search_overrides(_client(args))
     if not rows:
         print("No Unbound host overrides.")
         return True
@@ -105,6 +117,195 @@ def list_overrides(args) -> bool:
     return True
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# apply: declarative bulk sync
+# ─────────────────────────────────────────────────────────────────────────────
+#
+# Desired-set file (JSON):
+#   {
+#     "wildcards": {"tappaas.org": "10.6.0.1"},         # *.<domain> -> ip
+#     "overrides": [
+#       {"hostname": "nextcloud", "domain": "tappaas.org", "ip": "10.6.0.1",
+#        "description": "optional"}
+#     ]
+#   }
+# Only domains named in the file are managed: with --prune, A/AAAA overrides in
+# those domains that are not in the file are deleted; other domains, and record
+# types the file cannot describe (MX, ...), are untouched.
+
+_MANAGED_RR = ("A", "AAAA")
+
+
+@dataclass(frozen=True)
+class Override:
+    """One Unbound host override (A or AAAA)."""
+
+    hostname: str
+    domain: str
+    rr: str
+    server: str
+    description: str = ""
+    enabled: bool = True
+    uuid: str | None = None
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return (self.hostname.lower(), self.domain.lower(), self.rr)
+
+    @property
+    def fqdn(self) -> str:
+        return f"{self.hostname}.{self.domain}"
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Override":
+        return cls(
+            hostname=row.get("hostname") or "",
+            domain=row.get("domain") or "",
+            rr=(row.get("rr") or "A").split(" ")[0].upper(),
+            server=row.get("server") or "",
+            description=row.get("description") or "",
+            enabled=str(row.get("enabled", "1")) == "1",
+            uuid=row.get("uuid"),
+        )
+
+    def payload(self) -> dict:
+        return {
+            "enabled": "1",
+            "hostname": self.hostname,
+            "domain": self.domain,
+            "rr": self.rr,
+            "server": self.server,
+            "description": self.description,
+        }
+
+
+def _override(hostname: str, domain: str, ip: str, description: str, where: str) -> Override:
+    if not hostname or not domain:
+        raise ValueError(f"{where}: hostname and domain are required")
+    try:
+        version = ipaddress.ip_address(ip).version
+    except ValueError:
+        raise ValueError(f"{where}: invalid IP address '{ip}'") from None
+    return Override(hostname, domain, "AAAA" if version == 6 else "A", ip,
+                    description or f"{hostname}.{domain}")
+
+
+def parse_desired(data: dict) -> list[Override]:
+    """Desired overrides from a parsed apply file; raises ValueError if invalid."""
+    if not isinstance(data, dict):
+        raise ValueError("apply file must be a JSON object")
+    desired: dict[tuple, Override] = {}
+
+    def add(override: Override, where: str) -> None:
+        if override.key in desired:
+            raise ValueError(f"{where}: duplicate override {override.fqdn} ({override.rr})")
+        desired[override.key] = override
+
+    for domain, ip in (data.get("wildcards") or {}).items():
+        add(_override("*", domain, str(ip), f"wildcard *.{domain}", f"wildcards.{domain}"),
+            f"wildcards.{domain}")
+    for i, entry in enumerate(data.get("overrides") or []):
+        where = f"overrides[{i}]"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{where}: expected an object")
+        add(_override(str(entry.get("hostname") or ""), str(entry.get("domain") or ""),
+                      str(entry.get("ip") or ""), str(entry.get("description") or ""), where), where)
+    return list(desired.values())
+
+
+@dataclass
+class OverridePlan:
+    creates: list[Override]
+    updates: list[tuple[Override, Override]]   # (current, desired)
+    deletes: list[Override]
+    unchanged: int
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.creates or self.updates or self.deletes)
+
+
+def plan_overrides(rows: list[dict], desired: list[Override], prune: bool = False) -> OverridePlan:
+    """Diff the current overrides (one search result) against the desired set."""
+    current: dict[tuple, Override] = {}
+    for row in rows:
+        override = Override.from_row(row)
+        current.setdefault(override.key, override)
+    creates, updates, unchanged = [], [], 0
+    for want in desired:
+        have = current.get(want.key)
+        if have is None:
+            creates.append(want)
+        elif (have.server, have.description, have.enabled) != (want.server, want.description, True):
+            updates.append((have, want))
+        else:
+            unchanged += 1
+    deletes = []
+    if prune:
+        managed = {o.domain.lower() for o in desired}
+        wanted = {o.key for o in desired}
+        deletes = [
+            o for o in current.values()
+            if o.rr in _MANAGED_RR and o.domain.lower() in managed and o.key not in wanted
+        ]
+    return OverridePlan(creates, updates, deletes, unchanged)
+
+
+def apply_overrides(client: Client, plan: OverridePlan) -> list[str]:
+    """Write the plan's deltas, then reload Unbound once; returns error messages."""
+    errors: list[str] = []
+    written = 0
+    steps = (
+        [(o, "delHostOverride", o.uuid, None, "deleted") for o in plan.deletes]
+        + [(want, "setHostOverride", have.uuid, want, "saved") for have, want in plan.updates]
+        + [(o, "addHostOverride", None, o, "saved") for o in plan.creates]
+    )
+    for override, command, uuid, body, expect in steps:
+        data = {"host": body.payload()} if body is not None else None
+        try:
+            response = _raw(client, "settings", command, uuid=uuid, data=data)
+        except Exception as e:
+            errors.append(f"{override.fqdn}: {e}")
+            continue
+        if response.get("result") != expect:
+            errors.append(f"{override.fqdn}: {command} failed: {response}")
+            continue
+        written += 1
+    if written:
+        _raw(client, "service", "reconfigure")
+    return errors
+
+
+def apply_file(args) -> bool:
+    try:
+        desired = parse_desired(json.loads(Path(args.file).read_text()))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Cannot read {args.file}: {e}", file=sys.stderr)
+        return False
+
+    client = _client(args)
+    plan = plan_overrides(_search_overrides(client), desired, prune=args.prune)
+    for o in plan.creates:
+        print(f"+ {o.fqdn} {o.rr} {o.server}  ({o.description})")
+    for have, want in plan.updates:
+        print(f"~ {want.fqdn} {want.rr} {have.server} => {want.server}"
+              + ("" if have.enabled else "  (re-enable)")
+              + ("" if have.description == want.description else f"  ({want.description})"))
+    for o in plan.deletes:
+        print(f"- {o.fqdn} {o.rr} {o.server}  ({o.description})")
+    print(f"{len(plan.creates)} to create, {len(plan.updates)} to update, "
+          f"{len(plan.deletes)} to delete, {plan.unchanged} unchanged")
+
+    if args.check_mode or args.check or not plan.changed:
+        return True
+    errors = apply_overrides(client, plan)
+    for err in errors:
+        print(f"ERROR: {err}", file=sys.stderr)
+    if not errors:
+        print("Unbound host overrides applied (one reload)")
+    return not errors
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="OPNsense Unbound host-override management (split-horizon DNS)",
@@ -115,6 +316,8 @@ Examples:
   unbound-manager add nextcloud tappaas.org 10.6.0.1
   unbound-manager delete nextcloud tappaas.org
   unbound-manager list
+  unbound-manager apply public-dns.json --check
+  unbound-manager apply public-dns.json --prune
 """,
     )
     parser.add_argument("--firewall", default="firewall.mgmt.internal",
@@ -139,6 +342,12 @@ Examples:
 
     sub.add_parser("list", help="List Unbound host overrides")
 
+    p_apply = sub.add_parser("apply", help="Make host overrides match a JSON desired set (one reload)")
+    p_apply.add_argument("file", help="JSON file with 'wildcards' {domain: ip} and/or 'overrides' [...]")
+    p_apply.add_argument("--prune", action="store_true",
+                         help="Delete A/AAAA overrides in the file's domains that the file does not list")
+    p_apply.add_argument("--check", action="store_true", help="Only print the diff (same as --check-mode)")
+
     args = parser.parse_args()
     if not args.command:
         parser.print_help()
@@ -151,6 +360,8 @@ Examples:
             ok = delete_override(args)
         elif args.command == "list":
             ok = list_overrides(args)
+        elif args.command == "apply":
+            ok = apply_file(args)
         else:
             parser.print_help()
             ok = False
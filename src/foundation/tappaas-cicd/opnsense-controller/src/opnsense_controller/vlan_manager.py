@@ -5,10 +5,13 @@ See: https://github.com/opnsense/core/issues/7324#issuecomment-2830694222
 Install: https://gist.github.com/szymczag/df152a82e86aff67b984ed3786b027ba
 """
 
+import threading
 from dataclasses import dataclass
 from oxl_opnsense_client import Client
 
 from .config import Config
+from .log import debug, warn
+from .session import get_client
 
 
 @dataclass
@@ -21,39 +24,62 @@ class Vlan:
     priority: int = 0
     device: str | None = None  # VLAN device name (e.g., vlan0.100)
 
+    @property
+    def device_name(self) -> str:
+        """Kernel device name OPNsense gives this VLAN (e.g., 'vlan0.100')."""
+        return self.device or f"vlan0.{self.tag}"
 
-class VlanManager:
-    """Manage VLANs on OPNsense firewall."""
 
-    def __init__(self, config: Config):
-        self.config = config
-        self._client: Client | None = None
+def assign_saved(assign_result: dict) -> bool:
+    """Whether an assign_interface() result reports the assignment saved."""
+    return assign_result.get("result", {}).get("response", {}).get("result") == "saved"
 
-    def _get_client_kwargs(self) -> dict:
-        """Build client connection kwargs from config."""
-        kwargs = {
-            "firewall": self.config.firewall,
-            "port": self.config.resolve_port(),
-            "ssl_verify": self.config.ssl_verify,
-            "debug": self.config.debug,
-            "api_timeout": self.config.api_timeout,
-            "api_retries": self.config.api_retries,
-        }
 
-        if self.config.credential_file:
-            kwargs["credential_file"] = self.config.credential_file
-        elif self.config.token and self.config.secret:
-            kwargs["token"] = self.config.token
-            kwargs["secret"] = self.config.secret
+def assigned_ifname(assign_result: dict) -> str | None:
+    """Interface identifier (e.g., 'opt1') from a saved assign_interface() result."""
+    if not assign_saved(assign_result):
+        return None
+    return assign_result["result"]["response"].get("ifname")
+
 
-        if self.config.ssl_ca_file:
-            kwargs["ssl_ca_file"] = self.config.ssl_ca_file
+class ReloadError(RuntimeError):
+    """A coalesced interface apply failed; this batch's new interfaces were undone.
 
-        return kwargs
+    ``rolled_back`` lists the interface identifiers (e.g. 'opt3') that were
+    assigned during the batch and have been unassigned again;
+    ``deleted_vlans`` the descriptions of VLAN devices created during the
+    batch and deleted again.
+    """
+
+    def __init__(self, message: str, rolled_back: list[str], deleted_vlans: list[str] | None = None):
+        super().__init__(message)
+        self.rolled_back = rolled_back
+        self.deleted_vlans = deleted_vlans or []
+
+
+class VlanManager:
+    """Manage VLANs on OPNsense firewall.
+
+    Interface reloads can be batched: after :meth:`defer_reloads`,
+    ``reload_interface`` and ``apply_vlan_settings`` only record what needs
+    applying, and :meth:`flush_reloads` (or leaving the ``with`` block) issues
+    a single ``vlan_settings/reconfigure``. That call re-applies every VLAN
+    interface from config.xml, so one disruption replaces one per interface.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self._client: Client | None = None
+        self._lock = threading.Lock()
+        self._batching = False
+        self._pending_reloads: list[str] = []
+        self._apply_requested = False
+        self._batch_assigned: list[str] = []
+        self._batch_created: list[str] = []
 
     def connect(self) -> "VlanManager":
         """Establish connection to OPNsense."""
-        self._client = Client(**self._get_client_kwargs())
+        self._client = get_client(self.config)
         return self
 
     def disconnect(self):
@@ -64,7 +90,16 @@ class VlanManager:
         return self.connect()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.disconnect()
+        try:
+            if self._batching:
+                try:
+                    self.flush_reloads()
+                except ReloadError as e:
+                    if exc_type is None:
+                        raise
+                    warn(f"Deferred interface apply: {e}")
+        finally:
+            self.disconnect()
 
     @property
     def client(self) -> Client:
@@ -189,6 +224,7 @@ class VlanManager:
         ipv4_type: str | None = None,
         ipv4_address: str | None = None,
         ipv4_subnet: int | None = None,
+        rollback: bool = True,
     ) -> dict:
         """Assign a device to a new OPNsense interface and optionally enable it.
 
@@ -202,6 +238,9 @@ class VlanManager:
             ipv4_type: IPv4 configuration type ('static', 'dhcp', or None)
             ipv4_address: IPv4 address (required if ipv4_type is 'static')
             ipv4_subnet: IPv4 subnet mask (required if ipv4_type is 'static')
+            rollback: While reloads are deferred, unassign the interface again
+                if the flush fails (default). Pass False when re-assigning a
+                device that was already in use, e.g. a label rename.
 
         Returns:
             Result dictionary with 'ifname' (e.g., 'opt1') on success
@@ -232,6 +271,11 @@ class VlanManager:
                 "data": data,
             },
         )
+        ifname = assigned_ifname(result)
+        if ifname and rollback:
+            with self._lock:
+                if self._batching:
+                    self._batch_assigned.append(ifname)
         return result
 
     def reload_interface(self, identifier: str) -> dict:
@@ -240,12 +284,20 @@ class VlanManager:
         After assigning a VLAN to an interface with a static IP, the IP
         is written to config but not applied until the interface is reloaded.
 
+        While reloads are deferred, the identifier is queued for the next
+        :meth:`flush_reloads` instead and ``{"deferred": True}`` is returned.
+
         Args:
             identifier: Interface identifier (e.g., 'opt1', 'opt5')
 
         Returns:
             Result dictionary from the API
         """
+        with self._lock:
+            if self._batching:
+                if identifier not in self._pending_reloads:
+                    self._pending_reloads.append(identifier)
+                return {"deferred": True, "identifier": identifier}
         result = self.client.run_module(
             "raw",
             params={
@@ -273,7 +325,17 @@ class VlanManager:
         vlan0.210 → 10.2.10.1/24) but the FreeBSD interface had no IP. A
         manual `configctl interface reconfigure` brought it back. This
         endpoint achieves the same via the API.
+
+        While reloads are deferred the call is folded into the next
+        :meth:`flush_reloads` and ``{"deferred": True}`` is returned.
         """
+        with self._lock:
+            if self._batching:
+                self._apply_requested = True
+                return {"deferred": True}
+        return self._reconfigure_vlans()
+
+    def _reconfigure_vlans(self) -> dict:
         result = self.client.run_module(
             "raw",
             params={
@@ -285,6 +347,69 @@ class VlanManager:
         )
         return result
 
+    def defer_reloads(self) -> "VlanManager":
+        """Start queueing interface reloads until :meth:`flush_reloads`."""
+        with self._lock:
+            self._batching = True
+        return self
+
+    @property
+    def pending_reloads(self) -> list[str]:
+        """Interface identifiers queued for the next flush."""
+        with self._lock:
+            return list(self._pending_reloads)
+
+    def flush_reloads(self) -> dict:
+        """Apply every deferred reload with one VLAN reconfigure and stop batching.
+
+        If the apply fails, interfaces assigned during the batch are unassigned
+        again and VLAN devices created during it are deleted (newest first),
+        then :class:`ReloadError` is raised, so a failed batch does not leave
+        half-configured interfaces behind. Interfaces assigned with
+        ``rollback=False`` are left alone.
+
+        Returns:
+            ``{"identifiers": [...], "result": ...}``, or {} if nothing was queued
+        """
+        with self._lock:
+            identifiers, self._pending_reloads = self._pending_reloads, []
+            requested, self._apply_requested = self._apply_requested, False
+            assigned, self._batch_assigned = self._batch_assigned, []
+            created, self._batch_created = self._batch_created, []
+            self._batching = False
+        if not identifiers and not requested:
+            return {}
+        debug(f"  Applying VLAN interfaces once for {len(identifiers)} reloads: "
+              f"{', '.join(identifiers) or '-'}")
+        try:
+            result = self._reconfigure_vlans()
+        except Exception as e:
+            if not identifiers:
+                # Only the belt-and-suspenders apply was requested; nothing new
+                # depends on it, so there is nothing to roll back.
+                debug(f"  apply_vlan_settings: {e}")
+                return {"identifiers": [], "error": str(e)}
+            rolled_back = []
+            for identifier in reversed(assigned):
+                try:
+                    self.unassign_interface(identifier)
+                    rolled_back.append(identifier)
+                except Exception as undo_error:
+                    warn(f"Rollback: cannot unassign {identifier}: {undo_error}")
+            deleted = []
+            for description in reversed(created):
+                try:
+                    self.delete_vlan(description)
+                    deleted.append(description)
+                except Exception as undo_error:
+                    warn(f"Rollback: cannot delete VLAN {description}: {undo_error}")
+            raise ReloadError(
+                f"VLAN reconfigure failed ({e}); rolled back {len(rolled_back)} "
+                f"interface assignment(s) and {len(deleted)} VLAN device(s)",
+                rolled_back, deleted,
+            ) from e
+        return {"identifiers": identifiers, "result": result}
+
     def unassign_interface(self, identifier: str) -> dict:
         """Remove an interface assignment.
 
@@ -338,7 +463,7 @@ class VlanManager:
             "priority": vlan.priority,
         }
 
-        device_name = vlan.device or f"vlan0.{vlan.tag}"
+        device_name = vlan.device_name
         if vlan.device:
             params["device"] = vlan.device
 
@@ -347,6 +472,10 @@ class VlanManager:
             check_mode=check_mode,
             params=params,
         )
+        if not check_mode and result.get("changed"):
+            with self._lock:
+                if self._batching:
+                    self._batch_created.append(vlan.description)
 
         # If assign is requested and not in check mode, assign the interface
         if assign and not check_mode:
@@ -361,9 +490,8 @@ class VlanManager:
                 ipv4_subnet=ipv4_subnet,
             )
             result["assign_result"] = assign_result
-            response = assign_result.get("result", {}).get("response", {})
-            if response.get("result") == "saved":
-                ifname = response.get("ifname")
+            if assign_saved(assign_result):
+                ifname = assigned_ifname(assign_result)
                 result["ifname"] = ifname
 
                 # Reload the interface to apply IP configuration
@@ -13,23 +13,29 @@ Usage:
 """
 
 import argparse
+import contextlib
 import hashlib
 import ipaddress
 import json
 import os
 import socket
 import sys
-from dataclasses import dataclass
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
+from typing import NoReturn
 
 from .config import Config
+from .config_store import load_json
 
 
-def _check_unbound_dns(label: str = "") -> bool:
+def _check_unbound_dns(label: str = "", quiet: bool = False) -> bool:
     """Check if Unbound DNS at 10.0.0.1 is responding.
 
-    Debug instrumentation to track when Unbound breaks during zone-manager
-    operations. Returns True if DNS is working, False otherwise.
+    Returns True if DNS is working, False otherwise. ``quiet`` suppresses the
+    log lines (the health watcher reports transitions itself).
     """
     try:
         # Create a UDP socket for DNS query
@@ -58,21 +64,24 @@ def _check_unbound_dns(label: str = "") -> bool:
         # Check if we got a valid response (at least header + some data)
         if len(response) >= 12:
             prefix = f"[UNBOUND-CHECK {label}] " if label else "[UNBOUND-CHECK] "
-            info(f"{prefix}DNS OK - Unbound responding on 10.0.0.1:53")
+            if not quiet:
+                info(f"{prefix}DNS OK - Unbound responding on 10.0.0.1:53")
             return True
         return False
     except socket.timeout:
         prefix = f"[UNBOUND-CHECK {label}] " if label else "[UNBOUND-CHECK] "
-        warn(f"{prefix}DNS FAILED - Unbound NOT responding on 10.0.0.1:53 (timeout)")
+        if not quiet:
+            warn(f"{prefix}DNS FAILED - Unbound NOT responding on 10.0.0.1:53 (timeout)")
         return False
     except Exception as e:
         prefix = f"[UNBOUND-CHECK {label}] " if label else "[UNBOUND-CHECK] "
-        warn(f"{prefix}DNS FAILED - Unbound check error: {e}")
+        if not quiet:
+            warn(f"{prefix}DNS FAILED - Unbound check error: {e}")
         return False
 
 
 def _check_egress(host: str = "1.1.1.1", port: int = 443,
-                  timeout: float = 3.0, label: str = "") -> bool:
+                  timeout: float = 3.0, label: str = "", quiet: bool = False) -> bool:
     """Check control-plane egress: can we open a TCP connection to host:port?
 
     Detects when a firewall mutation has broken outbound connectivity (e.g. a
@@ -82,14 +91,56 @@ def _check_egress(host: str = "1.1.1.1", port: int = 443,
     prefix = f"[EGRESS-CHECK {label}] " if label else "[EGRESS-CHECK] "
     try:
         with socket.create_connection((host, port), timeout=timeout):
-            info(f"{prefix}egress OK - TCP {host}:{port} reachable")
+            if not quiet:
+                info(f"{prefix}egress OK - TCP {host}:{port} reachable")
             return True
     except Exception as e:
-        warn(f"{prefix}egress FAILED - cannot reach {host}:{port}: {e}")
+        if not quiet:
+            warn(f"{prefix}egress FAILED - cannot reach {host}:{port}: {e}")
         return False
 
 
-def preflight_checks(skip_egress: bool = False) -> bool:
+def _check_api(config: Config, timeout: float = 3.0, label: str = "",
+               quiet: bool = False) -> bool:
+    """Check that the OPNsense API port accepts TCP connections."""
+    prefix = f"[API-CHECK {label}] " if label else "[API-CHECK] "
+    try:
+        port = config.resolve_port()
+        with socket.create_connection((config.firewall, port), timeout=timeout):
+            if not quiet:
+                info(f"{prefix}API OK - {config.firewall}:{port} reachable")
+            return True
+    except Exception as e:
+        if not quiet:
+            warn(f"{prefix}API FAILED - cannot reach {config.firewall}: {e}")
+        return False
+
+
+def health_probes(
+    label: str = "",
+    skip_egress: bool = False,
+    config: Config | None = None,
+    quiet: bool = False,
+) -> dict[str, Callable[[], bool]]:
+    """The control-plane probes for the #307 gates: dns, egress and api.
+
+    ``egress`` is left out with skip_egress, ``api`` when there is no config.
+    """
+    probes: dict[str, Callable[[], bool]] = {
+        "dns": lambda: _check_unbound_dns(label, quiet=quiet),
+    }
+    if not skip_egress:
+        probes["egress"] = lambda: _check_egress(label=label, quiet=quiet)
+    if config is not None:
+        probes["api"] = lambda: _check_api(config, label=label, quiet=quiet)
+    return probes
+
+
+def preflight_checks(
+    skip_egress: bool = False,
+    config: Config | None = None,
+    metrics_file: str | None = None,
+) -> bool:
     """Probe control-plane health BEFORE any mutating zone operation (#307).
 
     Verifies Unbound DNS (10.0.0.1:53) and, unless skipped, control-plane egress
@@ -97,9 +148,15 @@ def preflight_checks(skip_egress: bool = False) -> bool:
     Returns True if healthy. The caller should abort --execute on False: mutating
     an already-degraded firewall risks leaving DNS unrecoverable, and recovery
     SSH needs name resolution that would no longer work (UNBOUND-DNSBL-PYTHON).
+    With a config the OPNsense API port is probed too. The probes run
+    concurrently; latencies go to ``metrics_file`` (JSON lines) if given.
     """
-    dns_ok = _check_unbound_dns("PRE-FLIGHT")
-    egress_ok = True if skip_egress else _check_egress(label="PRE-FLIGHT")
+    results = run_health_probes(
+        health_probes("PRE-FLIGHT", skip_egress, config), "PRE-FLIGHT", metrics_file,
+    )
+    dns_ok = results["dns"].ok
+    egress_ok = results["egress"].ok if "egress" in results else True
+    api_ok = results["api"].ok if "api" in results else True
     if not dns_ok:
         error("Pre-flight: Unbound DNS (10.0.0.1:53) is DOWN — refusing to mutate "
               "(a zone change could make DNS unrecoverable). Restore DNS first, or "
@@ -107,42 +164,56 @@ def preflight_checks(skip_egress: bool = False) -> bool:
     if not egress_ok:
         error("Pre-flight: control-plane egress (1.1.1.1:443) FAILED — refusing to "
               "mutate. Override with --skip-egress-check (air-gapped) or --skip-preflight.")
-    return dns_ok and egress_ok
+    if not api_ok:
+        error("Pre-flight: OPNsense API is unreachable — refusing to start a "
+              "half-applied run.")
+    return dns_ok and egress_ok and api_ok
 
 
-def postflight_checks(skip_egress: bool = False) -> bool:
+def postflight_checks(
+    skip_egress: bool = False,
+    config: Config | None = None,
+    metrics_file: str | None = None,
+) -> bool:
     """Probe control-plane health AFTER zone mutations (#307).
 
-    Same IP-literal probes as preflight. Returns True if still healthy; the caller
+    Same concurrent probes as preflight. Returns True if still healthy; the caller
     exits non-zero on False so CI/CD stops before a degraded firewall is shipped.
     """
-    dns_ok = _check_unbound_dns("POST-FLIGHT")
-    egress_ok = True if skip_egress else _check_egress(label="POST-FLIGHT")
+    results = run_health_probes(
+        health_probes("POST-FLIGHT", skip_egress, config), "POST-FLIGHT", metrics_file,
+    )
+    dns_ok = results["dns"].ok
+    egress_ok = results["egress"].ok if "egress" in results else True
+    api_ok = results["api"].ok if "api" in results else True
     if not dns_ok:
         error("Post-flight: Unbound DNS (10.0.0.1:53) is DOWN after zone changes — "
               "DNS may be unrecoverable. Recover via the firewall's mgmt IP "
               "(10.0.0.1), NOT via name resolution.")
     if not egress_ok:
         error("Post-flight: control-plane egress (1.1.1.1:443) FAILED after zone changes.")
-    return dns_ok and egress_ok
+    if not api_ok:
+        error("Post-flight: OPNsense API is unreachable after zone changes.")
+    return dns_ok and egress_ok and api_ok
 
 
 from .dhcp_manager import DhcpManager, DhcpRange
 from .firewall_manager import FirewallManager, FirewallRule, FirewallRuleInfo, Protocol, RuleAction
+from .health import HealthWatcher, run_health_probes
 from .log import debug, error, info, warn
-from .vlan_manager import Vlan, VlanManager
-
-# Modules whose JSON files exist in the config directory but are NOT consumer
-# modules — never apply per-module firewall validation to these.
-_NON_MODULE_STEMS: frozenset[str] = frozenset(
-    {"configuration", "firewall", "zones", "aliases",
-     "sequence-map", "module-fields"}
-)
+from .module_corpus import DEFAULT_LOAD_WORKERS, ModuleCorpus, ModuleDoc, discover_module_files
+from .vlan_manager import ReloadError, Vlan, VlanManager, assign_saved, assigned_ifname
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Zone:
-    """Represents a TAPPaaS network zone."""
+    """Represents a TAPPaaS network zone.
+
+    Zones are immutable. The state flags, network, gateway and DHCP addresses
+    are derived once in ``__post_init__``; the properties below only read
+    them back, so firewall planning over many zones × access-to targets does
+    not re-parse the network on every access.
+    """
 
     name: str
     zone_type: str
@@ -153,12 +224,37 @@ class Zone:
     ip_network: str
     bridge: str
     description: str
-    access_to: list[str]
-    pinhole_allowed_from: list[str]
+    access_to: tuple[str, ...]
+    pinhole_allowed_from: tuple[str, ...]
     ssid: str | None = None
     dhcp_start_offset: int = 50
     dhcp_end_offset: int = 250
 
+    _state: str = field(init=False, repr=False, compare=False)
+    _network: ipaddress.IPv4Network | None = field(init=False, repr=False, compare=False)
+    _gateway_ip: str = field(init=False, repr=False, compare=False)
+    _dhcp_start: str = field(init=False, repr=False, compare=False)
+    _dhcp_end: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        set_ = object.__setattr__
+        set_(self, "access_to", tuple(self.access_to or ()))
+        set_(self, "pinhole_allowed_from", tuple(self.pinhole_allowed_from or ()))
+        set_(self, "_state", self.state.lower())
+        try:
+            network = ipaddress.IPv4Network(self.ip_network, strict=False)
+        except ValueError:
+            # Malformed or empty ip: keep the zone; `network` raises on access.
+            set_(self, "_network", None)
+            set_(self, "_gateway_ip", "")
+            set_(self, "_dhcp_start", "")
+            set_(self, "_dhcp_end", "")
+            return
+        set_(self, "_network", network)
+        set_(self, "_gateway_ip", str(next(iter(network.hosts()), network.network_address)))
+        set_(self, "_dhcp_start", str(network.network_address + self.dhcp_start_offset))
+        set_(self, "_dhcp_end", str(network.network_address + self.dhcp_end_offset))
+
     @classmethod
     def from_json(cls, name: str, data: dict) -> "Zone":
         """Create a Zone from JSON data."""
@@ -182,17 +278,17 @@ class Zone:
     @property
     def is_enabled(self) -> bool:
         """Check if zone is enabled (Active or Mandatory)."""
-        return self.state.lower() in ("active", "mandatory", "manadatory")
+        return self._state in ("active", "mandatory", "manadatory")
 
     @property
     def is_manual(self) -> bool:
         """Check if zone is manually managed (neither created nor removed)."""
-        return self.state.lower() == "manual"
+        return self._state == "manual"
 
     @property
     def is_inactive(self) -> bool:
         """Check if zone is inactive (defined but not managed)."""
-        return self.state.lower() == "inactive"
+        return self._state == "inactive"
 
     @property
     def needs_vlan(self) -> bool:
@@ -202,24 +298,24 @@ class Zone:
     @property
     def network(self) -> ipaddress.IPv4Network:
         """Get the IP network as an IPv4Network object."""
-        return ipaddress.IPv4Network(self.ip_network, strict=False)
+        if self._network is None:
+            return ipaddress.IPv4Network(self.ip_network, strict=False)  # raises
+        return self._network
 
     @property
     def gateway_ip(self) -> str:
         """Get the gateway IP (first usable address, typically .1)."""
-        return str(list(self.network.hosts())[0])
+        return self._gateway_ip or str(self.network)
 
     @property
     def dhcp_start(self) -> str:
         """Get DHCP range start IP (default .50, configurable via DHCP-start)."""
-        network = self.network
-        return str(network.network_address + self.dhcp_start_offset)
+        return self._dhcp_start or str(self.network)
 
     @property
     def dhcp_end(self) -> str:
         """Get DHCP range end IP (default .250, configurable via DHCP-end)."""
-        network = self.network
-        return str(network.network_address + self.dhcp_end_offset)
+        return self._dhcp_end or str(self.network)
 
     @property
     def domain(self) -> str:
@@ -237,6 +333,45 @@ class Zone:
         return f"{self.name} DHCP"
 
 
+class ZoneIndex:
+    """Read-only lookups over one list of zones, built once.
+
+    Holds the category lists behind the ``ZoneManager.get_*_zones`` accessors
+    and maps by name (case-insensitive, first definition wins), VLAN tag,
+    bridge and physical parent interface.
+    """
+
+    __slots__ = (
+        "zones", "by_name", "by_tag", "by_bridge", "by_interface",
+        "enabled", "disabled", "manual", "vlan", "disabled_vlan", "firewall",
+    )
+
+    def __init__(self, zones: Iterable[Zone], interface_for_bridge: Callable[[str], str]):
+        self.zones: tuple[Zone, ...] = tuple(zones)
+        self.by_name: dict[str, Zone] = {}
+        self.by_tag: dict[int, tuple[Zone, ...]] = {}
+        self.by_bridge: dict[str, tuple[Zone, ...]] = {}
+        self.by_interface: dict[str, tuple[Zone, ...]] = {}
+        by_tag: dict[int, list[Zone]] = {}
+        by_bridge: dict[str, list[Zone]] = {}
+        by_interface: dict[str, list[Zone]] = {}
+        for zone in self.zones:
+            self.by_name.setdefault(zone.name.lower(), zone)
+            by_tag.setdefault(zone.vlan_tag, []).append(zone)
+            by_bridge.setdefault(zone.bridge.lower(), []).append(zone)
+            by_interface.setdefault(interface_for_bridge(zone.bridge), []).append(zone)
+        for target, source in ((self.by_tag, by_tag), (self.by_bridge, by_bridge),
+                               (self.by_interface, by_interface)):
+            target.update((k, tuple(v)) for k, v in source.items())
+
+        self.enabled = tuple(z for z in self.zones if z.is_enabled)
+        self.disabled = tuple(z for z in self.zones if not z.is_enabled and not z.is_manual)
+        self.manual = tuple(z for z in self.zones if z.is_manual)
+        self.vlan = tuple(z for z in self.enabled if z.needs_vlan)
+        self.disabled_vlan = tuple(z for z in self.disabled if z.needs_vlan)
+        self.firewall = tuple(z for z in self.enabled if z.access_to)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # pinhole-allowed-from validator (issue #163)
 #
@@ -260,98 +395,11 @@ class ValidationMessage:
     text: str
 
 
-def discover_module_files(modules_dir: Path) -> list[Path]:
-    """Return module.json file paths from `modules_dir`, sorted by name.
-
-    Skips well-known non-module JSON files (configuration.json, zones.json,
-    firewall.json, etc.) and `.orig` backup files.
-    """
-    if not modules_dir.is_dir():
-        return []
-    return sorted(
-        p for p in modules_dir.glob("*.json")
-        if p.stem not in _NON_MODULE_STEMS and not p.name.endswith(".orig")
-    )
-
-
-def _find_field_line(text: str, search: str) -> int:
-    """Best-effort 1-based line lookup for a substring; returns 1 if not found."""
-    for i, line in enumerate(text.splitlines(), start=1):
-        if search in line:
-            return i
-    return 1
-
-
-def _find_ingress_line(text: str, idx: int, field_value: str | None = None) -> int:
-    """Locate the line of the idx-th ingress entry in raw module.json text.
-
-    Walks lines after `"ingress"` and counts opening `{` braces. When
-    `field_value` is supplied we additionally try to find a line containing
-    `"<field_value>"` within the matched entry; falls back to the entry's
-    opening line. Best-effort — meant to give an operator a clickable line
-    reference, not perfect AST-level positions.
-    """
-    lines = text.splitlines()
-    in_ingress = False
-    bracket_depth = 0
-    entry_open_line: int | None = None
-    seen_entry = -1
-    for i, line in enumerate(lines, start=1):
-        stripped = line.strip()
-        if not in_ingress:
-            if '"ingress"' in line:
-                in_ingress = True
-            continue
-        if not entry_open_line and "{" in stripped and bracket_depth == 0:
-            seen_entry += 1
-            entry_open_line = i
-            bracket_depth = 1
-            # Honour fields on the same line (e.g. inline brace)
-            if "}" in stripped:
-                if field_value and f'"{field_value}"' in line and seen_entry == idx:
-                    return i
-                bracket_depth = 0
-                if seen_entry == idx:
-                    return entry_open_line
-                entry_open_line = None
-            continue
-        if entry_open_line:
-            bracket_depth += stripped.count("{") - stripped.count("}")
-            if seen_entry == idx and field_value and f'"{field_value}"' in line:
-                return i
-            if bracket_depth <= 0:
-                if seen_entry == idx:
-                    return entry_open_line
-                entry_open_line = None
-                bracket_depth = 0
-        # End of ingress array — stop walking
-        if in_ingress and entry_open_line is None and stripped.startswith("]"):
-            break
-    return entry_open_line or 1
-
-
-def _load_pinhole_ports(provider_location: str, service: str) -> list[dict] | None:
-    """Mirror of rules_manager.load_pinhole_ports (kept local to avoid a circular import).
-
-    Returns the ports list, or None when the provider has no pinhole.json for
-    that service (which is the normal case for most services).
-    """
-    if not provider_location:
-        return None
-    path = Path(provider_location) / "services" / service / "pinhole.json"
-    if not path.is_file():
-        return None
-    try:
-        data = json.loads(path.read_text())
-    except Exception:
-        return None
-    ports = data.get("ports", []) or []
-    return ports if isinstance(ports, list) else None
-
-
 def validate_pinhole_allowed_from(
     zones: dict[str, "Zone"],
     modules_dir: Path,
+    corpus: ModuleCorpus | None = None,
+    workers: int = DEFAULT_LOAD_WORKERS,
 ) -> tuple[list[ValidationMessage], list[ValidationMessage]]:
     """Cross-check every module's ingress entries against zone policy.
 
@@ -364,186 +412,190 @@ def validate_pinhole_allowed_from(
     `ingress` not an array, ingress entry without a `from` field, `from`
     references a non-existent peer or zone, …).
 
+    Modules are parsed once into a :class:`ModuleCorpus` (pass one in to
+    reuse it) and validated in parallel; findings keep file order.
+
     By contract: errors → CLI exit code 2; warnings alone → exit 0.
     """
+    if corpus is None:
+        corpus = ModuleCorpus(modules_dir, workers=workers)
     warnings: list[ValidationMessage] = []
     errors: list[ValidationMessage] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for mod_warnings, mod_errors in pool.map(
+            lambda doc: _validate_module(doc, zones, corpus), corpus,
+        ):
+            warnings.extend(mod_warnings)
+            errors.extend(mod_errors)
+    return warnings, errors
 
-    for mod_file in discover_module_files(modules_dir):
-        try:
-            raw = mod_file.read_text()
-            data = json.loads(raw)
-        except json.JSONDecodeError as e:
-            errors.append(ValidationMessage(
-                severity="error",
-                module=mod_file.stem,
-                file_path=str(mod_file),
-                line=getattr(e, "lineno", 1) or 1,
-                text=f"invalid JSON: {e.msg}",
-            ))
-            continue
-        except OSError as e:
+
+def _validate_module(
+    doc: ModuleDoc,
+    zones: dict[str, "Zone"],
+    corpus: ModuleCorpus,
+) -> tuple[list[ValidationMessage], list[ValidationMessage]]:
+    """Findings for one module file; see :func:`validate_pinhole_allowed_from`."""
+    warnings: list[ValidationMessage] = []
+    errors: list[ValidationMessage] = []
+    file_path = str(doc.path)
+
+    if doc.error:
+        errors.append(ValidationMessage(
+            severity="error",
+            module=doc.stem,
+            file_path=file_path,
+            line=doc.error_line,
+            text=doc.error,
+        ))
+        return warnings, errors
+    data = doc.data
+    if not isinstance(data, dict):
+        errors.append(ValidationMessage(
+            severity="error",
+            module=doc.stem,
+            file_path=file_path,
+            line=1,
+            text="top-level JSON value is not an object",
+        ))
+        return warnings, errors
+
+    vmname = data.get("vmname", doc.stem)
+    dest_zone_name = data.get("zone0", "")
+
+    # Manual ingress entries -----------------------------------------------------
+    ingress_entries = data.get("ingress", []) or []
+    if not isinstance(ingress_entries, list):
+        errors.append(ValidationMessage(
+            severity="error",
+            module=vmname,
+            file_path=file_path,
+            line=doc.line("ingress"),
+            text="'ingress' is not an array",
+        ))
+        ingress_entries = []
+
+    for idx, entry in enumerate(ingress_entries):
+        if not isinstance(entry, dict):
             errors.append(ValidationMessage(
                 severity="error",
-                module=mod_file.stem,
-                file_path=str(mod_file),
-                line=1,
-                text=f"cannot read: {e}",
+                module=vmname,
+                file_path=file_path,
+                line=doc.line("ingress", idx),
+                text=f"ingress[{idx}] is not an object",
             ))
             continue
-        if not isinstance(data, dict):
+        from_value = entry.get("from")
+        if not isinstance(from_value, str) or not from_value:
             errors.append(ValidationMessage(
                 severity="error",
-                module=mod_file.stem,
-                file_path=str(mod_file),
-                line=1,
-                text="top-level JSON value is not an object",
+                module=vmname,
+                file_path=file_path,
+                line=doc.line("ingress", idx),
+                text=f"ingress[{idx}] missing required 'from' field",
             ))
             continue
 
-        vmname = data.get("vmname", mod_file.stem)
-        dest_zone_name = data.get("zone0", "")
-
-        # Manual ingress entries -------------------------------------------------
-        ingress_entries = data.get("ingress", []) or []
-        if not isinstance(ingress_entries, list):
-            errors.append(ValidationMessage(
-                severity="error",
-                module=vmname,
-                file_path=str(mod_file),
-                line=_find_field_line(raw, '"ingress"'),
-                text="'ingress' is not an array",
-            ))
-            ingress_entries = []
+        # 'internet' and alias references are out of scope for the pinhole
+        # policy gate.
+        if from_value == "internet" or from_value.startswith("alias:"):
+            continue
 
-        for idx, entry in enumerate(ingress_entries):
-            if not isinstance(entry, dict):
-                errors.append(ValidationMessage(
-                    severity="error",
-                    module=vmname,
-                    file_path=str(mod_file),
-                    line=_find_ingress_line(raw, idx),
-                    text=f"ingress[{idx}] is not an object",
-                ))
-                continue
-            from_value = entry.get("from")
-            if not isinstance(from_value, str) or not from_value:
+        # Resolve from_value to a source zone. It is either a zone name
+        # directly, or a peer module's vmname (in which case we look up
+        # that peer's zone0).
+        if from_value in zones:
+            src_zone_name = from_value
+        else:
+            if corpus.peer(from_value) is None:
                 errors.append(ValidationMessage(
                     severity="error",
                     module=vmname,
-                    file_path=str(mod_file),
-                    line=_find_ingress_line(raw, idx),
-                    text=f"ingress[{idx}] missing required 'from' field",
+                    file_path=file_path,
+                    line=doc.line("ingress", idx, "from"),
+                    text=(f"ingress[{idx}].from = '{from_value}' is not a "
+                          f"known zone, 'internet', alias:..., or peer "
+                          f"module on disk"),
                 ))
                 continue
-
-            # 'internet' and alias references are out of scope for the pinhole
-            # policy gate.
-            if from_value == "internet" or from_value.startswith("alias:"):
-                continue
-
-            # Resolve from_value to a source zone. It is either a zone name
-            # directly, or a peer module's vmname (in which case we look up
-            # that peer's zone0).
-            if from_value in zones:
-                src_zone_name = from_value
-            else:
-                peer_file = modules_dir / f"{from_value}.json"
-                if not peer_file.is_file():
-                    errors.append(ValidationMessage(
-                        severity="error",
-                        module=vmname,
-                        file_path=str(mod_file),
-                        line=_find_ingress_line(raw, idx, from_value),
-                        text=(f"ingress[{idx}].from = '{from_value}' is not a "
-                              f"known zone, 'internet', alias:..., or peer "
-                              f"module on disk"),
-                    ))
-                    continue
-                try:
-                    peer_data = json.loads(peer_file.read_text())
-                except Exception:
-                    continue
-                src_zone_name = peer_data.get("zone0", "") if isinstance(peer_data, dict) else ""
-
-            if not src_zone_name or not dest_zone_name:
+            peer_data = corpus.peer_data(from_value)
+            if peer_data is None:
                 continue
-            if src_zone_name == dest_zone_name:
-                continue  # intra-zone traffic doesn't need a pinhole
-            dest_zone = zones.get(dest_zone_name)
-            if dest_zone is None:
-                continue  # surfaced by other checks; not our job
-            if src_zone_name in dest_zone.pinhole_allowed_from:
-                continue  # policy permits — happy path
-
-            warnings.append(ValidationMessage(
-                severity="warning",
-                module=vmname,
-                file_path=str(mod_file),
-                line=_find_ingress_line(raw, idx, from_value),
-                text=(f"ingress[{idx}].from = '{from_value}' "
-                      f"(source zone '{src_zone_name}') would pinhole into "
-                      f"'{dest_zone_name}', but "
-                      f"'{dest_zone_name}'.pinhole-allowed-from = "
-                      f"{dest_zone.pinhole_allowed_from} — policy denies. "
-                      f"Add '{src_zone_name}' to "
-                      f"{dest_zone_name}.pinhole-allowed-from in zones.json, "
-                      f"or remove this entry."),
-            ))
+            src_zone_name = peer_data.get("zone0", "")
 
-        # Auto-pinholes from dependsOn (issue #173) ----------------------------
-        # If a module depends on `<provider>:<service>` and the provider ships
-        # a services/<service>/pinhole.json, the rules_manager will (or won't)
-        # emit a synthesised pinhole — same policy gate. Report violations
-        # here so the operator catches them before install time.
-        deps = data.get("dependsOn", []) or []
-        if not isinstance(deps, list):
+        if not src_zone_name or not dest_zone_name:
             continue
-        for dep in deps:
-            if not isinstance(dep, str) or ":" not in dep:
-                continue
-            provider_name, _, service = dep.partition(":")
-            provider_name = provider_name.strip()
-            service = service.strip()
-            if not provider_name or not service:
-                continue
-            peer_file = modules_dir / f"{provider_name}.json"
-            if not peer_file.is_file():
-                continue  # provider not installed yet; install-time will catch
-            try:
-                peer_data = json.loads(peer_file.read_text())
-            except Exception:
-                continue
-            if not isinstance(peer_data, dict):
-                continue
-            provider_location = peer_data.get("location", "")
-            ports = _load_pinhole_ports(provider_location, service)
-            if not ports:
-                continue
-            provider_zone_name = peer_data.get("zone0", "")
-            if not provider_zone_name or not dest_zone_name:
-                continue
-            if provider_zone_name == dest_zone_name:
-                continue  # intra-zone — no pinhole
-            provider_zone = zones.get(provider_zone_name)
-            if provider_zone is None:
-                continue
-            if dest_zone_name in provider_zone.access_to:
-                continue  # zone-level access-to already permits
-            if dest_zone_name in provider_zone.pinhole_allowed_from:
-                continue  # policy permits the auto-pinhole
-
-            warnings.append(ValidationMessage(
-                severity="warning",
-                module=vmname,
-                file_path=str(mod_file),
-                line=_find_field_line(raw, f'"{dep}"'),
-                text=(f"dependsOn '{dep}' would create an auto-pinhole from "
-                      f"'{dest_zone_name}' into '{provider_zone_name}', but "
-                      f"'{provider_zone_name}'.pinhole-allowed-from = "
-                      f"{provider_zone.pinhole_allowed_from} — policy denies. "
-                      f"Auto-pinhole will be silently skipped at install time."),
-            ))
+        if src_zone_name == dest_zone_name:
+            continue  # intra-zone traffic doesn't need a pinhole
+        dest_zone = zones.get(dest_zone_name)
+        if dest_zone is None:
+            continue  # surfaced by other checks; not our job
+        if src_zone_name in dest_zone.pinhole_allowed_from:
+            continue  # policy permits — happy path
+
+        warnings.append(ValidationMessage(
+            severity="warning",
+            module=vmname,
+            file_path=file_path,
+            line=doc.line("ingress", idx, "from"),
+            text=(f"ingress[{idx}].from = '{from_value}' "
+                  f"(source zone '{src_zone_name}') would pinhole into "
+                  f"'{dest_zone_name}', but "
+                  f"'{dest_zone_name}'.pinhole-allowed-from = "
+                  f"{dest_zone.pinhole_allowed_from} — policy denies. "
+                  f"Add '{src_zone_name}' to "
+                  f"{dest_zone_name}.pinhole-allowed-from in zones.json, "
+                  f"or remove this entry."),
+        ))
+
+    # Auto-pinholes from dependsOn (issue #173) --------------------------------
+    # If a module depends on `<provider>:<service>` and the provider ships
+    # a services/<service>/pinhole.json, the rules_manager will (or won't)
+    # emit a synthesised pinhole — same policy gate. Report violations
+    # here so the operator catches them before install time.
+    deps = data.get("dependsOn", []) or []
+    if not isinstance(deps, list):
+        return warnings, errors
+    for dep_idx, dep in enumerate(deps):
+        if not isinstance(dep, str) or ":" not in dep:
+            continue
+        provider_name, _, service = dep.partition(":")
+        provider_name = provider_name.strip()
+        service = service.strip()
+        if not provider_name or not service:
+            continue
+        # Provider not installed yet (install-time will catch) or unreadable
+        peer_data = corpus.peer_data(provider_name)
+        if peer_data is None:
+            continue
+        provider_location = peer_data.get("location", "")
+        ports = corpus.pinhole_ports(provider_location, service)
+        if not ports:
+            continue
+        provider_zone_name = peer_data.get("zone0", "")
+        if not provider_zone_name or not dest_zone_name:
+            continue
+        if provider_zone_name == dest_zone_name:
+            continue  # intra-zone — no pinhole
+        provider_zone = zones.get(provider_zone_name)
+        if provider_zone is None:
+            continue
+        if dest_zone_name in provider_zone.access_to:
+            continue  # zone-level access-to already permits
+        if dest_zone_name in provider_zone.pinhole_allowed_from:
+            continue  # policy permits the auto-pinhole
+
+        warnings.append(ValidationMessage(
+            severity="warning",
+            module=vmname,
+            file_path=file_path,
+            line=doc.line("dependsOn", dep_idx),
+            text=(f"dependsOn '{dep}' would create an auto-pinhole from "
+                  f"'{dest_zone_name}' into '{provider_zone_name}', but "
+                  f"'{provider_zone_name}'.pinhole-allowed-from = "
+                  f"{provider_zone.pinhole_allowed_from} — policy denies. "
+                  f"Auto-pinhole will be silently skipped at install time."),
+        ))
 
     return warnings, errors
 
@@ -568,6 +620,149 @@ def print_validation_report(
     info(f"  Validation summary: {len(errors)} error(s), {len(warnings)} warning(s)")
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Plan/apply model for configure_all
+#
+# configure_all used to run four independent steps, each opening its own
+# manager and re-listing VLANs, assignments, DHCP ranges and rules (and
+# get_zone_interface opened a VlanManager per zone). The plan phase now reads
+# live state ONCE into a ZoneSnapshot, diffs it against zones.json into an
+# ordered ZoneChange list, and the apply phase runs only the steps that have
+# changes — reusing the snapshot instead of re-reading. A no-op run is just the
+# snapshot reads.
+# ─────────────────────────────────────────────────────────────────────────────
+
+PLAN_STEPS = ("vlans", "dnsmasq", "dhcp", "firewall")
+
+
+@dataclass
+class ZoneSnapshot:
+    """Live OPNsense state relevant to zones, read once per plan."""
+
+    vlans: list[dict]
+    assigned: list[dict]
+    dhcp_ranges: list[dict]
+    dnsmasq_interfaces: list[str] | None      # None = could not be read
+    firewall_rules: list[FirewallRuleInfo] | None = None  # None = not read
+    timings_ms: dict[str, float] = field(default_factory=dict)  # per read
+
+    @property
+    def vlans_by_tag(self) -> dict[int, dict]:
+        return {int(v["tag"]): v for v in self.vlans}
+
+    @property
+    def vlans_by_description(self) -> dict[str, dict]:
+        return {v["description"]: v for v in self.vlans}
+
+    @property
+    def assigned_by_tag(self) -> dict[int, dict]:
+        return {int(v["vlan_tag"]): v for v in self.assigned if v.get("vlan_tag")}
+
+    @property
+    def ranges_by_description(self) -> dict[str, dict]:
+        return {r["description"]: r for r in self.dhcp_ranges}
+
+    @property
+    def rules_by_description(self) -> dict[str, FirewallRuleInfo]:
+        return {r.description: r for r in self.firewall_rules or []}
+
+
+@dataclass
+class ZoneChange:
+    """One write the apply phase has to make."""
+
+    step: str           # one of PLAN_STEPS
+    zone: str
+    action: str         # create | delete | update | rebind | rename_label | bind
+    detail: str = ""
+
+
+@dataclass
+class ZonePlan:
+    """Ordered desired-vs-actual diff for every configure_all step."""
+
+    snapshot: ZoneSnapshot
+    changes: list[ZoneChange] = field(default_factory=list)
+
+    @property
+    def is_noop(self) -> bool:
+        return not self.changes
+
+    def for_step(self, step: str) -> list[ZoneChange]:
+        return [c for c in self.changes if c.step == step]
+
+    def summary(self) -> dict[str, int]:
+        return {step: len(self.for_step(step)) for step in PLAN_STEPS}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Drift report (zone-manager --drift)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Exit codes of `zone-manager --drift`
+DRIFT_OK = 0
+DRIFT_FOUND = 1
+DRIFT_ERROR = 2     # live state could not be read
+
+DRIFT_KINDS = ("vlan", "label", "dnsmasq", "dhcp", "firewall_rule")
+
+# ZoneChange.action -> DriftItem.status
+_DRIFT_STATUS = {
+    "create": "missing",
+    "delete": "stale",
+    "update": "drift",
+    "rebind": "drift",
+    "rename_label": "drift",
+    "bind": "unbound",
+}
+
+
+@dataclass
+class DriftItem:
+    """Desired-vs-actual status of one object zone-manager manages."""
+
+    kind: str           # one of DRIFT_KINDS
+    zone: str           # "*" for the dnsmasq interface list
+    name: str           # zone name, or the rule description for firewall rules
+    status: str         # ok | missing | stale | drift | unbound | unknown
+    detail: str = ""
+
+
+@dataclass
+class DriftReport:
+    """Every managed object's status plus the time each phase took."""
+
+    items: list[DriftItem]
+    timings_ms: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def drifted(self) -> list[DriftItem]:
+        return [i for i in self.items if i.status not in ("ok", "unknown")]
+
+    @property
+    def unknown(self) -> list[DriftItem]:
+        """Objects whose live state could not be read."""
+        return [i for i in self.items if i.status == "unknown"]
+
+    @property
+    def exit_code(self) -> int:
+        if self.unknown:
+            return DRIFT_ERROR
+        return DRIFT_FOUND if self.drifted else DRIFT_OK
+
+    def to_dict(self) -> dict:
+        counts: dict[str, int] = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {
+            "drift": bool(self.drifted),
+            "exit_code": self.exit_code,
+            "counts": counts,
+            "timings_ms": self.timings_ms,
+            "objects": [asdict(i) for i in self.items],
+        }
+
+
 class ZoneManager:
     """Manager for configuring TAPPaaS zones on OPNsense."""
 
@@ -637,6 +832,7 @@ class ZoneManager:
         zones_file: str | Path,
         interface: str = "vtnet0",
         bridge_map: dict[str, str] | None = None,
+        workers: int = 1,
     ):
         """Initialize the zone manager.
 
@@ -645,12 +841,20 @@ class ZoneManager:
             zones_file: Path to zones.json file
             interface: Default physical interface for VLANs (default: vtnet0)
             bridge_map: Mapping of bridge names to physical interfaces
+            workers: Per-zone API calls run concurrently within a step
+                (default: 1, one call at a time)
         """
         self.config = config
         self.zones_file = Path(zones_file)
         self.interface = interface
         self.bridge_map = bridge_map or self.DEFAULT_BRIDGE_MAP.copy()
-        self.zones: list[Zone] = []
+        self.workers = max(1, workers)
+        self.zones = []
+        # Live state shared by the configure_* steps while configure_all runs a
+        # plan (None = each step reads what it needs itself).
+        self._snapshot: ZoneSnapshot | None = None
+        # Plan computed by the most recent configure_all call.
+        self.last_plan: ZonePlan | None = None
 
     def get_interface_for_bridge(self, bridge: str) -> str:
         """Get the physical interface for a bridge name.
@@ -670,8 +874,7 @@ class ZoneManager:
         if not self.zones_file.exists():
             raise FileNotFoundError(f"Zones file not found: {self.zones_file}")
 
-        with open(self.zones_file) as f:
-            data = json.load(f)
+        data = load_json(self.zones_file)
 
         # Keys beginning with '_' (e.g. _README) are documentation blocks, not
         # zones — skip them so they never become inert Zone objects.
@@ -682,37 +885,54 @@ class ZoneManager:
         ]
         return self.zones
 
+    @property
+    def zones(self) -> list[Zone]:
+        """The loaded zones. Assign a new list to replace them (re-indexes)."""
+        return self._zones
+
+    @zones.setter
+    def zones(self, zones: list[Zone]) -> None:
+        self._zones = zones
+        self._index: ZoneIndex | None = None
+
+    @property
+    def index(self) -> ZoneIndex:
+        """Lookups and category lists for the current zones (built on first use)."""
+        if self._index is None:
+            self._index = ZoneIndex(self._zones, self.get_interface_for_bridge)
+        return self._index
+
     def get_enabled_zones(self) -> list[Zone]:
         """Get all enabled zones."""
-        return [z for z in self.zones if z.is_enabled]
+        return list(self.index.enabled)
 
     def get_disabled_zones(self) -> list[Zone]:
         """Get all disabled zones (excludes manual zones)."""
-        return [z for z in self.zones if not z.is_enabled and not z.is_manual]
+        return list(self.index.disabled)
 
     def get_manual_zones(self) -> list[Zone]:
         """Get all manually managed zones."""
-        return [z for z in self.zones if z.is_manual]
+        return list(self.index.manual)
 
     def get_vlan_zones(self) -> list[Zone]:
         """Get enabled zones that need VLANs (tag > 0)."""
-        return [z for z in self.get_enabled_zones() if z.needs_vlan]
+        return list(self.index.vlan)
 
     def get_disabled_vlan_zones(self) -> list[Zone]:
         """Get disabled zones that have VLANs (tag > 0, excludes manual zones)."""
-        return [z for z in self.get_disabled_zones() if z.needs_vlan]
+        return list(self.index.disabled_vlan)
 
     def get_dhcp_zones(self) -> list[Zone]:
         """Get enabled zones that need DHCP (tag > 0, excludes untagged zones)."""
-        return [z for z in self.get_enabled_zones() if z.needs_vlan]
+        return list(self.index.vlan)
 
     def get_disabled_dhcp_zones(self) -> list[Zone]:
         """Get disabled zones that have DHCP (tag > 0, excludes manual and untagged zones)."""
-        return [z for z in self.get_disabled_zones() if z.needs_vlan]
+        return list(self.index.disabled_vlan)
 
     def get_firewall_zones(self) -> list[Zone]:
         """Get enabled zones that need firewall rules (have access-to defined)."""
-        return [z for z in self.get_enabled_zones() if z.access_to]
+        return list(self.index.firewall)
 
     def get_zone_by_name(self, name: str) -> Zone | None:
         """Find a zone by its name.
@@ -723,10 +943,19 @@ class ZoneManager:
         Returns:
             Zone if found, None otherwise
         """
-        for zone in self.zones:
-            if zone.name.lower() == name.lower():
-                return zone
-        return None
+        return self.index.by_name.get(name.lower())
+
+    def _for_each_zone(self, zones: list[Zone], fn: Callable[[Zone], dict]) -> dict[str, dict]:
+        """Run ``fn`` per zone, at most ``self.workers`` at a time.
+
+        Returns ``{zone name: fn(zone)}`` in input order once every call has
+        finished, so each use is a barrier before the next stage. ``fn``
+        reports its own errors in the returned dict.
+        """
+        if self.workers <= 1 or len(zones) <= 1:
+            return {zone.name: fn(zone) for zone in zones}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(zones))) as pool:
+            return dict(zip([zone.name for zone in zones], pool.map(fn, zones)))
 
     def get_zone_interface(self, zone: Zone) -> str | None:
         """Get the OPNsense interface identifier for a zone.
@@ -741,25 +970,52 @@ class ZoneManager:
             Interface identifier (e.g., 'lan', 'srv', 'opt1') or None if not found
         """
         if zone.needs_vlan:
-            # For VLAN zones, find the assigned interface by zone name
-            with VlanManager(self.config) as vlan_mgr:
-                assigned = vlan_mgr.get_assigned_vlans()
-                for v in assigned:
-                    # Check by VLAN tag or by interface description/name.
-                    # Normalise both sides — the OPNsense interfacesInfo endpoint
-                    # has been observed returning vlan_tag as either int or str
-                    # depending on version (issue #179).
-                    if str(v["vlan_tag"]) == str(zone.vlan_tag):
-                        return v["identifier"]
-                    # Also check if the interface label matches the zone name.
-                    # Post-#237 the SSOT is underscore-aligned so labels and
-                    # zone keys match directly with no transformation.
-                    if v.get("description", "").lower() == zone.name.lower():
-                        return v["identifier"]
+            return self._interface_from_assigned(zone, self._assigned_vlans())
+        # For untagged zones, use the bridge directly
+        return zone.bridge.lower()
+
+    @staticmethod
+    def _interface_from_assigned(zone: Zone, assigned: list[dict]) -> str | None:
+        """Find a VLAN zone's assigned interface identifier in an assignment list."""
+        for v in assigned:
+            # Check by VLAN tag or by interface description/name.
+            # Normalise both sides — the OPNsense interfacesInfo endpoint
+            # has been observed returning vlan_tag as either int or str
+            # depending on version (issue #179).
+            if str(v["vlan_tag"]) == str(zone.vlan_tag):
+                return v["identifier"]
+            # Also check if the interface label matches the zone name.
+            # Post-#237 the SSOT is underscore-aligned so labels and
+            # zone keys match directly with no transformation.
+            if v.get("description", "").lower() == zone.name.lower():
+                return v["identifier"]
+        return None
+
+    def _assigned_vlans(self) -> list[dict]:
+        """Assigned VLAN interfaces, from the active plan snapshot when there is one."""
+        if self._snapshot is not None:
+            return self._snapshot.assigned
+        with VlanManager(self.config) as vlan_mgr:
+            return vlan_mgr.get_assigned_vlans()
+
+    @staticmethod
+    def _dhcp_interface_for(zone: Zone, assigned: list[dict]) -> str | None:
+        """Interface identifier a zone's DHCP range should be bound to.
+
+        The bridge field may be 'lan', 'wan', or a logical name; OPNsense
+        dnsmasq accepts identifiers like 'lan'/'wan'/'opt1'.
+        """
+        if zone.needs_vlan:
+            # For VLAN zones, look up the assigned interface identifier.
+            for v in assigned:
+                # Normalise both sides — see issue #179.
+                if str(v["vlan_tag"]) == str(zone.vlan_tag):
+                    return v["identifier"]
             return None
-        else:
-            # For untagged zones, use the bridge directly
-            return zone.bridge.lower()
+        bridge_lower = zone.bridge.lower()
+        if bridge_lower in ("lan", "wan") or bridge_lower.startswith("opt"):
+            return zone.bridge
+        return None
 
     def get_destination_for_target(self, target: str) -> str:
         """Get the destination network for a firewall rule target.
@@ -838,6 +1094,7 @@ class ZoneManager:
                 ipv4_type="static",
                 ipv4_address=zone.gateway_ip,
                 ipv4_subnet=zone.network.prefixlen,
+                rollback=False,  # an existing interface: a failed flush must not drop it
             )
             new_id = res.get("ifname") if isinstance(res, dict) else None
             if new_id:
@@ -878,6 +1135,7 @@ class ZoneManager:
             Dictionary mapping zone names to results
         """
         results = {}
+        to_create: list[Zone] = []
         vlan_zones = self.get_vlan_zones()
         disabled_zones = self.get_disabled_vlan_zones()
         manual_zones = [z for z in self.get_manual_zones() if z.needs_vlan]
@@ -889,14 +1147,23 @@ class ZoneManager:
         debug(f"  Untagged zones (skipped, vlantag=0): {len(untagged_zones)}")
 
         with VlanManager(self.config) as manager:
-            # Get existing VLANs once for efficiency
-            existing_vlans = manager.list_vlans()
+            # Get existing VLANs once for efficiency (or reuse the plan snapshot)
+            if self._snapshot is not None:
+                existing_vlans = self._snapshot.vlans
+                assigned_vlans = self._snapshot.assigned
+            else:
+                existing_vlans = manager.list_vlans()
+                # Get assigned VLANs to check if we need to unassign before deleting
+                assigned_vlans = manager.get_assigned_vlans()
             # Convert tag to int for proper comparison with zone.vlan_tag (which is int)
             existing_tags = {int(v["tag"]): v for v in existing_vlans}
             existing_descriptions = {v["description"]: v for v in existing_vlans}
 
-            # Get assigned VLANs to check if we need to unassign before deleting
-            assigned_vlans = manager.get_assigned_vlans()
+            # Interface reloads from here on are queued and applied once at
+            # the end, so a multi-zone change disrupts traffic once.
+            if not check_mode:
+                manager.defer_reloads()
+
             # Convert vlan_tag to int for proper comparison
             assigned_by_tag = {int(v["vlan_tag"]) if isinstance(v["vlan_tag"], str) else v["vlan_tag"]: v for v in assigned_vlans if v.get("vlan_tag")}
 
@@ -1024,47 +1291,16 @@ class ZoneManager:
                                       f"drifted (desired '{desired_label}')")
                     continue
 
-                # Use the zone's bridge to determine the physical interface
-                vlan_interface = self.get_interface_for_bridge(zone.bridge)
-                vlan = Vlan(
-                    description=vlan_desc,
-                    tag=zone.vlan_tag,
-                    interface=vlan_interface,
-                )
-
-                # Calculate gateway IP and subnet for static assignment
-                gateway_ip = zone.gateway_ip
-                subnet_bits = zone.network.prefixlen
-                debug(f"  {zone.name}: Creating VLAN {zone.vlan_tag} on {vlan_interface} (bridge: {zone.bridge}, gateway: {gateway_ip}/{subnet_bits})")
-
+                debug(f"  {zone.name}: Creating VLAN {zone.vlan_tag} on "
+                      f"{self.get_interface_for_bridge(zone.bridge)} (bridge: {zone.bridge}, "
+                      f"gateway: {zone.gateway_ip}/{zone.network.prefixlen})")
                 if check_mode:
                     results[zone.name] = {"status": "would_create", "vlan": zone.vlan_tag}
                 else:
-                    # DEBUG: Check Unbound before VLAN creation
-                    _check_unbound_dns(f"BEFORE create_vlan {zone.name}")
-
-                    try:
-                        # Name the assigned interface after the zone, with
-                        # zone keys are already underscore-aligned with OPNsense
-                        # interface labels (#237). Also assign the gateway IP
-                        # statically.
-                        result = manager.create_vlan(
-                            vlan,
-                            check_mode=False,
-                            assign=assign,
-                            interface_name=zone.name,
-                            ipv4_type="static",
-                            ipv4_address=gateway_ip,
-                            ipv4_subnet=subnet_bits,
-                        )
-                        results[zone.name] = {"status": "created", "result": result}
-
-                        # DEBUG: Check Unbound after VLAN creation
-                        _check_unbound_dns(f"AFTER create_vlan {zone.name}")
-
-                    except Exception as e:
-                        results[zone.name] = {"status": "error", "error": str(e)}
-                        error(f"{zone.name}: {e}")
+                    to_create.append(zone)
+
+            if to_create:
+                results.update(self._create_vlans(manager, to_create, assign))
 
             # Report on manual zones (not created or deleted)
             for zone in manual_zones:
@@ -1081,19 +1317,114 @@ class ZoneManager:
             # controller already does this after each addItem; this extra call
             # catches drift where an interface exists in config but its kernel
             # IP fell out of sync (observed in the #237 verification after a
-            # configd restart). Cheap and idempotent.
+            # configd restart). Cheap and idempotent. It is the same
+            # reconfigure that applies the queued reloads, so both go out as
+            # one call.
             if not check_mode:
-                # DEBUG: Check Unbound before apply_vlan_settings
-                _check_unbound_dns("BEFORE apply_vlan_settings")
+                manager.apply_vlan_settings()
+                try:
+                    manager.flush_reloads()
+                except ReloadError as e:
+                    error(f"Applying VLAN interfaces: {e}")
+                    deleted = set(e.deleted_vlans)
+                    for name, entry in results.items():
+                        ifname = (entry.get("result") or {}).get("ifname")
+                        if ifname in e.rolled_back:
+                            results[name] = {"status": "error", "error": str(e)}
+                    for zone in to_create:
+                        if zone.vlan_description in deleted:
+                            results[zone.name] = {"status": "error", "error": str(e)}
 
+        return results
+
+    def _vlan_for(self, zone: Zone) -> Vlan:
+        """The VLAN device for a zone, on its bridge's physical interface."""
+        return Vlan(
+            description=zone.vlan_description,
+            tag=zone.vlan_tag,
+            interface=self.get_interface_for_bridge(zone.bridge),
+        )
+
+    def _create_vlans(
+        self, manager: VlanManager, zones: list[Zone], assign: bool
+    ) -> dict[str, dict]:
+        """Create (and by default assign) the VLANs for ``zones``.
+
+        The assigned interface is named after the zone — zone keys are already
+        underscore-aligned with OPNsense interface labels (#237) — and gets the
+        zone gateway IP statically.
+
+        With ``workers`` > 1 this runs as three stages with a barrier between
+        them: VLAN devices are created concurrently, interfaces are then
+        assigned one at a time (the assign endpoint hands out the next free
+        optN, so concurrent calls could race for it), and the assigned
+        interfaces are reloaded to bring up their IPs (queued for the single
+        apply at the end of :meth:`configure_vlans`). A zone that fails a stage
+        skips the later ones.
+        """
+        def failed(zone: Zone, e: Exception) -> dict:
+            error(f"{zone.name}: {e}")
+            return {"status": "error", "error": str(e)}
+
+        if self.workers <= 1:
+            results = {}
+            for zone in zones:
                 try:
-                    manager.apply_vlan_settings()
+                    result = manager.create_vlan(
+                        self._vlan_for(zone),
+                        check_mode=False,
+                        assign=assign,
+                        interface_name=zone.name,
+                        ipv4_type="static",
+                        ipv4_address=zone.gateway_ip,
+                        ipv4_subnet=zone.network.prefixlen,
+                    )
+                    results[zone.name] = {"status": "created", "result": result}
                 except Exception as e:
-                    debug(f"  apply_vlan_settings: {e}")
+                    results[zone.name] = failed(zone, e)
+            return results
+
+        def create_device(zone: Zone) -> dict:
+            try:
+                result = manager.create_vlan(self._vlan_for(zone), check_mode=False)
+            except Exception as e:
+                return failed(zone, e)
+            return {"status": "created", "result": result}
+
+        results = self._for_each_zone(zones, create_device)
+        if not assign:
+            return results
+
+        assigned: list[Zone] = []
+        for zone in zones:
+            if results[zone.name]["status"] != "created":
+                continue
+            result = results[zone.name]["result"]
+            try:
+                result["assign_result"] = manager.assign_interface(
+                    device=self._vlan_for(zone).device_name,
+                    description=zone.name,
+                    ipv4_type="static",
+                    ipv4_address=zone.gateway_ip,
+                    ipv4_subnet=zone.network.prefixlen,
+                )
+            except Exception as e:
+                results[zone.name] = failed(zone, e)
+                continue
+            if assign_saved(result["assign_result"]):
+                result["ifname"] = assigned_ifname(result["assign_result"])
+                if result["ifname"]:
+                    assigned.append(zone)
 
-                # DEBUG: Check Unbound after apply_vlan_settings
-                _check_unbound_dns("AFTER apply_vlan_settings")
+        def reload(zone: Zone) -> dict:
+            result = results[zone.name]["result"]
+            try:
+                result["reload_result"] = manager.reload_interface(result["ifname"])
+            except Exception as e:
+                return failed(zone, e)
+            return results[zone.name]
 
+        results.update(self._for_each_zone(assigned, reload))
         return results
 
     def configure_dhcp(self, check_mode: bool = True) -> dict[str, dict]:
@@ -1121,17 +1452,51 @@ class ZoneManager:
         debug(f"  Untagged zones (skipped, vlantag=0): {len(untagged_zones)}")
 
         with DhcpManager(self.config) as manager:
-            # Get existing DHCP ranges once for efficiency
-            existing_ranges = manager.list_ranges()
+            # Get existing DHCP ranges once for efficiency (or reuse the plan
+            # snapshot); assignments are read at most once, on first need.
+            if self._snapshot is not None:
+                existing_ranges = self._snapshot.dhcp_ranges
+            else:
+                existing_ranges = manager.list_ranges()
             existing_by_desc = {r["description"]: r for r in existing_ranges}
+            assigned: list[dict] | None = None
+
+            # Stage all create/delete changes (up to `workers` at a time),
+            # then reconfigure dnsmasq once.
+            to_delete: list[Zone] = []
+            to_create: dict[str, tuple[DhcpRange, bool, str]] = {}
 
-            # Stage all create/delete changes, then reconfigure dnsmasq once.
-            changed = False
+            def delete(zone: Zone) -> dict:
+                try:
+                    result = manager.delete_range(
+                        zone.dhcp_description, check_mode=False, reconfigure=False
+                    )
+                except Exception as e:
+                    error(f"{zone.name}: {e}")
+                    return {"status": "error", "error": str(e)}
+                return {"status": "deleted", "result": result}
+
+            def create(zone: Zone) -> dict:
+                dhcp_range, will_rebind, interface_info = to_create[zone.name]
+                try:
+                    result = manager.create_range(
+                        dhcp_range, check_mode=False, reconfigure=False
+                    )
+                except Exception as e:
+                    # Surface binding failures instead of silently
+                    # downgrading to an unbound range (the old fallback
+                    # masked issue #179).
+                    error(f"{zone.name}: {e}")
+                    return {"status": "error", "error": str(e)}
+                return {
+                    "status": "rebound" if will_rebind else "created",
+                    "interface": interface_info,
+                    "result": result,
+                }
 
             # First, delete DHCP ranges for disabled zones
             for zone in disabled_zones:
-                dhcp_desc = zone.dhcp_description
-                existing = existing_by_desc.get(dhcp_desc)
+                existing = existing_by_desc.get(zone.dhcp_description)
 
                 if existing:
                     debug(f"  {zone.name}: Deleting DHCP range (zone disabled)")
@@ -1141,15 +1506,7 @@ class ZoneManager:
                             "range": f"{zone.dhcp_start}-{zone.dhcp_end}",
                         }
                     else:
-                        try:
-                            result = manager.delete_range(
-                                dhcp_desc, check_mode=False, reconfigure=False
-                            )
-                            changed = True
-                            results[zone.name] = {"status": "deleted", "result": result}
-                        except Exception as e:
-                            results[zone.name] = {"status": "error", "error": str(e)}
-                            error(f"{zone.name}: {e}")
+                        to_delete.append(zone)
                 else:
                     debug(f"  {zone.name}: DHCP range not found (nothing to delete)")
                     results[zone.name] = {"status": "not_found"}
@@ -1161,22 +1518,9 @@ class ZoneManager:
                 # Determine the interface for DHCP first — it is needed both to
                 # create the range and to detect an existing-but-unbound range
                 # (the issue #179 failure mode) that must be rebound.
-                # The bridge field may be 'lan', 'wan', or a logical name;
-                # OPNsense dnsmasq accepts identifiers like 'lan'/'wan'/'opt1'.
-                dhcp_interface = None
-                if zone.needs_vlan:
-                    # For VLAN zones, look up the assigned interface identifier.
-                    with VlanManager(self.config) as vlan_mgr:
-                        assigned = vlan_mgr.get_assigned_vlans()
-                        for v in assigned:
-                            # Normalise both sides — see issue #179.
-                            if str(v["vlan_tag"]) == str(zone.vlan_tag):
-                                dhcp_interface = v["identifier"]
-                                break
-                else:
-                    bridge_lower = zone.bridge.lower()
-                    if bridge_lower in ("lan", "wan") or bridge_lower.startswith("opt"):
-                        dhcp_interface = zone.bridge
+                if zone.needs_vlan and assigned is None:
+                    assigned = self._assigned_vlans()
+                dhcp_interface = self._dhcp_interface_for(zone, assigned or [])
 
                 existing = existing_by_desc.get(dhcp_desc)
                 existing_iface = (existing.get("interface") or "") if existing else ""
@@ -1219,35 +1563,22 @@ class ZoneManager:
                         "interface": interface_info,
                     }
                 else:
-                    try:
-                        # Stage the change; reconfigure once after the loop.
-                        result = manager.create_range(
-                            dhcp_range, check_mode=False, reconfigure=False
-                        )
-                        changed = True
-                        results[zone.name] = {
-                            "status": "rebound" if will_rebind else "created",
-                            "interface": interface_info,
-                            "result": result,
-                        }
-                    except Exception as e:
-                        # Surface binding failures instead of silently
-                        # downgrading to an unbound range (the old fallback
-                        # masked issue #179).
-                        results[zone.name] = {"status": "error", "error": str(e)}
-                        error(f"{zone.name}: {e}")
+                    to_create[zone.name] = (dhcp_range, will_rebind, interface_info)
+
+            # Deletes and creates are independent per zone; the reconfigure
+            # below waits for all of them.
+            staged = self._for_each_zone(to_delete, delete)
+            staged.update(self._for_each_zone(
+                [z for z in dhcp_zones if z.name in to_create], create
+            ))
+            results.update(staged)
+            changed = any(r["status"] != "error" for r in staged.values())
 
             # Apply all staged DHCP changes in a single reconfigure.
             if changed and not check_mode:
-                # DEBUG: Check Unbound before dnsmasq reconfigure
-                _check_unbound_dns("BEFORE dnsmasq reconfigure")
-
                 debug("  Reconfiguring dnsmasq to apply DHCP changes...")
                 manager.reconfigure()
 
-                # DEBUG: Check Unbound after dnsmasq reconfigure
-                _check_unbound_dns("AFTER dnsmasq reconfigure")
-
             # Report on manual zones (not created or deleted)
             for zone in manual_zones:
                 debug(f"  {zone.name}: DHCP skipped (manual zone)")
@@ -1266,6 +1597,27 @@ class ZoneManager:
 
         return results
 
+    @staticmethod
+    def _is_drifted(
+        existing: FirewallRuleInfo,
+        interface: str,
+        source_net: str,
+        destination_net: str,
+        action_str: str,
+        sequence: int,
+        destination_port: str | None,
+    ) -> bool:
+        """True if a live rule differs from the desired match fields or sequence."""
+        seq_drift = existing.sequence is None or int(existing.sequence) != sequence
+        return (
+            existing.interface != interface
+            or (existing.action or "").lower() != action_str
+            or existing.destination_net != destination_net
+            or existing.source_net != source_net
+            or (existing.destination_port or None) != destination_port
+            or seq_drift
+        )
+
     def _create_or_skip_rule(
         self,
         manager: FirewallManager,
@@ -1313,14 +1665,9 @@ class ZoneManager:
             # sequence (e.g. carried over from the old vlan*10 numbering, or
             # from before an access-to zone was added) must be renumbered or it
             # collides with / mis-orders against the other zone rules (#243).
-            seq_drift = existing.sequence is None or int(existing.sequence) != sequence
-            drifted = (
-                existing.interface != interface
-                or (existing.action or "").lower() != action_str
-                or existing.destination_net != destination_net
-                or existing.source_net != source_net
-                or (existing.destination_port or None) != destination_port
-                or seq_drift
+            drifted = self._is_drifted(
+                existing, interface, source_net, destination_net,
+                action_str, sequence, destination_port,
             )
             if not drifted:
                 debug(f"    {action_str}: {description} (exists, in sync, skipping)")
@@ -1392,6 +1739,22 @@ class ZoneManager:
                 })
                 error(f"Firewall rule '{description}': {e}")
 
+    def _reconcile_rule(
+        self,
+        manager: FirewallManager,
+        existing_by_desc: dict[str, FirewallRuleInfo],
+        rule: FirewallRule,
+        check_mode: bool,
+        results_list: list[dict],
+    ) -> None:
+        """:meth:`_create_or_skip_rule` for a rule built by :meth:`zone_rules_for`."""
+        self._create_or_skip_rule(
+            manager, existing_by_desc,
+            rule.description, rule.interface, rule.source_net, rule.destination_net,
+            rule.action, rule.sequence, check_mode, results_list,
+            protocol=rule.protocol, destination_port=rule.destination_port,
+        )
+
     def configure_firewall_rules(self, check_mode: bool = True) -> dict[str, dict]:
         """Configure firewall rules based on zone access-to definitions.
 
@@ -1437,8 +1800,11 @@ class ZoneManager:
         debug(f"  Manual zones (skipped): {len(manual_zones)}")
 
         with FirewallManager(self.config) as manager:
-            # Get existing rules for comparison
-            existing_rules = manager.list_rules()
+            # Get existing rules for comparison (or reuse the plan snapshot)
+            if self._snapshot is not None and self._snapshot.firewall_rules is not None:
+                existing_rules = self._snapshot.firewall_rules
+            else:
+                existing_rules = manager.list_rules()
             existing_by_desc = {r.description: r for r in existing_rules}
 
             # Delete firewall rules for disabled zones
@@ -1473,86 +1839,11 @@ class ZoneManager:
                     continue
 
                 debug(f"  {zone.name} (interface: {zone_interface}):")
-
-                # Categorise targets
-                targets_lower = [t.lower() for t in zone.access_to]
-                has_all = "all" in targets_lower
-                has_internet = "internet" in targets_lower
-                specific_targets = [t for t in zone.access_to if t.lower() not in ("all", "internet")]
-
-                # Deterministic band-5 base for this zone (#243). Intra-zone
-                # offsets are FIXED so adding an access-to zone never shifts the
-                # block/internet rules into a colliding sequence.
-                base = self._zone_rule_base(zone)
-
-                if has_all:
-                    # Full access — single pass rule to any
-                    self._create_or_skip_rule(
-                        manager, existing_by_desc,
-                        f"Zone {zone.name} -> all",
-                        zone_interface, zone.ip_network, "any",
-                        RuleAction.PASS, base + self.ZONE_RULE_GATEWAY_OFFSET,
-                        check_mode, zone_results,
-                    )
-                else:
-                    # Step 1: Allow access to own gateway (DNS, NTP)
-                    self._create_or_skip_rule(
-                        manager, existing_by_desc,
-                        f"Zone {zone.name} -> gateway",
-                        zone_interface, zone.ip_network, f"{zone.gateway_ip}/32",
-                        RuleAction.PASS, base + self.ZONE_RULE_GATEWAY_OFFSET,
-                        check_mode, zone_results,
+                for rule in self.zone_rules_for(zone, zone_interface):
+                    self._reconcile_rule(
+                        manager, existing_by_desc, rule, check_mode, zone_results
                     )
 
-                    # Step 2: Allow access to each explicitly named zone. These
-                    # occupy fixed offsets base+1 .. base+89, so the block band
-                    # below stays put regardless of how many zones are listed.
-                    if len(specific_targets) > self.ZONE_RULE_PASS_MAX:
-                        error(
-                            f"{zone.name}: {len(specific_targets)} access-to zones "
-                            f"exceeds the {self.ZONE_RULE_PASS_MAX}-slot pass band; "
-                            f"rules beyond that would collide with the block band"
-                        )
-                    for offset, target in enumerate(
-                        specific_targets[: self.ZONE_RULE_PASS_MAX]
-                    ):
-                        target_zone = self.get_zone_by_name(target)
-                        if target_zone:
-                            dest = target_zone.ip_network
-                        else:
-                            warn(f"target zone '{target}' not found in zones.json, using name as alias")
-                            dest = target
-                        self._create_or_skip_rule(
-                            manager, existing_by_desc,
-                            f"Zone {zone.name} -> {target}",
-                            zone_interface, zone.ip_network, dest,
-                            RuleAction.PASS, base + self.ZONE_RULE_PASS_OFFSET + offset,
-                            check_mode, zone_results,
-                        )
-
-                    if has_internet:
-                        # Step 3: Block RFC1918 to prevent reaching unlisted internal
-                        # zones — fixed offsets base+90/91/92, always trailing the
-                        # access-to passes above.
-                        for offset, (network, label) in enumerate(self.RFC1918_NETWORKS):
-                            self._create_or_skip_rule(
-                                manager, existing_by_desc,
-                                f"Zone {zone.name} block {label}",
-                                zone_interface, zone.ip_network, network,
-                                RuleAction.BLOCK,
-                                base + self.ZONE_RULE_BLOCK_OFFSET + offset,
-                                check_mode, zone_results,
-                            )
-
-                        # Step 4: Allow internet (pass to any — only non-RFC1918 reaches here)
-                        self._create_or_skip_rule(
-                            manager, existing_by_desc,
-                            f"Zone {zone.name} -> internet",
-                            zone_interface, zone.ip_network, "any",
-                            RuleAction.PASS, base + self.ZONE_RULE_INTERNET_OFFSET,
-                            check_mode, zone_results,
-                        )
-
                 results[zone.name] = {
                     "status": "processed",
                     "interface": zone_interface,
@@ -1619,46 +1910,187 @@ class ZoneManager:
         disabled-zone cleanup (which deletes by the ``Zone <name> `` prefix) tears
         them down when a zone is disabled.
         """
+        caddy_dest = self._caddy_destination()
+        if caddy_dest is None:
+            return
+        for zone in self._caddy_candidate_zones():
+            zone_interface = self.get_zone_interface(zone)
+            if not zone_interface:
+                continue
+            zone_results = results.setdefault(
+                zone.name, {"status": "processed", "rules": []}
+            ).setdefault("rules", [])
+            for rule in self.caddy_rules_for(zone, zone_interface, caddy_dest):
+                self._reconcile_rule(
+                    manager, existing_by_desc, rule, check_mode, zone_results
+                )
+
+    # ── Desired rule set (pure, no API calls) ────────────────────────────────
+
+    def zone_rules_for(self, zone: Zone, zone_interface: str) -> list[FirewallRule]:
+        """Build the band-5 access-to rules for one zone without touching OPNsense.
+
+        This is the single source of the zone rule layout (see
+        :meth:`configure_firewall_rules` for the ordering); the reconciler and
+        the offline policy simulator both consume it.
+        """
+        targets_lower = [t.lower() for t in zone.access_to]
+        specific_targets = [t for t in zone.access_to if t.lower() not in ("all", "internet")]
+
+        # Deterministic band-5 base for this zone (#243). Intra-zone offsets are
+        # FIXED so adding an access-to zone never shifts the block/internet rules
+        # into a colliding sequence.
+        base = self._zone_rule_base(zone)
+
+        def _rule(description, destination, action, sequence) -> FirewallRule:
+            return FirewallRule(
+                description=description,
+                action=action,
+                interface=zone_interface,
+                source_net=zone.ip_network,
+                destination_net=destination,
+                sequence=sequence,
+            )
+
+        if "all" in targets_lower:
+            # Full access — single pass rule to any
+            return [_rule(
+                f"Zone {zone.name} -> all", "any",
+                RuleAction.PASS, base + self.ZONE_RULE_GATEWAY_OFFSET,
+            )]
+
+        # Step 1: Allow access to own gateway (DNS, NTP)
+        rules = [_rule(
+            f"Zone {zone.name} -> gateway", f"{zone.gateway_ip}/32",
+            RuleAction.PASS, base + self.ZONE_RULE_GATEWAY_OFFSET,
+        )]
+
+        # Step 2: Allow access to each explicitly named zone. These occupy fixed
+        # offsets base+1 .. base+89, so the block band below stays put
+        # regardless of how many zones are listed.
+        if len(specific_targets) > self.ZONE_RULE_PASS_MAX:
+            error(
+                f"{zone.name}: {len(specific_targets)} access-to zones "
+                f"exceeds the {self.ZONE_RULE_PASS_MAX}-slot pass band; "
+                f"rules beyond that would collide with the block band"
+            )
+        for offset, target in enumerate(specific_targets[: self.ZONE_RULE_PASS_MAX]):
+            target_zone = self.get_zone_by_name(target)
+            if target_zone:
+                dest = target_zone.ip_network
+            else:
+                warn(f"target zone '{target}' not found in zones.json, using name as alias")
+                dest = target
+            rules.append(_rule(
+                f"Zone {zone.name} -> {target}", dest,
+                RuleAction.PASS, base + self.ZONE_RULE_PASS_OFFSET + offset,
+            ))
+
+        if "internet" in targets_lower:
+            # Step 3: Block RFC1918 to prevent reaching unlisted internal zones —
+            # fixed offsets base+90/91/92, always trailing the access-to passes.
+            for offset, (network, label) in enumerate(self.RFC1918_NETWORKS):
+                rules.append(_rule(
+                    f"Zone {zone.name} block {label}", network,
+                    RuleAction.BLOCK, base + self.ZONE_RULE_BLOCK_OFFSET + offset,
+                ))
+
+            # Step 4: Allow internet (pass to any — only non-RFC1918 reaches here)
+            rules.append(_rule(
+                f"Zone {zone.name} -> internet", "any",
+                RuleAction.PASS, base + self.ZONE_RULE_INTERNET_OFFSET,
+            ))
+        return rules
+
+    def caddy_rules_for(
+        self, zone: Zone, zone_interface: str, caddy_dest: str
+    ) -> list[FirewallRule]:
+        """Build the band-1 Caddy reachability passes for one zone (#366)."""
+        return [
+            FirewallRule(
+                description=f"Zone {zone.name} -> caddy {label}",
+                action=RuleAction.PASS,
+                interface=zone_interface,
+                protocol=Protocol.TCP,
+                source_net=self.CADDY_REACH_SOURCE,
+                destination_net=caddy_dest,
+                destination_port=port,
+                sequence=self.CADDY_REACH_SEQUENCE + offset,
+            )
+            for offset, (port, label) in enumerate(self.CADDY_REACH_PORTS)
+        ]
+
+    def _caddy_destination(self) -> str | None:
+        """DMZ gateway /32 that Caddy listens on, or None when there is no dmz."""
         dmz = self.get_zone_by_name("dmz")
         if dmz is None:
             warn("  Caddy reachability (#366): no 'dmz' zone in zones.json — skipping")
-            return
+            return None
         try:
-            caddy_dest = f"{dmz.gateway_ip}/32"
+            return f"{dmz.gateway_ip}/32"
         except Exception as e:  # noqa: BLE001 - malformed dmz.ip should not abort reconcile
             warn(f"  Caddy reachability (#366): cannot derive DMZ gateway: {e} — skipping")
-            return
+            return None
 
-        # Only zones that already have internet egress reach the proxy: a zone
-        # with internet access can already initiate outbound, so letting it reach
-        # Caddy adds no new exposure. Fully-isolated zones (empty access-to) are
-        # left unable to reach the reverse proxy. The dmz zone reaches the gateway
-        # locally and is skipped. Manual zones (e.g. mgmt) are included.
+    def _caddy_candidate_zones(self) -> list[Zone]:
+        """Zones that get the Caddy reachability pass.
+
+        Only zones that already have internet egress reach the proxy: a zone
+        with internet access can already initiate outbound, so letting it reach
+        Caddy adds no new exposure. Fully-isolated zones (empty access-to) are
+        left unable to reach the reverse proxy. The dmz zone reaches the gateway
+        locally and is skipped. Manual zones (e.g. mgmt) are included.
+        """
         def _has_internet(z: "Zone") -> bool:
             targets = {t.lower() for t in z.access_to}
             return "internet" in targets or "all" in targets
 
-        candidate_zones = [
+        return [
             z for z in (self.get_enabled_zones() + self.get_manual_zones())
-            if z.name != dmz.name and _has_internet(z)
+            if z.name.lower() != "dmz" and _has_internet(z)
         ]
 
-        for zone in candidate_zones:
-            zone_interface = self.get_zone_interface(zone)
-            if not zone_interface:
-                continue
-            zone_results = results.setdefault(
-                zone.name, {"status": "processed", "rules": []}
-            ).setdefault("rules", [])
-            for offset, (port, label) in enumerate(self.CADDY_REACH_PORTS):
-                self._create_or_skip_rule(
-                    manager, existing_by_desc,
-                    f"Zone {zone.name} -> caddy {label}",
-                    zone_interface, self.CADDY_REACH_SOURCE, caddy_dest,
-                    RuleAction.PASS, self.CADDY_REACH_SEQUENCE + offset,
-                    check_mode, zone_results,
-                    protocol=Protocol.TCP, destination_port=port,
-                )
+    def desired_firewall_rules(
+        self, interface_for: Callable[[Zone], str | None] | None = None,
+    ) -> list[FirewallRule]:
+        """Every zone-managed rule, as :meth:`configure_firewall_rules` would create it.
+
+        Args:
+            interface_for: Resolves a zone to its interface identifier. Defaults
+                to :meth:`get_zone_interface` (which queries OPNsense for VLAN
+                zones); pass a pure mapping to stay fully offline.
+
+        Returns:
+            Rules for enabled access-to zones plus the Caddy reachability passes.
+            Zones whose interface cannot be resolved are skipped, as in reconcile.
+        """
+        interface_for = interface_for or self.get_zone_interface
+        rules: list[FirewallRule] = []
+        for zone in self.get_firewall_zones():
+            zone_interface = interface_for(zone)
+            if zone_interface:
+                rules.extend(self.zone_rules_for(zone, zone_interface))
+        caddy_dest = self._caddy_destination()
+        if caddy_dest is not None:
+            for zone in self._caddy_candidate_zones():
+                zone_interface = interface_for(zone)
+                if zone_interface:
+                    rules.extend(self.caddy_rules_for(zone, zone_interface, caddy_dest))
+        return rules
+
+    def _dnsmasq_interface_list(self) -> list[str]:
+        """Interfaces dnsmasq should listen on: LAN plus every enabled VLAN zone."""
+        # Start with the base LAN interface
+        interfaces = ["lan"]
+
+        # Add all enabled VLAN zone interfaces (one assignment read, not one per zone)
+        vlan_zones = self.get_vlan_zones()
+        assigned = self._assigned_vlans() if vlan_zones else []
+        for zone in vlan_zones:
+            iface = self._interface_from_assigned(zone, assigned)
+            if iface and iface not in interfaces:
+                interfaces.append(iface)
+        return interfaces
 
     def update_dnsmasq_interfaces(self, check_mode: bool = True) -> dict:
         """Update dnsmasq to listen on all enabled VLAN interfaces.
@@ -1672,23 +2104,13 @@ class ZoneManager:
         Returns:
             Result dictionary
         """
-        # Start with the base LAN interface
-        interfaces = ["lan"]
-
-        # Add all enabled VLAN zone interfaces
-        for zone in self.get_vlan_zones():
-            iface = self.get_zone_interface(zone)
-            if iface and iface not in interfaces:
-                interfaces.append(iface)
+        interfaces = self._dnsmasq_interface_list()
 
         debug(f"  Dnsmasq interfaces: {', '.join(interfaces)}")
 
         if check_mode:
             return {"status": "would_update", "interfaces": interfaces}
 
-        # DEBUG: Check Unbound before set_dnsmasq_interfaces
-        _check_unbound_dns("BEFORE set_dnsmasq_interfaces")
-
         try:
             with DhcpManager(self.config) as manager:
                 result = manager.set_dnsmasq_interfaces(
@@ -1696,15 +2118,254 @@ class ZoneManager:
                     check_mode=check_mode,
                 )
                 debug(f"  Updated dnsmasq to listen on {len(interfaces)} interfaces")
-
-                # DEBUG: Check Unbound after set_dnsmasq_interfaces
-                _check_unbound_dns("AFTER set_dnsmasq_interfaces")
-
                 return {"status": "updated", "interfaces": interfaces, "result": result}
         except Exception as e:
             error(f"Updating dnsmasq interfaces: {e}")
             return {"status": "error", "error": str(e)}
 
+    # ── Plan / apply ─────────────────────────────────────────────────────────
+
+    def read_snapshot(self, firewall_rules: bool = True) -> ZoneSnapshot:
+        """Read every piece of live state configure_all needs, once.
+
+        The VLAN, DHCP and firewall reads are independent and run
+        concurrently; each one's duration lands in ``timings_ms``.
+
+        Args:
+            firewall_rules: Also download the firewall rule list
+
+        Returns:
+            ZoneSnapshot of VLANs, assignments, DHCP ranges, dnsmasq bindings
+            and (optionally) firewall rules
+        """
+        timings: dict[str, float] = {}
+
+        def timed(name: str, read: Callable[[], object]):
+            def run():
+                start = time.monotonic()
+                try:
+                    return read()
+                finally:
+                    timings[name] = round((time.monotonic() - start) * 1000, 1)
+            return run
+
+        def read_vlans():
+            with VlanManager(self.config) as vlan_mgr:
+                return vlan_mgr.list_vlans(), vlan_mgr.get_assigned_vlans()
+
+        def read_dhcp():
+            with DhcpManager(self.config) as dhcp_mgr:
+                ranges = dhcp_mgr.list_ranges()
+                try:
+                    dnsmasq_interfaces = dhcp_mgr.get_dnsmasq_interfaces()
+                except Exception as e:  # noqa: BLE001 - unknown bindings just force the step
+                    debug(f"  dnsmasq interfaces unavailable: {e}")
+                    dnsmasq_interfaces = None
+                return ranges, dnsmasq_interfaces
+
+        def read_rules():
+            with FirewallManager(self.config) as fw:
+                return fw.list_rules()
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            vlans_future = pool.submit(timed("vlans", read_vlans))
+            dhcp_future = pool.submit(timed("dhcp", read_dhcp))
+            rules_future = pool.submit(timed("firewall", read_rules)) if firewall_rules else None
+            vlans, assigned = vlans_future.result()
+            ranges, dnsmasq_interfaces = dhcp_future.result()
+            rules = rules_future.result() if rules_future else None
+        return ZoneSnapshot(
+            vlans=vlans,
+            assigned=assigned,
+            dhcp_ranges=ranges,
+            dnsmasq_interfaces=dnsmasq_interfaces,
+            firewall_rules=rules,
+            timings_ms=timings,
+        )
+
+    def drift_report(self, firewall_rules: bool = True) -> DriftReport:
+        """Read-only desired-vs-actual status of every managed object.
+
+        One :meth:`read_snapshot` pass plus :meth:`plan` (with label drift
+        included); nothing is written. Objects the plan would not touch are
+        reported ``ok`` so monitoring sees the full inventory.
+        """
+        start = time.monotonic()
+        snapshot = self.read_snapshot(firewall_rules=firewall_rules)
+        timings = {f"read_{name}": ms for name, ms in snapshot.timings_ms.items()}
+        timings["read"] = round((time.monotonic() - start) * 1000, 1)
+
+        phase = time.monotonic()
+        plan = self.plan(snapshot, firewall_rules=firewall_rules, force_rename_labels=True)
+        timings["plan"] = round((time.monotonic() - phase) * 1000, 1)
+
+        phase = time.monotonic()
+        previous, self._snapshot = self._snapshot, snapshot
+        try:
+            items = self._drift_items(plan, firewall_rules)
+        finally:
+            self._snapshot = previous
+        timings["report"] = round((time.monotonic() - phase) * 1000, 1)
+        timings["total"] = round((time.monotonic() - start) * 1000, 1)
+        return DriftReport(items=items, timings_ms=timings)
+
+    def _drift_items(self, plan: ZonePlan, firewall_rules: bool) -> list[DriftItem]:
+        snapshot = plan.snapshot
+        items: list[DriftItem] = []
+        flagged: set[tuple[str, str]] = set()
+        for change in plan.changes:
+            if change.step == "vlans":
+                kind = "label" if change.action == "rename_label" else "vlan"
+            elif change.step == "firewall":
+                kind = "firewall_rule"
+            else:
+                kind = change.step
+            name = change.detail if kind == "firewall_rule" and change.action != "bind" else change.zone
+            status = _DRIFT_STATUS[change.action]
+            if kind == "dnsmasq" and snapshot.dnsmasq_interfaces is None:
+                status = "unknown"
+            items.append(DriftItem(kind, change.zone, name, status, change.detail))
+            flagged.add((kind, name))
+
+        def ok(kind: str, zone: str, name: str) -> None:
+            if (kind, name) not in flagged:
+                items.append(DriftItem(kind, zone, name, "ok"))
+
+        assigned = snapshot.assigned_by_tag
+        for zone in self.get_vlan_zones():
+            ok("vlan", zone.name, zone.name)
+            if zone.vlan_tag in assigned:
+                ok("label", zone.name, zone.name)
+        ok("dnsmasq", "*", "*")
+        for zone in self.get_dhcp_zones():
+            ok("dhcp", zone.name, zone.name)
+        if firewall_rules:
+            for rule in self.desired_firewall_rules():
+                ok("firewall_rule", rule.description.split(" ", 2)[1], rule.description)
+
+        order = {kind: i for i, kind in enumerate(DRIFT_KINDS)}
+        items.sort(key=lambda i: (order[i.kind], i.zone, i.name))
+        return items
+
+    def plan(
+        self,
+        snapshot: ZoneSnapshot | None = None,
+        firewall_rules: bool = True,
+        force_rename_labels: bool = False,
+    ) -> ZonePlan:
+        """Diff zones.json against live state into an ordered change list.
+
+        Pure with respect to OPNsense once ``snapshot`` is given; otherwise it
+        reads one with :meth:`read_snapshot`.
+        """
+        snapshot = snapshot or self.read_snapshot(firewall_rules=firewall_rules)
+        plan = ZonePlan(snapshot=snapshot)
+        previous, self._snapshot = self._snapshot, snapshot
+        try:
+            plan.changes.extend(self._plan_vlans(snapshot, force_rename_labels))
+            # VLANs about to be created have no interface yet, so anything
+            # bound to their interface must be (re)done after the VLAN step.
+            pending = {c.zone for c in plan.changes if c.action == "create"}
+            plan.changes.extend(self._plan_dnsmasq(snapshot, pending))
+            plan.changes.extend(self._plan_dhcp(snapshot, pending))
+            if firewall_rules:
+                plan.changes.extend(self._plan_firewall(snapshot))
+        finally:
+            self._snapshot = previous
+        return plan
+
+    def _plan_vlans(self, snapshot: ZoneSnapshot, force_rename_labels: bool) -> list[ZoneChange]:
+        changes = []
+        by_tag = snapshot.vlans_by_tag
+        by_desc = snapshot.vlans_by_description
+        assigned = snapshot.assigned_by_tag
+        for zone in self.get_disabled_vlan_zones():
+            if zone.vlan_tag in by_tag:
+                changes.append(ZoneChange("vlans", zone.name, "delete", f"VLAN {zone.vlan_tag}"))
+        for zone in self.get_vlan_zones():
+            existing = by_tag.get(zone.vlan_tag) or by_desc.get(zone.vlan_description)
+            if not existing:
+                changes.append(ZoneChange("vlans", zone.name, "create", f"VLAN {zone.vlan_tag}"))
+                continue
+            descr = existing.get("description") or ""
+            if descr != zone.vlan_description:
+                changes.append(ZoneChange(
+                    "vlans", zone.name, "update", f"description {descr!r} -> {zone.vlan_description!r}"
+                ))
+            label = (assigned.get(zone.vlan_tag) or {}).get("description") or ""
+            if force_rename_labels and label and label.lower() != zone.name.lower():
+                changes.append(ZoneChange(
+                    "vlans", zone.name, "rename_label", f"{label!r} -> {zone.name!r}"
+                ))
+        return changes
+
+    def _plan_dnsmasq(self, snapshot: ZoneSnapshot, pending: set[str]) -> list[ZoneChange]:
+        desired = self._dnsmasq_interface_list()
+        current = snapshot.dnsmasq_interfaces
+        if (
+            current is None
+            or any(z.name in pending for z in self.get_vlan_zones())
+            or set(desired) != set(current)
+        ):
+            return [ZoneChange("dnsmasq", "*", "update", ",".join(desired))]
+        return []
+
+    def _plan_dhcp(self, snapshot: ZoneSnapshot, pending: set[str]) -> list[ZoneChange]:
+        changes = []
+        ranges = snapshot.ranges_by_description
+        for zone in self.get_disabled_dhcp_zones():
+            if zone.dhcp_description in ranges:
+                changes.append(ZoneChange("dhcp", zone.name, "delete", zone.dhcp_description))
+        for zone in self.get_dhcp_zones():
+            existing = ranges.get(zone.dhcp_description)
+            if existing is None:
+                changes.append(ZoneChange("dhcp", zone.name, "create", zone.dhcp_description))
+                continue
+            if zone.name in pending:
+                changes.append(ZoneChange("dhcp", zone.name, "rebind", "VLAN being created"))
+                continue
+            iface = self._dhcp_interface_for(zone, snapshot.assigned)
+            current = existing.get("interface") or ""
+            if iface and current != iface:
+                changes.append(ZoneChange("dhcp", zone.name, "rebind", f"{current or 'any'} -> {iface}"))
+        return changes
+
+    def _plan_firewall(self, snapshot: ZoneSnapshot) -> list[ZoneChange]:
+        changes = []
+        existing = snapshot.rules_by_description
+        for zone in self.get_disabled_zones():
+            prefix = f"Zone {zone.name} "
+            for description in existing:
+                if description.startswith(prefix):
+                    changes.append(ZoneChange("firewall", zone.name, "delete", description))
+        for zone in self.get_firewall_zones():
+            if not self.get_zone_interface(zone):
+                changes.append(ZoneChange("firewall", zone.name, "bind", "interface not found"))
+        for rule in self.desired_firewall_rules():
+            zone_name = rule.description.split(" ", 2)[1]
+            current = existing.get(rule.description)
+            if current is None:
+                changes.append(ZoneChange("firewall", zone_name, "create", rule.description))
+            elif self._is_drifted(
+                current, rule.interface, rule.source_net, rule.destination_net,
+                rule.action.value, rule.sequence, rule.destination_port,
+            ):
+                changes.append(ZoneChange("firewall", zone_name, "update", rule.description))
+        return changes
+
+    def _resync_vlan_interfaces(self) -> None:
+        """Re-apply VLAN interfaces from config.xml when the VLAN step is skipped.
+
+        configure_vlans ends with this apply to repair kernel-IP drift (#237:
+        an interface in config.xml without its IP after a configd restart);
+        the plan cannot see that drift, so an in-sync run still issues it.
+        """
+        try:
+            with VlanManager(self.config) as manager:
+                manager.apply_vlan_settings()
+        except Exception as e:  # noqa: BLE001 - best-effort, like the in-step apply
+            debug(f"  apply_vlan_settings: {e}")
+
     def configure_all(
         self,
         check_mode: bool = True,
@@ -1714,47 +2375,98 @@ class ZoneManager:
     ) -> dict:
         """Configure VLANs, DHCP, and firewall rules for all zones.
 
-        VLANs are always configured before DHCP ranges to ensure
-        the network infrastructure is in place.
-        Firewall rules are configured last, after all zones are created.
-        By default, VLANs are assigned to OPNsense interfaces and
-        firewall rules are created based on the access-to field.
+        Plans first: live state is read once (:meth:`read_snapshot`) and
+        diffed against zones.json (:meth:`plan`). Only steps with changes then
+        run, in dependency order, sharing the snapshot instead of re-reading:
+        VLANs before dnsmasq bindings before DHCP ranges, firewall rules last.
+        Within the VLAN and DHCP steps, per-zone calls run up to ``workers``
+        at a time; each step finishes before the next starts.
+        By default, VLANs are assigned to OPNsense interfaces and firewall
+        rules are created based on the access-to field.
 
         Args:
             check_mode: If True, don't make changes (dry-run)
             assign_vlans: If True (default), also assign VLANs to interfaces
             firewall_rules: If True (default), also configure firewall rules based on access-to
+            force_rename_labels: Reconcile drifted interface labels (disruptive)
 
         Returns:
-            Dictionary with 'vlans', 'dhcp', and optionally 'firewall' results
+            Dictionary with 'vlans', 'dhcp', 'dnsmasq_interfaces', 'plan' and
+            optionally 'firewall' results. Steps without changes report {}.
         """
-        # Configure VLANs first, then update dnsmasq bindings so it
-        # recognises the new interfaces, then create DHCP ranges.
-        info("Step 1: Configuring VLANs")
-        vlan_results = self.configure_vlans(
-            check_mode=check_mode, assign=assign_vlans,
+        info("Planning: reading live VLAN, DHCP and firewall state")
+        snapshot = self.read_snapshot(firewall_rules=firewall_rules)
+        plan = self.plan(
+            snapshot, firewall_rules=firewall_rules,
             force_rename_labels=force_rename_labels,
         )
-
-        # Update dnsmasq to listen on all VLAN interfaces *before* creating
-        # DHCP ranges — otherwise dnsmasq rejects the interface identifiers
-        # (opt1, opt2, …) because it doesn't know about them yet.
-        info("Step 2: Updating dnsmasq interface bindings")
-        dnsmasq_result = self.update_dnsmasq_interfaces(check_mode=check_mode)
-
-        info("Step 3: Configuring DHCP ranges")
-        dhcp_results = self.configure_dhcp(check_mode=check_mode)
-
-        result = {
-            "vlans": vlan_results,
-            "dhcp": dhcp_results,
-            "dnsmasq_interfaces": dnsmasq_result,
+        self.last_plan = plan
+        counts = plan.summary()
+        for change in plan.changes:
+            debug(f"  plan: {change.step} {change.zone} {change.action} {change.detail}")
+
+        result: dict = {
+            "vlans": {},
+            "dhcp": {},
+            "dnsmasq_interfaces": {
+                "status": "unchanged",
+                "interfaces": snapshot.dnsmasq_interfaces,
+            },
+            "plan": [asdict(c) for c in plan.changes],
         }
-
         if firewall_rules:
-            info("Step 4: Configuring Firewall Rules")
-            firewall_results = self.configure_firewall_rules(check_mode=check_mode)
-            result["firewall"] = firewall_results
+            result["firewall"] = {}
+        if plan.is_noop:
+            info("No changes: VLANs, DHCP and firewall rules match zones.json")
+            if not check_mode:
+                self._resync_vlan_interfaces()
+            return result
+
+        self._snapshot = snapshot
+        try:
+            # Configure VLANs first, then update dnsmasq bindings so it
+            # recognises the new interfaces, then create DHCP ranges.
+            if counts["vlans"]:
+                info(f"Step 1: Configuring VLANs ({counts['vlans']} changes)")
+                result["vlans"] = self.configure_vlans(
+                    check_mode=check_mode, assign=assign_vlans,
+                    force_rename_labels=force_rename_labels,
+                )
+                if not check_mode:
+                    # New/renamed interfaces get new identifiers — one re-read
+                    # so the later steps bind to the real opt-ids.
+                    with VlanManager(self.config) as vlan_mgr:
+                        snapshot.assigned = vlan_mgr.get_assigned_vlans()
+            else:
+                info("Step 1: VLANs in sync")
+                if not check_mode:
+                    self._resync_vlan_interfaces()
+
+            # Update dnsmasq to listen on all VLAN interfaces *before* creating
+            # DHCP ranges — otherwise dnsmasq rejects the interface identifiers
+            # (opt1, opt2, …) because it doesn't know about them yet.
+            if counts["dnsmasq"] or counts["vlans"]:
+                info("Step 2: Updating dnsmasq interface bindings")
+                result["dnsmasq_interfaces"] = self.update_dnsmasq_interfaces(check_mode=check_mode)
+            else:
+                info("Step 2: dnsmasq interface bindings in sync")
+
+            if counts["dhcp"]:
+                info(f"Step 3: Configuring DHCP ranges ({counts['dhcp']} changes)")
+                result["dhcp"] = self.configure_dhcp(check_mode=check_mode)
+            else:
+                info("Step 3: DHCP ranges in sync")
+
+            if firewall_rules:
+                # A VLAN change can move a zone to a new opt-id, which the
+                # rules bound to it must follow.
+                if counts["firewall"] or (counts["vlans"] and not check_mode):
+                    info(f"Step 4: Configuring Firewall Rules ({counts['firewall']} changes)")
+                    result["firewall"] = self.configure_firewall_rules(check_mode=check_mode)
+                else:
+                    info("Step 4: Firewall rules in sync")
+        finally:
+            self._snapshot = None
 
         return result
 
@@ -1815,7 +2527,9 @@ class ZoneManager:
 
         info("=" * 80)
 
-    def print_zone_summary(self, results: dict | None = None) -> None:
+    def print_zone_summary(
+        self, results: dict | None = None, snapshot: ZoneSnapshot | None = None,
+    ) -> None:
         """Print one VLAN-tag-sorted table of all zones (issue #212).
 
         Replaces the previously separate VLAN, DHCP and warnings tables with a
@@ -1829,6 +2543,8 @@ class ZoneManager:
             results: optional dict returned by configure_* (configure_all's
                 {"vlans":..,"dhcp":..} or a bare vlan-results dict). When given,
                 change/warning flags are derived from it.
+            snapshot: live state that is known to be current (e.g. the plan
+                snapshot of a run that changed nothing); skips the re-read.
         """
         vlan_results = (results or {}).get("vlans", results or {})
         if not isinstance(vlan_results, dict):
@@ -1842,14 +2558,19 @@ class ZoneManager:
         iface_by_domain: dict[str, str] = {}
         dhcp_by_domain: dict[str, tuple[str, str]] = {}
         try:
-            with VlanManager(self.config) as _vm:
-                for a in _vm.get_assigned_vlans():
-                    try:
-                        assigned_by_tag[int(a["vlan_tag"])] = a
-                    except (TypeError, ValueError, KeyError):
-                        continue
-            live = self.list_current_config()
-            for r in live.get("dhcp_ranges", []):
+            if snapshot is not None:
+                assigned, dhcp_ranges = snapshot.assigned, snapshot.dhcp_ranges
+            else:
+                with VlanManager(self.config) as _vm:
+                    assigned = _vm.get_assigned_vlans()
+                with DhcpManager(self.config) as _dm:
+                    dhcp_ranges = _dm.list_ranges()
+            for a in assigned:
+                try:
+                    assigned_by_tag[int(a["vlan_tag"])] = a
+                except (TypeError, ValueError, KeyError):
+                    continue
+            for r in dhcp_ranges:
                 dom = r.get("domain") or ""
                 if dom:
                     iface_by_domain[dom] = r.get("interface") or ""
@@ -1951,6 +2672,44 @@ class ZoneManager:
         info(footer)
 
 
+def _run_configure(
+    manager: ZoneManager,
+    args: argparse.Namespace,
+    check_mode: bool,
+    assign_vlans: bool,
+    firewall_rules: bool,
+) -> dict:
+    """Run the configure step selected by the CLI flags."""
+    if args.vlans_only:
+        return {"vlans": manager.configure_vlans(
+            check_mode=check_mode, assign=assign_vlans,
+            force_rename_labels=args.force_rename_labels,
+        )}
+    if args.dhcp_only:
+        return {"dhcp": manager.configure_dhcp(check_mode=check_mode)}
+    if args.firewall_rules_only:
+        return {"firewall": manager.configure_firewall_rules(check_mode=check_mode)}
+    return manager.configure_all(
+        check_mode=check_mode,
+        assign_vlans=assign_vlans,
+        firewall_rules=firewall_rules,
+        force_rename_labels=args.force_rename_labels,
+    )
+
+
+def _fail(message: str, drift: bool) -> NoReturn:
+    """Exit on a fatal CLI error.
+
+    Under --drift the error is also reported as the JSON a monitor parses,
+    with DRIFT_ERROR: exit 1 would read as "drift found".
+    """
+    error(message)
+    if drift:
+        print(json.dumps({"drift": None, "exit_code": DRIFT_ERROR, "error": message}))
+        sys.exit(DRIFT_ERROR)
+    sys.exit(1)
+
+
 def main():
     """Main entry point for zone-manager CLI."""
     parser = argparse.ArgumentParser(
@@ -2043,6 +2802,14 @@ def main():
         help="List the current zone configuration as the unified zone summary "
              "table (live interface IDs, DHCP ranges, drift flags)",
     )
+    parser.add_argument(
+        "--drift",
+        action="store_true",
+        help="Read-only drift report: desired (zones.json) vs actual VLANs, "
+             "interface labels, DHCP ranges, dnsmasq interfaces and zone firewall "
+             "rules as JSON on stdout, with per-phase timings. Exit 0 in sync, "
+             "1 on drift, 2 if the live state cannot be read",
+    )
     parser.add_argument(
         "--modules-dir",
         default="/home/tappaas/config",
@@ -2063,6 +2830,30 @@ def main():
              "keeping the Unbound DNS check. Use on air-gapped clusters with no "
              "internet egress but a working local resolver.",
     )
+    parser.add_argument(
+        "--health-interval",
+        type=float,
+        default=5.0,
+        metavar="SECONDS",
+        help="Re-run the DNS/egress/API health probes every SECONDS in the "
+             "background while --execute applies changes, and warn as soon as one "
+             "fails (default: 5; 0 disables the watch)",
+    )
+    parser.add_argument(
+        "--health-metrics",
+        metavar="FILE",
+        help="Append every health-probe result (probe, ok, latency_ms, label) "
+             "to FILE as JSON lines",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Run up to N per-zone VLAN/DHCP API calls at once within each step "
+             "(default: 1, one at a time). Steps still run in order: "
+             "VLANs, then dnsmasq bindings, then DHCP ranges",
+    )
 
     args = parser.parse_args()
     check_mode = not args.execute
@@ -2082,14 +2873,13 @@ def main():
                 break
 
     if not zones_file:
-        error("Could not find zones.json. Use --zones-file to specify the path.")
-        sys.exit(1)
+        _fail("Could not find zones.json. Use --zones-file to specify the path.", args.drift)
 
     # Map --debug flag to environment variable so log module picks it up
     if args.debug:
         os.environ["TAPPAAS_DEBUG"] = "1"
 
-    if check_mode and not args.summary and not args.list_config:
+    if check_mode and not args.summary and not args.list_config and not args.drift:
         warn("RUNNING IN CHECK MODE (dry-run) - no changes will be made. Use --execute to actually make changes.")
 
     # Build configuration
@@ -2110,24 +2900,22 @@ def main():
 
         config = Config(**config_kwargs)
     except ValueError as e:
-        error(f"Configuration error: {e}")
-        sys.exit(1)
+        _fail(f"Configuration error: {e}", args.drift)
 
     # Create manager and load zones
     manager = ZoneManager(
         config=config,
         zones_file=zones_file,
         interface=args.interface,
+        workers=args.workers,
     )
 
     try:
         manager.load_zones()
     except FileNotFoundError as e:
-        error(str(e))
-        sys.exit(1)
+        _fail(str(e), args.drift)
     except json.JSONDecodeError as e:
-        error(f"Parsing zones.json: {e}")
-        sys.exit(1)
+        _fail(f"Parsing zones.json: {e}", args.drift)
 
     # The unified zone summary (issue #212) is printed once AFTER configuration
     # so its Flags column can carry the change/warning outcome. (--list-config
@@ -2146,6 +2934,18 @@ def main():
             sys.exit(1)
         sys.exit(0)
 
+    if args.drift:
+        # Monitoring entry point: JSON only on stdout, never writes. [Info]
+        # and [Warning] lines (e.g. an unknown access-to target) print to
+        # stdout, so they are sent to stderr while the report is built.
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                report = manager.drift_report(firewall_rules=not args.no_firewall_rules)
+        except Exception as e:
+            _fail(f"Failed to read live OPNsense configuration: {e}", drift=True)
+        print(json.dumps(report.to_dict(), indent=2))
+        sys.exit(report.exit_code)
+
     if args.summary:
         # Pinhole-allowed-from validator (issue #163): cross-check every
         # module.json's ingress + dependsOn against the policy in zones.json.
@@ -2161,8 +2961,10 @@ def main():
     # egress is already degraded — a further zone change can make DNS
     # unrecoverable (and recovery SSH would itself need DNS). Probes use IP
     # literals (10.0.0.1, 1.1.1.1) so they never depend on name resolution.
-    if args.execute and not args.skip_preflight:
-        if not preflight_checks(skip_egress=args.skip_egress_check):
+    health_gates = args.execute and not args.skip_preflight
+    if health_gates:
+        if not preflight_checks(skip_egress=args.skip_egress_check, config=config,
+                                metrics_file=args.health_metrics):
             error("Aborting --execute on pre-flight health failure. "
                   "Override with --skip-preflight (recovery/air-gapped).")
             sys.exit(2)
@@ -2172,42 +2974,55 @@ def main():
     # By default, firewall rules are configured (use --no-firewall-rules to disable)
     assign_vlans = not args.no_assign
     firewall_rules = not args.no_firewall_rules
-    if args.vlans_only:
-        results = {"vlans": manager.configure_vlans(
-            check_mode=check_mode, assign=assign_vlans,
-            force_rename_labels=args.force_rename_labels,
-        )}
-    elif args.dhcp_only:
-        results = {"dhcp": manager.configure_dhcp(check_mode=check_mode)}
-    elif args.firewall_rules_only:
-        results = {"firewall": manager.configure_firewall_rules(check_mode=check_mode)}
-    else:
-        results = manager.configure_all(
-            check_mode=check_mode,
-            assign_vlans=assign_vlans,
-            firewall_rules=firewall_rules,
-            force_rename_labels=args.force_rename_labels,
-        )
+    watcher = None
+    if health_gates and args.health_interval > 0:
+        # Watch DNS/egress/API while mutating — replaces the ad-hoc Unbound
+        # checks that used to sit between the apply steps.
+        watcher = HealthWatcher(
+            health_probes("WATCH", args.skip_egress_check, config, quiet=True),
+            interval=args.health_interval,
+            metrics_file=args.health_metrics,
+        ).start()
+    try:
+        results = _run_configure(manager, args, check_mode, assign_vlans, firewall_rules)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+    if watcher is not None:
+        for name, stats in watcher.summary().items():
+            debug(f"  Health {name}: {stats['runs'] - stats['failures']}/{stats['runs']} ok "
+                  f"(avg {stats['avg_ms']}ms, max {stats['max_ms']}ms)")
+        if watcher.degraded:
+            warn(f"Health degraded during apply: {', '.join(watcher.degraded)}")
 
     # One unified, VLAN-tag-sorted summary with inline change/warning flags
     # (issue #212). It queries the live OPNsense config for interface IDs and
     # DHCP ranges, so it doubles as the post-execute verification — replacing
-    # the former separate VLAN/DHCP/warnings tables.
-    manager.print_zone_summary(results)
+    # the former separate VLAN/DHCP/warnings tables. When the plan changed
+    # nothing (or this is a dry run) its snapshot is still current — reuse it.
+    plan = manager.last_plan
+    manager.print_zone_summary(
+        results,
+        snapshot=plan.snapshot if plan and (check_mode or plan.is_noop) else None,
+    )
 
     # Firewall rules are not a per-zone column in the table; keep a concise
     # processed-count line (per-zone detail at --debug).
     if "firewall" in results:
         fw = results["firewall"]
-        info(f"  Firewall rules: {len(fw)} zones processed")
+        if fw or plan is None:
+            info(f"  Firewall rules: {len(fw)} zones processed")
+        else:
+            info("  Firewall rules: in sync")
         for zone_name, result in fw.items():
             debug(f"    {zone_name}: {result.get('status', 'unknown')}")
 
     # Post-flight health gate (#307): if the zone changes degraded DNS or egress,
     # exit non-zero so the deploy pipeline stops before shipping a broken
     # firewall. Recovery must use the firewall's mgmt IP (10.0.0.1), not DNS.
-    if args.execute and not args.skip_preflight:
-        if not postflight_checks(skip_egress=args.skip_egress_check):
+    if health_gates:
+        if not postflight_checks(skip_egress=args.skip_egress_check, config=config,
+                                 metrics_file=args.health_metrics):
             error("Post-flight health check failed — zone changes degraded "
                   "DNS/egress. Recover via the firewall mgmt IP (10.0.0.1), not DNS.")
             sys.exit(2)
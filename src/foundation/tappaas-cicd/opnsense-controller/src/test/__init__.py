@@ -0,0 +1,4 @@
+import os
+
+# Keep test runs from writing the config-store snapshot into ~/.cache.
+os.environ.setdefault("TAPPAAS_CONFIG_CACHE", "")
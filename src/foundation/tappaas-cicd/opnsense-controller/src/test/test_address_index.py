@@ -0,0 +1,89 @@
+"""Unit tests for the one-snapshot DHCP range/reservation/lease index.
+
+Run with:
+    cd src && python -m unittest test.test_address_index -v
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import random
+import unittest
+
+from opnsense_controller.address_index import AddressIndex
+
+
+def _range(desc, start, end):
+    return {"uuid": desc, "description": desc, "start_addr": start, "end_addr": end}
+
+
+def _host(desc, ip, mac=""):
+    return {"uuid": desc, "description": desc, "host": desc, "ip": ip, "hardware_addr": mac}
+
+
+class TestRangeLookup(unittest.TestCase):
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+        ranges = []
+        for i in range(200):
+            start = rng.randrange(0, 60000)
+            ranges.append(_range(f"r{i}", str(ipaddress.ip_address(0x0A000000 + start)),
+                                 str(ipaddress.ip_address(0x0A000000 + start + rng.randrange(0, 900)))))
+        ranges.append(_range("broken", "", "10.0.0.1"))
+        ranges.append(_range("inverted", "10.0.0.9", "10.0.0.1"))
+        index = AddressIndex(ranges=ranges)
+
+        def linear(ip):
+            value = ipaddress.ip_address(ip)
+            for r in ranges[:200]:
+                if ipaddress.ip_address(r["start_addr"]) <= value <= ipaddress.ip_address(r["end_addr"]):
+                    return r
+            return None
+
+        for n in range(0, 61000, 37):
+            ip = str(ipaddress.ip_address(0x0A000000 + n))
+            self.assertIs(index.range_for(ip), linear(ip), ip)
+
+    def test_ipv6_and_ipv4_do_not_mix(self):
+        index = AddressIndex(ranges=[_range("v4", "10.0.0.10", "10.0.0.20"),
+                                     _range("v6", "fd00::10", "fd00::20")])
+        self.assertEqual(index.range_for("10.0.0.15")["description"], "v4")
+        self.assertEqual(index.range_for("fd00::15")["description"], "v6")
+        self.assertIsNone(index.range_for("::a00:f"))
+        self.assertIsNone(index.range_for("bogus"))
+
+
+class TestAudit(unittest.TestCase):
+    def test_findings(self):
+        index = AddressIndex(
+            ranges=[_range("srvHome", "10.2.10.100", "10.2.10.200")],
+            hosts=[
+                _host("nas", "10.2.10.150"),                       # inside the pool
+                _host("db", "10.2.10.20", "aa:bb:cc:00:00:01"),
+                _host("db-old", "10.2.10.20"),                     # same IP as db
+                _host("cam", "10.2.10.30", "AA:BB:CC:00:00:03"),   # leased to someone else
+                _host("ok", "10.2.10.40", "aa:bb:cc:00:00:04"),
+            ],
+            leases=[
+                {"ip": "10.2.10.30", "mac": "aa:bb:cc:00:00:99", "hostname": "phone"},
+                {"ip": "10.2.10.40", "mac": "aa:bb:cc:00:00:04", "hostname": "ok"},
+            ],
+        )
+        found = [(f.kind, f.ip, f.host) for f in index.audit()]
+        self.assertEqual(found, [
+            ("duplicate", "10.2.10.20", "db"),
+            ("duplicate", "10.2.10.20", "db-old"),
+            ("leased-elsewhere", "10.2.10.30", "cam"),
+            ("in-pool", "10.2.10.150", "nas"),
+        ])
+        self.assertEqual([h["description"] for h in index.reservations_for("10.2.10.20")], ["db", "db-old"])
+        self.assertEqual(index.lease_for("10.2.10.40")["hostname"], "ok")
+
+    def test_multi_ip_hosts_are_indexed_per_ip(self):
+        index = AddressIndex(hosts=[_host("nas", "10.2.1.5,10.2.1.6")])
+        self.assertEqual(len(index.reservations_for("10.2.1.6")), 1)
+        self.assertEqual(index.audit(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
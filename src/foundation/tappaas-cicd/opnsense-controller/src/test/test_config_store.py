@@ -0,0 +1,129 @@
+"""Unit tests for the mtime/hash-validated config file cache.
+
+Run with:
+    cd src && python -m unittest test.test_config_store -v
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from opnsense_controller import config_store
+from opnsense_controller.rules_manager import load_module, load_zones
+from opnsense_controller.zone_manager import ZoneManager
+
+
+class TestConfigStore(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.snapshot = self.dir / "cache" / "store.pickle"
+        snapshot_patch = patch.object(config_store, "CONFIG_CACHE_FILE", str(self.snapshot))
+        snapshot_patch.start()
+        self.addCleanup(snapshot_patch.stop)
+        config_store.clear()
+        self.addCleanup(config_store.clear)
+
+    def _write(self, name, body, mtime_ns=None):
+        path = self.dir / name
+        path.write_text(json.dumps(body))
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def _parses(self):
+        return patch("opnsense_controller.config_store.json.loads", wraps=json.loads)
+
+    def test_unchanged_file_is_parsed_once(self):
+        path = self._write("zones.json", {"srv": {"vlantag": 210}})
+        with self._parses() as parse:
+            first = config_store.load_json(path)
+            second = config_store.load_json(str(path))
+        self.assertEqual(first, {"srv": {"vlantag": 210}})
+        self.assertIs(first, second)
+        self.assertEqual(parse.call_count, 1)
+
+    def test_edit_is_seen(self):
+        path = self._write("zones.json", {"a": 1}, mtime_ns=1_000_000_000)
+        self.assertEqual(config_store.load_json(path), {"a": 1})
+        self._write("zones.json", {"a": 2}, mtime_ns=2_000_000_000)
+        self.assertEqual(config_store.load_json(path), {"a": 2})
+
+    def test_touched_file_with_same_content_is_not_reparsed(self):
+        path = self._write("zones.json", {"a": 1}, mtime_ns=1_000_000_000)
+        config_store.load_json(path)
+        os.utime(path, ns=(5_000_000_000, 5_000_000_000))
+        with self._parses() as parse:
+            self.assertEqual(config_store.load_json(path), {"a": 1})
+        parse.assert_not_called()
+
+    def test_errors_are_not_cached(self):
+        with self.assertRaises(FileNotFoundError):
+            config_store.load_json(self.dir / "missing.json")
+        path = self.dir / "bad.json"
+        path.write_text("{not json")
+        with self.assertRaises(json.JSONDecodeError):
+            config_store.load_json(path)
+
+    def test_snapshot_warms_the_next_process(self):
+        path = self._write("zones.json", {"a": 1})
+        config_store.load_json(path)
+        config_store.save_snapshot()
+        self.assertTrue(self.snapshot.is_file())
+        self.assertEqual(self.snapshot.stat().st_mode & 0o777, 0o600)
+
+        config_store.clear()                        # a new CLI process
+        with self._parses() as parse:
+            self.assertEqual(config_store.load_json(path), {"a": 1})
+        parse.assert_not_called()
+
+    def test_corrupt_snapshot_is_ignored(self):
+        self.snapshot.parent.mkdir(parents=True)
+        self.snapshot.write_bytes(b"not a pickle")
+        path = self._write("zones.json", {"a": 1})
+        self.assertEqual(config_store.load_json(path), {"a": 1})
+
+    def test_disabled_snapshot_writes_nothing(self):
+        with patch.object(config_store, "CONFIG_CACHE_FILE", ""):
+            config_store.load_json(self._write("zones.json", {"a": 1}))
+            config_store.save_snapshot()
+        self.assertFalse(self.snapshot.exists())
+
+    def test_deleted_files_are_dropped_from_the_snapshot(self):
+        kept = self._write("zones.json", {"a": 1})
+        gone = self._write("old.json", {"b": 2})
+        config_store.load_json(kept)
+        config_store.load_json(gone)
+        gone.unlink()
+        config_store.save_snapshot()
+        config_store.clear()
+        config_store._load_snapshot()
+        self.assertEqual(set(config_store._entries), {str(kept)})
+
+    def test_path_is_resolved_when_used(self):
+        with patch.object(config_store, "CONFIG_CACHE_FILE", None), \
+                patch.dict(os.environ, {"TAPPAAS_CONFIG_CACHE": str(self.snapshot)}):
+            config_store.load_json(self._write("zones.json", {"a": 1}))
+            config_store.save_snapshot()
+        self.assertTrue(self.snapshot.is_file())
+
+    def test_loaders_share_one_parse(self):
+        self._write("zones.json", {"_README": "x", "srv": {"vlantag": 210, "ip": "10.2.1.0/24"}})
+        self._write("app.json", {"vmname": "app", "zone0": "srv"})
+        with self._parses() as parse:
+            self.assertEqual(load_zones(self.dir / "zones.json")["srv"].vlan_tag, 210)
+            manager = ZoneManager(config=MagicMock(), zones_file=self.dir / "zones.json")
+            self.assertEqual([z.name for z in manager.load_zones()], ["srv"])
+            for _ in range(3):
+                self.assertEqual(load_module(self.dir, "app").zone0, "srv")
+        self.assertEqual(parse.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
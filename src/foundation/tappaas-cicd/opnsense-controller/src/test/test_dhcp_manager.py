@@ -19,7 +19,12 @@ from __future__ import annotations
 import unittest
 from unittest.mock import MagicMock
 
-from opnsense_controller.dhcp_manager import DhcpManager, DhcpRange
+from opnsense_controller.dhcp_manager import (
+    BatchError,
+    DhcpHost,
+    DhcpManager,
+    DhcpRange,
+)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -31,25 +36,53 @@ def _searchRange(rows):
     return {"result": {"response": {"rows": rows}}}
 
 
-def _make_manager(existing_rows=None):
+# Fields of the OPNsense dnsmasq host model. The raw API rejects anything
+# else, so a payload using oxl-style names (description, hardware_addr)
+# would never reach the firewall intact.
+_HOST_FIELDS = {
+    "host", "domain", "local", "ip", "aliases", "cnames", "client_id",
+    "hwaddr", "lease_time", "ignore", "set_tag", "descr", "comments",
+}
+
+
+def _host_write(params):
+    body = params.get("data", {}).get("host", {})
+    unknown = sorted(set(body) - _HOST_FIELDS)
+    if unknown:
+        return {"result": {"response": {"result": "failed", "validations": unknown}}}
+    return {"result": {"response": {"result": "saved", "uuid": "new-uuid"}}}
+
+
+def _make_manager(existing_rows=None, host_rows=None):
     """Build a DhcpManager wired to a fake client.
 
     The fake client routes raw `run_module` calls by command:
       - searchRange -> returns `existing_rows`
+      - searchHost  -> returns `host_rows` (API shape: descr, hwaddr)
       - delRange    -> {"result": "deleted"}
       - addRange    -> {"result": "saved", "uuid": "new-uuid"}
+      - addHost / setHost -> {"result": "saved", "uuid": "new-uuid"}, or
+                      "failed" if the body has a field the host model lacks
+      - delHost     -> {"result": "deleted"}
       - reconfigure -> {"status": "ok"}
     All calls are recorded on `manager.client.run_module.call_args_list`.
     """
     existing_rows = existing_rows or []
+    host_rows = host_rows or []
 
     def run_module(module, **kwargs):
         params = kwargs.get("params", {})
         command = params.get("command")
         if command == "searchRange":
             return _searchRange(existing_rows)
+        if command == "searchHost":
+            return _searchRange(host_rows)
         if command == "delRange":
             return {"result": {"response": {"result": "deleted"}}}
+        if command == "delHost":
+            return {"result": {"response": {"result": "deleted"}}}
+        if command in ("addHost", "setHost"):
+            return _host_write(params)
         if command == "addRange":
             return {"result": {"response": {"result": "saved", "uuid": "new-uuid"}}}
         if command == "reconfigure":
@@ -296,5 +329,145 @@ class TestListLeases(unittest.TestCase):
         self.assertEqual(leases[0]["hostname"], "")
 
 
+class TestStagedHostWrites(unittest.TestCase):
+    HOST = DhcpHost(description="nas", host="nas", ip=["10.2.1.5", "10.2.1.6"],
+                    hardware_addr=["aa:bb:cc:dd:ee:01"], domain="srv.internal")
+
+    def test_add_and_set_use_raw_api_without_reconfigure(self):
+        manager = _make_manager()
+        self.assertEqual(manager.save_host(self.HOST, reconfigure=False)["uuid"], "new-uuid")
+        self.assertEqual(manager.save_host(self.HOST, uuid="u1", reconfigure=False)["uuid"], "u1")
+        added, = _calls_for(manager, "addHost")
+        self.assertEqual(added["data"]["host"]["ip"], "10.2.1.5,10.2.1.6")
+        self.assertEqual(added["data"]["host"]["descr"], "nas")
+        self.assertEqual(added["data"]["host"]["hwaddr"], "aa:bb:cc:dd:ee:01")
+        self.assertEqual(_calls_for(manager, "setHost")[0]["params"], ["u1"])
+        self.assertEqual(_calls_for(manager, "reconfigure"), [])
+
+    def test_list_hosts_maps_api_field_names(self):
+        manager = _make_manager(host_rows=[{
+            "uuid": "u1", "host": "nas", "domain": "srv.internal", "ip": "10.2.1.5",
+            "descr": "nas", "hwaddr": "aa:bb:cc:dd:ee:01",
+        }])
+        host, = manager.list_hosts()
+        self.assertEqual(host["description"], "nas")
+        self.assertEqual(host["hardware_addr"], "aa:bb:cc:dd:ee:01")
+
+    def test_delete_by_uuid_can_defer_reconfigure(self):
+        manager = _make_manager()
+        self.assertTrue(manager.delete_host_by_uuid("u1", reconfigure=False)["changed"])
+        self.assertEqual(_calls_for(manager, "reconfigure"), [])
+        manager.delete_host_by_uuid("u2")
+        self.assertEqual(len(_calls_for(manager, "reconfigure")), 1)
+
+
+class TestDhcpBatch(unittest.TestCase):
+    """DhcpBatch validates up front, lists once, reconfigures once, rolls back on failure."""
+
+    def _manager(self, ranges=(), hosts=(), fail_on=None):
+        """Fake client; `fail_on` is the description whose add/set write fails."""
+        manager = _make_manager(existing_rows=list(ranges))
+        fallback = manager.client.run_module.side_effect
+        counter = iter(range(1, 1000))
+
+        def run_module(module, **kwargs):
+            params = kwargs.get("params", {})
+            command = params.get("command")
+            body = next(iter(params.get("data", {}).values()), {})
+            if command == "searchHost":
+                return {"result": {"response": {"rows": [dict(h) for h in hosts]}}}
+            if fail_on and fail_on in (body.get("description"), body.get("descr")):
+                return {"result": {"response": {"result": "failed"}}}
+            if command in ("addHost", "setHost"):
+                result = _host_write(params)
+                if result["result"]["response"]["result"] != "saved":
+                    return result
+            if command in ("addRange", "addHost", "setHost"):
+                return {"result": {"response": {"result": "saved", "uuid": f"new{next(counter)}"}}}
+            return fallback(module, **kwargs)
+
+        manager._client.run_module.side_effect = run_module
+        return manager
+
+    def _commands(self, manager):
+        return [c.kwargs["params"]["command"] for c in manager.client.run_module.call_args_list]
+
+    RANGES = [DhcpRange(f"zone{i}", f"10.{i}.0.100", f"10.{i}.0.200", interface=f"opt{i}")
+              for i in range(1, 4)]
+
+    def test_many_ranges_one_list_one_reconfigure(self):
+        existing = [{"uuid": "old2", "description": "zone2", "start_addr": "10.2.0.50",
+                     "end_addr": "10.2.0.60", "interface": "opt9"}]
+        manager = self._manager(ranges=existing)
+        results = manager.create_multiple_ranges(self.RANGES)
+        self.assertEqual(self._commands(manager), [
+            "searchRange", "addRange", "delRange", "addRange", "addRange", "reconfigure",
+        ])
+        self.assertEqual([r["interface"] for r in results], ["opt1", "opt2", "opt3"])
+
+    def test_hosts_overwrite_by_description(self):
+        manager = self._manager(hosts=[{"uuid": "h1", "descr": "nas", "host": "nas", "ip": "10.0.0.5"}])
+        manager.create_multiple_hosts([
+            DhcpHost("nas", "nas", ip=["10.0.0.6"]),
+            DhcpHost("cam", "cam", ip=["10.0.0.7"], hardware_addr=["AA:BB:CC:DD:EE:FF"]),
+        ])
+        self.assertEqual(self._commands(manager), ["searchHost", "setHost", "addHost", "reconfigure"])
+        self.assertEqual(_calls_for(manager, "setHost")[0]["params"], ["h1"])
+        added = _calls_for(manager, "addHost")[0]["data"]["host"]
+        self.assertEqual((added["descr"], added["hwaddr"]), ("cam", "AA:BB:CC:DD:EE:FF"))
+
+    def test_invalid_items_write_nothing(self):
+        manager = self._manager()
+        with self.assertRaises(ValueError) as ctx:
+            manager.create_multiple_ranges(
+                self.RANGES + [DhcpRange("bad", "10.9.0.200", "10.9.0.100"), DhcpRange("zone1", "x", "y")]
+            )
+        self.assertIn("bad", str(ctx.exception))
+        self.assertIn("duplicate", str(ctx.exception))
+        manager.client.run_module.assert_not_called()
+
+    def test_failure_rolls_back_in_reverse(self):
+        existing = [{"uuid": "old1", "description": "zone1", "start_addr": "10.1.0.50",
+                     "end_addr": "10.1.0.60", "interface": "opt1", "lease_time": "3600",
+                     "subnet_mask": "255.255.255.0"}]
+        manager = self._manager(ranges=existing, fail_on="zone3")
+        with self.assertRaises(BatchError) as ctx:
+            manager.create_multiple_ranges(self.RANGES)
+        self.assertEqual(ctx.exception.rolled_back, ["zone2", "zone1"])
+        commands = self._commands(manager)
+        self.assertNotIn("reconfigure", commands)
+        # undo: delete zone2's new range, delete zone1's new range, re-add the old zone1
+        self.assertEqual(commands[-3:], ["delRange", "delRange", "addRange"])
+        restored = _calls_for(manager, "addRange")[-1]["data"]["range"]
+        self.assertEqual((restored["start_addr"], restored["lease_time"], restored["subnet_mask"]),
+                         ("10.1.0.50", "3600", "255.255.255.0"))
+
+    def test_failed_host_batch_restores_every_field(self):
+        manager = self._manager(hosts=[{
+            "uuid": "h1", "descr": "nas", "host": "nas", "ip": "10.0.0.5", "hwaddr": "",
+            "lease_time": "600", "set_tag": "iot", "ignore": "1",
+        }], fail_on="cam")
+        with self.assertRaises(BatchError):
+            manager.create_multiple_hosts([
+                DhcpHost("nas", "nas", ip=["10.0.0.6"], lease_time=3600),
+                DhcpHost("cam", "cam", ip=["10.0.0.7"]),
+            ])
+        first, restored = (c["data"]["host"] for c in _calls_for(manager, "setHost"))
+        self.assertEqual(first["lease_time"], "3600")
+        self.assertEqual(
+            (restored["ip"], restored["lease_time"], restored["set_tag"], restored["ignore"]),
+            ("10.0.0.5", "600", "iot", "1"),
+        )
+
+    def test_check_mode_and_context_manager(self):
+        manager = self._manager()
+        results = manager.create_multiple_hosts([DhcpHost("nas", "nas", ip=["10.0.0.6"])], check_mode=True)
+        self.assertTrue(results[0]["check_mode"])
+        manager.client.run_module.assert_not_called()
+        with manager.batch() as batch:
+            batch.add_host(DhcpHost("nas", "nas", ip=["10.0.0.6"]))
+        self.assertEqual(self._commands(manager), ["searchHost", "addHost", "reconfigure"])
+
+
 if __name__ == "__main__":
     unittest.main()
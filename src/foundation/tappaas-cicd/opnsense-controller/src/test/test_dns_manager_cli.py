@@ -1,9 +1,12 @@
-"""Unit tests for the dns-manager CLI check-range command (issue #251).
+"""Unit tests for the dns-manager CLI check-range, audit and import/export commands.
 
 check_dns_range is a thin wrapper over DhcpManager.ip_in_any_range: it must
 return True (shell exit 0) when the IP is clear of every DHCP pool, False
 (shell exit 1) when it is inside one, and must never raise — a query failure
-is reported as "clear" so it cannot block a module install.
+is reported as "clear" so it cannot block a module install (issue #251).
+
+import/export list the firewall once and stage only the needed writes,
+followed by a single reconfigure.
 
 Run with:
     cd src && python -m unittest test.test_dns_manager_cli -v
@@ -11,10 +14,26 @@ Run with:
 
 from __future__ import annotations
 
+import json
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock
 
-from opnsense_controller.dns_manager_cli import check_dns_range
+from opnsense_controller.dhcp_manager import DhcpManager
+from opnsense_controller.dns_inventory import (
+    HostIndex,
+    dump_inventory,
+    parse_inventory,
+    plan_import,
+)
+from opnsense_controller.dns_manager_cli import (
+    audit_dns_hosts,
+    check_dns_range,
+    check_dns_ranges,
+    export_dns_hosts,
+    import_dns_hosts,
+)
 
 
 class TestCheckDnsRange(unittest.TestCase):
@@ -39,6 +58,179 @@ class TestCheckDnsRange(unittest.TestCase):
         manager.ip_in_any_range.side_effect = RuntimeError("API down")
         self.assertTrue(check_dns_range(manager, "10.2.20.25"))
 
+    def test_many_ips_list_ranges_once(self):
+        manager = MagicMock()
+        manager.list_ranges.return_value = [{
+            "description": "srvWork", "start_addr": "10.2.20.100", "end_addr": "10.2.20.200",
+        }]
+        self.assertTrue(check_dns_ranges(manager, ["10.2.20.25", "10.2.20.26"]))
+        self.assertFalse(check_dns_ranges(manager, ["10.2.20.25", "10.2.20.150"]))
+        self.assertEqual(manager.list_ranges.call_count, 2)
+        manager.ip_in_any_range.assert_not_called()
+        manager.list_hosts.assert_not_called()
+
+
+class TestAuditDnsHosts(unittest.TestCase):
+    def _manager(self, hosts):
+        manager = MagicMock()
+        manager.list_ranges.return_value = [{
+            "description": "srvWork", "start_addr": "10.2.20.100", "end_addr": "10.2.20.200",
+        }]
+        manager.list_hosts.return_value = hosts
+        manager.list_leases.return_value = []
+        return manager
+
+    def test_reservation_in_pool_fails(self):
+        manager = self._manager([{"description": "nas", "host": "nas", "ip": "10.2.20.150"}])
+        self.assertFalse(audit_dns_hosts(manager))
+        manager.list_hosts.assert_called_once()
+
+    def test_clean_fleet_passes(self):
+        manager = self._manager([{"description": "nas", "host": "nas", "ip": "10.2.20.50"}])
+        self.assertTrue(audit_dns_hosts(manager, as_json=True))
+
+    def test_query_failure_fails(self):
+        manager = self._manager([])
+        manager.list_leases.side_effect = RuntimeError("API down")
+        self.assertFalse(audit_dns_hosts(manager))
+
+
+def _row(uuid, host, ip, domain="srv.internal", mac="", description=None):
+    """A searchHost row as the dnsmasq API returns it (``descr``, ``hwaddr``)."""
+    return {
+        "uuid": uuid, "host": host, "domain": domain, "ip": ip,
+        "hwaddr": mac, "descr": description or f"{host}.{domain}",
+    }
+
+
+def _host_manager(rows):
+    """A real DhcpManager on a fake client that records writes in ``manager.calls``.
+
+    Host writes are checked against the dnsmasq host model, so a payload with
+    oxl-style names (description, hardware_addr) fails like it would live.
+    """
+    manager = DhcpManager(config=MagicMock())
+    manager.calls = []
+
+    def run_module(module, **kwargs):
+        params = kwargs.get("params", {})
+        command = params.get("command")
+        if command == "searchHost":
+            manager.calls.append("list")
+            return {"result": {"response": {"rows": [dict(r) for r in rows]}}}
+        if command in ("addHost", "setHost"):
+            body = params["data"]["host"]
+            if not {"descr", "hwaddr"} <= set(body) or {"description", "hardware_addr"} & set(body):
+                return {"result": {"response": {"result": "failed"}}}
+            if command == "addHost":
+                manager.calls.append(("add", body["host"]))
+                return {"result": {"response": {"result": "saved", "uuid": "new"}}}
+            manager.calls.append(("set", params["params"][0]))
+            return {"result": {"response": {"result": "saved"}}}
+        if command == "delHost":
+            manager.calls.append(("delete", params["params"][0]))
+            return {"result": {"response": {"result": "deleted"}}}
+        if command == "reconfigure":
+            manager.calls.append("reconfigure")
+            return {"result": {"response": {"status": "ok"}}}
+        return {"result": {"response": {}}}
+
+    manager._client = MagicMock()
+    manager._client.run_module.side_effect = run_module
+    return manager
+
+
+class TestHostImport(unittest.TestCase):
+    ROWS = [
+        _row("u1", "app", "10.2.1.10"),
+        _row("u2", "db", "10.2.1.11", mac="AA:BB:CC:00:00:02"),
+        _row("u3", "old", "10.2.1.12"),
+    ]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def _inventory(self, hosts, name="hosts.json"):
+        path = self.dir / name
+        path.write_text(json.dumps(hosts))
+        return str(path)
+
+    def test_only_needed_writes_and_one_reconfigure(self):
+        manager = _host_manager(self.ROWS)
+        path = self._inventory([
+            {"host": "app", "domain": "srv.internal", "ip": "10.2.1.10"},                 # unchanged
+            {"host": "db", "domain": "srv.internal", "ip": "10.2.1.21",
+             "mac": "aa-bb-cc-00-00-02"},                                                  # IP moved
+            {"host": "web", "domain": "srv.internal", "ip": "10.2.1.30"},                 # new
+        ])
+        self.assertTrue(import_dns_hosts(manager, path, prune=True))
+        self.assertEqual(manager.calls, [
+            "list",
+            ("delete", "u3"),
+            ("set", "u2"),
+            ("add", "web"),
+            "reconfigure",
+        ])
+
+    def test_check_mode_lists_once_and_writes_nothing(self):
+        manager = _host_manager(self.ROWS)
+        path = self._inventory([{"host": "web", "domain": "srv.internal", "ip": "10.2.1.30"}])
+        self.assertTrue(import_dns_hosts(manager, path, prune=True, check_mode=True))
+        self.assertEqual(manager.calls, ["list"])
+
+    def test_in_sync_inventory_does_not_reconfigure(self):
+        manager = _host_manager(self.ROWS[:1])
+        path = self._inventory([{"host": "app", "domain": "srv.internal", "ip": "10.2.1.10"}])
+        self.assertTrue(import_dns_hosts(manager, path))
+        self.assertEqual(manager.calls, ["list"])
+
+    def test_ip_held_by_another_entry_is_a_conflict(self):
+        manager = _host_manager(self.ROWS)
+        path = self._inventory([
+            {"host": "web", "domain": "srv.internal", "ip": "10.2.1.12"},   # still owned by "old"
+            {"host": "api", "domain": "srv.internal", "ip": "10.2.1.40"},
+        ])
+        self.assertFalse(import_dns_hosts(manager, path))
+        self.assertEqual(manager.calls, ["list", ("add", "api"), "reconfigure"])
+
+    def test_renamed_description_matches_by_fqdn(self):
+        index = HostIndex(_host_manager(self.ROWS).list_hosts())
+        wanted = parse_inventory(json.dumps([
+            {"host": "app", "domain": "srv.internal", "ip": "10.2.1.10", "description": "App server"},
+        ]), "json")
+        plan = plan_import(index, wanted)
+        self.assertEqual([(c.uuid, w.description) for c, w in plan.updates], [("u1", "App server")])
+        self.assertEqual(plan.creates, [])
+
+    def test_bad_inventory_is_rejected_before_listing(self):
+        manager = _host_manager(self.ROWS)
+        path = self._inventory([{"host": "web", "domain": "srv.internal", "ip": "10.2.1.300"}])
+        self.assertFalse(import_dns_hosts(manager, path))
+        self.assertEqual(manager.calls, [])
+        with self.assertRaises(ValueError):
+            parse_inventory(json.dumps([{"host": "a", "ip": "10.0.0.1"}, {"host": "a", "ip": "10.0.0.2"}]), "json")
+
+    def test_export_round_trips_through_csv(self):
+        manager = _host_manager(self.ROWS)
+        out = self.dir / "hosts.csv"
+        self.assertTrue(export_dns_hosts(manager, str(out)))
+        self.assertTrue(out.read_text().startswith("host,domain,ip,mac,description\n"))
+        manager.calls.clear()
+        self.assertTrue(import_dns_hosts(manager, str(out), prune=True))
+        self.assertEqual(manager.calls, ["list"])
+
+    def test_multi_value_fields(self):
+        entries = parse_inventory(
+            "host,domain,ip,mac,description\n"
+            "nas,srv.internal,10.2.1.5 10.2.1.6,aa:bb:cc:dd:ee:01;aa:bb:cc:dd:ee:02,\n",
+            "csv",
+        )
+        self.assertEqual(entries[0].ip, ("10.2.1.5", "10.2.1.6"))
+        self.assertEqual(entries[0].description, "nas.srv.internal")
+        self.assertEqual(parse_inventory(dump_inventory(entries, "json"), "json"), entries)
+
 
 if __name__ == "__main__":
     unittest.main()
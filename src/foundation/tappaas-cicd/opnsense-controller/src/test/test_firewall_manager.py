@@ -0,0 +1,152 @@
+"""Unit tests for FirewallManager's RuleIndex snapshot.
+
+The filter ruleset is downloaded once and indexed; repeated lookups must not
+re-fetch, and every mutation made through the manager must drop the snapshot
+so the next lookup sees fresh state.
+
+Run with:
+    cd src && python -m unittest test.test_firewall_manager -v
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import MagicMock
+
+from opnsense_controller.firewall_manager import (
+    AliasInfo,
+    FirewallManager,
+    FirewallRule,
+    FirewallRuleInfo,
+    RuleIndex,
+)
+
+
+def _rule(uuid, description, sequence=None) -> FirewallRuleInfo:
+    return FirewallRuleInfo(
+        uuid=uuid, description=description, enabled=True, action="pass",
+        interface="lan", direction="in", protocol="TCP", source_net="any",
+        source_port=None, destination_net="any", destination_port=None,
+        log=True, sequence=sequence,
+    )
+
+
+def _filter_get(rules: dict) -> dict:
+    """Shape of /api/firewall/filter/get as returned through run_module('raw')."""
+    return {"result": {"response": {"filter": {"rules": {"rule": rules}}}}}
+
+
+def _make_manager(rules: dict):
+    manager = FirewallManager(config=MagicMock())
+    manager._client = MagicMock()
+
+    def run_module(module, **kwargs):
+        if module == "raw" and kwargs.get("params", {}).get("command") == "get":
+            return _filter_get(rules)
+        return {"result": {"changed": True}}
+
+    manager._client.run_module.side_effect = run_module
+    return manager
+
+
+def _fetch_count(manager) -> int:
+    return sum(
+        1 for call in manager.client.run_module.call_args_list
+        if call.kwargs.get("params", {}).get("command") == "get"
+    )
+
+
+class TestRuleIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = RuleIndex([
+            _rule("u1", "tappaas-module:litellm:ingress:dmz:4000 | Reverse proxy", 10400),
+            _rule("u2", "tappaas-module:litellm:egress:vllm:11434", 20400),
+            _rule("u3", "tappaas-module:litellm-b:ingress:dmz:80", 10500),
+            _rule("u4", "Zone srv -> gateway", 30100),
+        ])
+
+    def test_lookup_by_uuid_and_description(self):
+        self.assertEqual(self.index.get("u4").description, "Zone srv -> gateway")
+        self.assertEqual(self.index.get_by_description("Zone srv -> gateway").uuid, "u4")
+        self.assertIsNone(self.index.get("nope"))
+
+    def test_lookup_by_canonical_strips_freetext(self):
+        hits = self.index.get_by_canonical("tappaas-module:litellm:ingress:dmz:4000")
+        self.assertEqual([r.uuid for r in hits], ["u1"])
+
+    def test_lookup_by_sequence(self):
+        self.assertEqual([r.uuid for r in self.index.get_by_sequence(20400)], ["u2"])
+        self.assertEqual(self.index.get_by_sequence(1), [])
+
+    def test_prefix_scan_respects_module_boundary(self):
+        hits = self.index.with_prefix("tappaas-module:litellm:")
+        self.assertEqual(sorted(r.uuid for r in hits), ["u1", "u2"])
+
+    def test_search_is_case_insensitive_substring(self):
+        self.assertEqual([r.uuid for r in self.index.search("ZONE SRV")], ["u4"])
+        self.assertEqual(len(self.index.search("")), 4)
+
+
+class TestFirewallManagerSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.manager = _make_manager({
+            "u1": {"description": "a", "sequence": "10"},
+            "u2": {"description": "b", "sequence": "20"},
+        })
+
+    def test_repeated_lookups_fetch_once(self):
+        self.manager.list_rules()
+        self.manager.list_rules("a")
+        self.manager.get_rule_by_description("b")
+        self.assertEqual(_fetch_count(self.manager), 1)
+
+    def test_mutation_invalidates_snapshot(self):
+        self.manager.list_rules()
+        self.manager.create_rule(FirewallRule(description="c"), apply=False)
+        self.manager.list_rules()
+        self.manager.delete_rule_by_uuid("u1", apply=False)
+        self.manager.get_rule_by_description("a")
+        self.assertEqual(_fetch_count(self.manager), 3)
+
+    def test_empty_ruleset_list_shape(self):
+        manager = _make_manager([])
+        self.assertEqual(manager.list_rules(), [])
+
+
+class TestAliasTable(unittest.TestCase):
+    def _manager(self, aliases):
+        manager = FirewallManager(config=MagicMock())
+        manager._client = MagicMock()
+        manager._client.run_module.return_value = {
+            "result": {"response": {"alias": {"aliases": {"alias": aliases}}}}
+        }
+        return manager
+
+    def test_parses_selected_type_and_content(self):
+        manager = self._manager({
+            "a1": {
+                "name": "tm_vllm", "enabled": "1", "description": "vllm",
+                "type": {"host": {"value": "Host(s)", "selected": 1},
+                         "network": {"value": "Network(s)", "selected": 0}},
+                "content": {"vllm.srvwork.internal": {"selected": 1}},
+            },
+            "a2": {"name": "llm_providers", "type": "host",
+                   "content": "api.example.com\napi.other.com"},
+        })
+        aliases = {a.name: a for a in manager.list_aliases()}
+        self.assertEqual(aliases["tm_vllm"].type, "host")
+        self.assertEqual(aliases["tm_vllm"].content, ["vllm.srvwork.internal"])
+        self.assertEqual(aliases["llm_providers"].content,
+                         ["api.example.com", "api.other.com"])
+
+    def test_empty_table_list_shape(self):
+        self.assertEqual(self._manager([]).list_aliases(), [])
+
+    def test_matches_ignores_content_order(self):
+        alias = AliasInfo(uuid="u", name="x", type="host", content=["b", "a"])
+        self.assertTrue(alias.matches("host", ["a", "b"], ""))
+        self.assertFalse(alias.matches("network", ["a", "b"], ""))
+        self.assertFalse(alias.matches("host", ["a"], ""))
+
+if __name__ == "__main__":
+    unittest.main()
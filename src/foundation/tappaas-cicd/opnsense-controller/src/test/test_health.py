@@ -0,0 +1,82 @@
+"""Unit tests for the concurrent health probes and the background watcher.
+
+Probes are plain callables here, so no network access is needed.
+
+Run with:
+    cd src && python -m unittest test.test_health -v
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from opnsense_controller.health import HealthWatcher, run_health_probes
+
+
+def _sleeper(seconds: float, result: bool = True):
+    def probe():
+        time.sleep(seconds)
+        return result
+    return probe
+
+
+class TestRunHealthProbes(unittest.TestCase):
+    def test_results_and_latency(self):
+        results = run_health_probes({"a": _sleeper(0.05), "b": lambda: False}, "T")
+        self.assertTrue(results["a"].ok)
+        self.assertFalse(results["b"].ok)
+        self.assertGreaterEqual(results["a"].latency_ms, 40)
+        self.assertEqual(results["a"].label, "T")
+
+    def test_probes_run_concurrently(self):
+        start = time.monotonic()
+        run_health_probes({name: _sleeper(0.3) for name in ("dns", "egress", "api")})
+        self.assertLess(time.monotonic() - start, 0.6)
+
+    def test_exception_counts_as_failure(self):
+        def broken():
+            raise OSError("boom")
+        result = run_health_probes({"x": broken})["x"]
+        self.assertEqual((result.ok, result.detail), (False, "boom"))
+
+    def test_metrics_are_appended_as_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "health.jsonl"
+            run_health_probes({"dns": lambda: True}, "PRE-FLIGHT", metrics_file=path)
+            run_health_probes({"dns": lambda: False}, "POST-FLIGHT", metrics_file=path)
+            lines = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual([(m["label"], m["ok"]) for m in lines],
+                         [("PRE-FLIGHT", True), ("POST-FLIGHT", False)])
+        self.assertEqual(lines[0]["metric"], "health_probe")
+        self.assertIn("latency_ms", lines[0])
+
+
+class TestHealthWatcher(unittest.TestCase):
+    def test_watch_samples_until_stopped(self):
+        state = {"up": True}
+        with HealthWatcher({"dns": lambda: state["up"]}, interval=0.02) as watcher:
+            time.sleep(0.1)
+            state["up"] = False
+            time.sleep(0.1)
+        runs = len(watcher.samples)
+        self.assertGreaterEqual(runs, 4)
+        self.assertEqual(watcher.degraded, ["dns"])
+        summary = watcher.summary()["dns"]
+        self.assertEqual(summary["runs"], runs)
+        self.assertGreater(summary["failures"], 0)
+        time.sleep(0.05)
+        self.assertEqual(len(watcher.samples), runs)   # thread has stopped
+
+    def test_healthy_watch_is_not_degraded(self):
+        with HealthWatcher({"dns": lambda: True}, interval=10) as watcher:
+            pass
+        self.assertEqual(watcher.degraded, [])
+        self.assertEqual(watcher.summary()["dns"]["runs"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
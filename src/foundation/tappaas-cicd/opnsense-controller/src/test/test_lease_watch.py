@@ -0,0 +1,103 @@
+"""Unit tests for the incremental dnsmasq lease watcher.
+
+Run with:
+    cd src && python -m unittest test.test_lease_watch -v
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock, patch
+
+from opnsense_controller.dns_manager_cli import watch_leases
+from opnsense_controller.lease_watch import LeaseTable, LeaseWatcher
+
+
+def _lease(mac, ip, hostname="", zone="srv", expire=100):
+    return {"mac": mac, "ip": ip, "hostname": hostname, "zone": zone,
+            "interface": "opt1", "expire": expire}
+
+
+def _manager(*snapshots):
+    """A manager whose iter_leases returns each snapshot in turn."""
+    manager = MagicMock()
+    manager.iter_leases.side_effect = [iter(s) if isinstance(s, list) else s for s in snapshots]
+    return manager
+
+
+class TestLeaseTable(unittest.TestCase):
+    def test_add_change_expire(self):
+        table = LeaseTable()
+        first = table.update([_lease("AA:00", "10.0.0.1", "a"), _lease("aa:01", "10.0.0.2", "b")], now=1.0)
+        self.assertEqual([(e.event, e.mac, e.ip) for e in first],
+                         [("add", "aa:00", "10.0.0.1"), ("add", "aa:01", "10.0.0.2")])
+
+        second = table.update([
+            _lease("aa:00", "10.0.0.1", "a", expire=999),     # renewal only
+            _lease("aa:01", "10.0.0.2", "b2"),                # hostname changed
+            _lease("aa:02", "10.0.0.3", "c"),
+        ], now=2.0)
+        self.assertEqual([(e.event, e.ip) for e in second],
+                         [("change", "10.0.0.2"), ("add", "10.0.0.3")])
+        self.assertEqual(second[0].changed, {"hostname": ["b", "b2"]})
+
+        third = table.update([_lease("aa:02", "10.0.0.3", "c")], now=3.0)
+        self.assertEqual([(e.event, e.ip, e.hostname, e.expire) for e in third],
+                         [("expire", "10.0.0.1", "a", 999), ("expire", "10.0.0.2", "b2", 100)])
+        self.assertEqual(len(table), 1)
+
+    def test_new_ip_for_same_mac_is_add_plus_expire(self):
+        table = LeaseTable()
+        table.update([_lease("aa:00", "10.0.0.1")])
+        events = table.update([_lease("aa:00", "10.0.0.9")])
+        self.assertEqual([(e.event, e.ip) for e in events], [("add", "10.0.0.9"), ("expire", "10.0.0.1")])
+
+
+class TestLeaseWatcher(unittest.TestCase):
+    def test_only_changes_are_yielded(self):
+        manager = _manager([_lease("aa:00", "10.0.0.1")],
+                           [_lease("aa:00", "10.0.0.1")],
+                           [])
+        watcher = LeaseWatcher(manager, interval=0)
+        events = [(e.event, e.ip) for e in watcher.events(max_polls=3)]
+        self.assertEqual(events, [("add", "10.0.0.1"), ("expire", "10.0.0.1")])
+        self.assertEqual(manager.iter_leases.call_count, 3)
+
+    def test_no_initial_primes_silently(self):
+        manager = _manager([_lease("aa:00", "10.0.0.1")],
+                           [_lease("aa:00", "10.0.0.1"), _lease("aa:01", "10.0.0.2")])
+        watcher = LeaseWatcher(manager, interval=0, initial=False)
+        self.assertEqual([e.ip for e in watcher.events(max_polls=2)], ["10.0.0.2"])
+
+    def test_failed_poll_keeps_table(self):
+        manager = _manager([_lease("aa:00", "10.0.0.1")],
+                           RuntimeError("API down"),
+                           [_lease("aa:00", "10.0.0.1")])
+        watcher = LeaseWatcher(manager, interval=0)
+        with patch("opnsense_controller.lease_watch.error") as error:
+            events = list(watcher.events(max_polls=3))
+        self.assertEqual([e.event for e in events], ["add"])
+        error.assert_called_once()
+
+    def test_stop_ends_the_stream(self):
+        manager = MagicMock()
+        manager.iter_leases.side_effect = lambda: iter([_lease("aa:00", "10.0.0.1")])
+        watcher = LeaseWatcher(manager, interval=60)
+        for _ in watcher.events():
+            watcher.stop()
+        self.assertEqual(manager.iter_leases.call_count, 1)
+
+    def test_cli_prints_json_lines(self):
+        manager = _manager([_lease("aa:00", "10.0.0.1", "a")], [])
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertTrue(watch_leases(manager, interval=0, count=2))
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([(d["event"], d["hostname"]) for d in lines], [("add", "a"), ("expire", "a")])
+
+
+if __name__ == "__main__":
+    unittest.main()
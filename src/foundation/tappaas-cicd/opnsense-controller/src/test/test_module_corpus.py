@@ -0,0 +1,133 @@
+"""Unit tests for the parse-once module corpus and its line-tracking parser.
+
+Run with:
+    cd src && python -m unittest test.test_module_corpus -v
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from opnsense_controller.module_corpus import ModuleCorpus, loads_with_lines
+from opnsense_controller.zone_manager import Zone, validate_pinhole_allowed_from
+
+
+def _zone(name, pinhole_allowed_from=()):
+    return Zone(
+        name=name, zone_type="Service", state="Active", type_id="2", sub_id="1",
+        vlan_tag=210, ip_network="10.2.1.0/24", bridge="lan", description=name,
+        access_to=[], pinhole_allowed_from=list(pinhole_allowed_from),
+    )
+
+
+class TestLoadsWithLines(unittest.TestCase):
+    SAMPLES = [
+        '{}', '[]', '"x"', '0', '-1.5e3', 'true', 'null',
+        '{"a": [1, 2.0, {"b": null}], "c": "\\u00e9\\n", "d": false}',
+        '  [ {"k" : -0 } , [ ] , "" ]  ',
+    ]
+
+    def test_values_match_json_loads(self):
+        for text in self.SAMPLES:
+            with self.subTest(text=text):
+                self.assertEqual(loads_with_lines(text)[0], json.loads(text))
+
+    def test_lines_of_keys_and_elements(self):
+        text = json.dumps({
+            "vmname": "x",
+            "ingress": [{"from": "srv", "ports": [1]}, {"from": "home"}],
+        }, indent=2)
+        _, lines = loads_with_lines(text)
+        raw = text.splitlines()
+        self.assertIn('"ingress"', raw[lines[("ingress",)] - 1])
+        self.assertIn('"home"', raw[lines[("ingress", 1, "from")] - 1])
+        self.assertEqual(raw[lines[("ingress", 1)] - 1].strip(), "{")
+
+    def test_errors_carry_the_line(self):
+        for text in ['{\n  "a": 1,\n  "b" 2\n}', '{\n"a": [1,,2]}', '{"a": 1} x', '{not-json', '']:
+            with self.subTest(text=text):
+                with self.assertRaises(json.JSONDecodeError) as ours:
+                    loads_with_lines(text)
+                with self.assertRaises(json.JSONDecodeError) as ref:
+                    json.loads(text)
+                self.assertEqual(ours.exception.lineno, ref.exception.lineno)
+
+
+class TestModuleCorpus(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name, body):
+        (self.dir / f"{name}.json").write_text(json.dumps(body, indent=2))
+
+    def test_each_file_is_parsed_once(self):
+        self._write("a", {"zone0": "srv"})
+        self._write("b", {"zone0": "srv", "ingress": [{"from": "a"}]})
+        with patch("opnsense_controller.module_corpus.loads_with_lines",
+                   wraps=loads_with_lines) as parse:
+            corpus = ModuleCorpus(self.dir)
+            self.assertEqual(corpus.peer_data("a"), {"zone0": "srv"})
+            corpus.peer("a")
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual([d.stem for d in corpus], ["a", "b"])
+
+    def test_non_module_peer_is_loaded_lazily(self):
+        self._write("zones", {"zone0": "mgmt"})
+        corpus = ModuleCorpus(self.dir)
+        self.assertEqual(len(corpus), 0)
+        self.assertEqual(corpus.peer_data("zones"), {"zone0": "mgmt"})
+        self.assertIsNone(corpus.peer("ghost"))
+
+    def test_pinhole_files_are_cached_per_provider_service(self):
+        loc = self.dir / "loc"
+        (loc / "services" / "api").mkdir(parents=True)
+        (loc / "services" / "api" / "pinhole.json").write_text('{"ports": [{"port": 1}]}')
+        corpus = ModuleCorpus(self.dir)
+        with patch("opnsense_controller.module_corpus._read_pinhole_ports",
+                   return_value=[{"port": 1}]) as read:
+            for _ in range(3):
+                self.assertEqual(corpus.pinhole_ports(str(loc), "api"), [{"port": 1}])
+        read.assert_called_once()
+
+    def test_validation_line_is_the_offending_from(self):
+        self._write("secret", {
+            "zone0": "srv",
+            "ingress": [{"from": "srv", "ports": [1]}, {"from": "home", "ports": [2]}],
+        })
+        zones = {"srv": _zone("srv", ["dmz"]), "home": _zone("home")}
+        warnings, _ = validate_pinhole_allowed_from(zones, self.dir)
+        raw = (self.dir / "secret.json").read_text().splitlines()
+        self.assertIn('"from": "home"', raw[warnings[0].line - 1])
+
+    def test_hundreds_of_modules_validate_quickly(self):
+        loc = self.dir / "loc"
+        (loc / "services" / "api").mkdir(parents=True)
+        (loc / "services" / "api" / "pinhole.json").write_text('{"ports": [{"port": 1}]}')
+        self._write("provider", {"zone0": "home", "location": str(loc)})
+        for i in range(300):
+            self._write(f"m{i:03}", {
+                "vmname": f"m{i:03}", "zone0": "srv",
+                "ingress": [{"from": "home", "ports": [p]} for p in range(5)]
+                + [{"from": "provider", "ports": [9]}],
+                "dependsOn": ["provider:api", "cluster:vm"],
+            })
+        zones = {"srv": _zone("srv"), "home": _zone("home")}
+        start = time.monotonic()
+        warnings, errors = validate_pinhole_allowed_from(zones, self.dir)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(warnings), 300 * 7)
+        self.assertEqual(warnings[0].module, "m000")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+"""Unit tests for the offline policy simulator.
+
+Builds the policy from a throwaway zones.json + module directory — no OPNsense
+connection needed.
+
+Run with:
+    cd src && python -m unittest test.test_policy_simulator -v
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from opnsense_controller.firewall_manager import FirewallRule, Protocol, RuleAction
+from opnsense_controller.policy_simulator import (
+    PolicySimulator,
+    Query,
+    build_policy,
+    offline_interfaces,
+)
+from opnsense_controller.rules_manager import ZoneSpec
+
+ZONES = {
+    "mgmt": {"state": "Manual", "vlantag": 0, "ip": "10.0.0.0/24", "bridge": "lan",
+             "access-to": ["internet"]},
+    "srvHome": {"state": "Active", "vlantag": 210, "ip": "10.2.10.0/24",
+                "access-to": ["internet", "dmz"], "pinhole-allowed-from": ["home"]},
+    "home": {"state": "Active", "vlantag": 310, "ip": "10.3.10.0/24",
+             "access-to": ["internet"]},
+    "guest": {"state": "Active", "vlantag": 510, "ip": "10.5.10.0/24",
+              "access-to": ["internet"]},
+    "iotCams": {"state": "Active", "vlantag": 430, "ip": "10.4.30.0/24",
+                "access-to": []},
+    "dmz": {"state": "Mandatory", "vlantag": 610, "ip": "10.6.0.0/24",
+            "access-to": ["internet"]},
+}
+
+MODULES = {
+    "nextcloud": {
+        "vmname": "nextcloud", "zone0": "srvHome",
+        "ingress": [
+            {"from": "home", "ports": [443], "protocol": "tcp", "description": "web"},
+            {"from": "internet", "ports": ["8000:8010"], "protocol": "tcp",
+             "description": "sync"},
+        ],
+        "egress": [],
+    },
+    "frigate": {"vmname": "frigate", "zone0": "iotCams", "ingress": [], "egress": []},
+}
+
+
+class _PolicyFixture(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.zones_file = root / "zones.json"
+        self.zones_file.write_text(json.dumps(ZONES))
+        self.modules_dir = root / "modules"
+        self.modules_dir.mkdir()
+        for name, data in MODULES.items():
+            (self.modules_dir / f"{name}.json").write_text(json.dumps(data))
+        self.build = build_policy(self.zones_file, self.modules_dir)
+        self.sim = self.build.simulator
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+
+class TestBuildPolicy(_PolicyFixture):
+    def test_zone_and_module_rules_are_loaded(self):
+        self.assertEqual(self.build.errors, {})
+        # srvHome 6 (extra dmz pass) + home/guest/dmz 5 each, caddy passes for
+        # mgmt/srvHome/home/guest, and the two nextcloud pinholes
+        self.assertEqual(self.sim.rule_count, 6 + 3 * 5 + 4 * 2 + 2)
+
+    def test_module_compile_errors_are_reported(self):
+        (self.modules_dir / "bad.json").write_text(json.dumps({
+            "vmname": "bad", "zone0": "srvHome",
+            "ingress": [{"from": "guest", "ports": [22], "description": "ssh"}],
+        }))
+        build = build_policy(self.zones_file, self.modules_dir)
+        self.assertIn("bad", build.errors)
+
+    def test_offline_interfaces(self):
+        zones = {
+            "a": ZoneSpec("a", "10.1.0.0/24", "lan", 100, [], []),
+            "b": ZoneSpec("b", "10.0.0.0/24", "LAN", 0, [], []),
+        }
+        self.assertEqual(offline_interfaces(zones), {"a": "a", "b": "lan"})
+
+
+class TestVerdicts(_PolicyFixture):
+    def test_module_pinhole_passes_with_its_sequence(self):
+        verdict = self.sim.evaluate("home", "nextcloud", 443)
+        self.assertTrue(verdict.allowed)
+        self.assertEqual(verdict.reason, "rule")
+        self.assertTrue(10000 <= verdict.sequence < 20000)
+        self.assertIn("tappaas-module:nextcloud:ingress:home:443", verdict.description)
+
+    def test_other_port_hits_the_zone_block(self):
+        verdict = self.sim.evaluate("home", "nextcloud", 22)
+        self.assertFalse(verdict.allowed)
+        self.assertIn("block rfc1918-10", verdict.description)
+        self.assertTrue(30000 <= verdict.sequence < 40000)
+
+    def test_internet_port_range(self):
+        self.assertTrue(self.sim.evaluate("internet", "nextcloud", 8005).allowed)
+        verdict = self.sim.evaluate("internet", "nextcloud", 8011)
+        self.assertEqual((verdict.action, verdict.reason), ("block", "default-deny"))
+        self.assertEqual(verdict.interface, "wan")
+
+    def test_caddy_reachability_wins_over_rfc1918_block(self):
+        verdict = self.sim.evaluate("guest", "10.6.0.1", 443)
+        self.assertTrue(verdict.allowed)
+        self.assertEqual(verdict.sequence, 990)
+        self.assertFalse(self.sim.evaluate("guest", "10.6.0.1", 22).allowed)
+
+    def test_isolated_zone_is_default_denied(self):
+        verdict = self.sim.evaluate("iotCams", "internet", 443)
+        self.assertEqual(verdict.reason, "default-deny")
+
+    def test_internet_access(self):
+        verdict = self.sim.evaluate("guest", "internet", 443)
+        self.assertTrue(verdict.allowed)
+        self.assertIn("-> internet", verdict.description)
+
+    def test_same_zone_never_reaches_firewall(self):
+        verdict = self.sim.evaluate("frigate", "iotCams", 554)
+        self.assertEqual(verdict.reason, "same-zone")
+        self.assertTrue(verdict.allowed)
+
+    def test_protocol_must_match(self):
+        self.assertFalse(self.sim.evaluate("home", "nextcloud", 443, "UDP").allowed)
+
+    def test_unknown_endpoint_raises(self):
+        with self.assertRaises(ValueError):
+            self.sim.evaluate("home", "nosuchthing", 443)
+
+    def test_query_from_dict(self):
+        query = Query.from_dict({"from": "home", "to": "nextcloud", "port": "443",
+                                 "expect": "pass"})
+        self.assertEqual(query.port, 443)
+        self.assertEqual(self.sim.run(query).action, query.expect)
+
+
+class TestMatching(unittest.TestCase):
+    ZONES = {
+        "a": ZoneSpec("a", "10.1.0.0/24", "lan", 100, [], []),
+        "b": ZoneSpec("b", "10.2.0.0/24", "lan", 200, [], []),
+    }
+
+    def _sim(self, *rules, aliases=None) -> PolicySimulator:
+        return PolicySimulator(rules, self.ZONES, {"a": "a", "b": "b"}, aliases=aliases)
+
+    def test_lowest_sequence_wins_regardless_of_input_order(self):
+        sim = self._sim(
+            FirewallRule("late pass", RuleAction.PASS, "a", sequence=200),
+            FirewallRule("early block", RuleAction.BLOCK, "a", sequence=100),
+        )
+        verdict = sim.evaluate("a", "b", 80)
+        self.assertEqual((verdict.action, verdict.sequence), ("block", 100))
+
+    def test_rules_only_apply_to_their_interface(self):
+        sim = self._sim(FirewallRule("b only", RuleAction.PASS, "b", sequence=1))
+        self.assertEqual(sim.evaluate("a", "b", 80).reason, "default-deny")
+        self.assertTrue(sim.evaluate("b", "a", 80).allowed)
+
+    def test_multi_interface_rule_applies_on_each_interface(self):
+        sim = self._sim(FirewallRule("a and b", RuleAction.PASS, ["a", "b"],
+                                     destination_port="80", sequence=1))
+        self.assertTrue(sim.evaluate("a", "b", 80).allowed)
+        self.assertTrue(sim.evaluate("b", "a", 80).allowed)
+        self.assertEqual(sim.rule_count, 1)
+
+    def test_network_and_port_aliases_resolve(self):
+        sim = self._sim(
+            FirewallRule("web to b", RuleAction.PASS, "a", protocol=Protocol.TCP,
+                         destination_net="nets", destination_port="web", sequence=1),
+            aliases={"nets": {"type": "network", "addresses": ["10.2.0.0/16"]},
+                     "web": {"type": "port", "addresses": ["80", "443"]}},
+        )
+        self.assertTrue(sim.evaluate("a", "b", 443).allowed)
+        self.assertFalse(sim.evaluate("a", "b", 8080).allowed)
+
+    def test_disabled_rules_are_skipped(self):
+        sim = self._sim(FirewallRule("off", RuleAction.PASS, "a", enabled=False, sequence=1))
+        self.assertEqual(sim.rule_count, 0)
+        self.assertEqual(sim.skipped, ["off"])
+
+    def test_thousands_of_queries_per_second(self):
+        rules = [
+            FirewallRule(f"r{i}", RuleAction.PASS, "a", protocol=Protocol.TCP,
+                         destination_net="10.2.0.0/24", destination_port=str(1000 + i),
+                         sequence=10000 + i)
+            for i in range(2000)
+        ]
+        rules.append(FirewallRule("block", RuleAction.BLOCK, "a",
+                                  destination_net="10.0.0.0/8", sequence=30090))
+        sim = self._sim(*rules)
+        start = time.monotonic()
+        for i in range(5000):
+            sim.evaluate("a", "b", 1000 + i % 2500)
+        self.assertLess(time.monotonic() - start, 2.5)
+        verdict = sim.evaluate("a", "b", 2999)
+        self.assertEqual((verdict.sequence, verdict.evaluated), (11999, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Unit tests for the concurrent reachability prober.
+
+Probes run against local fake targets (a listening TCP socket, a UDP echo
+socket, and ports nothing listens on) so no network access is needed.
+
+Run with:
+    cd src && python -m unittest test.test_probe -v
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+import unittest
+
+from opnsense_controller.probe import ProbeTarget, probe_all
+
+
+def _closed_port() -> int:
+    """A localhost port with nothing listening on it."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestProbe(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tcp = socket.socket()
+        cls.tcp.bind(("127.0.0.1", 0))
+        cls.tcp.listen(1024)
+        cls.tcp_port = cls.tcp.getsockname()[1]
+
+        cls.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        cls.udp.bind(("127.0.0.1", 0))
+        cls.udp_port = cls.udp.getsockname()[1]
+        cls._stop = threading.Event()
+
+        def serve():
+            cls.tcp.settimeout(0.05)
+            cls.udp.settimeout(0.05)
+            while not cls._stop.is_set():
+                try:
+                    conn, _ = cls.tcp.accept()
+                    conn.close()
+                except OSError:
+                    pass
+                try:
+                    data, addr = cls.udp.recvfrom(64)
+                    cls.udp.sendto(data, addr)
+                except OSError:
+                    pass
+
+        cls._thread = threading.Thread(target=serve, daemon=True)
+        cls._thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._stop.set()
+        cls._thread.join()
+        cls.tcp.close()
+        cls.udp.close()
+
+    def test_tcp_pass_and_fail(self):
+        closed = _closed_port()
+        results = probe_all([
+            ProbeTarget("open", "127.0.0.1", self.tcp_port),
+            ProbeTarget("closed", "127.0.0.1", closed),
+        ], timeout=1.0)
+        self.assertEqual([r.status for r in results], ["pass", "fail"])
+        self.assertTrue(results[0].ok)
+        self.assertIsNotNone(results[0].latency_ms)
+
+    def test_udp_echo_passes(self):
+        result = probe_all([ProbeTarget("dns", "127.0.0.1", self.udp_port, "UDP")], timeout=1.0)[0]
+        self.assertEqual(result.status, "pass")
+
+    def test_udp_closed_port_is_not_pass(self):
+        result = probe_all([ProbeTarget("x", "127.0.0.1", _closed_port(), "UDP")], timeout=0.3)[0]
+        self.assertIn(result.status, ("fail", "unknown"))
+
+    def test_unresolvable_host_is_error(self):
+        result = probe_all([ProbeTarget("x", "no-such-host.invalid", 80)], timeout=1.0)[0]
+        self.assertEqual(result.status, "error")
+
+    def test_many_probes_run_concurrently(self):
+        closed = _closed_port()
+        targets = [
+            ProbeTarget(f"t{i}", "127.0.0.1", self.tcp_port if i % 2 else closed)
+            for i in range(500)
+        ]
+        start = time.monotonic()
+        results = probe_all(targets, concurrency=100, timeout=1.0)
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertEqual([r.target.label for r in results], [t.label for t in targets])
+        self.assertEqual(sum(r.ok for r in results), 250)
+
+    def test_no_targets(self):
+        self.assertEqual(probe_all([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,13 +17,21 @@ from unittest.mock import MagicMock, patch
 
 from opnsense_controller import rules_manager as rm
 from opnsense_controller.config import Config
-from opnsense_controller.firewall_manager import FirewallRuleInfo
+from opnsense_controller.probe import ProbeResult
+from opnsense_controller.firewall_manager import (
+    AliasInfo,
+    FirewallManager,
+    FirewallRuleInfo,
+    RuleIndex,
+)
 from opnsense_controller.rules_manager import (
     BAND_EGRESS_BASE,
     BAND_INGRESS_BASE,
     SLOT_SIZE,
     ModuleSpec,
+    OwnershipScan,
     RulesManager,
+    SequenceIndex,
     ValidationError,
     ZoneSpec,
     _canonical_description,
@@ -221,6 +229,7 @@ def _make_manager(zones=None, modules_dir=None, global_aliases=None, firewall_ty
         global_aliases=global_aliases or {},
         sequence_map_file=None,
         firewall_type=firewall_type,
+        compile_cache_file=None,
     )
     return mgr
 
@@ -553,6 +562,487 @@ class TestVerifyAndPruneSuffix(unittest.TestCase):
         self.assertEqual(result.deleted, 1)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Batched upsert: only changed rules are written
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _exact_live_from_compiled(mgr, rules) -> list[FirewallRuleInfo]:
+    """Live rules exactly as the compiled set would leave them (no drift)."""
+    live = []
+    for i, r in enumerate(rules):
+        fw_rule = mgr._to_firewall_rule(r)
+        live.append(FirewallRuleInfo(
+            uuid=f"U{i}", description=fw_rule.description, enabled=True,
+            action="pass", interface=fw_rule.interface, direction="in",
+            protocol=fw_rule.protocol.value, source_net=fw_rule.source_net,
+            source_port=None, destination_net=fw_rule.destination_net,
+            destination_port=fw_rule.destination_port, log=True,
+            sequence=fw_rule.sequence,
+        ))
+    return live
+
+
+class TestBatchedUpsert(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        (self.dir / "litellm.json").write_text(json.dumps(LITELLM_FIXTURE))
+        (self.dir / "vllm.json").write_text(json.dumps(VLLM_FIXTURE))
+        self.mgr = _make_manager(modules_dir=self.dir)
+        self.mgr._write_sequence_map = lambda *a, **k: None
+        self.mgr._upsert_alias = lambda *a, **k: None
+        self.desired, _ = self.mgr._compile(load_module(self.dir, "litellm"))
+        self.live = _exact_live_from_compiled(self.mgr, self.desired)
+        self.mgr._list_owned_rules = lambda name: self.live
+        self.fw = MagicMock()
+        self.mgr._fw = self.fw
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unchanged_module_makes_no_rule_writes(self):
+        result = self.mgr.reconcile("litellm")
+        self.assertEqual(result.applied, len(self.desired))
+        self.assertEqual(result.unchanged, len(self.desired))
+        self.fw.create_savepoint.assert_not_called()
+        self.fw.create_rule.assert_not_called()
+        self.fw.update_rule.assert_not_called()
+        self.fw.delete_rule_by_uuid.assert_not_called()
+        self.fw.apply_changes.assert_not_called()
+
+    def test_changed_field_is_updated_in_place(self):
+        self.live[0].sequence = 1
+        result = self.mgr.reconcile("litellm")
+        self.assertEqual((result.created, result.updated, result.deleted), (0, 1, 0))
+        self.assertEqual(self.fw.update_rule.call_count, 1)
+        self.fw.apply_changes.assert_called_once()
+
+    def test_missing_rule_is_created(self):
+        del self.live[0]
+        result = self.mgr.add_rules("litellm")
+        self.assertEqual((result.created, result.updated), (1, 0))
+        self.assertEqual(result.unchanged, len(self.desired) - 1)
+
+    def test_stale_freetext_copy_is_superseded(self):
+        canonical = _canonical_part(self.live[0].description)
+        self.live[0].description = f"{canonical} | old text"
+        result = self.mgr.add_rules("litellm")
+        self.fw.delete_rule_by_uuid.assert_called_once_with("U0", apply=False)
+        self.assertEqual((result.created, result.deleted), (1, 1))
+
+    def test_orphans_pruned_only_on_reconcile(self):
+        self.live.append(FirewallRuleInfo(
+            uuid="ORPHAN", description="tappaas-module:litellm:ingress:home:9999",
+            enabled=True, action="pass", interface="opt1", direction="in",
+            protocol="TCP", source_net="x", source_port=None,
+            destination_net="y", destination_port=None, log=True, sequence=10099,
+        ))
+        self.assertEqual(self.mgr.add_rules("litellm").deleted, 0)
+        self.fw.delete_rule_by_uuid.assert_not_called()
+        self.assertEqual(self.mgr.reconcile("litellm").deleted, 1)
+        self.fw.delete_rule_by_uuid.assert_called_once_with("ORPHAN", apply=False)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# reconcile --all: one snapshot, one savepoint, one apply
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestReconcileAll(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        (self.dir / "litellm.json").write_text(json.dumps(LITELLM_FIXTURE))
+        (self.dir / "vllm.json").write_text(json.dumps(VLLM_FIXTURE))
+        self.mgr = _make_manager(modules_dir=self.dir)
+        self.mgr._vlan_iface_cache = {}
+        self.mgr._write_sequence_map = lambda *a, **k: None
+        self.upserted = []
+        self.mgr._upsert_alias = lambda name, *a, **k: self.upserted.append(name)
+        self.fw = MagicMock()
+        self.fw.rule_index.return_value = RuleIndex([])
+        self.mgr._fw = self.fw
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_single_transaction_for_all_modules(self):
+        results = self.mgr.reconcile_all(workers=2)
+        self.assertEqual([r.module for r in results], ["litellm", "vllm"])
+        litellm = results[0]
+        self.assertEqual(litellm.created, litellm.applied)
+        self.assertGreater(litellm.created, 0)
+        self.fw.create_savepoint.assert_called_once()
+        self.fw.apply_changes.assert_called_once()
+
+    def test_shared_alias_upserted_once(self):
+        (self.dir / "other.json").write_text(json.dumps({
+            **LITELLM_FIXTURE, "vmname": "other",
+        }))
+        self.mgr.reconcile_all(module_names=["litellm", "other"])
+        self.assertEqual(self.upserted.count("tm_vllm"), 1)
+        self.assertEqual(self.upserted.count("llm_providers"), 1)
+
+    def test_broken_module_reported_and_skipped(self):
+        (self.dir / "broken.json").write_text("{not json")
+        results = {r.module: r for r in self.mgr.reconcile_all()}
+        self.assertTrue(results["broken"].errors)
+        self.assertFalse(results["litellm"].errors)
+        self.fw.apply_changes.assert_called_once()
+
+    def test_unchanged_fleet_makes_no_writes(self):
+        desired, _ = self.mgr._compile(load_module(self.dir, "litellm"))
+        self.fw.rule_index.return_value = RuleIndex(
+            _exact_live_from_compiled(self.mgr, desired)
+        )
+        results = self.mgr.reconcile_all(module_names=["litellm"])
+        self.assertEqual(results[0].unchanged, len(desired))
+        self.fw.create_savepoint.assert_not_called()
+        self.fw.apply_changes.assert_not_called()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Compiled-rules cache
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestCompileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        (self.dir / "litellm.json").write_text(json.dumps(LITELLM_FIXTURE))
+        (self.dir / "vllm.json").write_text(json.dumps(VLLM_FIXTURE))
+        self.cache_file = self.dir / "firewall" / "compiled-rules.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _manager(self):
+        mgr = _make_manager(modules_dir=self.dir)
+        mgr.compile_cache_file = self.cache_file
+        mgr._vlan_iface_cache = {}
+        mgr._fw = MagicMock()
+        mgr._fw.rule_index.return_value = RuleIndex([])
+        self.compiles = 0
+        real_compile = mgr._compile
+
+        def counting_compile(module):
+            self.compiles += 1
+            return real_compile(module)
+
+        mgr._compile = counting_compile
+        return mgr
+
+    def test_verify_reuses_cache_across_runs(self):
+        first = self._manager().verify_rules("litellm")
+        self.assertEqual(self.compiles, 1)
+        self.assertTrue(self.cache_file.exists())
+        second = self._manager().verify_rules("litellm")
+        self.assertEqual(self.compiles, 0)
+        self.assertEqual(second.missing, first.missing)
+
+    def test_peer_change_invalidates(self):
+        self._manager().verify_rules("litellm")
+        (self.dir / "vllm.json").write_text(json.dumps({**VLLM_FIXTURE, "zone0": "dmz"}))
+        self._manager().verify_rules("litellm")
+        self.assertEqual(self.compiles, 1)
+
+    def test_module_file_named_apart_from_vmname_invalidates(self):
+        (self.dir / "litellm.json").rename(self.dir / "litellm-prod.json")
+        self._manager().verify_rules("litellm-prod")
+        (self.dir / "litellm-prod.json").write_text(
+            json.dumps({**LITELLM_FIXTURE, "ports": [{"port": 4001, "protocol": "TCP"}]}))
+        self._manager().verify_rules("litellm-prod")
+        self.assertEqual(self.compiles, 1)
+
+    def test_zone_change_invalidates(self):
+        self._manager().verify_rules("litellm")
+        mgr = self._manager()
+        mgr.zones["srvWork"].access_to = []
+        mgr.verify_rules("litellm")
+        self.assertEqual(self.compiles, 1)
+
+    def test_real_apply_always_compiles(self):
+        self._manager().verify_rules("litellm")
+        mgr = self._manager()
+        mgr._write_sequence_map = lambda *a, **k: None
+        mgr._upsert_alias = lambda *a, **k: None
+        mgr.reconcile("litellm")
+        self.assertEqual(self.compiles, 1)
+        mgr = self._manager()
+        mgr.check_mode = True
+        mgr.reconcile("litellm")
+        self.assertEqual(self.compiles, 0)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Alias engine: diff against the live alias table, one reload
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestAliasEngine(unittest.TestCase):
+    def setUp(self):
+        self.mgr = _make_manager()
+        self.fw = MagicMock()
+        self.fw.list_aliases.return_value = [
+            AliasInfo(uuid="a1", name="tm_vllm", type="host",
+                      content=["vllm.srvWork.internal"], description="vllm"),
+        ]
+        self.mgr._fw = self.fw
+
+    def _alias_writes(self):
+        return [c for c in self.fw.client.run_module.call_args_list if c.args[0] == "alias"]
+
+    def test_identical_alias_not_written(self):
+        changed = self.mgr.create_alias("tm_vllm", "host", ["vllm.srvWork.internal"], "vllm")
+        self.assertFalse(changed)
+        self.assertEqual(self._alias_writes(), [])
+        self.fw.reconfigure_aliases.assert_not_called()
+
+    def test_changed_aliases_written_with_single_reload(self):
+        self.assertTrue(self.mgr._upsert_alias("tm_vllm", "network", ["10.2.10.0/24"], "vllm"))
+        self.assertTrue(self.mgr._upsert_alias("tm_new", "host", ["new.internal"], ""))
+        # Second identical upsert in the same run is a no-op (table kept in step).
+        self.assertFalse(self.mgr._upsert_alias("tm_new", "host", ["new.internal"], ""))
+        self.mgr._reload_aliases()
+        self.mgr._reload_aliases()
+        self.assertEqual(len(self._alias_writes()), 2)
+        self.fw.reconfigure_aliases.assert_called_once()
+        self.fw.list_aliases.assert_called_once()
+
+    def test_delete_absent_alias_skips_write(self):
+        self.assertTrue(self.mgr.remove_alias("tm_missing"))
+        self.assertEqual(self._alias_writes(), [])
+        self.assertTrue(self.mgr.remove_alias("tm_vllm"))
+        self.assertEqual(len(self._alias_writes()), 1)
+        self.fw.reconfigure_aliases.assert_called_once()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# reconcile --changed: reverse-dependency graph
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestAffectedModules(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        (self.dir / "litellm.json").write_text(json.dumps(LITELLM_FIXTURE))
+        (self.dir / "vllm.json").write_text(json.dumps(VLLM_FIXTURE))
+        src = self.dir / "litellm-src" / "services" / "api"
+        src.mkdir(parents=True)
+        self.pinhole = src / "pinhole.json"
+        self.pinhole.write_text(json.dumps({"ports": [{"port": 4000}]}))
+        litellm = {**LITELLM_FIXTURE, "location": str(self.dir / "litellm-src")}
+        (self.dir / "litellm.json").write_text(json.dumps(litellm))
+        (self.dir / "openwebui.json").write_text(json.dumps({
+            "vmname": "openwebui", "zone0": "dmz", "dependsOn": ["litellm:api"],
+        }))
+        (self.dir / "unrelated.json").write_text(json.dumps({
+            "vmname": "unrelated", "zone0": "home",
+        }))
+        self.mgr = _make_manager(modules_dir=self.dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_module_change_pulls_in_referencing_modules(self):
+        self.assertEqual(
+            self.mgr.affected_modules([self.dir / "vllm.json"]), ["litellm", "vllm"]
+        )
+        self.assertEqual(
+            self.mgr.affected_modules([str(self.dir / "litellm.json")]),
+            ["litellm", "openwebui"],
+        )
+
+    def test_pinhole_change_affects_consumers_only(self):
+        self.assertEqual(self.mgr.affected_modules([self.pinhole]), ["openwebui"])
+
+    def test_zones_change_affects_everything(self):
+        self.assertEqual(
+            self.mgr.affected_modules(["/somewhere/zones.json"]),
+            ["litellm", "openwebui", "unrelated", "vllm"],
+        )
+
+    def test_unrelated_file_ignored(self):
+        self.assertEqual(self.mgr.affected_modules([self.dir / "README.md"]), [])
+
+    def test_reconcile_changed_delegates_affected_set(self):
+        with patch.object(self.mgr, "reconcile_all", return_value=[]) as rec:
+            self.mgr.reconcile_changed([self.dir / "vllm.json"])
+        self.assertEqual(rec.call_args.kwargs["module_names"], ["litellm", "vllm"])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Sequence index: slot collisions and occupancy
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _colliding_names() -> tuple[str, str]:
+    """Two module names that hash into the same slot."""
+    seen: dict[int, str] = {}
+    for i in range(10 * rm.SLOT_COUNT):
+        name = f"mod{i}"
+        slot = stable_hash_index(name)
+        if slot in seen:
+            return seen[slot], name
+        seen[slot] = name
+    raise AssertionError("no collision found")
+
+
+class TestSequenceIndex(unittest.TestCase):
+    def test_collision_detected_and_free_slot_suggested(self):
+        a, b = _colliding_names()
+        index = SequenceIndex()
+        index.claim(a, stable_hash_index(a))
+        index.claim(b, stable_hash_index(b))
+        slot = stable_hash_index(a)
+        self.assertEqual(index.collisions(), {slot: sorted([a, b])})
+        report = index.report()
+        self.assertEqual(report["used_slots"], 1)
+        suggested = report["collisions"][0]["suggested_slots"]
+        self.assertEqual(len(suggested), 1)
+        self.assertNotEqual(next(iter(suggested.values())), slot)
+
+    def test_live_sequences_claim_their_slot(self):
+        index = SequenceIndex()
+        index.add("litellm", BAND_INGRESS_BASE + 7 * SLOT_SIZE + 3)
+        index.add("litellm", BAND_EGRESS_BASE + 7 * SLOT_SIZE)
+        index.add("zone-rule", 30100)  # outside the module bands: ignored
+        self.assertEqual(index.owners(7), {"litellm"})
+        self.assertEqual(index.collisions(), {})
+        slot = index.report()["slots"][0]
+        self.assertEqual((slot["ingress_used"], slot["egress_used"]), (1, 1))
+
+    def test_range_query(self):
+        index = SequenceIndex()
+        for seq in (10005, 10001, 10150, 10003):
+            index.add("m", seq)
+        self.assertEqual(index.sequences_in(10000, 10099), [10001, 10003, 10005])
+
+    def test_manager_merges_disk_map_and_live(self):
+        a, b = _colliding_names()
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            (d / f"{a}.json").write_text(json.dumps({"vmname": a, "zone0": "srvWork"}))
+            seq_map = d / "sequence-map.json"
+            seq_map.write_text(json.dumps({"modules": {
+                "recorded": {"slot": 42, "ingress_used": [BAND_INGRESS_BASE + 4200]},
+            }}))
+            mgr = _make_manager(modules_dir=d)
+            mgr.sequence_map_file = seq_map
+            mgr._fw = MagicMock()
+            mgr._fw.rule_index.return_value = RuleIndex([_owned_rule(
+                "B1", f"tappaas-module:{b}:ingress:dmz:80",
+            )])
+            mgr._fw.rule_index.return_value.rules[0].sequence = (
+                BAND_INGRESS_BASE + stable_hash_index(b) * SLOT_SIZE
+            )
+            index = mgr.sequence_index()
+        self.assertIn("recorded", index.owners(42))
+        self.assertEqual(index.owners(stable_hash_index(a)), {a, b})
+
+    def _reconcile_warnings(self, files: dict[str, str]) -> list[str]:
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            for name, body in files.items():
+                (d / f"{name}.json").write_text(body)
+            mgr = _make_manager(modules_dir=d)
+            mgr.check_mode = True
+            mgr._vlan_iface_cache = {}
+            mgr._fw = MagicMock()
+            mgr._fw.rule_index.return_value = RuleIndex([])
+            with patch.object(mgr, "sequence_index", side_effect=AssertionError("full index")), \
+                    patch.object(rm, "warn") as warned:
+                mgr.reconcile(next(iter(files)))
+        return [c.args[0] for c in warned.call_args_list if "sequence slot" in c.args[0]]
+
+    def test_single_module_apply_checks_hash_slots_only(self):
+        slot = stable_hash_index("litellm")
+        twin = next(f"mod{i}" for i in range(100 * rm.SLOT_COUNT)
+                    if stable_hash_index(f"mod{i}") == slot)
+        warnings = self._reconcile_warnings({
+            "litellm": json.dumps(LITELLM_FIXTURE),
+            "vllm": json.dumps(VLLM_FIXTURE),
+            twin: "{ unparseable: claimed by file name",
+        })
+        self.assertEqual(len(warnings), 1)
+        self.assertIn(twin, warnings[0])
+
+    def test_slots_are_keyed_by_vmname_not_file_name(self):
+        slot = stable_hash_index("litellm")
+        twin = next(f"mod{i}" for i in range(100 * rm.SLOT_COUNT)
+                    if stable_hash_index(f"mod{i}") == slot)
+        # litellm lives in litellm-prod.json; the twin's file name hashes elsewhere
+        self.assertEqual(self._reconcile_warnings({
+            "litellm-prod": json.dumps(LITELLM_FIXTURE),
+            "vllm": json.dumps(VLLM_FIXTURE),
+        }), [])
+        warnings = self._reconcile_warnings({
+            "litellm-prod": json.dumps(LITELLM_FIXTURE),
+            "vllm": json.dumps(VLLM_FIXTURE),
+            "other": json.dumps({"vmname": twin, "zone0": "srvWork"}),
+        })
+        self.assertEqual(len(warnings), 1)
+        self.assertIn(twin, warnings[0])
+        self.assertNotIn("litellm-prod", warnings[0])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# verify --deep: probe targets from compiled rules
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class TestDeepVerify(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        (self.dir / "litellm.json").write_text(json.dumps(LITELLM_FIXTURE))
+        (self.dir / "vllm.json").write_text(json.dumps(VLLM_FIXTURE))
+        self.mgr = _make_manager(modules_dir=self.dir)
+        self.mgr._vlan_iface_cache = {}
+        self.module = load_module(self.dir, "litellm")
+        self.desired, _ = self.mgr._compile(self.module)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_targets_resolve_module_and_alias_hosts(self):
+        targets, unprobed = self.mgr._probe_targets(self.module, self.desired)
+        by_port = {(t.host, t.port) for t in targets}
+        self.assertIn(("litellm.srvWork.internal", 4000), by_port)
+        self.assertIn(("vllm.srvWork.internal", 11434), by_port)
+        self.assertIn(("api.example.com", 443), by_port)
+        self.assertEqual(unprobed, [])
+
+    def test_network_destination_not_probed(self):
+        self.mgr.zones["srvWork"].ip_network = "10.2.10.0/24"
+        module = load_module(self.dir, "litellm")
+        module.alias_type = "network"
+        rules, _ = self.mgr._compile(module)
+        targets, unprobed = self.mgr._probe_targets(module, rules)
+        self.assertTrue(all(t.host != "litellm.srvWork.internal" for t in targets))
+        self.assertTrue(any(":ingress:" in d for d in unprobed))
+
+    def test_deep_verify_reports_probe_failures(self):
+        live = _live_from_compiled(self.mgr, self.desired)
+        self.mgr._list_owned_rules = lambda name: live
+
+        def fake_probe_all(targets, **kwargs):
+            return [ProbeResult(t, "fail" if t.port == 443 else "pass") for t in targets]
+
+        with patch.object(rm, "probe_all", side_effect=fake_probe_all):
+            result = self.mgr.verify_rules("litellm", deep=True)
+            gated = self.mgr.verify_rules("litellm", deep=True, probe_gate=True)
+        self.assertEqual(len(result.probes), len(self.desired))
+        self.assertEqual(result.missing, [])
+        # Probes run from mgmt: informational unless gated
+        self.assertFalse(result.probes_ok)
+        self.assertTrue(result.ok)
+        self.assertFalse(gated.ok)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Auto-pinholes (issue #173)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -846,6 +1336,99 @@ class TestPeerResolution(unittest.TestCase):
                          "tm_some_module")
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Ownership scan: one snapshot serves list / remove / alias refcount
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _owned_rule(uuid, description, src="any", dst="any") -> FirewallRuleInfo:
+    return FirewallRuleInfo(
+        uuid=uuid, description=description, enabled=True, action="pass",
+        interface="opt1", direction="in", protocol="TCP", source_net=src,
+        source_port=None, destination_net=dst, destination_port=None,
+        log=True, sequence=None,
+    )
+
+
+OWNERSHIP_RULES = [
+    _owned_rule("L1", "tappaas-module:litellm:egress:vllm:11434 | Local inference",
+                src="tm_litellm", dst="tm_vllm"),
+    _owned_rule("L2", "tappaas-svcdep:litellm:ingress:openwebui:4000",
+                src="tm_openwebui", dst="tm_litellm"),
+    _owned_rule("O1", "tappaas-module:openwebui:egress:litellm:4000",
+                src="tm_openwebui", dst="tm_litellm"),
+    _owned_rule("Z1", "Zone srvWork -> internet"),
+]
+
+
+class TestOwnershipScan(unittest.TestCase):
+    def setUp(self):
+        self.scan = OwnershipScan.from_rules(OWNERSHIP_RULES[:3])
+
+    def test_groups_rules_by_module_across_prefixes(self):
+        self.assertEqual([r.uuid for r in self.scan.owned("litellm")], ["L1", "L2"])
+        self.assertEqual([r.uuid for r in self.scan.owned("openwebui")], ["O1"])
+        self.assertEqual(self.scan.owned("missing"), [])
+
+    def test_alias_refcount(self):
+        self.assertEqual(self.scan.alias_refs["tm_litellm"], {"litellm", "openwebui"})
+        self.assertTrue(self.scan.alias_is_orphan("tm_vllm", exclude_module="litellm"))
+        self.assertFalse(self.scan.alias_is_orphan("tm_litellm", exclude_module="litellm"))
+        self.assertTrue(self.scan.alias_is_orphan("tm_unused", exclude_module="litellm"))
+
+    def test_alias_match_is_exact_not_substring(self):
+        scan = OwnershipScan.from_rules([
+            _owned_rule("X", "tappaas-module:other:egress:vllm-b:80", dst="tm_vllm_b"),
+        ])
+        self.assertTrue(scan.alias_is_orphan("tm_vllm", exclude_module="litellm"))
+
+
+class TestOwnershipSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        (self.dir / "litellm.json").write_text(json.dumps(LITELLM_FIXTURE))
+        (self.dir / "vllm.json").write_text(json.dumps(VLLM_FIXTURE))
+        self.mgr = _make_manager(modules_dir=self.dir)
+        self.fw = MagicMock()
+        self.fw.rule_index.return_value = RuleIndex(OWNERSHIP_RULES)
+        self.mgr._fw = self.fw
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_list_rules_uses_snapshot_not_search(self):
+        rules = self.mgr.list_rules()
+        self.assertEqual(sorted(r.uuid for r in rules), ["L1", "L2", "O1"])
+        self.assertEqual([r.uuid for r in self.mgr.list_rules("openwebui")], ["O1"])
+        self.fw.list_rules.assert_not_called()
+
+    def test_list_orphans(self):
+        rules = self.mgr.list_rules(orphans=True)
+        self.assertEqual([r.uuid for r in rules], ["O1"])
+
+    def test_scan_reused_until_snapshot_changes(self):
+        first = self.mgr._ownership_scan()
+        self.assertIs(self.mgr._ownership_scan(), first)
+        self.fw.rule_index.return_value = RuleIndex(OWNERSHIP_RULES[:1])
+        self.assertIsNot(self.mgr._ownership_scan(), first)
+
+    def test_remove_rules_downloads_ruleset_once(self):
+        fw = FirewallManager(config=MagicMock())
+        fw._client = MagicMock()
+        fetches = []
+        fw._fetch_rules = lambda: fetches.append(1) or list(OWNERSHIP_RULES)
+        self.mgr._fw = fw
+        deleted_aliases = []
+        self.mgr._delete_alias = lambda name: deleted_aliases.append(name) or True
+        result = self.mgr.remove_rules("litellm")
+        self.assertEqual(result.deleted, 2)
+        # tm_litellm is still referenced by openwebui; tm_vllm is orphaned.
+        self.assertNotIn("tm_litellm", deleted_aliases)
+        self.assertIn("tm_vllm", deleted_aliases)
+        self.assertEqual(len(fetches), 1)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # NONE firewall type — no connection, no errors
 # ─────────────────────────────────────────────────────────────────────────────
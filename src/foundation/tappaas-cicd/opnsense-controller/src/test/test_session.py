@@ -0,0 +1,158 @@
+"""Unit tests for the shared client factory and the port caches.
+
+The oxl Client and the port probe are patched (or pointed at local sockets),
+so no firewall is needed.
+
+Run with:
+    cd src && python -m unittest test.test_session -v
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from opnsense_controller import config as config_module
+from opnsense_controller import session
+from opnsense_controller.config import Config
+from opnsense_controller.dhcp_manager import DhcpManager
+from opnsense_controller.firewall_manager import FirewallManager
+from opnsense_controller.vlan_manager import VlanManager
+
+
+def _config(firewall="fw.test", **kwargs) -> Config:
+    return Config(firewall=firewall, token="t", secret="s", credential_file=None, **kwargs)
+
+
+class _SessionTestCase(unittest.TestCase):
+    def setUp(self):
+        session.close_all()
+        config_module._probed_ports.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_file = Path(tmp.name) / "ports.json"
+        cache_patch = patch.object(config_module, "PORT_CACHE_FILE", str(self.cache_file))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        patcher = patch("opnsense_controller.session.Client",
+                        side_effect=lambda **kw: MagicMock(kwargs=kw))
+        self.client_cls = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(session.close_all)
+        self.addCleanup(config_module._probed_ports.clear)
+
+
+class TestSharedClient(_SessionTestCase):
+    def test_managers_share_one_client(self):
+        config = _config(port=443)
+        with VlanManager(config) as vlan, DhcpManager(config) as dhcp:
+            fw = FirewallManager(_config(port=443)).connect()
+            self.assertIs(vlan.client, dhcp.client)
+            self.assertIs(vlan.client, fw.client)
+        self.assertEqual(self.client_cls.call_count, 1)
+
+    def test_distinct_targets_get_distinct_clients(self):
+        a = session.get_client(_config("fw-a", port=443))
+        b = session.get_client(_config("fw-b", port=443))
+        c = session.get_client(_config("fw-a", port=8443))
+        self.assertEqual(len({id(a), id(b), id(c)}), 3)
+        self.assertEqual(c.kwargs["port"], 8443)
+
+    def test_disconnect_keeps_the_shared_client_open(self):
+        with VlanManager(_config(port=443)) as vlan:
+            client = vlan.client
+        client.session.close.assert_not_called()
+        session.close_all()
+        client.session.close.assert_called_once()
+        self.assertIsNot(session.get_client(_config(port=443)), client)
+
+    def test_port_is_probed_once_per_firewall(self):
+        with patch("opnsense_controller.config.probe_opnsense_port",
+                   return_value=8443) as probe:
+            first, second = _config(), _config()
+            self.assertEqual(first.resolve_port(), 8443)
+            self.assertEqual(second.resolve_port(), 8443)
+            self.assertEqual(_config("other").resolve_port(), 8443)
+        self.assertEqual(probe.call_count, 2)
+
+    def test_token_credentials_are_passed_through(self):
+        kwargs = session.client_kwargs(_config(port=443, ssl_verify=False))
+        self.assertEqual((kwargs["token"], kwargs["secret"]), ("t", "s"))
+        self.assertNotIn("credential_file", kwargs)
+        self.assertFalse(kwargs["ssl_verify"])
+
+
+class TestPortCache(_SessionTestCase):
+    def _probe(self, port=8443):
+        return patch("opnsense_controller.config.probe_opnsense_port", return_value=port)
+
+    def test_probed_port_is_written_and_reused_by_the_next_process(self):
+        with self._probe() as probe:
+            self.assertEqual(_config().resolve_port(), 8443)
+        self.assertEqual(json.loads(self.cache_file.read_text())["fw.test"]["port"], 8443)
+
+        config_module._probed_ports.clear()          # a new CLI process
+        with self._probe() as probe:
+            config = _config()
+            self.assertEqual(config.resolve_port(), 8443)
+        probe.assert_not_called()
+        self.assertEqual(config.port_source, "cache")
+
+    def test_expired_entry_is_probed_again(self):
+        self.cache_file.write_text(json.dumps(
+            {"fw.test": {"port": 443, "time": time.time() - config_module.PORT_CACHE_TTL - 1}}))
+        with self._probe() as probe:
+            self.assertEqual(_config().resolve_port(), 8443)
+        probe.assert_called_once()
+
+    def test_stale_cached_port_is_forgotten_on_connect_failure(self):
+        self.cache_file.write_text(json.dumps({"fw.test": {"port": 443, "time": time.time()}}))
+
+        def client(**kwargs):
+            if kwargs["port"] == 443:
+                raise RuntimeError("The firewall is unreachable!")
+            return MagicMock(kwargs=kwargs)
+        self.client_cls.side_effect = client
+        with self._probe(8443):
+            self.assertEqual(session.get_client(_config()).kwargs["port"], 8443)
+        self.assertEqual(json.loads(self.cache_file.read_text())["fw.test"]["port"], 8443)
+
+    def test_probed_port_failure_is_not_retried(self):
+        self.client_cls.side_effect = RuntimeError("unreachable")
+        with self._probe() as probe, self.assertRaises(RuntimeError):
+            session.get_client(_config())
+        probe.assert_called_once()
+        self.assertNotIn("fw.test", json.loads(self.cache_file.read_text()))
+
+    def test_explicit_port_is_never_cached(self):
+        self.client_cls.side_effect = RuntimeError("unreachable")
+        with self.assertRaises(RuntimeError):
+            session.get_client(_config(port=443))
+        self.assertFalse(self.cache_file.exists())
+
+
+class TestConcurrentProbe(unittest.TestCase):
+    def test_ports_are_probed_concurrently(self):
+        # Listeners that accept but never answer the TLS handshake: each port
+        # costs one full timeout, so sequential probing would take 2x.
+        servers = []
+        for _ in range(2):
+            srv = socket.socket()
+            srv.bind(("127.0.0.1", 0))
+            srv.listen(8)
+            servers.append(srv)
+            self.addCleanup(srv.close)
+        ports = [srv.getsockname()[1] for srv in servers]
+        start = time.monotonic()
+        with self.assertRaises(ConnectionError):
+            config_module.probe_opnsense_port("127.0.0.1", ports=ports, timeout=0.6)
+        self.assertLess(time.monotonic() - start, 1.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
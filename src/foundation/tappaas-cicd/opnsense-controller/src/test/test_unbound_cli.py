@@ -0,0 +1,114 @@
+"""Unit tests for unbound-manager apply (declarative host-override sync).
+
+Run with:
+    cd src && python -m unittest test.test_unbound_cli -v
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from opnsense_controller.unbound_cli import apply_file, parse_desired, plan_overrides
+
+
+def _row(uuid, hostname, domain, server, description=None, rr="A", enabled="1"):
+    return {"uuid": uuid, "hostname": hostname, "domain": domain, "rr": rr,
+            "server": server, "description": description or f"{hostname}.{domain}",
+            "enabled": enabled}
+
+
+def _fake_client(rows):
+    """Fake oxl client for the raw Unbound API; records (command, uuid)."""
+    client = MagicMock()
+    client.calls = []
+
+    def run_module(module, **kwargs):
+        params = kwargs["params"]
+        command = params["command"]
+        client.calls.append((command, (params.get("params") or [None])[0]))
+        if command == "searchHostOverride":
+            return {"result": {"response": {"rows": rows}}}
+        if command == "delHostOverride":
+            return {"result": {"response": {"result": "deleted"}}}
+        if command in ("addHostOverride", "setHostOverride"):
+            return {"result": {"response": {"result": "saved"}}}
+        return {"result": {"response": {"status": "ok"}}}
+
+    client.run_module.side_effect = run_module
+    return client
+
+
+class TestApply(unittest.TestCase):
+    ROWS = [
+        _row("u1", "*", "tappaas.org", "10.6.0.1", "wildcard *.tappaas.org"),
+        _row("u2", "cloud", "tappaas.org", "10.6.0.9"),
+        _row("u3", "old", "tappaas.org", "10.6.0.1"),
+        _row("u4", "printer", "home.lan", "10.1.0.5"),       # unmanaged domain
+    ]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.file = Path(tmp.name) / "public-dns.json"
+
+    def _apply(self, desired, rows, **flags):
+        self.file.write_text(json.dumps(desired))
+        args = argparse.Namespace(file=str(self.file), prune=False, check=False, check_mode=False)
+        vars(args).update(flags)
+        client = _fake_client(rows)
+        with patch("opnsense_controller.unbound_cli._client", return_value=client):
+            ok = apply_file(args)
+        return ok, client.calls
+
+    DESIRED = {
+        "wildcards": {"tappaas.org": "10.6.0.1", "example.net": "10.6.0.1"},
+        "overrides": [{"hostname": "cloud", "domain": "tappaas.org", "ip": "10.6.0.1"}],
+    }
+
+    def test_only_deltas_and_one_reload(self):
+        ok, calls = self._apply(self.DESIRED, self.ROWS, prune=True)
+        self.assertTrue(ok)
+        self.assertEqual(calls, [
+            ("searchHostOverride", None),
+            ("delHostOverride", "u3"),
+            ("setHostOverride", "u2"),
+            ("addHostOverride", None),
+            ("reconfigure", None),
+        ])
+
+    def test_prune_keeps_other_record_types(self):
+        rows = self.ROWS + [_row("u5", "mail", "tappaas.org", "10 mx.tappaas.org", rr="MX (Mail Exchange)")]
+        plan = plan_overrides(rows, parse_desired(self.DESIRED), prune=True)
+        self.assertEqual([o.uuid for o in plan.deletes], ["u3"])
+
+    def test_check_mode_and_in_sync_do_not_write(self):
+        _, calls = self._apply(self.DESIRED, self.ROWS, check=True)
+        self.assertEqual(calls, [("searchHostOverride", None)])
+        _, calls = self._apply({"wildcards": {"tappaas.org": "10.6.0.1"}}, self.ROWS)
+        self.assertEqual(calls, [("searchHostOverride", None)])
+
+    def test_disabled_override_is_reenabled(self):
+        rows = [_row("u1", "*", "tappaas.org", "10.6.0.1", "wildcard *.tappaas.org", enabled="0")]
+        plan = plan_overrides(rows, parse_desired({"wildcards": {"tappaas.org": "10.6.0.1"}}))
+        self.assertEqual([have.uuid for have, _ in plan.updates], ["u1"])
+
+    def test_invalid_file_writes_nothing(self):
+        ok, calls = self._apply({"overrides": [{"hostname": "a", "domain": "b", "ip": "nope"}]}, self.ROWS)
+        self.assertFalse(ok)
+        self.assertEqual(calls, [])
+        with self.assertRaises(ValueError):
+            parse_desired({"wildcards": {"x.org": "10.0.0.1"},
+                           "overrides": [{"hostname": "*", "domain": "X.org", "ip": "10.0.0.2"}]})
+
+    def test_ipv6_is_aaaa(self):
+        desired = parse_desired({"wildcards": {"tappaas.org": "fd00::1"}})
+        self.assertEqual(desired[0].rr, "AAAA")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Unit tests for VlanManager's deferred (coalesced) interface reloads.
+
+The oxl client is a MagicMock, so no firewall is needed.
+
+Run with:
+    cd src && python -m unittest test.test_vlan_manager -v
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from opnsense_controller.config import Config
+from opnsense_controller.vlan_manager import ReloadError, Vlan, VlanManager
+
+
+def _saved(ifname):
+    return {"result": {"response": {"result": "saved", "ifname": ifname}}}
+
+
+class TestDeferredReloads(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.run_module.return_value = {}
+        config = Config(firewall="fw.test", port=443, token="t", secret="s", credential_file=None)
+        patcher = patch("opnsense_controller.vlan_manager.get_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = VlanManager(config)
+
+    def _commands(self):
+        return [c.kwargs["params"].get("command") for c in self.client.run_module.call_args_list
+                if c.args[0] == "raw"]
+
+    def test_reloads_are_immediate_without_a_batch(self):
+        with self.manager as vlan:
+            vlan.reload_interface("opt1")
+        self.assertEqual(self._commands(), ["reloadInterface/opt1"])
+
+    def test_batch_coalesces_reloads_and_apply_into_one_call(self):
+        with self.manager as vlan:
+            vlan.defer_reloads()
+            for ident in ("opt1", "opt2", "opt1"):
+                self.assertTrue(vlan.reload_interface(ident)["deferred"])
+            vlan.apply_vlan_settings()
+            self.assertEqual(vlan.pending_reloads, ["opt1", "opt2"])
+            self.assertEqual(self._commands(), [])
+            result = vlan.flush_reloads()
+        self.assertEqual(result["identifiers"], ["opt1", "opt2"])
+        self.assertEqual(self._commands(), ["reconfigure"])
+
+    def test_create_vlan_reload_is_deferred_until_exit(self):
+        self.client.run_module.side_effect = lambda name, **kw: (
+            _saved("opt4") if kw["params"].get("command") == "addItem" else {})
+        with self.manager as vlan:
+            vlan.defer_reloads()
+            result = vlan.create_vlan(Vlan("srv", 210, "vtnet0"), assign=True)
+            self.assertEqual(result["ifname"], "opt4")
+            self.assertEqual(self._commands(), ["addItem"])
+        self.assertEqual(self._commands(), ["addItem", "reconfigure"])
+
+    def test_failed_apply_rolls_back_batch_assignments(self):
+        def run_module(name, **kw):
+            command = kw["params"].get("command")
+            if command == "addItem":
+                return _saved(kw["params"]["data"]["assign"]["description"])
+            if command == "reconfigure":
+                raise RuntimeError("configd timeout")
+            return {}
+        self.client.run_module.side_effect = run_module
+        with self.manager as vlan:
+            vlan.assign_interface("vlan0.100", "before")      # not part of the batch
+            vlan.defer_reloads()
+            for name in ("opt5", "opt6"):
+                vlan.assign_interface(f"vlan0.{name}", name)
+                vlan.reload_interface(name)
+            with self.assertRaises(ReloadError) as ctx:
+                vlan.flush_reloads()
+        self.assertEqual(ctx.exception.rolled_back, ["opt6", "opt5"])
+        self.assertEqual(self._commands()[-2:], ["delItem/opt6", "delItem/opt5"])
+
+    def test_failed_apply_keeps_reassigned_interfaces_and_deletes_new_vlans(self):
+        def run_module(name, **kw):
+            if name == "interface_vlan":
+                return {"changed": kw["params"].get("state") != "absent"}
+            command = kw["params"].get("command")
+            if command == "addItem":
+                return _saved(kw["params"]["data"]["assign"]["description"])
+            if command == "reconfigure":
+                raise RuntimeError("configd timeout")
+            return {}
+        self.client.run_module.side_effect = run_module
+        with self.manager as vlan:
+            vlan.defer_reloads()
+            vlan.assign_interface("vlan0.210", "opt2", rollback=False)   # label rename
+            vlan.create_vlan(Vlan("srv", 220, "vtnet0"), assign=True, interface_name="opt7")
+            with self.assertRaises(ReloadError) as ctx:
+                vlan.flush_reloads()
+        self.assertEqual(ctx.exception.rolled_back, ["opt7"])
+        self.assertEqual(ctx.exception.deleted_vlans, ["srv"])
+        self.assertNotIn("delItem/opt2", self._commands())
+        deletes = [c.kwargs["params"] for c in self.client.run_module.call_args_list
+                   if c.args[0] == "interface_vlan" and c.kwargs["params"].get("state") == "absent"]
+        self.assertEqual(deletes, [{"description": "srv", "state": "absent"}])
+
+    def test_failed_bare_apply_is_not_an_error(self):
+        self.client.run_module.side_effect = RuntimeError("configd timeout")
+        with self.manager as vlan:
+            vlan.defer_reloads()
+            vlan.apply_vlan_settings()
+            self.assertIn("error", vlan.flush_reloads())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,8 +8,12 @@ Run with:
 
 from __future__ import annotations
 
+import dataclasses
+import io
 import json
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -20,10 +24,14 @@ from opnsense_controller.firewall_manager import (
     RuleAction,
 )
 from opnsense_controller.zone_manager import (
+    DRIFT_ERROR,
+    DRIFT_FOUND,
+    DRIFT_OK,
     Zone,
     ValidationMessage,
     ZoneManager,
     _check_egress,
+    main,
     discover_module_files,
     postflight_checks,
     preflight_checks,
@@ -81,8 +89,7 @@ def _build_zones(**overrides) -> dict[str, Zone]:
     for n, attrs in overrides.items():
         if n not in zones:
             continue
-        for k, v in attrs.items():
-            setattr(zones[n], k, v)
+        zones[n] = dataclasses.replace(zones[n], **attrs)
     return zones
 
 
@@ -665,6 +672,31 @@ class TestCaddyReachability(TestConfigureFirewallRulesSequencing):
         self.assertEqual([r.description for r in self._caddy_rules(second)], [])
 
 
+class TestDesiredFirewallRules(TestConfigureFirewallRulesSequencing):
+    """desired_firewall_rules() is exactly what configure_firewall_rules creates."""
+
+    @staticmethod
+    def _key(r):
+        return (r.description, r.interface, r.source_net, r.destination_net,
+                r.action, r.sequence, r.protocol, r.destination_port)
+
+    def test_matches_reconcile_output(self):
+        zones = _build_zones(home={"access_to": ["internet", "srv"]})
+        fake = self._run(zones)
+        desired = self._manager(zones).desired_firewall_rules()
+        self.assertEqual(
+            sorted(map(self._key, desired)), sorted(map(self._key, fake.created))
+        )
+
+    def test_interface_resolver_is_used_and_unresolved_zones_skipped(self):
+        zm = self._manager(_build_zones())
+        rules = zm.desired_firewall_rules(
+            interface_for=lambda z: None if z.name == "home" else z.name
+        )
+        self.assertFalse(any(r.description.startswith("Zone home ") for r in rules))
+        self.assertEqual({r.interface for r in rules}, {"srv", "dmz", "locked-srv"})
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Pre-flight / post-flight health guards (issue #307)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -727,6 +759,395 @@ class TestPreflightChecks(unittest.TestCase):
         # skip_egress must NOT bypass the DNS check.
         self.assertFalse(preflight_checks(skip_egress=True))
 
+    @patch("opnsense_controller.zone_manager._check_api", return_value=False)
+    @patch("opnsense_controller.zone_manager._check_egress", return_value=True)
+    @patch("opnsense_controller.zone_manager._check_unbound_dns", return_value=True)
+    def test_api_probe_runs_only_with_a_config(self, _dns, _egress, mock_api):
+        self.assertTrue(preflight_checks())
+        mock_api.assert_not_called()
+        self.assertFalse(preflight_checks(config=MagicMock()))
+        self.assertFalse(postflight_checks(config=MagicMock()))
+
+    def test_probes_run_concurrently(self):
+        def slow(*args, **kwargs):
+            time.sleep(0.3)
+            return True
+        with patch("opnsense_controller.zone_manager._check_unbound_dns", side_effect=slow), \
+                patch("opnsense_controller.zone_manager._check_egress", side_effect=slow), \
+                patch("opnsense_controller.zone_manager._check_api", side_effect=slow):
+            start = time.monotonic()
+            self.assertTrue(preflight_checks(config=MagicMock()))
+            self.assertLess(time.monotonic() - start, 0.6)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# configure_all plan/apply — one read snapshot, minimal writes
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class _CountingFake:
+    """Counts every method call by name; unknown methods return {}.
+
+    A callable return value is called on each use (for state that changes).
+    """
+
+    def __init__(self, **returns):
+        self.calls: dict[str, int] = {}
+        self._returns = returns
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            value = self._returns.get(name, {})
+            if callable(value):
+                value = value()
+            return list(value) if isinstance(value, list) else value
+        return method
+
+    def writes(self) -> dict[str, int]:
+        reads = {"list_vlans", "get_assigned_vlans", "list_ranges",
+                 "get_dnsmasq_interfaces", "list_rules"}
+        return {k: v for k, v in self.calls.items() if k not in reads}
+
+
+def _plan_zone(name, tag, net, state="Active", access_to=("internet",)) -> Zone:
+    return Zone(
+        name=name, zone_type="Service", state=state, type_id="", sub_id="",
+        vlan_tag=tag, ip_network=net, bridge="lan", description=f"{name} zone",
+        access_to=list(access_to), pinhole_allowed_from=[],
+    )
+
+
+class TestConfigureAllPlan(unittest.TestCase):
+    ZONES = [
+        _plan_zone("srv", 210, "10.2.10.0/24", access_to=("internet", "dmz")),
+        _plan_zone("home", 310, "10.3.10.0/24"),
+        _plan_zone("dmz", 610, "10.6.0.0/24"),
+        _plan_zone("old", 900, "10.9.0.0/24", state="Disabled"),
+    ]
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            json.dump({}, f)
+        self.zm = ZoneManager(config=MagicMock(), zones_file=f.name)
+        self.zm.zones = list(self.ZONES)
+        live = [z for z in self.ZONES if z.is_enabled]
+        self.vlans = [
+            {"uuid": f"v{z.vlan_tag}", "tag": str(z.vlan_tag), "device": f"vlan0.{z.vlan_tag}",
+             "interface": "vtnet0", "description": z.description}
+            for z in live
+        ]
+        self.assigned = [
+            {"vlan_tag": z.vlan_tag, "device": f"vlan0.{z.vlan_tag}",
+             "identifier": f"opt_{z.name}", "description": z.name}
+            for z in live
+        ]
+        self.ranges = [
+            {"uuid": f"r{z.vlan_tag}", "description": z.dhcp_description,
+             "interface": f"opt_{z.name}", "start_addr": z.dhcp_start, "end_addr": z.dhcp_end}
+            for z in live
+        ]
+        self.dnsmasq = ["lan"] + [f"opt_{z.name}" for z in live]
+        desired = self.zm.desired_firewall_rules(interface_for=lambda z: f"opt_{z.name}")
+        self.rules = [_to_info(r, uuid=f"u{i}") for i, r in enumerate(desired)]
+
+    def _run(self, check_mode=False):
+        self.vlan = _CountingFake(list_vlans=self.vlans,
+                                  get_assigned_vlans=lambda: self.assigned)
+        self.dhcp = _CountingFake(list_ranges=self.ranges, get_dnsmasq_interfaces=self.dnsmasq)
+        self.fw = _FakeFirewall(self.rules)
+        self.fw_reads = 0
+        original_list = self.fw.list_rules
+
+        def counted_list():
+            self.fw_reads += 1
+            return original_list()
+        self.fw.list_rules = counted_list
+        with patch("opnsense_controller.zone_manager.VlanManager", return_value=self.vlan), \
+                patch("opnsense_controller.zone_manager.DhcpManager", return_value=self.dhcp), \
+                patch("opnsense_controller.zone_manager.FirewallManager", return_value=self.fw), \
+                patch("opnsense_controller.zone_manager._check_unbound_dns"):
+            return self.zm.configure_all(check_mode=check_mode)
+
+    def test_noop_run_is_only_the_snapshot_reads(self):
+        result = self._run()
+        self.assertEqual(result["plan"], [])
+        self.assertTrue(self.zm.last_plan.is_noop)
+        # The only write is the kernel-IP drift repair (#237), which no plan can see
+        self.assertEqual(self.vlan.calls, {"list_vlans": 1, "get_assigned_vlans": 1,
+                                           "apply_vlan_settings": 1})
+        self.assertEqual(self.dhcp.calls, {"list_ranges": 1, "get_dnsmasq_interfaces": 1})
+        self.assertEqual(self.fw_reads, 1)
+        self.assertEqual((self.fw.created, self.fw.deleted), ([], []))
+
+    def test_noop_check_run_does_not_apply(self):
+        self._run(check_mode=True)
+        self.assertEqual(self.vlan.writes(), {})
+
+    def test_firewall_drift_touches_only_the_firewall(self):
+        self.rules[0].sequence += 1
+        result = self._run()
+        plan = self.zm.last_plan
+        self.assertEqual(plan.summary(), {"vlans": 0, "dnsmasq": 0, "dhcp": 0, "firewall": 1})
+        self.assertEqual(plan.changes[0].action, "update")
+        self.assertEqual(self.vlan.writes(), {"apply_vlan_settings": 1})
+        self.assertEqual(self.dhcp.writes(), {})
+        self.assertEqual([r.description for r in self.fw.created], [self.rules[0].description])
+        self.assertEqual(self.fw_reads, 1)      # snapshot reused by the apply step
+        self.assertIn("srv", result["firewall"])
+
+    def test_missing_vlan_orders_dependent_steps(self):
+        self.vlans = [v for v in self.vlans if v["tag"] != "310"]
+        full_assigned = self.assigned
+        self.assigned = [a for a in self.assigned if a["vlan_tag"] != 310]
+        self.dnsmasq = [i for i in self.dnsmasq if i != "opt_home"]
+        self.ranges = [r for r in self.ranges if r["interface"] != "opt_home"]
+
+        def create_vlan(*args, **kwargs):   # the new VLAN shows up once assigned
+            self.assigned = full_assigned
+            return {}
+        with patch.object(_CountingFake, "create_vlan", create_vlan, create=True):
+            self._run()
+        changes = [(c.step, c.zone, c.action) for c in self.zm.last_plan.changes]
+        self.assertEqual(changes[0], ("vlans", "home", "create"))
+        self.assertIn(("dnsmasq", "*", "update"), changes)
+        self.assertIn(("dhcp", "home", "create"), changes)
+        self.assertEqual(self.vlan.calls["list_vlans"], 1)
+        self.assertEqual(self.vlan.calls["get_assigned_vlans"], 2)   # re-read after create
+        self.assertEqual(self.dhcp.calls["set_dnsmasq_interfaces"], 1)
+        self.assertEqual(self.dhcp.calls["create_range"], 1)
+
+    def test_disabled_zone_leftovers_are_planned_for_deletion(self):
+        old = self.ZONES[3]
+        self.vlans.append({"uuid": "v900", "tag": "900", "device": "vlan0.900",
+                           "interface": "vtnet0", "description": old.description})
+        self.ranges.append({"uuid": "r900", "description": old.dhcp_description,
+                            "interface": "opt_old"})
+        self._run(check_mode=True)
+        changes = {(c.step, c.action) for c in self.zm.last_plan.changes if c.zone == "old"}
+        self.assertEqual(changes, {("vlans", "delete"), ("dhcp", "delete")})
+        self.assertNotIn("delete_vlan", self.vlan.calls)   # check mode writes nothing
+
+    def _drift(self):
+        self.vlan = _CountingFake(list_vlans=self.vlans, get_assigned_vlans=lambda: self.assigned)
+        self.dhcp = _CountingFake(list_ranges=self.ranges, get_dnsmasq_interfaces=self.dnsmasq)
+        self.fw = _FakeFirewall(self.rules)
+        with patch("opnsense_controller.zone_manager.VlanManager", return_value=self.vlan), \
+                patch("opnsense_controller.zone_manager.DhcpManager", return_value=self.dhcp), \
+                patch("opnsense_controller.zone_manager.FirewallManager", return_value=self.fw):
+            return self.zm.drift_report()
+
+    def test_drift_report_in_sync(self):
+        report = self._drift()
+        doc = report.to_dict()
+        self.assertEqual(report.exit_code, DRIFT_OK)
+        self.assertEqual(set(doc["counts"]), {"ok"})
+        kinds = {(i.kind, i.name) for i in report.items}
+        self.assertIn(("label", "srv"), kinds)
+        self.assertIn(("dnsmasq", "*"), kinds)
+        self.assertIn(("firewall_rule", "Zone srv -> dmz"), kinds)
+        self.assertEqual(self.vlan.writes(), {})
+        self.assertEqual(self.dhcp.writes(), {})
+        self.assertEqual((self.fw.created, self.fw.deleted), ([], []))
+        for phase in ("read_vlans", "read_dhcp", "read_firewall", "plan", "total"):
+            self.assertIn(phase, doc["timings_ms"])
+        json.dumps(doc)
+
+    def test_drift_report_flags_each_object(self):
+        self.vlans = [v for v in self.vlans if v["tag"] != "310"]
+        self.assigned = [dict(a, description="legacy") if a["vlan_tag"] == 210 else a
+                         for a in self.assigned if a["vlan_tag"] != 310]
+        self.rules[0].sequence += 1
+        report = self._drift()
+        status = {(i.kind, i.name): i.status for i in report.items}
+        self.assertEqual(report.exit_code, DRIFT_FOUND)
+        self.assertEqual(status[("vlan", "home")], "missing")
+        self.assertEqual(status[("label", "srv")], "drift")
+        self.assertEqual(status[("firewall_rule", self.rules[0].description)], "drift")
+        self.assertEqual(status[("vlan", "srv")], "ok")
+        self.assertEqual(len(status), len(report.items))     # one entry per object
+
+    def test_unreadable_dnsmasq_is_an_error_not_drift(self):
+        self.dnsmasq = None
+        report = self._drift()
+        status = {(i.kind, i.name): i.status for i in report.items}
+        self.assertEqual(status[("dnsmasq", "*")], "unknown")
+        self.assertEqual(report.exit_code, DRIFT_ERROR)
+
+    def test_drift_cli_reports_setup_errors_as_json(self):
+        stdout = io.StringIO()
+        with patch("sys.argv", ["zone-manager", "--drift", "--zones-file", "/nonexistent/zones.json"]), \
+                patch("opnsense_controller.zone_manager.Config"), \
+                patch("sys.stdout", stdout), patch("sys.stderr", io.StringIO()), \
+                self.assertRaises(SystemExit) as ctx:
+            main()
+        doc = json.loads(stdout.getvalue())
+        self.assertEqual(ctx.exception.code, DRIFT_ERROR)
+        self.assertEqual((doc["drift"], doc["exit_code"]), (None, DRIFT_ERROR))
+
+    def test_drift_cli_keeps_log_lines_off_stdout(self):
+        srv = dataclasses.replace(self.ZONES[0], access_to=["internet", "dmz", "nowhere"])
+        self.zm.zones = [srv] + list(self.ZONES[1:])
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with patch("opnsense_controller.zone_manager.ZoneManager", return_value=self.zm), \
+                patch("opnsense_controller.zone_manager.Config"), \
+                patch.object(self.zm, "load_zones"), \
+                patch("sys.argv", ["zone-manager", "--drift", "--zones-file", "zones.json"]), \
+                patch("sys.stdout", stdout), patch("sys.stderr", stderr), \
+                self.assertRaises(SystemExit) as ctx:
+            self._drift_main()
+        doc = json.loads(stdout.getvalue())
+        self.assertEqual(ctx.exception.code, DRIFT_FOUND)
+        self.assertEqual(doc["exit_code"], DRIFT_FOUND)
+        self.assertIn("target zone 'nowhere' not found", stderr.getvalue())
+
+    def _drift_main(self):
+        self.vlan = _CountingFake(list_vlans=self.vlans, get_assigned_vlans=lambda: self.assigned)
+        self.dhcp = _CountingFake(list_ranges=self.ranges, get_dnsmasq_interfaces=self.dnsmasq)
+        self.fw = _FakeFirewall(self.rules)
+        with patch("opnsense_controller.zone_manager.VlanManager", return_value=self.vlan), \
+                patch("opnsense_controller.zone_manager.DhcpManager", return_value=self.dhcp), \
+                patch("opnsense_controller.zone_manager.FirewallManager", return_value=self.fw):
+            main()
+
+
+class _ConcurrencyFake:
+    """VLAN/DHCP manager fake that logs each call and how many overlap."""
+
+    def __init__(self, delay=0.05, **returns):
+        self.delay = delay
+        self.returns = returns
+        self.events: list[str] = []
+        self.in_flight: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            with self._lock:
+                self.events.append(name)
+                self.in_flight[name] = self.in_flight.get(name, 0) + 1
+                self.peak[name] = max(self.peak.get(name, 0), self.in_flight[name])
+            time.sleep(self.delay)
+            with self._lock:
+                self.in_flight[name] -= 1
+            value = self.returns.get(name, {})
+            return value(*args, **kwargs) if callable(value) else value
+        return method
+
+
+class TestParallelZoneSteps(unittest.TestCase):
+    """Per-zone VLAN/DHCP calls run on a bounded pool with ordered stages."""
+
+    ZONES = [_plan_zone(f"z{i}", 300 + i, f"10.3.{i}.0/24") for i in range(6)]
+
+    def _manager(self, workers):
+        zm = ZoneManager(config=MagicMock(), zones_file="/nonexistent", workers=workers)
+        zm.zones = list(self.ZONES)
+        return zm
+
+    def test_vlan_stages_are_barriers_and_assignment_is_serial(self):
+        def saved(device, **kwargs):
+            return {"result": {"response": {"result": "saved", "ifname": f"opt_{device}"}}}
+
+        fake = _ConcurrencyFake(list_vlans=[], get_assigned_vlans=[], assign_interface=saved)
+        with patch("opnsense_controller.zone_manager.VlanManager", return_value=fake):
+            results = self._manager(workers=3).configure_vlans(check_mode=False)
+        stages = [e for e in fake.events
+                  if e in ("create_vlan", "assign_interface", "reload_interface")]
+        self.assertEqual(stages, ["create_vlan"] * 6 + ["assign_interface"] * 6
+                         + ["reload_interface"] * 6)
+        self.assertIn(fake.peak["create_vlan"], (2, 3))      # concurrent, capped at workers
+        self.assertEqual(fake.peak["assign_interface"], 1)
+        self.assertIn(fake.peak["reload_interface"], (2, 3))
+        self.assertEqual(results["z0"]["result"]["ifname"], "opt_vlan0.300")
+        # Reloads are deferred for the run and applied once at the end
+        self.assertLess(fake.events.index("defer_reloads"), fake.events.index("create_vlan"))
+        self.assertEqual(fake.events[-2:], ["apply_vlan_settings", "flush_reloads"])
+
+    def test_dhcp_ranges_are_created_concurrently_then_applied_once(self):
+        assigned = [{"vlan_tag": z.vlan_tag, "identifier": f"opt{i}", "description": z.name}
+                    for i, z in enumerate(self.ZONES)]
+        vlan = _ConcurrencyFake(get_assigned_vlans=assigned)
+        dhcp = _ConcurrencyFake(list_ranges=[])
+        with patch("opnsense_controller.zone_manager.VlanManager", return_value=vlan), \
+                patch("opnsense_controller.zone_manager.DhcpManager", return_value=dhcp):
+            results = self._manager(workers=4).configure_dhcp(check_mode=False)
+        self.assertIn(dhcp.peak["create_range"], (2, 3, 4))
+        self.assertEqual(dhcp.events[-1], "reconfigure")
+        self.assertEqual(dhcp.events.count("reconfigure"), 1)
+        self.assertEqual({r["status"] for r in results.values()}, {"created"})
+        self.assertEqual(results["z5"]["interface"], "opt5")
+
+    def test_single_worker_keeps_the_combined_create_call(self):
+        fake = _ConcurrencyFake(delay=0, list_vlans=[], get_assigned_vlans=[])
+        with patch("opnsense_controller.zone_manager.VlanManager", return_value=fake):
+            self._manager(workers=1).configure_vlans(check_mode=False)
+        self.assertNotIn("assign_interface", fake.events)
+        self.assertEqual(fake.events.count("create_vlan"), 6)
+        self.assertEqual(fake.peak["create_vlan"], 1)
+
+
+class TestZoneModel(unittest.TestCase):
+    """Zone is immutable with derived values computed once; lookups are indexed."""
+
+    def test_derived_values(self):
+        zone = dataclasses.replace(_zone("srv"), ip_network="10.2.0.0/16", dhcp_end_offset=1000)
+        self.assertEqual(zone.gateway_ip, "10.2.0.1")
+        self.assertEqual((zone.dhcp_start, zone.dhcp_end), ("10.2.0.50", "10.2.3.232"))
+        self.assertEqual(zone.network.prefixlen, 16)
+        self.assertEqual(zone.domain, "srv.internal")
+
+    def test_zone_is_frozen_and_hashable(self):
+        zone = _zone("srv", access_to=["internet"])
+        self.assertEqual(zone.access_to, ("internet",))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            zone.state = "Inactive"
+        self.assertEqual(len({zone, _zone("srv", access_to=["internet"])}), 1)
+
+    def test_malformed_ip_raises_only_on_access(self):
+        zone = dataclasses.replace(_zone("dmz"), ip_network="not-a-network")
+        self.assertEqual(zone.name, "dmz")
+        for attr in ("network", "gateway_ip", "dhcp_start"):
+            with self.subTest(attr=attr), self.assertRaises(ValueError):
+                getattr(zone, attr)
+
+    def test_index_categories_and_lookups(self):
+        zm = ZoneManager(config=MagicMock(), zones_file="/nonexistent",
+                         bridge_map={"lan": "vtnet0", "wan": "vtnet1"})
+        zones = _build_zones()
+        zones["home"] = dataclasses.replace(zones["home"], state="Inactive")
+        zones["dmz"] = dataclasses.replace(zones["dmz"], vlan_tag=0, bridge="WAN")
+        zm.zones = list(zones.values())
+        self.assertIs(zm.get_zone_by_name("SRV"), zones["srv"])
+        self.assertEqual([z.name for z in zm.get_vlan_zones()], ["srv", "locked-srv"])
+        self.assertEqual([z.name for z in zm.get_disabled_vlan_zones()], ["home"])
+        self.assertEqual([z.name for z in zm.index.by_interface["vtnet1"]], ["dmz"])
+        self.assertEqual(len(zm.index.by_tag[210]), 3)
+        self.assertIs(zm.index, zm.index)
+
+        zm.zones = [zones["home"]]                       # reassigning re-indexes
+        self.assertIsNone(zm.get_zone_by_name("srv"))
+        self.assertEqual(zm.get_firewall_zones(), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -207,12 +207,29 @@ def get_installed_apps() -> list[str]:
     return apps
 
 
+# Parsed module JSON keyed by path, validated by (mtime_ns, size):
+# topological_sort() and the app loop ask for the same modules repeatedly.
+_module_json_cache: dict[Path, tuple[tuple[int, int], dict]] = {}
+
+
+def _load_module_json(json_path: Path) -> dict:
+    """Parse a module JSON file, reusing the last parse while it is unchanged."""
+    st = json_path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _module_json_cache.get(json_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with open(json_path) as f:
+        config = json.load(f)
+    _module_json_cache[json_path] = (stamp, config)
+    return config
+
+
 def get_module_dependencies(module_name: str) -> list[str]:
     """Get provider module names from a module's dependsOn field."""
     json_path = CONFIG_DIR / f"{module_name}.json"
     try:
-        with open(json_path) as f:
-            config = json.load(f)
+        config = _load_module_json(json_path)
         depends_on = config.get("dependsOn", [])
         providers = set()
         for dep in depends_on: